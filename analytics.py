@@ -0,0 +1,241 @@
+"""
+Fungsi komputasi analisis dashboard yang tidak bergantung pada Streamlit.
+
+Setiap fungsi menerima data yang sudah difilter (potongan kubus penjualan atau frame stok/inbound)
+dan mengembalikan tabel hasil, sehingga bisa dimemo per bagian dashboard maupun dipakai ulang
+di luar aplikasi.
+"""
+import numpy as np
+import pandas as pd
+
+import demand_forecast
+import sales_cube
+import sketches
+import sku_dimension
+
+# Tampilan di tab "Analisis Penjualan": (judul subheader, dimensi, ukuran, judul grafik)
+SALES_VIEWS = {
+    "Berdasarkan Kategori": [
+        ("Penjualan Berdasarkan Kategori Produk", 'Category', 'Sub Total', 'Total Penjualan per Kategori')],
+    "Berdasarkan Sub Kategori": [
+        ("Penjualan Berdasarkan Sub Kategori Produk", 'Sub Category', 'Sub Total',
+         'Total Penjualan per Sub Kategori')],
+    "Berdasarkan Tahun Produksi": [
+        ("Penjualan Berdasarkan Tahun Produksi", 'Tahun Produksi', 'Sub Total',
+         'Total Penjualan per Tahun Produksi')],
+    "Berdasarkan Musim": [
+        ("Penjualan Berdasarkan Musim", 'Season', 'Sub Total', 'Total Penjualan per Musim')],
+    "Berdasarkan Warna": [
+        ("Penjualan Berdasarkan Warna Produk", 'Warna Produk', 'Sub Total', 'Total Penjualan per Warna Produk')],
+    "Berdasarkan Ukuran": [
+        ("Penjualan Berdasarkan Ukuran Produk", 'Size Produk', 'Sub Total', 'Total Penjualan per Ukuran Produk')],
+    "Analisis Profitabilitas": [
+        ("Analisis Profitabilitas Berdasarkan Kategori", 'Category', 'Gross Profit',
+         'Total Gross Profit per Kategori'),
+        ("Analisis Profitabilitas Berdasarkan Sub Kategori", 'Sub Category', 'Gross Profit',
+         'Total Gross Profit per Sub Kategori')]
+}
+
+
+def kpi_summary(cube_sales, df_stock):
+    """
+    Nilai untuk kartu KPI: total penjualan, gross profit, QTY terjual dan perputaran stok.
+    """
+    total_qty = sales_cube.total(cube_sales, 'QTY')
+    # Menghitung Inventory Turnover Ratio (sederhana: Total QTY Terjual / Rata-rata Stok Tersedia)
+    # Ini adalah perhitungan snapshot, untuk akurasi lebih baik butuh data stok time-series
+    avg_stock_qty = df_stock['Tersedia'].mean() if not df_stock.empty else 0
+    inventory_turnover = (total_qty / avg_stock_qty) if avg_stock_qty > 0 else 0
+    return {
+        "nett_sales": sales_cube.total(cube_sales, 'Nett Sales'),
+        "gross_profit": sales_cube.total(cube_sales, 'Gross Profit'),
+        "qty": total_qty,
+        "inventory_turnover": inventory_turnover
+    }
+
+
+def sales_view(cube_sales, view):
+    """
+    Roll-up kubus untuk satu tampilan di tab "Analisis Penjualan".
+    Mengembalikan list (judul subheader, dimensi, ukuran, judul grafik, tabel).
+    """
+    return [(subheader, dimension, measure, title, sales_cube.rollup(cube_sales, dimension, measure))
+            for subheader, dimension, measure, title in SALES_VIEWS[view]]
+
+
+def sales_by_channel(cube_sales):
+    return sales_cube.rollup(cube_sales, 'Channel', 'Sub Total')
+
+
+def top_products(cube_products, top=10):
+    return sales_cube.rollup(cube_products, 'Nama Barang', 'QTY', top=top)
+
+
+def top_values(df_sales, dimension, top=10):
+    """
+    Top-N nilai sebuah dimensi penjualan berdasarkan QTY (eksak), misalnya per Salesman atau Nama Toko.
+    """
+    if dimension not in df_sales.columns:
+        return pd.DataFrame(columns=[dimension, 'QTY'])
+    return sales_cube.rollup(df_sales, dimension, 'QTY', top=top)
+
+
+def distinct_counts(df_sales):
+    """
+    Jumlah nilai unik (eksak) per kolom sketches.DISTINCT_DIMENSIONS yang ada di data penjualan.
+    """
+    return {column: int(df_sales[column].nunique()) for column in sketches.DISTINCT_DIMENSIONS
+            if column in df_sales.columns}
+
+
+def monthly_sales(cube_sales):
+    return sales_cube.monthly(cube_sales, 'Nett Sales')
+
+
+def _dimension(dimension, df_sales=None, df_stock=None, df_inbound=None):
+    # Tanpa dimensi bersama (misalnya laporan batch), dimensi dibangun dari frame yang diberikan
+    return dimension if dimension is not None else sku_dimension.SkuDimension.build(df_sales, df_stock, df_inbound)
+
+
+def stock_vs_inbound(df_stock, df_inbound, dimension=None):
+    """
+    Perbandingan stok tersedia dengan total qty diterima (inbound) per SKU, terurut berdasarkan SKU.
+    Agregasi dan join nama memakai SKU_ID dari dimensi SKU (bincount dan pengindeksan array).
+    """
+    dimension = _dimension(dimension, df_stock=df_stock, df_inbound=df_inbound)
+    stock_ids = dimension.encode(df_stock['SKU'])
+    inbound_ids = dimension.encode(df_inbound['SKU'])
+    rows = np.flatnonzero(dimension.present(stock_ids) | dimension.present(inbound_ids))
+    names = dimension.table.take(rows)
+    return pd.DataFrame({
+        'SKU': dimension.skus[rows],
+        'Total Tersedia': dimension.totals(stock_ids, df_stock['Tersedia'])[rows],
+        'Total Qty Diterima': dimension.totals(inbound_ids, df_inbound['Qty Diterima'])[rows],
+        'Nama Item': names['Nama Item'].fillna(names['SKU']).to_numpy(),
+        'Category': names['Category'].to_numpy()
+    })
+
+
+def stock_by_location(df_stock):
+    return df_stock.groupby('Lokasi', observed=True)['QTY'].sum().sort_values(ascending=False,
+                                                                               kind='stable').reset_index()
+
+
+def reorder_recommendations(daily_sales, seasons, stock_by_sku, names):
+    """
+    Rekomendasi dari ramalan permintaan (demand_forecast) untuk input yang sudah disiapkan backend:
+    daily_sales (SKU, Tanggal, QTY), Season per SKU, stok tersedia per SKU dan nama per SKU.
+    Mengembalikan (perlu reorder, stok berlebih): yang pertama terurut dari hari persediaan
+    tersingkat, yang kedua dari stok terbesar.
+    """
+    forecast = demand_forecast.forecast_demand(daily_sales['SKU'], daily_sales['Tanggal'], daily_sales['QTY'],
+                                               seasons)
+    plan = demand_forecast.reorder_plan(forecast, stock_by_sku)
+    return _split_plan(plan.merge(names.drop_duplicates('SKU'), on='SKU', how='left'))
+
+
+def _split_plan(plan):
+    plan = plan[['SKU', 'Nama Item', 'Category'] + demand_forecast.PLAN_COLUMNS]
+    reorder = plan[plan['Perlu Reorder']].sort_values(['Hari Persediaan', 'SKU'], kind='stable')
+    overstock = plan[plan['Stok Berlebih']].sort_values(['TotalTersedia', 'SKU'], ascending=[False, True],
+                                                        kind='stable')
+    return reorder.reset_index(drop=True), overstock.reset_index(drop=True)
+
+
+def recommendations(df_sales, df_stock, dimension=None):
+    """
+    Produk yang perlu dipesan ulang (stok di bawah reorder point hasil ramalan permintaan) dan produk
+    dengan stok berlebih. Mengembalikan (low_stock_high_sales, high_stock_low_sales).
+    Ramalan dan stok dihitung per SKU_ID; teks SKU, nama dan Season diambil dari dimensi SKU.
+    """
+    dimension = _dimension(dimension, df_sales=df_sales, df_stock=df_stock)
+    sales_ids = dimension.encode(df_sales['SKU'])
+    stock_ids = dimension.encode(df_stock['SKU'])
+    sold = sales_ids >= 0
+    forecast = demand_forecast.forecast_demand(sales_ids[sold], df_sales['Tanggal'].to_numpy()[sold],
+                                               df_sales['QTY'].to_numpy()[sold], dimension.table['Season'])
+    in_stock = np.flatnonzero(dimension.present(stock_ids))
+    stock_by_sku = pd.Series(dimension.totals(stock_ids, df_stock['Tersedia'])[in_stock], index=in_stock)
+    plan = demand_forecast.reorder_plan(forecast, stock_by_sku)
+    ids = plan['SKU'].to_numpy()
+    plan['SKU'] = dimension.skus[ids]
+    for column in sku_dimension.NAME_COLUMNS:
+        plan[column] = dimension.table[column].to_numpy()[ids]
+    return _split_plan(plan)
+
+
+class FrameQueries:
+    """
+    Kueri dashboard di atas data pandas yang sudah difilter: potongan kubus penjualan/produk dan
+    frame penjualan, stok serta inbound terpilih. Antarmukanya sama dengan sql_backend.SqlQueries,
+    sehingga bagian dashboard tidak perlu tahu backend mana yang menjawab.
+    """
+    backend = "pandas"
+
+    def __init__(self, cube_sales, cube_products, df_sales, df_stock, df_inbound, dimension=None):
+        self.cube_sales = cube_sales
+        self.cube_products = cube_products
+        self.df_sales = df_sales
+        self.df_stock = df_stock
+        self.df_inbound = df_inbound
+        self._sku_dimension = dimension
+
+    @property
+    def dimension(self):
+        """
+        Dimensi SKU bersama dari dataset lengkap; jika tidak diberikan, dibangun sekali dari frame terpilih.
+        """
+        if self._sku_dimension is None:
+            self._sku_dimension = sku_dimension.SkuDimension.build(self.df_sales, self.df_stock, self.df_inbound)
+        return self._sku_dimension
+
+    def kpi_summary(self):
+        return kpi_summary(self.cube_sales, self.df_stock)
+
+    def sales_view(self, view):
+        return sales_view(self.cube_sales, view)
+
+    def sales_by_channel(self):
+        return sales_by_channel(self.cube_sales)
+
+    def top_products(self, top=10):
+        return top_products(self.cube_products, top)
+
+    def top_values(self, dimension, top=10):
+        # Nama Barang sudah menjadi dimensi kubus produk
+        if dimension == 'Nama Barang':
+            return self.top_products(top)
+        return top_values(self.df_sales, dimension, top)
+
+    def distinct_counts(self):
+        return distinct_counts(self.df_sales)
+
+    def monthly_sales(self):
+        return monthly_sales(self.cube_sales)
+
+    def stock_vs_inbound(self):
+        return stock_vs_inbound(self.df_stock, self.df_inbound, self.dimension)
+
+    def stock_by_location(self):
+        return stock_by_location(self.df_stock)
+
+    def sku_sales(self):
+        """
+        QTY terjual per SKU (Series), misalnya untuk metrik snapshot stok.
+        """
+        ids = self.dimension.encode(self.df_sales['SKU'])
+        rows = np.flatnonzero(self.dimension.present(ids))
+        return pd.Series(self.dimension.totals(ids, self.df_sales['QTY'])[rows],
+                         index=pd.Index(self.dimension.skus[rows], name='SKU'), name='QTY')
+
+    def recommendations(self):
+        return recommendations(self.df_sales, self.df_stock, self.dimension)
+
+    def frame(self, file_type):
+        """
+        Frame terpilih untuk tabel data mentah.
+        """
+        return {"sales": self.df_sales, "stock": self.df_stock, "inbound": self.df_inbound}[file_type]
+
+    def columns(self, file_type):
+        return list(self.frame(file_type).columns)
@@ -1,7 +1,32 @@
+import logging
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import re  # Untuk ekspresi reguler dalam parsing SKU
+
+import analytics
+import charts
+import data_cache
+import data_loader
+import dataset_registry
+import demand_forecast
+import export_jobs
+import filter_engine
+import incremental_store
+import parallel_loader
+import profiler
+import sales_cube
+import schemas
+import sketches
+import sku_dimension
+import sql_backend
+import stock_snapshots
+import table_view
+import warm_start
+from sku_parser import parse_sku_batch
 
 # Konfigurasi halaman Streamlit
 st.set_page_config(
@@ -10,34 +35,38 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Instrumentasi: setiap tahap pada rerun ini dicatat ke profile_run (lihat panel instrumentasi di sidebar)
+profile_run = profiler.start_run("rerun")
+
+# Frame, decoder SKU, kubus dan indeks filter disimpan sekali per isi data di registry proses dan
+# dibagikan ke semua sesi; sesi ini hanya memegang referensinya lewat holder (lihat dataset_registry)
+registry = dataset_registry.shared()
+if 'dataset_holder' not in st.session_state:
+    st.session_state['dataset_holder'] = registry.holder()
+holder = st.session_state['dataset_holder']
+
+# Warm start: dataset terakhir dimuat ke registry sekali per proses, di thread latar (lihat warm_start)
+if warm_start.enabled():
+    warm_start.start(registry)
+
+# Ekspor latar belakang: interval polling status dan jumlah job terakhir yang ditampilkan per sesi
+EXPORT_POLL_SECONDS = float(os.environ.get("EXPORT_POLL_SECONDS", "1"))
+EXPORT_HISTORY = 5
+
 
 # --- Fungsi untuk Memuat Data ---
-# Menggunakan st.cache_data untuk caching data agar aplikasi lebih cepat
-@st.cache_data
 def load_sku_master(file_uploader):
     """
     Memuat data master SKU dari file Excel yang diunggah.
     File ini diharapkan memiliki kolom 'CODE', 'ARTI', dan 'JENIS'.
+    Decoder dibagikan antar sesi lewat registry (st.cache_data akan mengembalikan salinan pada setiap rerun).
     """
     if file_uploader is not None:
         try:
-            df_sku_master = pd.read_excel(file_uploader)
-            # Membersihkan nama kolom dari spasi berlebih dan karakter baris baru
-            df_sku_master.columns = [re.sub(r'\s+', ' ', col).strip() for col in df_sku_master.columns]
-
-            sku_decoder = {}
-            if not df_sku_master.empty:
-                required_cols = ['CODE', 'ARTI', 'JENIS']
-                if not all(col in df_sku_master.columns for col in required_cols):
-                    raise ValueError(f"File SKU Master harus memiliki kolom: {', '.join(required_cols)}")
-
-                for index, row in df_sku_master.iterrows():
-                    code = str(row.get('CODE', '')).strip().upper()
-                    arti = str(row.get('ARTI', '')).strip()
-                    jenis = str(row.get('JENIS', '')).strip().upper()
-                    if code:
-                        sku_decoder[code] = {"arti": arti, "Jenis": jenis}
-            return sku_decoder
+            # Hasil baca Excel disimpan di cache Parquet berdasarkan hash isi file
+            sku_master_key = data_cache.cache_key(data_cache.file_content_hash(file_uploader), "sku_master")
+            return holder.acquire("sku_master", sku_master_key, lambda: data_loader.build_sku_decoder(
+                data_cache.cached_frame(sku_master_key, lambda: pd.read_excel(file_uploader))))
         except Exception as e:
             st.error(
                 f"Gagal memuat Data Master SKU. Pastikan format file benar dan memiliki kolom 'CODE', 'ARTI', 'JENIS'. Error: {e}")
@@ -45,140 +74,941 @@ def load_sku_master(file_uploader):
     return {}
 
 
+# Menggunakan st.cache_data untuk caching data agar aplikasi lebih cepat
 @st.cache_data
 def load_data(file_uploader, file_type):
     """
     Fungsi umum untuk memuat data dari file Excel yang diunggah.
+    Pembersihan kolom dilakukan oleh data_loader.clean_data sesuai skema jenis file.
+    Mengembalikan (DataFrame, laporan parsing per kolom).
     """
     if file_uploader is not None:
         try:
-            df = pd.read_excel(file_uploader)
-            df.columns = [re.sub(r'\s+', ' ', col).strip() for col in df.columns]
-
-            if file_type == "sales":
-                df = df.rename(columns={
-                    'SK U': 'SKU',
-                    'Nama Toka Ziel Kids Officia Shop': 'Nama Toko',
-                    'Salesmen': 'Salesman'
-                })
-                # Konversi Tanggal dengan format eksplisit dan errors='coerce'
-                df['Tanggal'] = pd.to_datetime(df['Tanggal'], format='%d/%m/%Y %H:%M', errors='coerce')
-
-                # Menggunakan errors='ignore' untuk pd.to_numeric, lalu astype(float) dan fillna(0)
-                # untuk memastikan kolom numerik dan menangani nilai yang tidak dapat di-parse
-                for col in ['QTY', 'Harga', 'Sub Total', 'Nett Sales']:
-                    df[col] = pd.to_numeric(df[col], errors='ignore').astype(float).fillna(0)
-
-                # Membersihkan dan mengonversi kolom HPP dan Gross Profit
-                # Asumsi format Indonesia: Rp 1.234.567,89 -> 1234567.89
-                df['HPP'] = df['HPP'].astype(str).str.replace('Rp', '', regex=False).str.replace('.', '',
-                                                                                                 regex=False).str.replace(
-                    ',', '.', regex=False).astype(float).fillna(0)
-                df['Gross Profit'] = df['Gross Profit'].astype(str).str.replace('Rp', '', regex=False).str.replace('.',
-                                                                                                                   '',
-                                                                                                                   regex=False).str.replace(
-                    ',', '.', regex=False).astype(float).fillna(0)
-                return df
-            elif file_type == "inbound":
-                df = df.rename(columns={
-                    'purchaseorder_no': 'No PO',
-                    'supplier_name': 'Nama Supplier',
-                    'Qty Dipesan': 'Qty Dipesan Unit',
-                    'bill_no': 'No Bill',
-                    'Catatan': 'Catatan',
-                    'Pajak.1': 'Pajak Total',
-                    'amount': 'Amount'
-                })
-                if 'Tanggal' not in df.columns:
-                    raise KeyError(
-                        "Kolom 'Tanggal' tidak ditemukan setelah pembersihan dan penamaan ulang di Data Inbound.")
-                df['Tanggal'] = pd.to_datetime(df['Tanggal'],
-                                               errors='coerce')  # Biarkan pandas infer format jika memungkinkan
-
-                # Menggunakan errors='ignore' untuk pd.to_numeric, lalu astype(float) dan fillna(0)
-                for col in ['Qty Dipesan Unit', 'Qty Diterima', 'Harga', 'Amount', 'Sub Total', 'Diskon', 'Pajak Total',
-                            'Grand Total']:
-                    # Menggunakan regex=False untuk str.replace jika tidak ada pola regex yang kompleks
-                    df[col] = pd.to_numeric(df[col].astype(str).str.replace(' Buah', '', regex=False),
-                                            errors='ignore').astype(float).fillna(0)
-
-                return df
-            elif file_type == "stock":
-                df = df.rename(columns={
-                    'Nama': 'Nama Item',
-                    'is_bundle': 'Is Bundle'
-                })
-                # Menggunakan errors='ignore' untuk pd.to_numeric, lalu astype(float) dan fillna(0)
-                for col in ['QTY', 'Dipesan', 'Tersedia', 'Harga Jual', 'HPP', 'Nilai Persediaan']:
-                    df[col] = pd.to_numeric(df[col], errors='ignore').astype(float).fillna(0)
-                return df
+            report = {}
+            return data_loader.clean_data(pd.read_excel(file_uploader), file_type, report), report
         except Exception as e:
             st.error(f"Gagal memuat file {file_type}. Pastikan format file benar. Error: {e}")
-            return pd.DataFrame()
-    return pd.DataFrame()
-
-
-# --- Fungsi untuk Memparse SKU ---
-def parse_sku(sku, sku_decoder):
-    """
-    Memparse string SKU untuk mengekstrak informasi kategori, tahun, musim, dll.
-    Pola regex ini perlu disesuaikan dengan variasi format SKU Anda.
-    Contoh format SKU yang diberikan: ZOZA21BAS-MIA-TBW35, Z11822BAS LUNA-BWT03, 201A21BAS-CND-ORG02, 202D24BAS-HTR-BLK01
-    """
-    sku_info = {
-        "Original SKU": sku,
-        "Category": "Unknown Category",
-        "Sub Category": "Unknown Sub Category",
-        "Tahun Produksi": "Unknown Tahun",
-        "Season": "Unknown Musim",
-        "Singkatan Nama Produk": "Unknown Produk",
-        "Warna Produk": "Unknown Warna",
-        "Size Produk": "Unknown Ukuran"
-    }
-
-    # Pola regex yang lebih fleksibel untuk menangani variasi SKU
-    # Captures:
-    # 1: First alphanumeric block (e.g., ZOZA, Z118, 201A, 202D, Z01)
-    # 2: Optional second alphanumeric block (e.g., 118, A, D - if the first part was just 'Z', '201', '202')
-    # 3: Year code (2 digits)
-    # 4: Season code (3 letters)
-    # 5: Product name code (any letters)
-    # 6: Color code (3 letters)
-    # 7: Size code (2 digits)
-    match = re.match(r'([A-Z0-9]+)([A-Z0-9]+)?([0-9]{2})([A-Z]{3})[- ]([A-Z]+)-([A-Z]{3})([0-9]{2})', sku,
-                     re.IGNORECASE)
-
-    if match:
-        parts = match.groups()
-        first_code_part = parts[0].upper()
-        second_code_part = parts[1].upper() if parts[1] else None
-        year_code = parts[2]
-        season_code = parts[3].upper()
-        product_name_code = parts[4].upper()
-        color_code = parts[5].upper()
-        size_code = parts[6]
-
-        # --- Logika untuk Kategori dan Sub Kategori ---
-        if first_code_part in sku_decoder and sku_decoder[first_code_part]["Jenis"] == "CATEGORY":
-            sku_info["Category"] = sku_decoder[first_code_part]["arti"]
-        elif second_code_part and second_code_part in sku_decoder and sku_decoder[second_code_part][
-            "Jenis"] == "CATEGORY":
-            sku_info["Category"] = sku_decoder[second_code_part]["arti"]
-
-        if first_code_part in sku_decoder and sku_decoder[first_code_part]["Jenis"] == "SUB CATEGORY":
-            sku_info["Sub Category"] = sku_decoder[first_code_part]["arti"]
-        elif second_code_part and second_code_part in sku_decoder and sku_decoder[second_code_part][
-            "Jenis"] == "SUB CATEGORY":
-            sku_info["Sub Category"] = sku_decoder[second_code_part]["arti"]
-
-        # --- Logika untuk atribut lainnya ---
-        sku_info["Tahun Produksi"] = sku_decoder.get(year_code, {}).get("arti", "Unknown Tahun")
-        sku_info["Season"] = sku_decoder.get(season_code, {}).get("arti", "Unknown Musim")
-        sku_info["Singkatan Nama Produk"] = sku_decoder.get(product_name_code, {}).get("arti", "Unknown Produk")
-        sku_info["Warna Produk"] = sku_decoder.get(color_code, {}).get("arti", "Unknown Warna")
-        sku_info["Size Produk"] = sku_decoder.get(size_code, {}).get("arti", "Unknown Ukuran")
-
-    return sku_info
+            return pd.DataFrame(), {}
+    return pd.DataFrame(), {}
+
+
+def record_parse_report(file_type, report):
+    """
+    Menyimpan laporan parsing terakhir per jenis file untuk ditampilkan di sidebar.
+    """
+    if report:
+        st.session_state.setdefault('parse_report', {})[file_type] = report
+
+
+def load_combined_data(file_uploader, file_type, sku_decoder, streaming=False, append=False):
+    """
+    Memuat data yang sudah dibersihkan dan (jika SKU decoder tersedia) sudah diparse SKU-nya.
+    Hasil akhirnya disimpan di cache Parquet di disk dengan kunci hash isi file, versi skema
+    file_type dan hash SKU decoder, sehingga unggahan ulang, restart server, atau worker lain
+    cukup membaca Parquet tanpa memparse ulang Excel.
+
+    Dengan streaming=True, file .xlsx diproses per potongan baris langsung ke Parquet
+    (lihat data_loader.stream_excel_to_parquet) sehingga tidak ada salinan penuh saat pembersihan.
+
+    Dengan append=True, file yang diunggah dianggap delta harian dan digabung ke dataset tersimpan
+    (lihat load_appended_data).
+
+    Frame hasilnya dibagikan ke semua sesi yang memuat isi file yang sama (lihat dataset_registry)
+    dan harus diperlakukan read-only.
+    """
+    with profiler.stage(f"muat: {file_type}", "muat") as record:
+        if append:
+            df = load_appended_data(file_uploader, file_type, sku_decoder)
+            record["rows_out"] = len(df)
+            return df
+
+        # Unggahan yang sama (file_id dan SKU decoder sama) tidak perlu dibaca ulang pada setiap rerun
+        decoder_digest = data_cache.decoder_hash(sku_decoder)
+        upload_token = (getattr(file_uploader, "file_id", None) or id(file_uploader), decoder_digest)
+        loaded = st.session_state.setdefault('loaded_frames', {})
+        if file_type in loaded and loaded[file_type]['token'] == upload_token:
+            key = loaded[file_type]['key']
+        else:
+            key = data_cache.cache_key(data_cache.file_content_hash(file_uploader), file_type, decoder_digest)
+        # Sesi lain yang sudah memuat isi file yang sama cukup dibagi frame-nya
+        record["cached"] = key in registry
+        df = holder.acquire(f"data:{file_type}", key,
+                            lambda: read_combined_data(file_uploader, file_type, sku_decoder, key, streaming))
+        record["rows_out"] = len(df)
+        if not df.empty:
+            loaded[file_type] = {'token': upload_token, 'key': key}
+        return df
+
+
+def apply_delta(file_uploader, file_type, sku_decoder):
+    """
+    Menggabungkan file delta ke dataset tersimpan. Delta dibersihkan dengan load_data yang sama;
+    file yang sama tidak diterapkan dua kali. Mengembalikan False jika delta gagal dimuat atau digabung.
+    """
+    df_delta, report = load_data(file_uploader, file_type)
+    record_parse_report(file_type, report)
+    if df_delta.empty:
+        return False
+    try:
+        report = incremental_store.append_delta(df_delta, file_type, sku_decoder,
+                                                data_cache.file_content_hash(file_uploader))
+    except (KeyError, ValueError) as e:
+        st.error(f"Gagal menggabungkan delta {file_type}. Error: {e}")
+        return False
+    if not report['skipped']:
+        st.sidebar.success(f"Delta {file_type}: {report['new']:,} baris baru, {report['replaced']:,} diganti, "
+                           f"{report['duplicates']:,} duplikat; {len(report['partitions'])} partisi "
+                           f"diperbarui dalam {report['seconds']:,.2f} detik.")
+    return True
+
+
+def load_appended_data(file_uploader, file_type, sku_decoder):
+    """
+    Menerapkan file delta (jika ada) ke dataset tersimpan, lalu memuat dataset tersebut.
+    Dataset hanya dibaca ulang dari disk ketika versinya berubah.
+    """
+    if file_uploader is not None and not apply_delta(file_uploader, file_type, sku_decoder):
+        return pd.DataFrame()
+
+    token = incremental_store.dataset_token(file_type)
+    if token is None:
+        return pd.DataFrame()
+    key = f"store-{file_type}-{token}"
+    df = holder.acquire(f"data:{file_type}", key,
+                        lambda: finalize_frame(incremental_store.load_dataset(file_type), file_type))
+    if not df.empty:
+        st.session_state.setdefault('loaded_frames', {})[file_type] = {'token': token, 'key': key, 'store': True}
+    return df
+
+
+def prefetch_uploads(uploads):
+    """
+    Memuat file-file unggahan yang belum ada di memo sesi, registry bersama maupun cache disk secara
+    paralel (lihat parallel_loader.load_workbooks). Hasilnya dimasukkan ke cache disk dan registry,
+    sehingga load_sku_master dan load_combined_data setelahnya tinggal mengambilnya.
+    Status setiap file ditampilkan di sidebar selama pemuatan.
+    """
+    master_file = uploads["sku_master"]
+    master_key = data_cache.cache_key(data_cache.file_content_hash(master_file), "sku_master")
+    df_master = data_cache.load_cached_frame(master_key)
+    sources = {}
+    if df_master is None:
+        sources["sku_master"] = master_file.getvalue()
+    sku_decoder = data_loader.build_sku_decoder(df_master) if df_master is not None else None
+
+    loaded = st.session_state.setdefault('loaded_frames', {})
+    data_keys, from_memo = {}, set()
+
+    def lookup(file_type, decoder):
+        file_uploader = uploads[file_type]
+        decoder_digest = data_cache.decoder_hash(decoder)
+        token = (getattr(file_uploader, "file_id", None) or id(file_uploader), decoder_digest)
+        if file_type in loaded and loaded[file_type]['token'] == token and loaded[file_type]['key'] in registry:
+            from_memo.add(file_type)
+            return registry.lookup(loaded[file_type]['key'])
+        key = data_cache.cache_key(data_cache.file_content_hash(file_uploader), file_type, decoder_digest)
+        data_keys[file_type] = (token, key)
+        shared_df = registry.lookup(key)
+        return shared_df if shared_df is not None else data_cache.load_cached_frame(key)
+
+    frames = {}
+    for file_type in parallel_loader.DATA_TYPES:
+        if not uploads.get(file_type):
+            continue
+        df = lookup(file_type, sku_decoder) if sku_decoder is not None else None
+        if df is None:
+            sources[file_type] = uploads[file_type].getvalue()
+        else:
+            frames[file_type] = df
+    if not any(file_type in sources for file_type in parallel_loader.DATA_TYPES):
+        result = {"master": None, "frames": {}, "errors": {}, "timings": {}, "reports": {}}
+    else:
+        status = st.sidebar.status("Memuat file secara paralel...", expanded=True)
+        lines = {}
+        placeholder = status.empty()
+
+        def on_status(file_type, state):
+            lines[file_type] = state
+            placeholder.markdown("\n".join(f"- **{name}**: {state}" for name, state in lines.items()))
+
+        with profiler.stage("muat paralel", "muat"):
+            result = parallel_loader.load_workbooks(sources, sku_decoder=sku_decoder, lookup=lookup,
+                                                    on_status=on_status)
+        status.update(label=f"{len(result['frames'])} file dimuat dalam {result['seconds']:,.1f} detik",
+                      state="error" if result["errors"] else "complete", expanded=False)
+        st.session_state['load_report'] = {"seconds": result["seconds"], "work": sum(result["timings"].values())}
+
+    if result["master"] is not None and not result["master"].empty:
+        data_cache.store_cached_frame(master_key, result["master"])
+    frames.update(result["frames"])
+    for file_type, report in result["reports"].items():
+        record_parse_report(file_type, report)
+    for file_type, df in frames.items():
+        if file_type in from_memo or df.empty:
+            continue
+        token, key = data_keys[file_type]
+        if key not in registry:
+            df = finalize_frame(df, file_type, cached_key=None if file_type in result["timings"] else key)
+        if file_type in result["timings"]:
+            # Hasil baru (bukan dari cache disk) disimpan agar unggahan ulang atau worker lain tidak membaca Excel lagi
+            try:
+                data_cache.store_cached_frame(key, df)
+            except Exception:
+                pass
+            store_memory_report(key, file_type)
+        holder.acquire(f"data:{file_type}", key, lambda: df)
+        loaded[file_type] = {'token': token, 'key': key}
+
+
+def dataset_key(file_type):
+    """
+    Kunci cache (hash isi file) dari dataset yang sedang dimuat, dipakai sebagai identitas
+    dataset untuk struktur turunan seperti kubus penjualan.
+    """
+    return st.session_state.get('loaded_frames', {}).get(file_type, {}).get('key')
+
+
+def read_combined_data(file_uploader, file_type, sku_decoder, key, streaming):
+    """
+    Membaca data dari cache Parquet, atau memuat dan membersihkannya dari file Excel.
+    """
+    df = data_cache.load_cached_frame(key)
+    if df is not None:
+        return finalize_frame(df, file_type, cached_key=key)
+    if streaming and getattr(file_uploader, "name", "").lower().endswith(".xlsx"):
+        return load_streaming_data(file_uploader, file_type, sku_decoder, key)
+
+    def build():
+        with profiler.stage(f"baca Excel: {file_type}", "muat") as record:
+            df, report = load_data(file_uploader, file_type)
+            record["rows_out"] = len(df)
+        record_parse_report(file_type, report)
+        if not df.empty and sku_decoder and 'SKU' in df.columns:
+            # Parsing batch: setiap SKU unik hanya diparse sekali
+            df = profiler.measure(f"parse SKU: {file_type}", "parse SKU",
+                                  lambda: pd.concat([df, parse_sku_batch(df['SKU'], sku_decoder)], axis=1),
+                                  rows_in=len(df))
+        return finalize_frame(df, file_type)
+
+    df = data_cache.cached_frame(key, build)
+    store_memory_report(key, file_type)
+    return df
+
+
+def finalize_frame(df, file_type, cached_key=None):
+    """
+    Menjalankan optimasi tipe data dan mencatat memori sebelum/sesudah untuk ditampilkan di sidebar,
+    lalu mengurutkan frame berdasarkan tanggal untuk mesin filter.
+    Frame dari entri cache Parquet `cached_key` sudah ringkas dan terurut, sehingga pemrosesan ulangnya
+    murah tetapi tidak menunjukkan penghematan sebenarnya: laporan memori yang ditampilkan adalah laporan
+    saat entri itu pertama kali dibuat (lihat store_memory_report), atau tidak ada sama sekali.
+    """
+    if df.empty:
+        return df
+    with profiler.stage(f"optimasi tipe: {file_type}", "muat", rows_in=len(df)):
+        df, report = data_loader.optimize_dtypes(data_loader.sort_by_date(df, file_type), file_type)
+    if cached_key is not None:
+        report = data_cache.load_metadata(cached_key).get("memory_report")
+    show_memory_report(file_type, report)
+    return df
+
+
+def show_memory_report(file_type, report):
+    """
+    Laporan memori file_type yang ditampilkan di sidebar; report kosong/None menghapus laporan lama.
+    """
+    reports = st.session_state.setdefault('memory_report', {})
+    if report:
+        reports[file_type] = report
+    else:
+        reports.pop(file_type, None)
+
+
+def store_memory_report(key, file_type):
+    """
+    Menyimpan laporan memori file_type yang sedang ditampilkan bersama entri cache `key`. Dipanggil
+    setelah entri Parquet ditulis; jika penulisan cache gagal, tidak ada keterangan yang disimpan.
+    """
+    report = st.session_state.get('memory_report', {}).get(file_type)
+    if not report:
+        return
+    try:
+        data_cache.store_metadata(key, {"memory_report": report})
+    except OSError:
+        pass
+
+
+def load_streaming_data(file_uploader, file_type, sku_decoder, key):
+    """
+    Ingest streaming ke file Parquet di direktori cache, lalu membaca hasilnya. Entri hasil streaming
+    sudah terurut dan dipadatkan (data_loader.compact_parquet), sehingga frame dipakai apa adanya tanpa
+    finalize_frame.
+    """
+    if not stream_to_cache(file_uploader, file_type, sku_decoder, key):
+        return pd.DataFrame()
+    df = data_cache.load_cached_frame(key)
+    if df is None:
+        return pd.DataFrame()
+    show_memory_report(file_type, data_cache.load_metadata(key).get("memory_report"))
+    return df
+
+
+def stream_to_cache(file_uploader, file_type, sku_decoder, key):
+    """
+    Ingest streaming file .xlsx ke entri cache `key` tanpa memuat hasilnya (backend duckdb membaca
+    file Parquet-nya langsung). Kecepatan (baris/detik) dan memori selama ingest ditampilkan di sidebar;
+    laporan pemadatan tipe disimpan bersama entrinya. Mengembalikan False jika gagal.
+    """
+    tmp_path = data_cache.temp_path(key)
+    try:
+        with st.spinner(f"Memproses file {file_type} secara streaming..."), \
+                profiler.stage(f"streaming: {file_type}", "muat") as record:
+            stats = data_loader.stream_excel_to_parquet(file_uploader, file_type, tmp_path, sku_decoder)
+            record["rows_out"] = stats['rows']
+        data_cache.store_cached_file(key, tmp_path)
+    except Exception as e:
+        data_cache.discard_temp(tmp_path)
+        st.error(f"Gagal memuat file {file_type} secara streaming. Pastikan format file benar. Error: {e}")
+        return False
+    if stats['memory_report']:
+        try:
+            data_cache.store_metadata(key, {"memory_report": stats['memory_report']})
+        except OSError:
+            pass
+
+    record_parse_report(file_type, stats['parse_report'])
+    st.sidebar.info(f"Streaming {file_type}: {stats['rows']:,} baris dalam {stats['seconds']:,.1f} detik "
+                    f"({stats['rows_per_sec']:,.0f} baris/detik), {data_loader.describe_ingest_memory(stats)}.")
+    return True
+
+
+def load_parquet_source(file_uploader, file_type, sku_decoder, streaming=False, append=False):
+    """
+    Backend duckdb: memastikan data yang sudah dibersihkan dan diparse SKU-nya tersedia sebagai file
+    Parquet di disk (entri cache, hasil streaming, atau partisi dataset tersimpan), lalu mengembalikan
+    {'token', 'key', 'paths'} atau None. Tidak ada frame yang disimpan di memori sesi; jika file harus
+    dibangun dari Excel, frame hanya ada selama pembangunan.
+    """
+    with profiler.stage(f"muat Parquet: {file_type}", "muat") as record:
+        sources = st.session_state.setdefault('parquet_sources', {})
+        if append:
+            if file_uploader is not None and not apply_delta(file_uploader, file_type, sku_decoder):
+                return None
+            token = incremental_store.dataset_token(file_type)
+            if token is None:
+                return None
+            entry = {'token': token, 'key': f"store-{file_type}-{token}",
+                     'paths': incremental_store.partition_paths(file_type)}
+        else:
+            decoder_digest = data_cache.decoder_hash(sku_decoder)
+            upload_token = (getattr(file_uploader, "file_id", None) or id(file_uploader), decoder_digest)
+            entry = sources.get(file_type)
+            # Entri cache bisa saja tereviksi oleh worker lain, sehingga keberadaan file tetap diperiksa
+            if entry is not None and entry['token'] == upload_token and all(map(os.path.exists, entry['paths'])):
+                record["cached"] = True
+                return entry
+            key = data_cache.cache_key(data_cache.file_content_hash(file_uploader), file_type, decoder_digest)
+            if data_cache.cached_path(key) is None:
+                if streaming and getattr(file_uploader, "name", "").lower().endswith(".xlsx"):
+                    stream_to_cache(file_uploader, file_type, sku_decoder, key)
+                else:
+                    read_combined_data(file_uploader, file_type, sku_decoder, key, streaming=False)
+            path = data_cache.cached_path(key)
+            if path is None:
+                return None
+            entry = {'token': upload_token, 'key': key, 'paths': [path]}
+        sources[file_type] = entry
+        return entry
+
+
+def sql_dataset_info(queries, source_key):
+    """
+    Rentang tanggal penjualan dan opsi filter per dimensi untuk backend duckdb. Keduanya butuh
+    pemindaian penuh, sehingga dihitung sekali per kombinasi sumber dan disimpan di session state.
+    """
+    cached = st.session_state.get('sql_dataset_info')
+    if cached is None or cached['key'] != source_key:
+        def build():
+            options = {column: set().union(*(queries.values(file_type, column)
+                                              for file_type in sql_backend.DATA_TYPES))
+                       for column in filter_engine.FILTER_DIMENSIONS}
+            return {'dates': queries.date_limits(), 'options': options}
+
+        cached = {'key': source_key, 'value': profiler.measure("bangun: info dataset SQL", "indeks", build)}
+        st.session_state['sql_dataset_info'] = cached
+    return cached['value']
+
+
+def per_dataset(name, file_type, builder):
+    """
+    Struktur turunan (kubus, indeks filter, dll.) untuk dataset aktif. Dibangun sekali per dataset
+    (berdasarkan kunci hash isi file) dan dibagikan ke semua sesi lewat registry, bukan pada setiap rerun.
+    """
+    key = dataset_key(file_type)
+    if key is None:
+        return profiler.measure(f"bangun: {name}", "indeks", builder)
+    return holder.acquire(name, (name, key), lambda: profiler.measure(f"bangun: {name}", "indeks", builder))
+
+
+def get_sales_cube(df_sales):
+    """
+    Kubus penjualan untuk dataset penjualan aktif.
+    """
+    def build():
+        # Dataset tersimpan sudah memiliki kubus per partisi yang diperbarui saat delta digabung
+        if st.session_state.get('loaded_frames', {}).get("sales", {}).get('store'):
+            cube = incremental_store.load_aggregates("sales")
+            if cube is not None:
+                return cube
+        return sales_cube.build_sales_cube(df_sales)
+
+    return per_dataset('sales_cube', "sales", build)
+
+
+def get_sales_sketches(df_sales):
+    """
+    Sketsa harian (heavy-hitter, Count-Min, HyperLogLog) untuk dataset penjualan aktif, dibangun sekali per dataset.
+    """
+    return per_dataset('sales_sketches', "sales", lambda: sketches.DailySketches.build(df_sales))
+
+
+def get_filter_index(file_type, df):
+    """
+    Indeks filter untuk satu dataset; data penjualan diindeks juga berdasarkan Tanggal.
+    """
+    date_column = 'Tanggal' if file_type == "sales" else None
+    return per_dataset(f'{file_type}_filter_index', file_type,
+                       lambda: filter_engine.FilterIndex(df, date_column=date_column))
+
+
+def get_sku_dimension(df_sales, df_stock, df_inbound):
+    """
+    Dimensi SKU (SKU_ID, nama dan atribut) untuk kombinasi dataset aktif, dibangun sekali dan dibagikan lewat registry.
+    """
+    keys = tuple(dataset_key(file_type) for file_type in ("sales", "stock", "inbound"))
+
+    def build():
+        return profiler.measure("bangun: dimensi SKU", "indeks",
+                                lambda: sku_dimension.SkuDimension.build(df_sales, df_stock, df_inbound))
+
+    if None in keys:
+        return build()
+    return holder.acquire('sku_dimension', ('sku_dimension',) + keys, build)
+
+
+def use_warm_dataset(files):
+    """
+    Mengisi state sesi dari dataset warm start: nilai yang sudah dimuat preload diambil dari registry
+    (menunggu jika preload masih berjalan), atau dibaca ulang dari cache Parquet jika sudah dievict.
+    """
+    with profiler.stage("muat: warm start", "muat"):
+        master_key = files["sku_master"]["key"]
+        st.session_state['sku_decoder'] = holder.acquire("sku_master", master_key,
+                                                         lambda: warm_start.load_decoder(master_key))
+        loaded = st.session_state.setdefault('loaded_frames', {})
+        for file_type in warm_start.DATA_TYPES:
+            key = files[file_type]["key"]
+            st.session_state[f'df_{file_type}_combined'] = holder.acquire(
+                f"data:{file_type}", key, lambda: warm_start.load_frame(key, file_type))
+            loaded[file_type] = {'token': None, 'key': key}
+            # Laporan memori saat entri cache pertama dibuat (lihat finalize_frame)
+            show_memory_report(file_type, data_cache.load_metadata(key).get("memory_report"))
+    st.session_state['warm_dataset'] = files
+
+
+def leave_warm_dataset():
+    """
+    Melepas dataset warm start begitu pengguna mulai mengunggah file, agar frame lama tidak tercampur
+    dengan unggahan baru.
+    """
+    if st.session_state.pop('warm_dataset', None) is None:
+        return
+    for file_type in warm_start.DATA_TYPES:
+        st.session_state[f'df_{file_type}_combined'] = pd.DataFrame()
+    st.session_state.pop('loaded_frames', None)
+    holder.release()
+
+
+def remember_dataset():
+    """
+    Mencatat dataset lengkap sesi ini sebagai dataset terakhir untuk warm start (sekali per kombinasi file).
+    """
+    if not uploaded_sku_master_file or not all(uploads.values()):
+        return
+    files = {"sku_master": {"key": holder.key("sku_master"), "name": uploaded_sku_master_file.name}}
+    files.update({file_type: {"key": dataset_key(file_type), "name": file_uploader.name}
+                  for file_type, file_uploader in uploads.items()})
+    if any(entry["key"] is None for entry in files.values()) or files == st.session_state.get('recorded_dataset'):
+        return
+    try:
+        data_cache.record_last_dataset(files)
+    except OSError:
+        # Warm start bersifat opsional; kegagalan menulis catatan tidak boleh mengganggu dashboard
+        return
+    st.session_state['recorded_dataset'] = files
+
+
+def select_rows(file_type, index, start_date=None, end_date=None, filters=None):
+    """
+    Seleksi baris lewat indeks filter, dicatat sebagai satu tahap instrumentasi.
+    """
+    with profiler.stage(f"filter: {file_type}", "filter", rows_in=len(index.frame)) as record:
+        selected, stats = index.select(start_date, end_date, filters)
+        record["rows_out"] = len(selected)
+    return selected, stats
+
+
+def record_stock_snapshot(snapshot_date, source_key, load_stock):
+    """
+    Menyimpan data stok yang sedang dimuat sebagai snapshot historis pada snapshot_date. Sumber yang
+    sama untuk tanggal yang sama tidak disimpan ulang, sehingga rerun tidak menulis apa pun.
+    """
+    if source_key is None or stock_snapshots.has_snapshot(snapshot_date, source_key):
+        return
+    try:
+        with profiler.stage("simpan snapshot stok", "muat"):
+            report = stock_snapshots.add_snapshot(load_stock(), snapshot_date, source_key)
+    except (KeyError, ValueError) as exc:
+        st.sidebar.error(f"Snapshot stok gagal disimpan: {exc}")
+        return
+    st.sidebar.success(f"Snapshot stok {report['date']} disimpan ({report['keys']:,} baris, "
+                       f"{len(report['recomputed'])} kumulatif dihitung dalam {report['seconds']:,.1f} detik).")
+
+
+# --- Instrumentasi ---
+def record_profile(run):
+    """
+    Menyimpan run instrumentasi yang sudah selesai ke riwayat sesi (profiler.HISTORY_SIZE run terakhir).
+    """
+    st.session_state.setdefault('profile_history', deque(maxlen=profiler.HISTORY_SIZE)).append(run)
+
+
+def render_profile_panel():
+    """
+    Panel sidebar berisi waktu, baris masuk/keluar dan selisih memori per tahap untuk rerun-rerun
+    terakhir, beserta unduhan JSON/CSV untuk analisis di luar aplikasi.
+    """
+    runs = list(st.session_state.get('profile_history', []))
+    if not runs:
+        return
+    with st.sidebar.expander("Instrumentasi Rerun", expanded=True):
+        st.dataframe(profiler.summary_frame(runs)[::-1], hide_index=True)
+        number = st.selectbox("Detail run", [run['run'] for run in reversed(runs)], key="profile_run")
+        stages = profiler.history_frame([run for run in runs if run['run'] == number])
+        # Tahap bersarang (misalnya parse SKU di dalam muat file) ditampilkan menjorok
+        stages['stage'] = ["\u00a0\u00a0" * depth + name for depth, name in zip(stages['depth'], stages['stage'])]
+        st.dataframe(stages[['stage', 'kind', 'ms', 'rows_in', 'rows_out', 'mem_delta_mb', 'cached']],
+                     hide_index=True)
+        col_json, col_csv = st.columns(2)
+        col_json.download_button("Unduh JSON", profiler.to_json(runs), file_name="instrumentasi.json",
+                                 mime="application/json")
+        col_csv.download_button("Unduh CSV", profiler.history_frame(runs).to_csv(index=False),
+                                file_name="instrumentasi.csv", mime="text/csv")
+
+
+# --- Bagian Dashboard ---
+# Setiap bagian adalah fragment: widget di dalamnya hanya me-rerun bagian itu sendiri. Hasil komputasinya
+# dimemo berdasarkan status filter, sehingga rerun tanpa perubahan filter tidak menghitung ulang.
+logger = logging.getLogger("dashboard")
+
+
+@contextmanager
+def section_timer(section):
+    """
+    Mencatat waktu komputasi dan render sebuah bagian ke log dan ke session state.
+    Rerun fragment (tanpa rerun skrip penuh) dicatat sebagai run instrumentasi tersendiri.
+    """
+    timings = st.session_state.setdefault('section_timings', {})
+    timings[section] = {'compute_ms': 0.0, 'render_ms': 0.0, 'cached': True}
+    with profiler.run_scope(f"fragment: {section}") as fragment_run:
+        with profiler.stage(f"bagian: {section}", "bagian"):
+            started = time.perf_counter()
+            try:
+                yield
+            finally:
+                timing = timings[section]
+                timing['render_ms'] = (time.perf_counter() - started) * 1000 - timing['compute_ms']
+                logger.info("bagian=%s compute_ms=%.1f render_ms=%.1f cached=%s", section, timing['compute_ms'],
+                            timing['render_ms'], timing['cached'])
+    if fragment_run is not None:
+        record_profile(fragment_run)
+
+
+def section_result(section, name, filter_key, compute):
+    """
+    Hasil komputasi sebuah bagian, dimemo berdasarkan status filter. Hanya hasil terakhir per nama
+    yang disimpan agar memori session tidak terus bertambah.
+    """
+    memo = st.session_state.setdefault('section_memo', {})
+    entry = memo.get(name)
+    if entry is not None and entry['key'] == filter_key:
+        with profiler.stage(f"hitung: {name}", "agregasi") as record:
+            record["cached"] = True
+            record["rows_out"] = profiler.rows_of(entry['value'])
+        return entry['value']
+
+    started = time.perf_counter()
+    value = profiler.measure(f"hitung: {name}", "agregasi", compute)
+    timing = st.session_state.setdefault('section_timings', {}).setdefault(
+        section, {'compute_ms': 0.0, 'render_ms': 0.0, 'cached': True})
+    timing['compute_ms'] += (time.perf_counter() - started) * 1000
+    timing['cached'] = False
+    memo[name] = {'key': filter_key, 'value': value}
+    return value
+
+
+def show_payload():
+    """
+    True jika panel instrumentasi aktif. Ukuran payload hanya diukur saat itu, karena menserialisasi ulang
+    figure/tabel pada setiap rerun tidak gratis. Dibaca dari session state karena dipanggil di dalam fragment.
+    """
+    return st.session_state.get('show_profiler', False)
+
+
+def show_chart(fig):
+    """
+    Menampilkan figure plotly, beserta ukuran payload-nya jika panel instrumentasi aktif.
+    """
+    with profiler.stage(f"render grafik: {fig.layout.title.text or 'tanpa judul'}", "render"):
+        st.plotly_chart(fig, use_container_width=True)
+    if show_payload():
+        st.caption(f"Payload grafik: {table_view.format_bytes(charts.payload_bytes(fig))}")
+
+
+def show_table(df):
+    """
+    Menampilkan tabel kecil (hasil agregasi), beserta ukuran payload-nya jika panel instrumentasi aktif.
+    """
+    with profiler.stage("render tabel", "render", rows_in=len(df)):
+        st.dataframe(df)
+    if show_payload():
+        st.caption(f"Payload tabel: {table_view.format_bytes(table_view.arrow_payload_bytes(df))}")
+
+
+KPI_CARD_STYLE = ("background-color:#F0F2F6; padding: 15px; border-radius: 10px; text-align: center; "
+                  "box-shadow: 2px 2px 5px rgba(0,0,0,0.1);")
+
+
+def kpi_card(title, value, color):
+    st.markdown(f"""
+        <div style="{KPI_CARD_STYLE}">
+            <h3 style="color:#303030; margin-bottom: 5px;">{title}</h3>
+            <p style="font-size: 2em; color:{color}; font-weight: bold;">{value}</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+
+@st.fragment
+def render_kpi_section(queries, filter_key, stock_history=None):
+    with section_timer("kpi"):
+        kpi = section_result("kpi", "kpi", filter_key, queries.kpi_summary)
+        # Dengan snapshot historis di rentang tanggal, perputaran memakai rata-rata stok, bukan stok satu saat
+        turnover, turnover_label = kpi['inventory_turnover'], "Perputaran Stok"
+        if stock_history is not None:
+            turnover, turnover_label = stock_history['turnover'], "Perputaran Stok (historis)"
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            kpi_card("Total Penjualan", f"Rp {kpi['nett_sales']:,.2f}", "#4CAF50")
+        with col2:
+            kpi_card("Total Gross Profit", f"Rp {kpi['gross_profit']:,.2f}", "#2196F3")
+        with col3:
+            kpi_card("Total QTY Terjual", f"{kpi['qty']:,.0f} unit", "#FF9800")
+        with col4:
+            kpi_card(turnover_label, f"{turnover:,.2f}x", "#9C27B0")
+
+
+@st.fragment
+def render_sales_analysis_section(queries, filter_key):
+    # Pilihan tampilan menggantikan st.tabs, karena st.tabs selalu mengeksekusi semua tab
+    view = st.radio("Tampilan Analisis Penjualan", list(analytics.SALES_VIEWS), horizontal=True,
+                    key="sales_view", label_visibility="collapsed")
+    section = f"penjualan: {view}"
+    with section_timer(section):
+        results = section_result(section, f"sales_view:{view}", filter_key,
+                                 lambda: queries.sales_view(view))
+        for subheader, dimension, measure, title, table in results:
+            st.subheader(subheader)
+            label = 'Total Penjualan (Rp)' if measure == 'Sub Total' else 'Gross Profit (Rp)'
+            fig = charts.bar(table, x=dimension, y=measure,
+                             title=title,
+                             labels={measure: label},
+                             color=dimension)
+            show_chart(fig)
+
+
+@st.fragment
+def render_channel_section(queries, filter_key):
+    st.subheader("Penjualan Berdasarkan Channel")
+    if not st.toggle("Tampilkan", value=True, key="show_channel"):
+        return
+    with section_timer("channel"):
+        sales_by_channel = section_result("channel", "channel", filter_key, queries.sales_by_channel)
+        fig_sales_channel = charts.pie(sales_by_channel, names='Channel', values='Sub Total',
+                                       title='Proporsi Penjualan per Channel')
+        show_chart(fig_sales_channel)
+
+
+@st.fragment
+def render_top_products_section(queries, filter_key, sketch_window=None, approx_requested=False):
+    """
+    Top 10 per dimensi (produk, SKU, salesman, toko) beserta jumlah SKU dan pelanggan unik. Dengan
+    sketch_window (mode perkiraan), hasil diambil dari gabungan sketsa harian beserta batas galatnya.
+    approx_requested: mode perkiraan dipilih di sidebar (argumen, bukan variabel global, karena bagian ini
+    adalah fragment), untuk menjelaskan jika sketsa tidak bisa dipakai pada seleksi ini.
+    """
+    st.subheader("Top 10 Terlaris (Berdasarkan QTY)")
+    if not st.toggle("Tampilkan", value=True, key="show_top_products"):
+        return
+    columns = queries.columns("sales")
+    dimensions = {column: label for column, label in sketches.TOP_DIMENSIONS.items() if column in columns}
+    if not dimensions:
+        return
+    dimension = st.radio("Dimensi Top 10", list(dimensions), format_func=dimensions.get, horizontal=True,
+                         key="top_dimension", label_visibility="collapsed")
+    mode = "sketsa" if sketch_window is not None else "eksak"
+    section = f"top: {dimensions[dimension]}"
+    with section_timer(section):
+        if sketch_window is not None:
+            top_values, bounds = section_result(
+                section, f"top_values:{dimension}:{mode}", filter_key,
+                lambda: (sketch_window.top(dimension), sketch_window.error_bounds(dimension)))
+            distinct = section_result(section, f"distinct_counts:{mode}", filter_key, sketch_window.distinct)
+        else:
+            top_values, bounds = section_result(section, f"top_values:{dimension}:{mode}", filter_key,
+                                                lambda: queries.top_values(dimension)), None
+            distinct = {column: (count, 0.0) for column, count in
+                        section_result(section, f"distinct_counts:{mode}", filter_key,
+                                       queries.distinct_counts).items()}
+
+        for metric_column, (column, (count, error)) in zip(st.columns(max(len(distinct), 1)), distinct.items()):
+            metric_column.metric(sketches.DISTINCT_DIMENSIONS[column],
+                                 f"≈ {count:,.0f}" if error else f"{count:,.0f}",
+                                 help=f"Perkiraan HyperLogLog, galat standar ±{error:.1%}" if error else None)
+        fig_top_values = charts.bar(top_values, x=dimension, y='QTY',
+                                    title=f'Top 10 {dimensions[dimension]} Terlaris (QTY)',
+                                    labels={'QTY': 'Jumlah Terjual (Unit)'},
+                                    color='QTY', hover_data=[sketches.UPPER_COLUMN] if bounds else None)
+        show_chart(fig_top_values)
+        if bounds is None:
+            if approx_requested:
+                st.caption("Mode perkiraan tidak dipakai untuk seleksi ini (backend duckdb atau filter dimensi "
+                           "pada data penjualan); hasil dihitung eksak.")
+        elif bounds['exact']:
+            st.caption("Mode perkiraan: tidak ada nilai harian yang terbuang dari sketsa, sehingga top 10 ini eksak.")
+        else:
+            st.caption(f"Mode perkiraan: QTY adalah batas bawah dan {sketches.UPPER_COLUMN} batas atas per baris; "
+                       f"nilai di luar kandidat paling banyak {bounds['unseen_max']:,.0f} unit, galat Count-Min "
+                       f"paling banyak {bounds['countmin_error']:,.0f} unit.")
+
+
+@st.fragment
+def render_monthly_section(queries, filter_key):
+    st.subheader("Tren Penjualan Bulanan")
+    if not st.toggle("Tampilkan", value=True, key="show_monthly"):
+        return
+    with section_timer("tren bulanan"):
+        monthly_sales = section_result("tren bulanan", "monthly", filter_key, queries.monthly_sales)
+        fig_monthly_sales = charts.line(monthly_sales, x='Bulan', y='Nett Sales',
+                                        title='Tren Penjualan Bersih Bulanan',
+                                        labels={'Nett Sales': 'Nett Sales (Rp)'},
+                                        markers=True)
+        show_chart(fig_monthly_sales)
+
+
+@st.fragment
+def render_stock_summary_section(queries, filter_key):
+    st.subheader("Ringkasan Stok Saat Ini")
+    if not st.toggle("Tampilkan", value=True, key="show_stock_summary"):
+        return
+    with section_timer("ringkasan stok"):
+        render_data_table(queries, "stock", "stock_summary", filter_key,
+                          ['Nama Item', 'Category', 'Sub Category', 'Lokasi', 'QTY', 'Tersedia', 'Harga Jual', 'HPP',
+                           'Nilai Persediaan'])
+
+
+@st.fragment
+def render_stock_inbound_section(queries, filter_key):
+    st.subheader("Perbandingan Stok Tersedia vs. Barang Diterima (Inbound)")
+    if not st.toggle("Tampilkan", value=True, key="show_stock_inbound"):
+        return
+    with section_timer("stok vs inbound"):
+        comparison_df = section_result("stok vs inbound", "stock_inbound", filter_key, queries.stock_vs_inbound)
+        fig_stock_inbound_comp = charts.bar(comparison_df.sort_values(by='Total Tersedia', ascending=False).head(20),
+                                            x='Nama Item', y=['Total Tersedia', 'Total Qty Diterima'],
+                                            title='Stok Tersedia vs. Qty Diterima per SKU (Top 20)',
+                                            labels={'value': 'Jumlah', 'variable': 'Tipe'},
+                                            barmode='group')
+        show_chart(fig_stock_inbound_comp)
+
+
+@st.fragment
+def render_location_section(queries, filter_key):
+    st.subheader("Distribusi Stok Berdasarkan Lokasi")
+    if not st.toggle("Tampilkan", value=True, key="show_location"):
+        return
+    with section_timer("lokasi stok"):
+        stock_by_location = section_result("lokasi stok", "location", filter_key, queries.stock_by_location)
+        fig_stock_location = charts.pie(stock_by_location, names='Lokasi', values='QTY',
+                                        title='Distribusi Stok Berdasarkan Lokasi')
+        show_chart(fig_stock_location)
+
+
+@st.fragment
+def render_stock_history_section(stock_history, history_key):
+    st.subheader("Perputaran dan Hari Persediaan (Snapshot Historis)")
+    if not st.toggle("Tampilkan", value=True, key="show_stock_history"):
+        return
+    if stock_history is None:
+        st.info("Belum ada snapshot stok di rentang tanggal ini. Aktifkan \"Simpan stok sebagai snapshot "
+                "historis\" di sidebar saat mengunggah Data Stok untuk mengisi riwayat.")
+        return
+    group_by = st.radio("Kelompokkan per", list(stock_snapshots.GROUPINGS), horizontal=True,
+                        format_func=stock_snapshots.GROUPINGS.get, key="stock_history_group")
+    section = f"snapshot stok: {group_by}"
+    with section_timer(section):
+        table = section_result(section, f"stock_history:{group_by}", history_key,
+                               lambda: stock_snapshots.group_metrics(stock_history, group_by))
+        st.caption(f"{stock_history['snapshots']} snapshot ({stock_history['first']} s.d. {stock_history['last']}) "
+                   f"dalam {stock_history['days']} hari; rata-rata stok {stock_history['average_stock']:,.0f} unit, "
+                   f"perputaran {stock_history['turnover']:,.2f}x")
+        if group_by != 'SKU':
+            fig = charts.bar(table, x=group_by, y='Perputaran', title=f"Perputaran Stok per {group_by}",
+                             labels={'Perputaran': 'Perputaran (x)'}, color=group_by)
+            show_chart(fig)
+        table_view.render_paged_table(table, key="stock_history_table", data_key=history_key + (group_by,))
+
+
+RECOMMENDATION_COLUMNS = ['Nama Item', 'Category', 'TotalQTYTerjual', 'TotalTersedia', 'Perkiraan Harian',
+                          'Reorder Point', 'Hari Persediaan', 'Model']
+
+
+@st.fragment
+def render_recommendation_section(queries, filter_key):
+    st.subheader("Rekomendasi Berdasarkan Data")
+    if not st.toggle("Tampilkan", value=True, key="show_recommendations"):
+        return
+    with section_timer("rekomendasi"):
+        low_stock_high_sales, high_stock_low_sales = section_result("rekomendasi", "recommendations", filter_key,
+                                                                    queries.recommendations)
+
+        st.caption(f"Ramalan permintaan harian per SKU (moving average / exponential smoothing, dipilih per SKU "
+                   f"lewat backtest, dengan indeks musiman per Season); lead time {demand_forecast.LEAD_TIME_DAYS} "
+                   f"hari, stok berlebih di atas {demand_forecast.OVERSTOCK_DAYS} hari permintaan.")
+        st.write("**Produk dengan Stok Rendah dan Penjualan Tinggi:**")
+        if not low_stock_high_sales.empty:
+            table_view.render_paged_table(low_stock_high_sales[RECOMMENDATION_COLUMNS], key="reorder_table",
+                                          data_key=filter_key)
+            st.info("Rekomendasi: Pertimbangkan untuk melakukan pemesanan ulang segera untuk produk-produk ini "
+                    "untuk menghindari kehabisan stok dan kehilangan potensi penjualan.")
+        else:
+            st.info("Tidak ada produk dengan stok rendah dan penjualan tinggi yang teridentifikasi saat ini.")
+
+        st.write("**Produk dengan Stok Berlebih:**")
+        if not high_stock_low_sales.empty:
+            table_view.render_paged_table(high_stock_low_sales[RECOMMENDATION_COLUMNS], key="overstock_table",
+                                          data_key=filter_key)
+            st.info("Rekomendasi: Pertimbangkan strategi promosi, diskon, atau penjualan cepat untuk produk-produk "
+                    "ini guna mengurangi biaya penyimpanan dan membebaskan modal.")
+        else:
+            st.info("Tidak ada produk dengan stok berlebih yang teridentifikasi saat ini.")
+
+
+def render_data_table(queries, file_type, key, filter_key, columns=None):
+    """
+    Tabel berhalaman atas data terpilih: backend pandas memotong frame di memori, backend duckdb
+    menjalankan pencarian, pengurutan dan pemotongan halaman sebagai kueri SQL.
+    """
+    if queries.backend == "pandas":
+        df = queries.frame(file_type)
+        table_view.render_paged_table(df[columns] if columns else df, key=key, data_key=filter_key,
+                                      page_transform=lambda page: data_loader.to_rupiah(page, file_type))
+        return
+    columns = columns or queries.columns(file_type)
+    table_view.render_query_table(
+        key, filter_key, columns, lambda search: queries.count(file_type, columns, search),
+        lambda search, sort_by, ascending, offset, limit: queries.page(file_type, columns, search, sort_by,
+                                                                       ascending, offset, limit))
+
+
+def export_context(start_date, end_date, active_filters):
+    """
+    Status filter saat ekspor diminta, ditulis ke sheet Filter dan kepala file HTML.
+    """
+    context = {"Dibuat": pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S"), "Backend Query": query_backend}
+    for file_type, file_uploader in uploads.items():
+        if file_uploader:
+            context[DATA_LABELS[file_type]] = file_uploader.name
+        elif warm_dataset:
+            context[DATA_LABELS[file_type]] = warm_dataset[file_type]["name"]
+    context["Rentang Tanggal"] = (f"{start_date:%Y-%m-%d} s.d. {end_date:%Y-%m-%d}"
+                                  if start_date is not None else "Semua")
+    for column, label in filter_engine.FILTER_DIMENSIONS.items():
+        context[label] = ", ".join(map(str, active_filters[column])) if column in active_filters else "Semua"
+    return context
+
+
+def export_job_list():
+    manager = export_jobs.shared()
+    jobs = [manager.get(job_id) for job_id in st.session_state.get('export_jobs', [])]
+    return [job for job in jobs if job is not None]
+
+
+def render_export_job(job):
+    if job.active:
+        step = job.step or "menunggu giliran"
+        st.progress(job.progress, text=f"{job.label}: {step} ({job.done}/{job.total})")
+        st.button("Batalkan", key=f"cancel_export_{job.id}", on_click=job.cancel)
+    elif job.status == export_jobs.DONE:
+        st.success(f"{job.label} selesai.")
+        columns = st.columns(2)
+        with columns[0]:
+            with open(job.paths["xlsx"], "rb") as f:
+                st.download_button("Unduh Workbook Excel", f.read(), file_name=os.path.basename(job.paths["xlsx"]),
+                                   mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                                   key=f"download_xlsx_{job.id}")
+        with columns[1]:
+            with open(job.paths["html"], "rb") as f:
+                st.download_button("Unduh Grafik HTML", f.read(), file_name=os.path.basename(job.paths["html"]),
+                                   mime="text/html", key=f"download_html_{job.id}")
+    elif job.status == export_jobs.CANCELLED:
+        st.caption(f"{job.label} dibatalkan.")
+    else:
+        st.error(f"{job.label} gagal: {job.error}")
+
+
+def render_export_jobs():
+    jobs = export_job_list()
+    for job in reversed(jobs):
+        render_export_job(job)
+    # Polling berhenti lewat rerun penuh begitu tidak ada job yang masih berjalan
+    if not any(job.active for job in jobs):
+        st.rerun()
+
+
+# Status job diperbarui hanya di fragmen ini, tanpa merender ulang seluruh dashboard
+poll_export_jobs = st.fragment(run_every=EXPORT_POLL_SECONDS)(render_export_jobs)
+
+
+@st.fragment
+def render_export_section(label, context, make_queries):
+    if st.button("Ekspor Laporan (Excel + HTML)", key="start_export",
+                 help="Laporan dibuat di latar belakang untuk filter saat ini; dashboard tetap bisa dipakai."):
+        job = export_jobs.shared().submit(label, context, make_queries)
+        st.session_state['export_jobs'] = (st.session_state.get('export_jobs', []) + [job.id])[-EXPORT_HISTORY:]
+    jobs = export_job_list()
+    if any(job.active for job in jobs):
+        poll_export_jobs()
+    else:
+        for job in reversed(jobs):
+            render_export_job(job)
+
+
+@st.fragment
+def render_raw_table_section(label, queries, file_type, key, filter_key):
+    # Tabel mentah hanya diserialisasi ketika dibuka, dan hanya halaman yang sedang dilihat
+    if st.toggle(label, value=False, key=key):
+        with section_timer(f"tabel mentah: {key}"):
+            render_data_table(queries, file_type, f"{key}_table", filter_key)
 
 
 # --- Sidebar untuk Unggah File ---
@@ -194,6 +1024,62 @@ uploaded_inbound_file = st.sidebar.file_uploader("3. Unggah Data Inbound Barang
 uploaded_stock_file = st.sidebar.file_uploader("4. Unggah Data Stok Barang (Excel)", type=["xlsx", "xls"],
                                                key="stock_uploader")
 
+streaming_mode = st.sidebar.checkbox(
+    "Mode streaming untuk file besar", value=False,
+    help="Memproses file .xlsx per potongan baris agar pemakaian memori tetap rendah")
+
+append_mode = st.sidebar.checkbox(
+    "Mode append harian", value=False,
+    help="File yang diunggah dianggap delta harian dan digabung ke dataset tersimpan (dideduplikasi "
+         "berdasarkan kunci alami), sehingga riwayat lengkap tidak perlu diunggah ulang")
+
+if st.sidebar.button("Hapus Cache Data", help="Hapus cache Parquet di disk dan paksa file dibaca ulang"):
+    removed = data_cache.clear_cache()
+    st.cache_data.clear()
+    st.session_state.pop('loaded_frames', None)
+    st.session_state.pop('parquet_sources', None)
+    holder.release()
+    registry.clear()
+    st.sidebar.success(f"{removed} entri cache dihapus.")
+
+if append_mode and st.sidebar.button("Hapus Data Tersimpan", help="Hapus dataset hasil append harian"):
+    removed = incremental_store.clear_store()
+    st.session_state.pop('loaded_frames', None)
+    st.session_state.pop('parquet_sources', None)
+    holder.release()
+    st.sidebar.success(f"{removed} dataset tersimpan dihapus.")
+
+snapshot_mode = st.sidebar.checkbox(
+    "Simpan stok sebagai snapshot historis", value=False, key="stock_snapshot",
+    help="Setiap unggahan Data Stok disimpan sebagai posisi stok pada tanggal snapshot, sehingga perputaran "
+         "stok dan hari persediaan dihitung dari rata-rata stok selama rentang tanggal yang dipilih")
+if snapshot_mode:
+    snapshot_date = st.sidebar.date_input("Tanggal snapshot stok", value=pd.Timestamp.now().date(),
+                                          key="stock_snapshot_date")
+
+parallel_mode = st.sidebar.checkbox(
+    "Muat file secara paralel", value=parallel_loader.DEFAULT_WORKERS > 1,
+    help="Membaca Data Master SKU, penjualan, inbound dan stok bersamaan di beberapa proses")
+
+backend_options = sql_backend.available_backends()
+query_backend = st.sidebar.selectbox(
+    "Backend query", backend_options,
+    index=backend_options.index(sql_backend.DEFAULT_BACKEND) if sql_backend.DEFAULT_BACKEND in backend_options else 0,
+    key="query_backend",
+    help="pandas: data dimuat ke memori. duckdb: kueri SQL langsung atas file Parquet di disk, untuk data "
+         "yang lebih besar dari memori (butuh paket duckdb)")
+sql_mode = query_backend == "duckdb"
+
+approx_mode = st.sidebar.checkbox(
+    "Mode analitik perkiraan", value=False, key="approx_mode",
+    help="Top 10 dan jumlah unik dihitung dari sketsa harian (heavy-hitter, Count-Min, HyperLogLog) yang "
+         "digabung untuk rentang tanggal terpilih, beserta batas galatnya. Backend duckdb dan filter dimensi "
+         "pada data penjualan tetap memakai perhitungan eksak")
+
+profiler_panel = st.sidebar.checkbox(
+    "Tampilkan panel instrumentasi", value=False, key="show_profiler",
+    help="Waktu, jumlah baris dan selisih memori per tahap untuk beberapa rerun terakhir")
+
 # Inisialisasi state sesi untuk DataFrame
 if 'df_sales_combined' not in st.session_state:
     st.session_state['df_sales_combined'] = pd.DataFrame()
@@ -204,70 +1090,151 @@ if 'df_stock_combined' not in st.session_state:
 if 'sku_decoder' not in st.session_state:
     st.session_state['sku_decoder'] = {}
 
+# Pemuatan paralel lebih dulu; langkah di bawah ini lalu cukup mengambil hasilnya dari memo sesi/cache.
+# Backend duckdb tidak menyimpan frame di memori, sehingga tidak ada yang perlu diambil lebih dulu.
+if parallel_mode and not streaming_mode and not append_mode and not sql_mode and uploaded_sku_master_file:
+    prefetch_uploads({"sku_master": uploaded_sku_master_file, "sales": uploaded_sales_file,
+                      "inbound": uploaded_inbound_file, "stock": uploaded_stock_file})
+if st.session_state.get('load_report'):
+    load_report = st.session_state['load_report']
+    st.sidebar.caption(f"Pemuatan paralel terakhir: {load_report['seconds']:,.1f} detik; berurutan ≈ "
+                       f"{load_report['work']:,.1f} detik ({load_report['work'] / load_report['seconds']:,.1f}x)")
+
+# Tanpa unggahan apa pun, sesi warm start langsung memakai dataset terakhir yang tercatat di cache
+warm_dataset = None
+if warm_start.enabled() and not sql_mode and not append_mode and not any(
+        [uploaded_sku_master_file, uploaded_sales_file, uploaded_inbound_file, uploaded_stock_file]):
+    warm_dataset = data_cache.last_dataset()
+if warm_dataset is None:
+    leave_warm_dataset()
+
 # Proses unggah file SKU Master
 if uploaded_sku_master_file:
-    st.session_state['sku_decoder'] = load_sku_master(uploaded_sku_master_file)
+    with profiler.stage("muat: sku_master", "muat"):
+        st.session_state['sku_decoder'] = load_sku_master(uploaded_sku_master_file)
     if not st.session_state['sku_decoder']:
         st.sidebar.error("Data Master SKU kosong atau gagal dimuat. Pastikan file benar.")
+elif warm_dataset:
+    use_warm_dataset(warm_dataset)
+    st.sidebar.info("Menampilkan dataset terakhir dari cache: "
+                    f"{', '.join(entry['name'] for entry in warm_dataset.values())}. "
+                    "Unggah file untuk menggantinya.")
+    warm_status = warm_start.status()
+    if warm_status['state'] == warm_start.DONE:
+        st.sidebar.caption(f"Warm start: dataset dan struktur turunannya dimuat dalam "
+                           f"{warm_status['seconds']:,.2f} detik saat server start.")
 else:
     st.session_state['sku_decoder'] = {}
-
-# Proses unggah file penjualan
-if uploaded_sales_file and st.session_state['sku_decoder']:
-    df_sales = load_data(uploaded_sales_file, "sales")
-    if not df_sales.empty:
-        if 'SKU' in df_sales.columns:
-            df_sales_parsed_list = []
-            for sku in df_sales['SKU'].astype(str):
-                df_sales_parsed_list.append(parse_sku(sku, st.session_state['sku_decoder']))
-            df_sales_parsed = pd.DataFrame(df_sales_parsed_list)
-            st.session_state['df_sales_combined'] = pd.concat([df_sales, df_sales_parsed], axis=1)
-        else:
-            st.sidebar.warning("Kolom 'SKU' tidak ditemukan di Data Penjualan. Parsing SKU dilewati.")
+    holder.release("sku_master")
+
+DATA_LABELS = {"sales": "Data Penjualan", "inbound": "Data Inbound", "stock": "Data Stok"}
+uploads = {"sales": uploaded_sales_file, "inbound": uploaded_inbound_file, "stock": uploaded_stock_file}
+sql_sources = {}
+if sql_mode:
+    # Backend duckdb: hanya path Parquet yang disimpan; setiap kueri membaca file langsung dari disk
+    for file_type, file_uploader in uploads.items():
+        if not file_uploader and not append_mode:
+            continue
+        if not st.session_state['sku_decoder']:
+            st.sidebar.warning(
+                f"Unggah Data Master SKU terlebih dahulu untuk parsing SKU pada {DATA_LABELS[file_type]}.")
+            continue
+        entry = load_parquet_source(file_uploader, file_type, st.session_state['sku_decoder'],
+                                    streaming=streaming_mode, append=append_mode)
+        if entry is not None:
+            sql_sources[file_type] = entry
+        elif file_uploader:
+            st.sidebar.error(f"Gagal memuat {DATA_LABELS[file_type]}. Pastikan format file benar.")
+else:
+    # Proses unggah file penjualan
+    if uploaded_sales_file and st.session_state['sku_decoder']:
+        df_sales = load_combined_data(uploaded_sales_file, "sales", st.session_state['sku_decoder'],
+                                      streaming=streaming_mode, append=append_mode)
+        if not df_sales.empty:
+            if 'SKU' not in df_sales.columns:
+                st.sidebar.warning("Kolom 'SKU' tidak ditemukan di Data Penjualan. Parsing SKU dilewati.")
             st.session_state['df_sales_combined'] = df_sales
-    else:
-        st.sidebar.error("Gagal memuat Data Penjualan. Pastikan format file benar.")
-elif uploaded_sales_file and not st.session_state['sku_decoder']:
-    st.sidebar.warning("Unggah Data Master SKU terlebih dahulu untuk parsing SKU pada Data Penjualan.")
-    st.session_state['df_sales_combined'] = load_data(uploaded_sales_file, "sales")
-
-# Proses unggah file inbound
-if uploaded_inbound_file and st.session_state['sku_decoder']:
-    df_inbound = load_data(uploaded_inbound_file, "inbound")
-    if not df_inbound.empty:
-        if 'SKU' in df_inbound.columns:
-            df_inbound_parsed_list = []
-            for sku in df_inbound['SKU'].astype(str):
-                df_inbound_parsed_list.append(parse_sku(sku, st.session_state['sku_decoder']))
-            df_inbound_parsed = pd.DataFrame(df_inbound_parsed_list)
-            st.session_state['df_inbound_combined'] = pd.concat([df_inbound, df_inbound_parsed], axis=1)
         else:
-            st.sidebar.warning("Kolom 'SKU' tidak ditemukan di Data Inbound. Parsing SKU dilewati.")
+            st.sidebar.error("Gagal memuat Data Penjualan. Pastikan format file benar.")
+    elif uploaded_sales_file and not st.session_state['sku_decoder']:
+        st.sidebar.warning("Unggah Data Master SKU terlebih dahulu untuk parsing SKU pada Data Penjualan.")
+        st.session_state['df_sales_combined'] = load_combined_data(uploaded_sales_file, "sales", {},
+                                                                   streaming=streaming_mode, append=append_mode)
+
+    # Proses unggah file inbound
+    if uploaded_inbound_file and st.session_state['sku_decoder']:
+        df_inbound = load_combined_data(uploaded_inbound_file, "inbound", st.session_state['sku_decoder'],
+                                        streaming=streaming_mode, append=append_mode)
+        if not df_inbound.empty:
+            if 'SKU' not in df_inbound.columns:
+                st.sidebar.warning("Kolom 'SKU' tidak ditemukan di Data Inbound. Parsing SKU dilewati.")
             st.session_state['df_inbound_combined'] = df_inbound
-    else:
-        st.sidebar.error("Gagal memuat Data Inbound. Pastikan format file benar.")
-elif uploaded_inbound_file and not st.session_state['sku_decoder']:
-    st.sidebar.warning("Unggah Data Master SKU terlebih dahulu untuk parsing SKU pada Data Inbound.")
-    st.session_state['df_inbound_combined'] = load_data(uploaded_inbound_file, "inbound")
-
-# Proses unggah file stok
-if uploaded_stock_file and st.session_state['sku_decoder']:
-    df_stock = load_data(uploaded_stock_file, "stock")
-    if not df_stock.empty:
-        if 'SKU' in df_stock.columns:
-            df_stock_parsed_list = []
-            for sku in df_stock['SKU'].astype(str):
-                df_stock_parsed_list.append(parse_sku(sku, st.session_state['sku_decoder']))
-            df_stock_parsed = pd.DataFrame(df_stock_parsed_list)
-            st.session_state['df_stock_combined'] = pd.concat([df_stock, df_stock_parsed], axis=1)
         else:
-            st.sidebar.warning("Kolom 'SKU' tidak ditemukan di Data Stok. Parsing SKU dilewati.")
+            st.sidebar.error("Gagal memuat Data Inbound. Pastikan format file benar.")
+    elif uploaded_inbound_file and not st.session_state['sku_decoder']:
+        st.sidebar.warning("Unggah Data Master SKU terlebih dahulu untuk parsing SKU pada Data Inbound.")
+        st.session_state['df_inbound_combined'] = load_combined_data(uploaded_inbound_file, "inbound", {},
+                                                                     streaming=streaming_mode, append=append_mode)
+
+    # Proses unggah file stok
+    if uploaded_stock_file and st.session_state['sku_decoder']:
+        df_stock = load_combined_data(uploaded_stock_file, "stock", st.session_state['sku_decoder'],
+                                      streaming=streaming_mode, append=append_mode)
+        if not df_stock.empty:
+            if 'SKU' not in df_stock.columns:
+                st.sidebar.warning("Kolom 'SKU' tidak ditemukan di Data Stok. Parsing SKU dilewati.")
             st.session_state['df_stock_combined'] = df_stock
-    else:
-        st.sidebar.error("Gagal memuat Data Stok. Pastikan format file benar.")
-elif uploaded_stock_file and not st.session_state['sku_decoder']:
-    st.sidebar.warning("Unggah Data Master SKU terlebih dahulu untuk parsing SKU pada Data Stok.")
-    st.session_state['df_stock_combined'] = load_data(uploaded_stock_file, "stock")
+        else:
+            st.sidebar.error("Gagal memuat Data Stok. Pastikan format file benar.")
+    elif uploaded_stock_file and not st.session_state['sku_decoder']:
+        st.sidebar.warning("Unggah Data Master SKU terlebih dahulu untuk parsing SKU pada Data Stok.")
+        st.session_state['df_stock_combined'] = load_combined_data(uploaded_stock_file, "stock", {},
+                                                                   streaming=streaming_mode, append=append_mode)
+
+    # Pada mode append, dataset tersimpan tetap dimuat meskipun hari ini tidak ada delta yang diunggah
+    if append_mode and st.session_state['sku_decoder']:
+        for file_type, file_uploader in [("sales", uploaded_sales_file), ("inbound", uploaded_inbound_file),
+                                         ("stock", uploaded_stock_file)]:
+            if not file_uploader:
+                st.session_state[f'df_{file_type}_combined'] = profiler.measure(
+                    f"muat tersimpan: {file_type}", "muat",
+                    lambda: load_appended_data(None, file_type, st.session_state['sku_decoder']))
+
+# Snapshot stok historis disimpan dari data stok yang sudah dimuat (hasil parsing yang sama dengan dashboard)
+if snapshot_mode and uploaded_stock_file:
+    if sql_mode and 'stock' in sql_sources:
+        record_stock_snapshot(snapshot_date, sql_sources['stock']['key'],
+                              lambda: pd.concat([pd.read_parquet(path) for path in sql_sources['stock']['paths']],
+                                                ignore_index=True))
+    elif not sql_mode and not st.session_state['df_stock_combined'].empty:
+        record_stock_snapshot(snapshot_date, dataset_key("stock"), lambda: st.session_state['df_stock_combined'])
+
+# Ringkasan pemakaian memori setelah optimasi tipe data
+if st.session_state.get('memory_report'):
+    with st.sidebar.expander("Pemakaian Memori Data"):
+        for file_type, report in st.session_state['memory_report'].items():
+            st.write(f"**{file_type}**: {report['before_mb']:,.1f} MB → {report['after_mb']:,.1f} MB")
+            if report['converted']:
+                st.caption(", ".join(f"{col}: {dtype}" for col, dtype in report['converted'].items()))
+
+# Dataset bersama: memori tumbuh dengan jumlah dataset berbeda, bukan dengan jumlah sesi
+registry_stats = registry.stats()
+if not registry_stats.empty:
+    with st.sidebar.expander("Dataset Bersama Antar Sesi"):
+        st.caption(f"{len(registry_stats)} nilai, {registry.total_mb():,.1f} MB dari anggaran "
+                   f"{dataset_registry.REGISTRY_BUDGET_MB:,.0f} MB; {registry.evictions} dievict")
+        st.dataframe(registry_stats, hide_index=True)
+
+# Sel yang gagal diparse dikosongkan (angka menjadi 0), bukan menggagalkan file; jumlahnya ditampilkan di sini
+if st.session_state.get('parse_report'):
+    for file_type, report in st.session_state['parse_report'].items():
+        bad = sum(entry['bad'] for entry in report.values())
+        if bad:
+            st.sidebar.warning(f"{bad:,} sel di data {file_type} gagal diparse dan dikosongkan.")
+    with st.sidebar.expander("Laporan Parsing Data"):
+        for file_type, report in st.session_state['parse_report'].items():
+            st.write(f"**{file_type}**")
+            st.dataframe(schemas.report_frame(report), hide_index=True)
 
 # --- Dashboard Utama ---
 st.title("Dashboard Analisis Data Bisnis")
@@ -275,24 +1242,40 @@ st.markdown(
     "Dashboard ini membantu Anda menganalisis data penjualan, inbound, dan stok untuk mendapatkan wawasan bisnis.")
 
 # Tampilkan dashboard hanya jika semua file telah diunggah dan tidak kosong
-if not st.session_state['df_sales_combined'].empty and \
+if sql_mode:
+    data_ready = len(sql_sources) == len(DATA_LABELS) and bool(st.session_state['sku_decoder'])
+else:
+    data_ready = not st.session_state['df_sales_combined'].empty and \
         not st.session_state['df_inbound_combined'].empty and \
         not st.session_state['df_stock_combined'].empty and \
-        st.session_state['sku_decoder']:
+        st.session_state['sku_decoder']
+    if data_ready and not append_mode and not warm_dataset:
+        remember_dataset()
+
+if data_ready:
 
     # --- Filter Interaktif ---
     st.sidebar.markdown("---")
     st.sidebar.header("Filter Data")
 
-    df_sales_filtered = st.session_state['df_sales_combined'].copy()
-    df_stock_filtered = st.session_state['df_stock_combined'].copy()
-    df_inbound_filtered = st.session_state['df_inbound_combined'].copy()
+    if sql_mode:
+        source_keys = tuple(sql_sources[file_type]['key'] for file_type in sql_backend.DATA_TYPES)
+        source_queries = profiler.measure(
+            "buka Parquet", "muat",
+            lambda: sql_backend.SqlQueries({file_type: entry['paths'] for file_type, entry in sql_sources.items()}))
+        dataset_info = sql_dataset_info(source_queries, source_keys)
+        first_date, last_date = dataset_info['dates']
+    else:
+        source_keys = (dataset_key("sales"), dataset_key("stock"), dataset_key("inbound"))
+        # Indeks filter dibangun sekali per dataset; seleksi tidak menyalin seluruh frame
+        sales_index = get_filter_index("sales", st.session_state['df_sales_combined'])
+        stock_index = get_filter_index("stock", st.session_state['df_stock_combined'])
+        inbound_index = get_filter_index("inbound", st.session_state['df_inbound_combined'])
+        first_date, last_date = sales_index.date_limits()
 
     # Filter Tanggal Penjualan
-    min_date = df_sales_filtered['Tanggal'].min().date() if not df_sales_filtered[
-        'Tanggal'].empty else pd.Timestamp.now().date()
-    max_date = df_sales_filtered['Tanggal'].max().date() if not df_sales_filtered[
-        'Tanggal'].empty else pd.Timestamp.now().date()
+    min_date = first_date.date() if first_date is not None else pd.Timestamp.now().date()
+    max_date = last_date.date() if last_date is not None else pd.Timestamp.now().date()
 
     date_range = st.sidebar.date_input(
         "Pilih Rentang Tanggal Penjualan",
@@ -301,267 +1284,135 @@ if not st.session_state['df_sales_combined'].empty and \
         max_value=max_date
     )
 
+    # Tanggal akhir inklusif sampai akhir hari, sama seperti grain harian kubus penjualan
+    start_date, end_date = None, None
     if len(date_range) == 2:
         start_date = pd.to_datetime(date_range[0])
         end_date = pd.to_datetime(date_range[1])
-        df_sales_filtered = df_sales_filtered[
-            (df_sales_filtered['Tanggal'] >= start_date) & (df_sales_filtered['Tanggal'] <= end_date)]
 
-    # Filter Kategori Produk
-    all_categories = ['Semua Kategori'] + list(st.session_state['df_sales_combined']['Category'].unique())
-    selected_categories = st.sidebar.multiselect("Filter Berdasarkan Kategori", all_categories,
-                                                 default='Semua Kategori')
-
-    if 'Semua Kategori' not in selected_categories:
-        df_sales_filtered = df_sales_filtered[df_sales_filtered['Category'].isin(selected_categories)]
-        df_stock_filtered = df_stock_filtered[df_stock_filtered['Category'].isin(selected_categories)]
-        df_inbound_filtered = df_inbound_filtered[df_inbound_filtered['Category'].isin(selected_categories)]
+    # Filter per dimensi (Kategori, Musim, Channel, Salesman, Toko, Lokasi).
+    # Filter hanya berlaku untuk data yang memiliki kolom tersebut, misalnya Lokasi hanya untuk stok.
+    active_filters = {}
+    for column, label in filter_engine.FILTER_DIMENSIONS.items():
+        if sql_mode:
+            options = dataset_info['options'][column]
+        else:
+            options = set()
+            for index in (sales_index, stock_index, inbound_index):
+                options.update(index.values(column))
+        if not options:
+            continue
+        all_label = f"Semua {label}"
+        selected = st.sidebar.multiselect(f"Filter Berdasarkan {label}", [all_label] + sorted(options, key=str),
+                                          default=all_label)
+        if all_label not in selected:
+            active_filters[column] = selected
+
+    sketch_window = None
+    if sql_mode:
+        # Filter diterjemahkan ke klausa WHERE dan didorong DuckDB ke pemindaian Parquet
+        queries = source_queries.select(start_date, end_date, active_filters)
+    else:
+        df_sales_filtered, sales_filter_stats = select_rows("sales", sales_index, start_date, end_date,
+                                                            active_filters)
+        df_stock_filtered, _ = select_rows("stock", stock_index, filters=active_filters)
+        df_inbound_filtered, _ = select_rows("inbound", inbound_index, filters=active_filters)
+
+        if sales_filter_stats:
+            with st.sidebar.expander("Statistik Filter Penjualan"):
+                for stat in sales_filter_stats:
+                    st.caption(f"{stat['filter']}: {stat['rows']:,} baris ({stat['selectivity']:.1%}) "
+                               f"dalam {stat['ms']:,.2f} ms")
+
+        # Grafik dan KPI penjualan dijawab dari roll-up kubus; data mentah hanya untuk tabel detail
+        cube = get_sales_cube(st.session_state['df_sales_combined'])
+        sales_filters = {column: values for column, values in active_filters.items()
+                         if column in sales_index.columns}
+        if sales_cube.covers(cube, sales_filters):
+            cube_sales = profiler.measure("potong kubus: sales", "filter",
+                                          lambda: sales_cube.slice_cube(cube['sales'], start_date, end_date,
+                                                                        sales_filters),
+                                          rows_in=len(cube['sales']))
+            cube_products = profiler.measure("potong kubus: products", "filter",
+                                             lambda: sales_cube.slice_cube(cube['products'], start_date, end_date,
+                                                                           sales_filters),
+                                             rows_in=len(cube['products']))
+        else:
+            # Filter di luar grain kubus (misalnya Salesman atau Toko): kubus dibangun dari baris terpilih saja
+            filtered_cube = profiler.measure("bangun kubus terfilter", "agregasi",
+                                             lambda: sales_cube.build_sales_cube(df_sales_filtered),
+                                             rows_in=len(df_sales_filtered))
+            cube_sales, cube_products = filtered_cube['sales'], filtered_cube['products']
+        # Agregasi dan join per SKU memakai SKU_ID dari dimensi bersama, bukan merge berbasis teks SKU
+        dimension = get_sku_dimension(st.session_state['df_sales_combined'], st.session_state['df_stock_combined'],
+                                      st.session_state['df_inbound_combined'])
+        queries = analytics.FrameQueries(cube_sales, cube_products, df_sales_filtered, df_stock_filtered,
+                                         df_inbound_filtered, dimension)
+        # Sketsa hanya dipartisi per hari, sehingga mode perkiraan berlaku jika penjualan hanya difilter tanggal
+        if approx_mode and not sales_filters:
+            sketch_window = profiler.measure(
+                "gabung sketsa", "filter",
+                lambda: get_sales_sketches(st.session_state['df_sales_combined']).window(start_date, end_date))
+
+    # Status filter sebagai kunci memo hasil komputasi per bagian
+    filter_key = (query_backend,) + source_keys + (
+        start_date, end_date, tuple(sorted((column, tuple(values)) for column, values in active_filters.items())))
+
+    # Metrik snapshot stok historis untuk rentang tanggal terpilih; ikut dihitung ulang saat snapshot baru disimpan
+    history_key = filter_key + (stock_snapshots.version(),)
+    stock_history = section_result(
+        "snapshot stok", "stock_history", history_key,
+        lambda: stock_snapshots.window_metrics(queries.sku_sales(), start_date, end_date, active_filters))
 
     st.header("Ringkasan Kinerja Utama")
-    col1, col2, col3, col4 = st.columns(4)
-
-    with col1:
-        st.markdown(f"""
-        <div style="background-color:#F0F2F6; padding: 15px; border-radius: 10px; text-align: center; box-shadow: 2px 2px 5px rgba(0,0,0,0.1);">
-            <h3 style="color:#303030; margin-bottom: 5px;">Total Penjualan</h3>
-            <p style="font-size: 2em; color:#4CAF50; font-weight: bold;">Rp {df_sales_filtered['Nett Sales'].sum():,.2f}</p>
-        </div>
-        """, unsafe_allow_html=True)
-    with col2:
-        st.markdown(f"""
-        <div style="background-color:#F0F2F6; padding: 15px; border-radius: 10px; text-align: center; box-shadow: 2px 2px 5px rgba(0,0,0,0.1);">
-            <h3 style="color:#303030; margin-bottom: 5px;">Total Gross Profit</h3>
-            <p style="font-size: 2em; color:#2196F3; font-weight: bold;">Rp {df_sales_filtered['Gross Profit'].sum():,.2f}</p>
-        </div>
-        """, unsafe_allow_html=True)
-    with col3:
-        st.markdown(f"""
-        <div style="background-color:#F0F2F6; padding: 15px; border-radius: 10px; text-align: center; box-shadow: 2px 2px 5px rgba(0,0,0,0.1);">
-            <h3 style="color:#303030; margin-bottom: 5px;">Total QTY Terjual</h3>
-            <p style="font-size: 2em; color:#FF9800; font-weight: bold;">{df_sales_filtered['QTY'].sum():,.0f} unit</p>
-        </div>
-        """, unsafe_allow_html=True)
-    with col4:
-        # Menghitung Inventory Turnover Ratio (sederhana: Total QTY Terjual / Rata-rata Stok Tersedia)
-        # Ini adalah perhitungan snapshot, untuk akurasi lebih baik butuh data stok time-series
-        avg_stock_qty = df_stock_filtered['Tersedia'].mean() if not df_stock_filtered.empty else 0
-        inventory_turnover = (df_sales_filtered['QTY'].sum() / avg_stock_qty) if avg_stock_qty > 0 else 0
-        st.markdown(f"""
-        <div style="background-color:#F0F2F6; padding: 15px; border-radius: 10px; text-align: center; box-shadow: 2px 2px 5px rgba(0,0,0,0.1);">
-            <h3 style="color:#303030; margin-bottom: 5px;">Perputaran Stok</h3>
-            <p style="font-size: 2em; color:#9C27B0; font-weight: bold;">{inventory_turnover:,.2f}x</p>
-        </div>
-        """, unsafe_allow_html=True)
+    render_kpi_section(queries, filter_key, stock_history)
 
     st.markdown("---")
 
     # --- Analisis Penjualan ---
     st.header("Analisis Penjualan")
-
-    tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs([
-        "Berdasarkan Kategori", "Berdasarkan Sub Kategori", "Berdasarkan Tahun Produksi",
-        "Berdasarkan Musim", "Berdasarkan Warna", "Berdasarkan Ukuran", "Analisis Profitabilitas"
-    ])
-
-    with tab1:
-        st.subheader("Penjualan Berdasarkan Kategori Produk")
-        sales_by_category = df_sales_filtered.groupby('Category')['Sub Total'].sum().sort_values(
-            ascending=False).reset_index()
-        fig_sales_category = px.bar(sales_by_category, x='Category', y='Sub Total',
-                                    title='Total Penjualan per Kategori',
-                                    labels={'Sub Total': 'Total Penjualan (Rp)'},
-                                    color='Category',
-                                    template='plotly_white')
-        st.plotly_chart(fig_sales_category, use_container_width=True)
-
-    with tab2:
-        st.subheader("Penjualan Berdasarkan Sub Kategori Produk")
-        sales_by_subcategory = df_sales_filtered.groupby('Sub Category')['Sub Total'].sum().sort_values(
-            ascending=False).reset_index()
-        fig_sales_subcategory = px.bar(sales_by_subcategory, x='Sub Category', y='Sub Total',
-                                       title='Total Penjualan per Sub Kategori',
-                                       labels={'Sub Total': 'Total Penjualan (Rp)'},
-                                       color='Sub Category',
-                                       template='plotly_white')
-        st.plotly_chart(fig_sales_subcategory, use_container_width=True)
-
-    with tab3:
-        st.subheader("Penjualan Berdasarkan Tahun Produksi")
-        sales_by_year = df_sales_filtered.groupby('Tahun Produksi')['Sub Total'].sum().sort_values(
-            ascending=False).reset_index()
-        fig_sales_year = px.bar(sales_by_year, x='Tahun Produksi', y='Sub Total',
-                                title='Total Penjualan per Tahun Produksi',
-                                labels={'Sub Total': 'Total Penjualan (Rp)'},
-                                color='Tahun Produksi',
-                                template='plotly_white')
-        st.plotly_chart(fig_sales_year, use_container_width=True)
-
-    with tab4:
-        st.subheader("Penjualan Berdasarkan Musim")
-        sales_by_season = df_sales_filtered.groupby('Season')['Sub Total'].sum().sort_values(
-            ascending=False).reset_index()
-        fig_sales_season = px.bar(sales_by_season, x='Season', y='Sub Total',
-                                  title='Total Penjualan per Musim',
-                                  labels={'Sub Total': 'Total Penjualan (Rp)'},
-                                  color='Season',
-                                  template='plotly_white')
-        st.plotly_chart(fig_sales_season, use_container_width=True)
-
-    with tab5:
-        st.subheader("Penjualan Berdasarkan Warna Produk")
-        sales_by_color = df_sales_filtered.groupby('Warna Produk')['Sub Total'].sum().sort_values(
-            ascending=False).reset_index()
-        fig_sales_color = px.bar(sales_by_color, x='Warna Produk', y='Sub Total',
-                                 title='Total Penjualan per Warna Produk',
-                                 labels={'Sub Total': 'Total Penjualan (Rp)'},
-                                 color='Warna Produk',
-                                 template='plotly_white')
-        st.plotly_chart(fig_sales_color, use_container_width=True)
-
-    with tab6:
-        st.subheader("Penjualan Berdasarkan Ukuran Produk")
-        sales_by_size = df_sales_filtered.groupby('Size Produk')['Sub Total'].sum().sort_values(
-            ascending=False).reset_index()
-        fig_sales_size = px.bar(sales_by_size, x='Size Produk', y='Sub Total',
-                                title='Total Penjualan per Ukuran Produk',
-                                labels={'Sub Total': 'Total Penjualan (Rp)'},
-                                color='Size Produk',
-                                template='plotly_white')
-        st.plotly_chart(fig_sales_size, use_container_width=True)
-
-    with tab7:
-        st.subheader("Analisis Profitabilitas Berdasarkan Kategori")
-        profit_by_category = df_sales_filtered.groupby('Category')['Gross Profit'].sum().sort_values(
-            ascending=False).reset_index()
-        fig_profit_category = px.bar(profit_by_category, x='Category', y='Gross Profit',
-                                     title='Total Gross Profit per Kategori',
-                                     labels={'Gross Profit': 'Gross Profit (Rp)'},
-                                     color='Category',
-                                     template='plotly_white')
-        st.plotly_chart(fig_profit_category, use_container_width=True)
-
-        st.subheader("Analisis Profitabilitas Berdasarkan Sub Kategori")
-        profit_by_subcategory = df_sales_filtered.groupby('Sub Category')['Gross Profit'].sum().sort_values(
-            ascending=False).reset_index()
-        fig_profit_subcategory = px.bar(profit_by_subcategory, x='Sub Category', y='Gross Profit',
-                                        title='Total Gross Profit per Sub Kategori',
-                                        labels={'Gross Profit': 'Gross Profit (Rp)'},
-                                        color='Sub Category',
-                                        template='plotly_white')
-        st.plotly_chart(fig_profit_subcategory, use_container_width=True)
-
-    st.subheader("Penjualan Berdasarkan Channel")
-    sales_by_channel = df_sales_filtered.groupby('Channel')['Sub Total'].sum().sort_values(
-        ascending=False).reset_index()
-    fig_sales_channel = px.pie(sales_by_channel, names='Channel', values='Sub Total',
-                               title='Proporsi Penjualan per Channel',
-                               template='plotly_white')
-    st.plotly_chart(fig_sales_channel, use_container_width=True)
-
-    st.subheader("Top 10 Produk Terlaris (Berdasarkan QTY)")
-    top_selling_products_qty = df_sales_filtered.groupby('Nama Barang')['QTY'].sum().sort_values(ascending=False).head(
-        10).reset_index()
-    fig_top_products_qty = px.bar(top_selling_products_qty, x='Nama Barang', y='QTY',
-                                  title='Top 10 Produk Terlaris (QTY)',
-                                  labels={'QTY': 'Jumlah Terjual (Unit)'},
-                                  color='QTY',
-                                  template='plotly_white')
-    st.plotly_chart(fig_top_products_qty, use_container_width=True)
-
-    st.subheader("Tren Penjualan Bulanan")
-    df_sales_filtered['Bulan'] = df_sales_filtered['Tanggal'].dt.to_period('M').astype(str)
-    monthly_sales = df_sales_filtered.groupby('Bulan')['Nett Sales'].sum().reset_index()
-    fig_monthly_sales = px.line(monthly_sales, x='Bulan', y='Nett Sales',
-                                title='Tren Penjualan Bersih Bulanan',
-                                labels={'Nett Sales': 'Nett Sales (Rp)'},
-                                markers=True,
-                                template='plotly_white')
-    st.plotly_chart(fig_monthly_sales, use_container_width=True)
+    render_sales_analysis_section(queries, filter_key)
+    render_channel_section(queries, filter_key)
+    render_top_products_section(queries, filter_key, sketch_window, approx_mode)
+    render_monthly_section(queries, filter_key)
 
     st.markdown("---")
 
     # --- Analisis Stok dan Inbound ---
     st.header("Analisis Stok dan Inbound")
-
-    st.subheader("Ringkasan Stok Saat Ini")
-    st.dataframe(df_stock_filtered[
-                     ['Nama Item', 'Category', 'Sub Category', 'Lokasi', 'QTY', 'Tersedia', 'Harga Jual', 'HPP',
-                      'Nilai Persediaan']])
-
-    st.subheader("Perbandingan Stok Tersedia vs. Barang Diterima (Inbound)")
-    inbound_by_sku = df_inbound_filtered.groupby('SKU')['Qty Diterima'].sum().reset_index(name='Total Qty Diterima')
-    stock_available = df_stock_filtered.groupby('SKU')['Tersedia'].sum().reset_index(name='Total Tersedia')
-
-    comparison_df = pd.merge(stock_available, inbound_by_sku, on='SKU', how='outer').fillna(0)
-    comparison_df = pd.merge(comparison_df, df_stock_filtered[['SKU', 'Nama Item', 'Category']].drop_duplicates(),
-                             on='SKU', how='left')
-    comparison_df['Nama Item'] = comparison_df['Nama Item'].fillna(comparison_df['SKU'])
-
-    fig_stock_inbound_comp = px.bar(comparison_df.sort_values(by='Total Tersedia', ascending=False).head(20),
-                                    x='Nama Item', y=['Total Tersedia', 'Total Qty Diterima'],
-                                    title='Stok Tersedia vs. Qty Diterima per SKU (Top 20)',
-                                    labels={'value': 'Jumlah', 'variable': 'Tipe'},
-                                    barmode='group',
-                                    template='plotly_white')
-    st.plotly_chart(fig_stock_inbound_comp, use_container_width=True)
-
-    st.subheader("Distribusi Stok Berdasarkan Lokasi")
-    stock_by_location = df_stock_filtered.groupby('Lokasi')['QTY'].sum().sort_values(ascending=False).reset_index()
-    fig_stock_location = px.pie(stock_by_location, names='Lokasi', values='QTY',
-                                title='Distribusi Stok Berdasarkan Lokasi',
-                                template='plotly_white')
-    st.plotly_chart(fig_stock_location, use_container_width=True)
+    render_stock_summary_section(queries, filter_key)
+    render_stock_inbound_section(queries, filter_key)
+    render_location_section(queries, filter_key)
+    render_stock_history_section(stock_history, history_key)
 
     st.markdown("---")
 
     # --- Analisis Gabungan dan Masukan ---
     st.header("Analisis Gabungan dan Masukan")
-
-    st.subheader("Rekomendasi Berdasarkan Data")
-
-    st.write("**Produk dengan Stok Rendah dan Penjualan Tinggi:**")
-    avg_sales_qty = df_sales_filtered['QTY'].mean()
-    sales_agg = df_sales_filtered.groupby('SKU')['QTY'].sum().reset_index(name='TotalQTYTerjual')
-    stock_agg = df_stock_filtered.groupby('SKU')['Tersedia'].sum().reset_index(name='TotalTersedia')
-
-    merged_performance = pd.merge(sales_agg, stock_agg, on='SKU', how='left').fillna(0)
-    low_stock_high_sales = merged_performance[
-        (merged_performance['TotalTersedia'] < 50) &
-        (merged_performance['TotalQTYTerjual'] > avg_sales_qty)
-        ]
-    if not low_stock_high_sales.empty:
-        low_stock_high_sales = pd.merge(low_stock_high_sales,
-                                        df_stock_filtered[['SKU', 'Nama Item', 'Category']].drop_duplicates(), on='SKU',
-                                        how='left')
-        st.dataframe(low_stock_high_sales[['Nama Item', 'Category', 'TotalQTYTerjual', 'TotalTersedia']])
-        st.info(
-            "Rekomendasi: Pertimbangkan untuk melakukan pemesanan ulang segera untuk produk-produk ini untuk menghindari kehabisan stok dan kehilangan potensi penjualan.")
-    else:
-        st.info("Tidak ada produk dengan stok rendah dan penjualan tinggi yang teridentifikasi saat ini.")
-
-    st.write("**Produk dengan Stok Berlebih:**")
-    high_stock_low_sales = merged_performance[
-        (merged_performance['TotalTersedia'] > 100) &
-        (merged_performance['TotalQTYTerjual'] < avg_sales_qty)
-        ]
-    if not high_stock_low_sales.empty:
-        high_stock_low_sales = pd.merge(high_stock_low_sales,
-                                        df_stock_filtered[['SKU', 'Nama Item', 'Category']].drop_duplicates(), on='SKU',
-                                        how='left')
-        st.dataframe(high_stock_low_sales[['Nama Item', 'Category', 'TotalQTYTerjual', 'TotalTersedia']])
-        st.info(
-            "Rekomendasi: Pertimbangkan strategi promosi, diskon, atau penjualan cepat untuk produk-produk ini guna mengurangi biaya penyimpanan dan membebaskan modal.")
-    else:
-        st.info("Tidak ada produk dengan stok berlebih yang teridentifikasi saat ini.")
+    render_recommendation_section(queries, filter_key)
 
     st.markdown("---")
     st.subheader("Tabel Data Mentah (untuk Pemeriksaan Detail)")
-    with st.expander("Lihat Data Penjualan Lengkap"):
-        st.dataframe(df_sales_filtered)
-    with st.expander("Lihat Data Inbound Barang Lengkap"):
-        st.dataframe(df_inbound_filtered)
-    with st.expander("Lihat Data Stok Barang Lengkap"):
-        st.dataframe(df_stock_filtered)
+    render_raw_table_section("Lihat Data Penjualan Lengkap", queries, "sales", "raw_sales", filter_key)
+    render_raw_table_section("Lihat Data Inbound Barang Lengkap", queries, "inbound", "raw_inbound", filter_key)
+    render_raw_table_section("Lihat Data Stok Barang Lengkap", queries, "stock", "raw_stock", filter_key)
+
+    st.markdown("---")
+    st.subheader("Ekspor Laporan")
+    export_sources = {file_type: entry['paths'] for file_type, entry in sql_sources.items()}
+
+    def make_export_queries():
+        # Thread pekerja memakai cursor DuckDB sendiri atas file Parquet yang sama; objek kueri pandas
+        # hanya dibaca sehingga bisa dipakai langsung
+        if sql_mode:
+            return sql_backend.SqlQueries(export_sources, start_date, end_date, active_filters)
+        return queries
+
+    render_export_section("Laporan Dashboard", export_context(start_date, end_date, active_filters),
+                          make_export_queries)
+
+    with st.expander("Waktu Komputasi per Bagian"):
+        st.dataframe(pd.DataFrame.from_dict(st.session_state.get('section_timings', {}), orient='index'))
 
 else:
     st.info(
@@ -573,3 +1424,9 @@ else:
     3. Pastikan file Anda dalam format Excel (.xlsx atau .xls).
     4. Setelah semua file diunggah, dashboard akan otomatis muncul.
     """)
+
+# Run instrumentasi ditutup di akhir skrip; panel menampilkan riwayat termasuk rerun ini
+profiler.finish_run(profile_run)
+record_profile(profile_run)
+if profiler_panel:
+    render_profile_panel()
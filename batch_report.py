@@ -0,0 +1,318 @@
+"""
+Mesin laporan batch tanpa Streamlit.
+
+Setiap set input (satu direktori berisi file penjualan, inbound dan stok, ditambah Data Master SKU)
+dimuat, diparse SKU-nya dan dianalisis dengan fungsi yang sama seperti dashboard. Set-set input
+independen dijalankan paralel di process pool; hasilnya ditulis ke direktori output per set:
+tabel sebagai Parquet/CSV dan grafik sebagai HTML statis yang bisa dibuka offline (satu salinan
+plotly.min.js per direktori), ditambah ringkasan waktu per job.
+
+Hasil pemuatan memakai cache Parquet yang sama dengan dashboard (kunci hash isi file), sehingga
+laporan malam hari sekaligus menghangatkan cache untuk aplikasi.
+
+Penggunaan dari command line:
+    python batch_report.py toko_a/ toko_b/ toko_c/ --sku-master master.xlsx --out laporan/ --workers 4
+"""
+import argparse
+import fnmatch
+import hashlib
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+import analytics
+import charts
+import data_cache
+import data_loader
+import sales_cube
+import sku_dimension
+
+# Pola nama file (tanpa membedakan huruf besar/kecil) untuk mengenali jenis file di direktori input
+INPUT_PATTERNS = {
+    "sku_master": ["*master*"],
+    "sales": ["*penjualan*", "*sales*"],
+    "inbound": ["*inbound*"],
+    "stock": ["*stok*", "*stock*"]
+}
+EXCEL_EXTENSIONS = (".xlsx", ".xls")
+OUTPUT_FORMATS = ["parquet", "csv"]
+SUMMARY_FILE = "ringkasan_batch.csv"
+# Bundel plotly.js yang ditulis sekali per direktori output dan dirujuk secara relatif oleh setiap HTML grafik
+PLOTLY_JS_FILE = "plotly.min.js"
+
+
+def slugify(text):
+    return re.sub(r'[^a-z0-9]+', '_', str(text).lower()).strip('_')
+
+
+def find_inputs(directory):
+    """
+    Mencari file Excel untuk setiap jenis data di sebuah direktori berdasarkan INPUT_PATTERNS.
+    Mengembalikan {jenis file: path}; jenis yang tidak ditemukan tidak disertakan.
+    """
+    files = sorted(name for name in os.listdir(directory) if name.lower().endswith(EXCEL_EXTENSIONS))
+    found = {}
+    for file_type, patterns in INPUT_PATTERNS.items():
+        for name in files:
+            if any(fnmatch.fnmatch(name.lower(), pattern) for pattern in patterns) and name not in found.values():
+                found[file_type] = name
+                break
+    return {file_type: os.path.join(directory, name) for file_type, name in found.items()}
+
+
+def discover_jobs(directories, sku_master=None):
+    """
+    Membentuk daftar job dari direktori input. Data Master SKU dari argumen dipakai jika
+    direktori tidak memiliki file master sendiri.
+
+    Nama job (dan direktori outputnya) adalah nama direktori input. Direktori berbeda dengan nama yang
+    sama (misalnya toko_a/2024 dan toko_b/2024) diberi akhiran hash path-nya agar outputnya tidak saling
+    menimpa; akhiran ini sama pada setiap run untuk path yang sama.
+    """
+    paths = list(dict.fromkeys(os.path.abspath(directory) for directory in directories))
+    names = [os.path.basename(path) or "root" for path in paths]
+    jobs = []
+    for path, name in zip(paths, names):
+        inputs = find_inputs(path)
+        if sku_master and "sku_master" not in inputs:
+            inputs["sku_master"] = sku_master
+        if names.count(name) > 1:
+            name = f"{name}-{hashlib.sha256(path.encode('utf-8')).hexdigest()[:8]}"
+        jobs.append({"name": name, "inputs": inputs})
+    return jobs
+
+
+def load_frame(path, file_type, sku_decoder):
+    """
+    Memuat satu file yang sudah dibersihkan, diparse SKU-nya, terurut dan dipadatkan tipe datanya,
+    melalui cache Parquet di disk dengan kunci yang sama seperti dashboard.
+    """
+    key = data_cache.cache_key(data_cache.file_content_hash(path), file_type, data_cache.decoder_hash(sku_decoder))
+
+    def build():
+        df = data_loader.read_data(path, file_type, sku_decoder)
+        df, _ = data_loader.optimize_dtypes(data_loader.sort_by_date(df, file_type), file_type)
+        return df
+
+    return data_cache.cached_frame(key, build)
+
+
+def load_inputs(inputs):
+    """
+    Memuat SKU decoder dan data penjualan, inbound serta stok untuk satu set input.
+    """
+    missing = [file_type for file_type in INPUT_PATTERNS if file_type not in inputs]
+    if missing:
+        raise FileNotFoundError(f"File {', '.join(missing)} tidak ditemukan")
+    sku_decoder = data_loader.build_sku_decoder(pd.read_excel(inputs["sku_master"]))
+    if not sku_decoder:
+        raise ValueError("Data Master SKU kosong")
+    frames = {file_type: load_frame(inputs[file_type], file_type, sku_decoder)
+              for file_type in ("sales", "inbound", "stock")}
+    return sku_decoder, frames
+
+
+def _sales_views(queries):
+    items = []
+    for view in analytics.SALES_VIEWS:
+        for _, dimension, measure, title, table in queries.sales_view(view):
+            label = 'Total Penjualan (Rp)' if measure == 'Sub Total' else 'Gross Profit (Rp)'
+            items.append((f"penjualan_{slugify(dimension)}_{slugify(measure)}", table,
+                          charts.bar(table, x=dimension, y=measure, title=title, labels={measure: label},
+                                     color=dimension)))
+    return items
+
+
+def _sales_by_channel(queries):
+    table = queries.sales_by_channel()
+    return [("penjualan_channel", table,
+             charts.pie(table, names='Channel', values='Sub Total', title='Proporsi Penjualan per Channel'))]
+
+
+def _top_products(queries):
+    table = queries.top_products()
+    return [("top_produk", table,
+             charts.bar(table, x='Nama Barang', y='QTY', title='Top 10 Produk Terlaris (QTY)',
+                        labels={'QTY': 'Jumlah Terjual (Unit)'}, color='QTY'))]
+
+
+def _monthly_sales(queries):
+    table = queries.monthly_sales()
+    return [("tren_bulanan", table,
+             charts.line(table, x='Bulan', y='Nett Sales', title='Tren Penjualan Bersih Bulanan',
+                         labels={'Nett Sales': 'Nett Sales (Rp)'}, markers=True))]
+
+
+def _stock_vs_inbound(queries):
+    table = queries.stock_vs_inbound()
+    return [("stok_vs_inbound", table,
+             charts.bar(table.sort_values(by='Total Tersedia', ascending=False).head(20),
+                        x='Nama Item', y=['Total Tersedia', 'Total Qty Diterima'],
+                        title='Stok Tersedia vs. Qty Diterima per SKU (Top 20)',
+                        labels={'value': 'Jumlah', 'variable': 'Tipe'}, barmode='group'))]
+
+
+def _stock_by_location(queries):
+    table = queries.stock_by_location()
+    return [("stok_per_lokasi", table,
+             charts.pie(table, names='Lokasi', values='QTY', title='Distribusi Stok Berdasarkan Lokasi'))]
+
+
+def _recommendations(queries):
+    low_stock_high_sales, high_stock_low_sales = queries.recommendations()
+    return [("stok_rendah_penjualan_tinggi", low_stock_high_sales, None), ("stok_berlebih", high_stock_low_sales, None)]
+
+
+# Bagian laporan berurutan: (label, fungsi(queries) -> list (nama, tabel, grafik atau None)). queries adalah
+# objek kueri dashboard (analytics.FrameQueries atau sql_backend.SqlQueries), sehingga laporan batch dan
+# ekspor dari dashboard (export_jobs) menghasilkan tabel dan grafik yang sama untuk backend mana pun.
+REPORT_SECTIONS = [
+    ("KPI", lambda queries: [("kpi", pd.DataFrame([queries.kpi_summary()]), None)]),
+    ("Analisis penjualan", _sales_views),
+    ("Penjualan per channel", _sales_by_channel),
+    ("Top produk", _top_products),
+    ("Tren bulanan", _monthly_sales),
+    ("Stok vs inbound", _stock_vs_inbound),
+    ("Stok per lokasi", _stock_by_location),
+    ("Rekomendasi", _recommendations)
+]
+
+
+def analyze(df_sales, df_inbound, df_stock):
+    """
+    Menjalankan seluruh analisis dashboard (tanpa filter) dan mengembalikan (tabel, grafik),
+    masing-masing berupa dict {nama: DataFrame/figure}.
+    """
+    cube = sales_cube.build_sales_cube(df_sales)
+    dimension = sku_dimension.SkuDimension.build(df_sales, df_stock, df_inbound)
+    queries = analytics.FrameQueries(cube["sales"], cube["products"], df_sales, df_stock, df_inbound, dimension)
+    tables, figures = {}, {}
+    for _, section in REPORT_SECTIONS:
+        for name, table, fig in section(queries):
+            tables[name] = table
+            if fig is not None:
+                figures[name] = fig
+    return tables, figures
+
+
+def write_outputs(tables, figures, out_dir, formats=None):
+    """
+    Menulis tabel (Parquet dan/atau CSV) dan grafik (HTML statis) ke out_dir. HTML merujuk
+    PLOTLY_JS_FILE di direktori yang sama (disalin sekali), sehingga laporan bisa dibuka tanpa internet.
+    Mengembalikan daftar path yang ditulis.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    written = []
+    for name, table in tables.items():
+        if "parquet" in (formats or OUTPUT_FORMATS):
+            path = os.path.join(out_dir, f"{name}.parquet")
+            data_cache.prepare_for_parquet(table).to_parquet(path, index=False)
+            written.append(path)
+        if "csv" in (formats or OUTPUT_FORMATS):
+            path = os.path.join(out_dir, f"{name}.csv")
+            table.to_csv(path, index=False)
+            written.append(path)
+    for name, fig in figures.items():
+        path = os.path.join(out_dir, f"{name}.html")
+        fig.write_html(path, include_plotlyjs='directory')
+        written.append(path)
+    if figures:
+        written.append(os.path.join(out_dir, PLOTLY_JS_FILE))
+    return written
+
+
+def run_job(job, out_dir, formats=None):
+    """
+    Menjalankan satu job (muat, analisis, tulis). Kesalahan dicatat di hasil, tidak dilempar,
+    sehingga satu set input yang rusak tidak menghentikan batch.
+    """
+    result = {"name": job["name"], "rows": 0, "files": 0, "load_s": 0.0, "analyze_s": 0.0, "write_s": 0.0,
+              "seconds": 0.0, "error": None}
+    started = time.perf_counter()
+    try:
+        _, frames = load_inputs(job["inputs"])
+        result["rows"] = sum(len(df) for df in frames.values())
+        result["load_s"] = time.perf_counter() - started
+
+        step = time.perf_counter()
+        tables, figures = analyze(frames["sales"], frames["inbound"], frames["stock"])
+        result["analyze_s"] = time.perf_counter() - step
+
+        step = time.perf_counter()
+        result["files"] = len(write_outputs(tables, figures, os.path.join(out_dir, job["name"]), formats))
+        result["write_s"] = time.perf_counter() - step
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+
+def run_batch(jobs, out_dir, workers=None, formats=None, progress=None):
+    """
+    Menjalankan job-job secara paralel di process pool (workers=1 menjalankannya berurutan di proses ini).
+    `progress(result, selesai, total)` dipanggil setiap kali satu job selesai.
+
+    Mengembalikan (DataFrame waktu per job, ringkasan throughput). Waktu per job juga ditulis
+    ke SUMMARY_FILE di out_dir.
+    """
+    started = time.perf_counter()
+    results = []
+    if workers == 1 or len(jobs) <= 1:
+        for job in jobs:
+            results.append(run_job(job, out_dir, formats))
+            if progress:
+                progress(results[-1], len(results), len(jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(run_job, job, out_dir, formats) for job in jobs]
+            for future in as_completed(futures):
+                results.append(future.result())
+                if progress:
+                    progress(results[-1], len(results), len(jobs))
+
+    elapsed = time.perf_counter() - started
+    timings = pd.DataFrame(results, columns=["name", "rows", "files", "load_s", "analyze_s", "write_s", "seconds",
+                                             "error"])
+    os.makedirs(out_dir, exist_ok=True)
+    timings.to_csv(os.path.join(out_dir, SUMMARY_FILE), index=False)
+    succeeded = timings[timings["error"].isna()]
+    summary = {
+        "jobs": len(jobs),
+        "failed": len(jobs) - len(succeeded),
+        "rows": int(succeeded["rows"].sum()),
+        "seconds": elapsed,
+        "jobs_per_min": len(jobs) / elapsed * 60 if elapsed else 0.0,
+        "rows_per_sec": succeeded["rows"].sum() / elapsed if elapsed else 0.0
+    }
+    return timings, summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Buat laporan dashboard untuk banyak set data tanpa browser.")
+    parser.add_argument("inputs", nargs="+", help="Direktori input, masing-masing berisi file penjualan, inbound "
+                                                  "dan stok")
+    parser.add_argument("--sku-master", help="File Data Master SKU untuk direktori yang tidak memiliki file master")
+    parser.add_argument("--out", default="laporan", help="Direktori output")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Jumlah proses paralel")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, action="append",
+                        help="Format tabel (bisa diulang; default Parquet dan CSV)")
+    args = parser.parse_args(argv)
+
+    def report(result, done, total):
+        status = f"GAGAL ({result['error']})" if result["error"] else \
+            f"{result['rows']:,} baris, {result['files']} file"
+        print(f"[{done}/{total}] {result['name']}: {status} dalam {result['seconds']:,.1f} detik "
+              f"(muat {result['load_s']:,.1f}, analisis {result['analyze_s']:,.1f}, tulis {result['write_s']:,.1f})")
+
+    jobs = discover_jobs(args.inputs, args.sku_master)
+    _, summary = run_batch(jobs, args.out, args.workers, args.format, progress=report)
+    print(f"{summary['jobs']} job ({summary['failed']} gagal) dalam {summary['seconds']:,.1f} detik: "
+          f"{summary['jobs_per_min']:,.1f} job/menit, {summary['rows_per_sec']:,.0f} baris/detik")
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,45 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import pandas as pd
+
+import batch_report
+import charts
+
+
+class BatchReportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+
+    def test_job_names_are_unique(self):
+        directories = [os.path.join(self.directory, *parts) for parts in [("toko_a", "2024"), ("toko_b", "2024"),
+                                                                          ("toko_c", "2025")]]
+        for directory in directories:
+            os.makedirs(directory)
+        # Direktori yang sama disebut dua kali hanya menjadi satu job
+        jobs = batch_report.discover_jobs(directories + [directories[0] + os.sep])
+        names = [job["name"] for job in jobs]
+        self.assertEqual(len(names), 3)
+        self.assertEqual(len(set(names)), 3)
+        self.assertTrue(names[0].startswith("2024-") and names[1].startswith("2024-"))
+        self.assertEqual(names[2], "2025")
+        # Nama stabil antar run agar laporan malam hari menimpa direktori yang sama
+        self.assertEqual([job["name"] for job in batch_report.discover_jobs(directories)], names)
+
+    def test_html_works_offline(self):
+        fig = charts.bar(pd.DataFrame({'Channel': ['Offline', 'Shopee'], 'QTY': [3, 5]}), x='Channel', y='QTY')
+        written = batch_report.write_outputs({}, {"a": fig, "b": fig}, self.directory)
+        self.assertEqual(sorted(os.listdir(self.directory)), ["a.html", "b.html", batch_report.PLOTLY_JS_FILE])
+        self.assertIn(os.path.join(self.directory, batch_report.PLOTLY_JS_FILE), written)
+        with open(os.path.join(self.directory, "a.html"), encoding="utf-8") as f:
+            page = f.read()
+        self.assertIn(f'src="{batch_report.PLOTLY_JS_FILE}"', page)
+        self.assertNotIn("cdn.plot.ly", page)
+
+
+if __name__ == "__main__":
+    unittest.main()
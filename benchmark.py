@@ -0,0 +1,324 @@
+"""
+Benchmark pipeline dashboard pada data sintetis di beberapa skala.
+
+Setiap tahap (baca Excel, pembersihan, parsing SKU, optimasi tipe data, indeks filter, seleksi
+filter, kubus penjualan, setiap agregasi dan merge rekomendasi) dijalankan dengan fungsi yang sama
+seperti dashboard, diukur waktunya (median dari beberapa ulangan) dan puncak alokasi memorinya
+(tracemalloc, pada satu lintasan terpisah agar tidak memengaruhi waktu).
+
+Hasil setiap run disimpan sebagai JSON di BENCHMARK_DIR/runs. Run bisa disimpan sebagai baseline;
+run berikutnya dibandingkan dengan baseline dan tahap yang melambat melebihi toleransi ditandai
+sebagai regresi (exit code 1, sehingga bisa dipakai di CI).
+
+Penggunaan dari command line:
+    python benchmark.py --scales 10k,100k --save-baseline
+    python benchmark.py --scales 10k,100k            # bandingkan dengan baseline
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import analytics
+import batch_report
+import data_loader
+import filter_engine
+import sales_cube
+import sketches
+import sku_dimension
+import synthetic_data
+from sku_parser import parse_sku_batch
+
+BENCHMARK_DIR = os.environ.get("BENCHMARK_DIR", ".benchmarks")
+BASELINE_FILE = "baseline.json"
+DEFAULT_SCALES = "10k,100k"
+# Tahap baca Excel hanya dijalankan sampai skala ini; menulis workbook besar dengan openpyxl sangat lambat
+DEFAULT_EXCEL_MAX_ROWS = 100_000
+# Tahap dianggap regresi jika lebih lambat dari baseline lebih dari toleransi relatif ini,
+# dan selisihnya lebih dari MIN_REGRESSION_SECONDS (tahap yang sangat cepat terlalu berisik)
+DEFAULT_TOLERANCE = 0.25
+MIN_REGRESSION_SECONDS = 0.005
+MIN_REGRESSION_MB = 1.0
+
+DATA_TYPES = ["sales", "inbound", "stock"]
+
+
+def parse_scale(text):
+    """
+    '10k' -> 10000, '1m' atau '1M' -> 1000000, '250000' -> 250000.
+    """
+    text = text.strip().lower().replace("_", "")
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip("km")) * multiplier)
+
+
+def _filters_for(df_sales):
+    """
+    Seleksi filter yang khas: satu bulan terakhir, dua kategori teratas dan satu channel.
+    """
+    end = df_sales['Tanggal'].max()
+    filters = {}
+    for column, top in (('Category', 2), ('Channel', 1)):
+        if column in df_sales.columns:
+            filters[column] = df_sales[column].value_counts().index[:top].tolist()
+    return end - pd.Timedelta(days=30), end, filters
+
+
+def dashboard_stages():
+    """
+    Tahap-tahap pipeline sebagai list (nama, fungsi). Setiap fungsi menerima dict state
+    (berisi hasil tahap sebelumnya di bawah nama tahapnya) dan mengembalikan hasil tahap itu.
+    """
+    stages = [("sku_decoder", lambda s: data_loader.build_sku_decoder(s["raw_sku_master"].copy()))]
+    for file_type in DATA_TYPES:
+        stages += [
+            (f"clean_{file_type}",
+             lambda s, t=file_type: data_loader.clean_data(s[f"raw_{t}"].copy(deep=False), t)),
+            (f"parse_sku_{file_type}",
+             lambda s, t=file_type: pd.concat([s[f"clean_{t}"], parse_sku_batch(s[f"clean_{t}"]['SKU'],
+                                                                                 s["sku_decoder"])], axis=1)),
+            (f"optimize_{file_type}",
+             lambda s, t=file_type: data_loader.optimize_dtypes(
+                 data_loader.sort_by_date(s[f"parse_sku_{t}"], t), t)[0])
+        ]
+    stages += [
+        ("filter_index", lambda s: filter_engine.FilterIndex(s["optimize_sales"], date_column='Tanggal')),
+        ("filter_select", lambda s: s["filter_index"].select(*_filters_for(s["optimize_sales"]))[0]),
+        ("cube_build", lambda s: sales_cube.build_sales_cube(s["optimize_sales"])),
+        ("sku_dimension", lambda s: sku_dimension.SkuDimension.build(s["optimize_sales"], s["optimize_stock"],
+                                                                     s["optimize_inbound"])),
+        ("agg_kpi", lambda s: analytics.kpi_summary(s["cube_build"]["sales"], s["optimize_stock"]))
+    ]
+    for view in analytics.SALES_VIEWS:
+        stages.append((f"agg_view_{batch_report.slugify(view)}",
+                       lambda s, v=view: analytics.sales_view(s["cube_build"]["sales"], v)))
+    stages += [
+        ("agg_channel", lambda s: analytics.sales_by_channel(s["cube_build"]["sales"])),
+        ("agg_top_products", lambda s: analytics.top_products(s["cube_build"]["products"])),
+        ("agg_monthly", lambda s: analytics.monthly_sales(s["cube_build"]["sales"])),
+        ("agg_stock_vs_inbound", lambda s: analytics.stock_vs_inbound(s["optimize_stock"], s["optimize_inbound"],
+                                                                      s["sku_dimension"])),
+        ("agg_stock_by_location", lambda s: analytics.stock_by_location(s["optimize_stock"])),
+        ("recommendations", lambda s: analytics.recommendations(s["optimize_sales"], s["optimize_stock"],
+                                                                s["sku_dimension"])),
+        # Top-N dan jumlah unik untuk rentang tanggal filter: eksak dari baris vs gabungan sketsa harian
+        ("agg_top_salesman", lambda s: analytics.top_values(_window_rows(s["optimize_sales"]), 'Salesman')),
+        ("agg_distinct", lambda s: analytics.distinct_counts(_window_rows(s["optimize_sales"]))),
+        ("sketch_build", lambda s: sketches.DailySketches.build(s["optimize_sales"])),
+        ("sketch_top_salesman", lambda s: _sketch_window(s).top('Salesman')),
+        ("sketch_distinct", lambda s: _sketch_window(s).distinct())
+    ]
+    return stages
+
+
+def _window_rows(df_sales):
+    start, end, _ = _filters_for(df_sales)
+    return df_sales[df_sales['Tanggal'].between(start, end)]
+
+
+def _sketch_window(state):
+    start, end, _ = _filters_for(state["optimize_sales"])
+    return state["sketch_build"].window(start, end)
+
+
+def dataset_paths(rows, seed, frames=None):
+    """
+    Workbook sintetis untuk tahap baca, ditulis sekali ke BENCHMARK_DIR/data dan dipakai ulang antar run.
+    """
+    directory = os.path.join(BENCHMARK_DIR, "data", f"{rows}-{seed}")
+    paths = {file_type: os.path.join(directory, f"{file_type}.xlsx") for file_type in ["sku_master"] + DATA_TYPES}
+    if not all(os.path.exists(path) for path in paths.values()):
+        synthetic_data.write_dataset(frames or synthetic_data.generate(rows, seed), directory)
+    return paths
+
+
+def _measure(func, state, repeat):
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(state)
+        durations.append(time.perf_counter() - started)
+    return result, durations
+
+
+def _peak_mb(func, state):
+    tracemalloc.reset_peak()
+    current = tracemalloc.get_traced_memory()[0]
+    func(state)
+    return (tracemalloc.get_traced_memory()[1] - current) / 1024 / 1024
+
+
+def run_scale(rows, seed=0, repeat=3, excel_max_rows=DEFAULT_EXCEL_MAX_ROWS, memory=True, only=None,
+              progress=None):
+    """
+    Menjalankan semua tahap pada satu skala. `only` (list awalan nama tahap) membatasi tahap yang
+    dilaporkan; tahap yang dibutuhkan tahap lain tetap dijalankan sekali tanpa diukur.
+    `progress(nama tahap, hasil)` dipanggil setelah setiap tahap terukur.
+
+    Mengembalikan list hasil per tahap: scale, stage, rows, median_s, min_s, runs dan peak_mb.
+    """
+    def measured(name):
+        return only is None or any(name.startswith(prefix) for prefix in only)
+
+    frames = synthetic_data.generate(rows, seed)
+    state = {f"raw_{file_type}": df for file_type, df in frames.items()}
+    stages = []
+    # Tahap berikutnya memakai frame hasil generator, jadi tahap baca hanya dijalankan jika diukur
+    if rows <= excel_max_rows and any(measured(f"read_{file_type}") for file_type in frames):
+        paths = dataset_paths(rows, seed, frames)
+        stages += [(f"read_{file_type}", lambda s, path=path: pd.read_excel(path)) for file_type, path in paths.items()
+                   if measured(f"read_{file_type}")]
+    stages += dashboard_stages()
+
+    results = []
+    for name, func in stages:
+        if not measured(name):
+            state[name] = func(state)
+            continue
+        state[name], durations = _measure(func, state, repeat)
+        peak = None
+        if memory:
+            tracemalloc.start()
+            try:
+                peak = _peak_mb(func, state)
+            finally:
+                tracemalloc.stop()
+        results.append({
+            "scale": rows,
+            "stage": name,
+            "rows": len(state[name]) if isinstance(state[name], pd.DataFrame) else None,
+            "median_s": statistics.median(durations),
+            "min_s": min(durations),
+            "runs": len(durations),
+            "peak_mb": peak
+        })
+        if progress:
+            progress(name, results[-1])
+    return results
+
+
+def environment():
+    """
+    Informasi lingkungan yang disimpan bersama hasil, agar perbandingan beda mesin bisa dikenali.
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "cpu_count": os.cpu_count(),
+        "commit": commit
+    }
+
+
+def save_run(results, seed, repeat, path=None):
+    """
+    Menyimpan hasil run sebagai JSON (default BENCHMARK_DIR/runs/<waktu>.json) dan mengembalikan path-nya.
+    """
+    created = time.strftime("%Y%m%d-%H%M%S")
+    path = path or os.path.join(BENCHMARK_DIR, "runs", f"{created}.json")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"created": created, "seed": seed, "repeat": repeat, "environment": environment(),
+                   "results": results}, f, indent=1)
+    return path
+
+
+def load_run(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE, statistic="min_s"):
+    """
+    Membandingkan hasil dengan baseline per (skala, tahap). Status:
+    "regresi" (lebih lambat atau memori lebih besar melebihi toleransi), "lebih cepat", "ok",
+    atau "baru" (tidak ada di baseline). Waktu dibandingkan dengan waktu tercepat dari ulangan
+    (statistic="min_s"), yang lebih tahan terhadap gangguan proses lain daripada median.
+    """
+    reference = {(row["scale"], row["stage"]): row for row in baseline["results"]}
+    rows = []
+    for row in results:
+        base = reference.get((row["scale"], row["stage"]))
+        entry = {"scale": row["scale"], "stage": row["stage"], "seconds": row[statistic], "peak_mb": row["peak_mb"],
+                 "baseline_s": None, "ratio": None, "baseline_mb": None, "status": "baru"}
+        if base is not None:
+            entry.update(baseline_s=base[statistic], baseline_mb=base["peak_mb"],
+                         ratio=row[statistic] / base[statistic] if base[statistic] else None)
+            slower = row[statistic] - base[statistic]
+            more_memory = (row["peak_mb"] or 0) - (base["peak_mb"] or 0)
+            if (slower > MIN_REGRESSION_SECONDS and slower > base[statistic] * tolerance) or \
+                    (base["peak_mb"] is not None and row["peak_mb"] is not None and
+                     more_memory > MIN_REGRESSION_MB and more_memory > base["peak_mb"] * tolerance):
+                entry["status"] = "regresi"
+            elif -slower > MIN_REGRESSION_SECONDS and -slower > base[statistic] * tolerance:
+                entry["status"] = "lebih cepat"
+            else:
+                entry["status"] = "ok"
+        rows.append(entry)
+    return pd.DataFrame(rows, columns=["scale", "stage", "seconds", "baseline_s", "ratio", "peak_mb", "baseline_mb",
+                                       "status"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark waktu dan memori pipeline dashboard pada data sintetis.")
+    parser.add_argument("--scales", default=DEFAULT_SCALES, help="Daftar jumlah baris penjualan, misalnya 10k,1m,10m")
+    parser.add_argument("--repeat", type=int, default=3, help="Ulangan per tahap (median yang dilaporkan)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stages", help="Awalan nama tahap yang diukur, dipisah koma (misalnya clean,agg)")
+    parser.add_argument("--excel-max-rows", type=int, default=DEFAULT_EXCEL_MAX_ROWS,
+                        help="Skala terbesar yang ikut mengukur pembacaan Excel")
+    parser.add_argument("--no-memory", action="store_true", help="Lewati pengukuran memori dengan tracemalloc")
+    parser.add_argument("--baseline", default=os.path.join(BENCHMARK_DIR, BASELINE_FILE))
+    parser.add_argument("--save-baseline", action="store_true", help="Simpan run ini sebagai baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Perlambatan relatif yang dianggap regresi (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    only = [prefix.strip() for prefix in args.stages.split(",")] if args.stages else None
+    results = []
+    for rows in [parse_scale(scale) for scale in args.scales.split(",")]:
+        print(f"== {rows:,} baris penjualan")
+        results += run_scale(rows, args.seed, args.repeat, args.excel_max_rows, not args.no_memory, only,
+                             progress=lambda name, r: print(
+                                 f"  {name:<36} {r['median_s'] * 1000:>10,.1f} ms" +
+                                 (f" {r['peak_mb']:>9,.1f} MB" if r["peak_mb"] is not None else "")))
+        print(f"  puncak RSS proses {data_loader.peak_rss_mb() or 0:,.0f} MB")
+    print(f"Hasil disimpan di {save_run(results, args.seed, args.repeat)}")
+
+    if args.save_baseline:
+        save_run(results, args.seed, args.repeat, args.baseline)
+        print(f"Baseline disimpan di {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print("Belum ada baseline; jalankan dengan --save-baseline untuk membuatnya.")
+        return 0
+
+    baseline = load_run(args.baseline)
+    if baseline["environment"].get("cpu_count") != os.cpu_count() or \
+            baseline["environment"].get("python") != platform.python_version():
+        print("Peringatan: baseline dibuat di lingkungan berbeda, perbandingan waktu kurang bermakna.")
+    comparison = compare(results, baseline, args.tolerance)
+    regressions = comparison[comparison["status"] == "regresi"]
+    with pd.option_context("display.max_rows", None, "display.width", 160):
+        print(comparison.to_string(index=False, float_format=lambda value: f"{value:,.4f}"))
+    print(f"{len(regressions)} regresi terhadap baseline {baseline['created']} (commit "
+          f"{baseline['environment'].get('commit') or '?'})")
+    return 1 if len(regressions) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,86 @@
+"""
+Lapisan pembuat grafik plotly dengan batas ukuran payload.
+
+- Grafik dengan satu trace per nilai kategori (color=<kolom kategori>) dibatasi ke top-N nilai,
+  sisanya digabung menjadi satu kelompok "Lainnya".
+- Grafik garis dengan titik lebih banyak dari ambang batas dirender dengan WebGL.
+Batas dapat diatur lewat variabel lingkungan CHART_MAX_TRACES dan CHART_WEBGL_THRESHOLD.
+
+plotly.express baru diimpor saat grafik pertama dibuat (lihat express()), agar start server dan
+alat CLI yang tidak membuat grafik tidak membayar biaya impornya.
+"""
+import os
+
+import pandas as pd
+
+import profiler
+
+MAX_TRACES = int(os.environ.get("CHART_MAX_TRACES", "20"))
+WEBGL_POINT_THRESHOLD = int(os.environ.get("CHART_WEBGL_THRESHOLD", "5000"))
+OTHER_LABEL = "Lainnya"
+TEMPLATE = 'plotly_white'
+
+
+def cap_categories(df, column, value, max_items=None):
+    """
+    Menyisakan max_items - 1 nilai teratas dari `column` (berdasarkan jumlah `value`) dan
+    menggabungkan sisanya menjadi satu baris "Lainnya".
+    """
+    max_items = MAX_TRACES if max_items is None else max_items
+    if df[column].nunique(dropna=False) <= max_items:
+        return df
+    ranked = df.groupby(column, observed=True, dropna=False)[value].sum().sort_values(ascending=False)
+    keep = ranked.index[:max_items - 1]
+    head = df[df[column].isin(keep)].copy()
+    head[column] = head[column].astype(object)
+    other = pd.DataFrame({column: [OTHER_LABEL], value: [ranked.iloc[max_items - 1:].sum()]})
+    return pd.concat([head, other], ignore_index=True)
+
+
+def express():
+    """
+    Modul plotly.express, diimpor saat pertama dibutuhkan (impor berikutnya hanya lookup sys.modules).
+    """
+    import plotly.express as px
+
+    return px
+
+
+def _is_discrete(series):
+    return not pd.api.types.is_numeric_dtype(series) or isinstance(series.dtype, pd.CategoricalDtype)
+
+
+def bar(df, x, y, color=None, **kwargs):
+    """
+    px.bar dengan jumlah trace dibatasi jika `color` berupa kolom diskrit.
+    """
+    with profiler.stage(f"grafik: {kwargs.get('title', 'bar')}", "grafik", rows_in=len(df)):
+        if color is not None and isinstance(y, str) and _is_discrete(df[color]):
+            df = cap_categories(df, color, y)
+        return express().bar(df, x=x, y=y, color=color, template=TEMPLATE, **kwargs)
+
+
+def pie(df, names, values, **kwargs):
+    """
+    px.pie dengan jumlah irisan dibatasi ke top-N ditambah "Lainnya".
+    """
+    with profiler.stage(f"grafik: {kwargs.get('title', 'pie')}", "grafik", rows_in=len(df)):
+        return express().pie(cap_categories(df, names, values), names=names, values=values, template=TEMPLATE, **kwargs)
+
+
+def line(df, x, y, **kwargs):
+    """
+    px.line yang beralih ke render WebGL jika jumlah titik melebihi ambang batas.
+    """
+    with profiler.stage(f"grafik: {kwargs.get('title', 'line')}", "grafik", rows_in=len(df)):
+        if len(df) > WEBGL_POINT_THRESHOLD:
+            kwargs.setdefault('render_mode', 'webgl')
+        return express().line(df, x=x, y=y, template=TEMPLATE, **kwargs)
+
+
+def payload_bytes(fig):
+    """
+    Ukuran JSON figure yang dikirim ke browser, dalam byte. Menserialisasi seluruh figure, jadi hanya
+    dipanggil untuk diagnosis (panel instrumentasi), bukan pada setiap render.
+    """
+    return len(fig.to_json())
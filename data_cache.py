@@ -0,0 +1,365 @@
+"""
+Cache kolumnar (Parquet) di disk untuk file Excel yang diunggah.
+
+Kunci cache dibentuk dari hash isi file, jenis file (beserta versi skemanya) dan
+informasi tambahan seperti hash SKU decoder. Karena disimpan di disk, cache tetap
+berlaku setelah server restart dan bisa dipakai bersama oleh beberapa worker.
+
+Penggunaan dari command line:
+    python data_cache.py stats
+    python data_cache.py clear [--type sales]
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+import uuid
+
+import pandas as pd
+
+CACHE_DIR = os.environ.get("DATA_CACHE_DIR",
+                           os.path.join(os.path.dirname(os.path.abspath(__file__)), ".data_cache"))
+CACHE_MAX_BYTES = int(float(os.environ.get("DATA_CACHE_MAX_MB", "2048")) * 1024 * 1024)
+
+# Naikkan versi jika logika pembersihan/parsing untuk jenis file tersebut berubah,
+# sehingga entri cache lama otomatis tidak terpakai lagi
+SCHEMA_VERSIONS = {
+    "sku_master": 1,
+    "sales": 5,
+    "inbound": 4,
+    "stock": 4
+}
+
+# Naikkan jika tata letak frame yang disimpan di cache (tipe hasil data_loader.optimize_dtypes) berubah,
+# misalnya kolom rupiah fixed-point dalam sen; berbeda dengan SCHEMA_VERSIONS, dataset tersimpan
+# incremental_store (yang menyimpan frame sebelum optimasi tipe) tidak ikut dibangun ulang
+CACHE_LAYOUT_VERSION = 2
+
+# Baris per row group Parquet. Row group yang kecil membuat filter rentang tanggal/kategori pada
+# data terurut bisa melewati sebagian besar file (predicate pushdown di sql_backend).
+PARQUET_ROW_GROUP_ROWS = 131_072
+
+# Catatan dataset lengkap terakhir yang dimuat dashboard (dibaca warm_start saat server start)
+LAST_DATASET_FILE = "last_dataset.json"
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+def file_content_hash(source):
+    """
+    Menghitung SHA-256 dari isi file. `source` bisa berupa path atau objek file
+    (misalnya UploadedFile dari Streamlit); posisi baca objek file dikembalikan ke awal.
+    """
+    digest = hashlib.sha256()
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    if hasattr(source, "getvalue"):
+        digest.update(source.getvalue())
+        return digest.hexdigest()
+
+    position = source.tell()
+    source.seek(0)
+    for chunk in iter(lambda: source.read(_CHUNK_SIZE), b""):
+        digest.update(chunk)
+    source.seek(position)
+    return digest.hexdigest()
+
+
+def decoder_hash(sku_decoder):
+    """
+    Hash stabil dari SKU decoder, dipakai agar hasil parsing SKU ikut ter-invalidasi
+    ketika Data Master SKU berubah.
+    """
+    payload = json.dumps(sku_decoder or {}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def cache_key(content_hash, file_type, extra=""):
+    """
+    Membentuk kunci cache: <file_type>-v<versi skema>-<hash>.
+    """
+    version = SCHEMA_VERSIONS.get(file_type, 0)
+    digest = hashlib.sha256(f"{content_hash}:{extra}:{CACHE_LAYOUT_VERSION}".encode("utf-8")).hexdigest()[:32]
+    return f"{file_type}-v{version}-{digest}"
+
+
+def _cache_path(key):
+    return os.path.join(CACHE_DIR, f"{key}.parquet")
+
+
+def _metadata_path(key):
+    return os.path.join(CACHE_DIR, f"{key}.json")
+
+
+def prepare_for_parquet(df):
+    """
+    Kolom object dengan tipe campuran (misalnya angka dan teks dalam satu kolom Excel)
+    tidak bisa ditulis ke Parquet, sehingga nilai non-null-nya diubah menjadi string.
+    """
+    df = df.copy(deep=False)
+    for col in df.columns:
+        if df[col].dtype == object:
+            inferred = pd.api.types.infer_dtype(df[col], skipna=True)
+            if inferred in ("mixed", "mixed-integer"):
+                df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+
+def load_cached_frame(key):
+    """
+    Membaca DataFrame dari cache. Mengembalikan None jika tidak ada atau rusak.
+    Waktu akses file diperbarui agar urutan LRU tetap akurat.
+    """
+    path = _cache_path(key)
+    if not os.path.exists(path):
+        return None
+    try:
+        df = pd.read_parquet(path)
+    except Exception:
+        # Entri rusak (misalnya tulisan yang terputus) dibuang saja
+        _remove_entry(path)
+        return None
+    now = time.time()
+    try:
+        os.utime(path, (now, now))
+    except OSError:
+        pass
+    return df
+
+
+def store_cached_frame(key, df, max_bytes=None):
+    """
+    Menyimpan DataFrame ke cache secara atomik (tulis ke file sementara lalu rename),
+    kemudian menjalankan eviksi LRU agar ukuran cache tetap di bawah batas.
+    """
+    tmp_path = temp_path(key)
+    try:
+        prepare_for_parquet(df).to_parquet(tmp_path, index=False, row_group_size=PARQUET_ROW_GROUP_ROWS)
+    except Exception:
+        _remove(tmp_path)
+        raise
+    return store_cached_file(key, tmp_path, max_bytes)
+
+
+def cached_path(key):
+    """
+    Path file Parquet sebuah entri cache (untuk dibaca langsung, misalnya oleh sql_backend),
+    atau None jika tidak ada. Waktu akses diperbarui seperti load_cached_frame.
+    """
+    path = _cache_path(key)
+    if not os.path.exists(path):
+        return None
+    now = time.time()
+    try:
+        os.utime(path, (now, now))
+    except OSError:
+        pass
+    return path
+
+
+def writer_temp_path(path):
+    """
+    Path sementara unik per penulis untuk file yang akan dipindahkan ke `path` dengan os.replace.
+    Sesi Streamlit adalah thread dalam satu proses, sehingga pid saja tidak cukup: dua sesi yang menulis
+    kunci yang sama akan berbagi satu file sementara.
+    """
+    return f"{path}.{os.getpid()}-{uuid.uuid4().hex}.tmp"
+
+
+def temp_path(key):
+    """
+    Path sementara di dalam direktori cache untuk menulis Parquet secara bertahap
+    (misalnya ingest streaming) sebelum dipindahkan dengan store_cached_file.
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    return writer_temp_path(_cache_path(key))
+
+
+def discard_temp(path):
+    """
+    Menghapus file sementara yang gagal diselesaikan.
+    """
+    _remove(path)
+
+
+def store_cached_file(key, parquet_path, max_bytes=None):
+    """
+    Memindahkan file Parquet yang sudah selesai ditulis ke cache secara atomik.
+    """
+    path = _cache_path(key)
+    os.replace(parquet_path, path)
+    evict_to_budget(CACHE_MAX_BYTES if max_bytes is None else max_bytes)
+    return path
+
+
+def cached_frame(key, builder):
+    """
+    Mengambil DataFrame dari cache, atau membangunnya dengan `builder()` lalu menyimpannya.
+    DataFrame kosong tidak disimpan (biasanya tanda file gagal dimuat).
+    """
+    df = load_cached_frame(key)
+    if df is not None:
+        return df
+    df = builder()
+    if df is not None and not df.empty:
+        try:
+            store_cached_frame(key, df)
+        except Exception:
+            # Cache bersifat opsional; kegagalan menulis tidak boleh menggagalkan pemuatan data
+            pass
+    return df
+
+
+def store_metadata(key, metadata):
+    """
+    Menyimpan keterangan sebuah entri cache (dict yang bisa di-JSON-kan, misalnya laporan memori saat
+    frame pertama kali dibuat) di samping file Parquet-nya. Ditulis secara atomik; ikut terhapus
+    bersama entrinya. Hanya ditulis jika entrinya sudah ada (panggil setelah store_cached_frame /
+    store_cached_file), agar tidak ada keterangan tanpa entri; mengembalikan True jika ditulis.
+    """
+    if not os.path.exists(_cache_path(key)):
+        return False
+    path = _metadata_path(key)
+    tmp_path = writer_temp_path(path)
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(metadata, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    return True
+
+
+def load_metadata(key):
+    """
+    Keterangan entri cache yang disimpan store_metadata, atau {} jika tidak ada atau rusak.
+    """
+    try:
+        with open(_metadata_path(key), encoding="utf-8") as f:
+            metadata = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return metadata if isinstance(metadata, dict) else {}
+
+
+def record_last_dataset(files):
+    """
+    Mencatat dataset lengkap terakhir yang dimuat: {jenis file: {"key": kunci cache, "name": nama file}}.
+    Ditulis secara atomik agar pembaca tidak pernah melihat file setengah jadi.
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = os.path.join(CACHE_DIR, LAST_DATASET_FILE)
+    tmp_path = writer_temp_path(path)
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"recorded": time.time(), "files": files}, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def last_dataset():
+    """
+    Dataset terakhir yang dicatat record_last_dataset ({jenis file: {"key", "name"}}), atau None jika
+    belum ada, catatannya rusak, atau salah satu entri cache-nya sudah dievict atau berasal dari versi
+    skema lama.
+    """
+    try:
+        with open(os.path.join(CACHE_DIR, LAST_DATASET_FILE), encoding="utf-8") as f:
+            files = json.load(f)["files"]
+        keys = {file_type: str(entry["key"]) for file_type, entry in files.items()}
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+    for file_type, key in keys.items():
+        if not key.startswith(f"{file_type}-v{SCHEMA_VERSIONS.get(file_type, 0)}-") or \
+                not os.path.exists(_cache_path(key)):
+            return None
+    return files
+
+
+def _entries():
+    if not os.path.isdir(CACHE_DIR):
+        return []
+    entries = []
+    for name in os.listdir(CACHE_DIR):
+        if not name.endswith(".parquet"):
+            continue
+        path = os.path.join(CACHE_DIR, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append({"key": name[:-len(".parquet")], "path": path, "bytes": stat.st_size,
+                        "last_access": max(stat.st_atime, stat.st_mtime)})
+    return entries
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _remove_entry(path):
+    # File Parquet sebuah entri beserta keterangannya (store_metadata)
+    _remove(path)
+    _remove(f"{path[:-len('.parquet')]}.json")
+
+
+def evict_to_budget(max_bytes=CACHE_MAX_BYTES):
+    """
+    Menghapus entri yang paling lama tidak diakses sampai total ukuran cache <= max_bytes.
+    Mengembalikan daftar kunci yang dihapus.
+    """
+    entries = sorted(_entries(), key=lambda e: e["last_access"])
+    total = sum(e["bytes"] for e in entries)
+    evicted = []
+    for entry in entries:
+        if total <= max_bytes:
+            break
+        _remove_entry(entry["path"])
+        total -= entry["bytes"]
+        evicted.append(entry["key"])
+    return evicted
+
+
+def clear_cache(file_type=None):
+    """
+    Menghapus seluruh isi cache, atau hanya entri untuk satu jenis file.
+    Mengembalikan jumlah entri yang dihapus.
+    """
+    removed = 0
+    for entry in _entries():
+        if file_type is None or entry["key"].startswith(f"{file_type}-"):
+            _remove_entry(entry["path"])
+            removed += 1
+    return removed
+
+
+def cache_stats():
+    """
+    Ringkasan isi cache: jumlah entri dan total ukuran dalam byte.
+    """
+    entries = _entries()
+    return {"dir": CACHE_DIR, "entries": len(entries), "bytes": sum(e["bytes"] for e in entries),
+            "max_bytes": CACHE_MAX_BYTES}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kelola cache Parquet untuk data yang diunggah.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    clear_parser = subparsers.add_parser("clear", help="Hapus entri cache")
+    clear_parser.add_argument("--type", choices=sorted(SCHEMA_VERSIONS), help="Hanya hapus jenis file ini")
+    subparsers.add_parser("stats", help="Tampilkan ukuran cache")
+    args = parser.parse_args(argv)
+
+    if args.command == "clear":
+        print(f"{clear_cache(args.type)} entri cache dihapus dari {CACHE_DIR}")
+    else:
+        stats = cache_stats()
+        print(f"{stats['entries']} entri, {stats['bytes'] / 1024 / 1024:,.1f} MB "
+              f"(batas {stats['max_bytes'] / 1024 / 1024:,.0f} MB) di {stats['dir']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+import data_cache
+
+
+class ConcurrentWriteTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        patcher = mock.patch.object(data_cache, "CACHE_DIR", self.directory)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.directory, True)
+
+    def test_temp_paths_are_unique_per_writer(self):
+        self.assertNotEqual(data_cache.temp_path("sales-v1-x"), data_cache.temp_path("sales-v1-x"))
+
+    def test_threads_storing_same_key(self):
+        # Sesi Streamlit adalah thread dalam satu proses yang bisa menulis kunci yang sama bersamaan
+        df = pd.DataFrame({'SKU': [f"SKU-{i}" for i in range(20_000)], 'QTY': range(20_000)})
+        errors = []
+
+        def write():
+            try:
+                data_cache.store_cached_frame("sales-v1-x", df)
+                data_cache.store_metadata("sales-v1-x", {"rows": len(df)})
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=write) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        pd.testing.assert_frame_equal(data_cache.load_cached_frame("sales-v1-x"), df)
+        self.assertEqual(data_cache.load_metadata("sales-v1-x"), {"rows": len(df)})
+        self.assertEqual([name for name in os.listdir(self.directory) if name.endswith(".tmp")], [])
+
+    def test_metadata_requires_entry(self):
+        self.assertFalse(data_cache.store_metadata("sales-v1-x", {"rows": 1}))
+        self.assertEqual(data_cache.load_metadata("sales-v1-x"), {})
+        self.assertEqual(os.listdir(self.directory), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,458 @@
+"""
+Logika pembersihan data Excel yang bisa dipakai tanpa Streamlit, termasuk mode ingest
+streaming untuk file penjualan yang sangat besar.
+
+Mode streaming membaca workbook baris demi baris dengan openpyxl (read_only), memproses
+potongan (chunk) berukuran tetap melalui pembersihan yang sama seperti load_data, lalu
+menulis setiap potongan ke file Parquet. Pemakaian memori tetap datar berapa pun jumlah barisnya.
+
+Penggunaan dari command line:
+    python data_loader.py sales penjualan.xlsx penjualan.parquet --sku-master master.xlsx
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import profiler
+import schemas
+from sku_parser import parse_sku_batch
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+# Konstanta per jenis file diturunkan dari registri skema (lihat schemas.SCHEMAS)
+FILE_TYPES = ["sales", "inbound", "stock"]
+COLUMN_RENAMES = {file_type: schemas.column_aliases(file_type) for file_type in FILE_TYPES}
+
+# Kolom bertipe tetap setelah pembersihan (dipakai juga untuk skema Parquet mode streaming)
+NUMERIC_COLUMNS = {file_type: schemas.columns_with(file_type, parser="number") +
+                   schemas.columns_with(file_type, parser="rupiah") for file_type in FILE_TYPES}
+DATE_COLUMNS = {file_type: schemas.columns_with(file_type, parser="datetime") for file_type in FILE_TYPES}
+
+# Kolom rupiah disimpan sebagai int64 jika semua nilainya rupiah utuh (tanpa sen)
+CURRENCY_COLUMNS = {file_type: schemas.columns_with(file_type, role="currency") for file_type in FILE_TYPES}
+# Kolom rupiah dari teks "Rp 1.234,56" (HPP, Gross Profit penjualan) biasanya bersen, sehingga disimpan
+# sebagai fixed-point: int64 dalam sen (nilai x CURRENCY_SCALE). Kolom ini bertipe integer hanya dalam sen;
+# pemakai yang butuh nilai rupiah memakai to_rupiah
+FIXED_POINT_COLUMNS = {file_type: schemas.columns_with(file_type, parser="rupiah", role="currency")
+                       for file_type in FILE_TYPES}
+CURRENCY_SCALE = 100
+# Kolom kuantitas di-downcast ke tipe integer terkecil jika semua nilainya bilangan bulat
+QUANTITY_COLUMNS = {file_type: schemas.columns_with(file_type, role="quantity") for file_type in FILE_TYPES}
+# Kolom teks diubah menjadi 'category' jika jumlah nilai uniknya <= rasio ini dari jumlah baris
+CATEGORY_MAX_RATIO = 0.5
+
+
+normalize_columns = schemas.normalize_columns
+
+
+def build_sku_decoder(df_sku_master):
+    """
+    Membangun SKU decoder (CODE -> {"arti", "Jenis"}) dari DataFrame Data Master SKU.
+    """
+    df_sku_master.columns = normalize_columns(df_sku_master.columns)
+    df_sku_master = df_sku_master.rename(columns=schemas.column_aliases("sku_master"))
+
+    sku_decoder = {}
+    if not df_sku_master.empty:
+        required_cols = schemas.columns_with("sku_master", required=True)
+        if not all(col in df_sku_master.columns for col in required_cols):
+            raise ValueError(f"File SKU Master harus memiliki kolom: {', '.join(required_cols)}")
+
+        for index, row in df_sku_master.iterrows():
+            code = str(row.get('CODE', '')).strip().upper()
+            arti = str(row.get('ARTI', '')).strip()
+            jenis = str(row.get('JENIS', '')).strip().upper()
+            if code:
+                sku_decoder[code] = {"arti": arti, "Jenis": jenis}
+    return sku_decoder
+
+
+def clean_data(df, file_type, report=None):
+    """
+    Menerapkan skema jenis file (penamaan ulang kolom, parsing tanggal, angka dan rupiah; lihat
+    schemas.apply_schema). Dipakai oleh load_data maupun ingest streaming per potongan baris.
+    Sel yang gagal diparse tidak menggagalkan file; jumlahnya per kolom ditambahkan ke `report`
+    jika diberikan.
+    """
+    return schemas.apply_schema(df, file_type, report)
+
+
+def memory_usage_mb(df):
+    """
+    Pemakaian memori DataFrame (termasuk isi string) dalam MB.
+    """
+    return df.memory_usage(deep=True).sum() / 1024 / 1024
+
+
+def _is_whole_numbers(series):
+    return series.notna().all() and bool((series % 1 == 0).all())
+
+
+def _to_fixed_point(series):
+    """
+    Nilai rupiah sebagai int64 dalam sen, atau None jika ada nilai kosong atau pecahan di bawah sen.
+    """
+    if not series.notna().all():
+        return None
+    scaled = series.to_numpy(dtype='float64') * CURRENCY_SCALE
+    rounded = np.round(scaled)
+    # Toleransi untuk galat pembulatan float saat parsing (misalnya 1234567.89 * 100)
+    if not np.all(np.abs(scaled - rounded) <= 1e-6 * np.maximum(1.0, np.abs(scaled))):
+        return None
+    return pd.Series(rounded.astype('int64'), index=series.index, name=series.name)
+
+
+def is_fixed_point(series, file_type):
+    """
+    True jika kolom ini adalah kolom fixed-point (int64 dalam sen) hasil optimize_dtypes.
+    """
+    return series.name in FIXED_POINT_COLUMNS.get(file_type, []) and pd.api.types.is_integer_dtype(series)
+
+
+def to_rupiah(df, file_type):
+    """
+    df dengan kolom fixed-point dikembalikan ke nilai rupiah (float64), untuk ditampilkan atau diekspor.
+    Frame tanpa kolom fixed-point dikembalikan apa adanya.
+    """
+    columns = [col for col in df.columns if is_fixed_point(df[col], file_type)]
+    if not columns:
+        return df
+    df = df.copy(deep=False)
+    for col in columns:
+        df[col] = df[col] / CURRENCY_SCALE
+    return df
+
+
+def optimize_dtypes(df, file_type):
+    """
+    Memadatkan tipe data di akhir pemuatan:
+    - teks dengan kardinalitas rendah (atribut SKU, Channel, Salesman, Lokasi, dll.) -> category
+    - kuantitas -> integer terkecil, jika tidak ada nilai pecahan
+    - rupiah -> int64, jika semuanya rupiah utuh; jika ada sen, tetap float64 agar tidak ada nilai yang hilang
+    - rupiah fixed-point (FIXED_POINT_COLUMNS) -> int64 dalam sen, jika tidak ada pecahan di bawah sen
+    Groupby pada kolom category harus memakai observed=True.
+
+    Mengembalikan (df, laporan) dengan laporan berisi memori sebelum/sesudah, kolom yang diubah dan
+    skala kolom fixed-point ({kolom: CURRENCY_SCALE}).
+    """
+    before = memory_usage_mb(df)
+    df = df.copy(deep=False)
+    currency = set(CURRENCY_COLUMNS.get(file_type, []))
+    quantity = set(QUANTITY_COLUMNS.get(file_type, []))
+    fixed_point = set(FIXED_POINT_COLUMNS.get(file_type, []))
+    converted, scales = {}, {}
+
+    for col in df.columns:
+        series = df[col]
+        if col in fixed_point:
+            sen = _to_fixed_point(series) if pd.api.types.is_float_dtype(series) else None
+            if sen is not None:
+                df[col] = sen
+                scales[col] = CURRENCY_SCALE
+        elif col in quantity or col in currency:
+            if pd.api.types.is_float_dtype(series) and _is_whole_numbers(series):
+                if col in quantity:
+                    df[col] = pd.to_numeric(series, downcast='integer')
+                else:
+                    df[col] = series.astype('int64')
+        elif series.dtype == object or isinstance(series.dtype, pd.StringDtype):
+            if len(series) and pd.api.types.infer_dtype(series, skipna=True) == "string" and \
+                    series.nunique(dropna=True) <= len(series) * CATEGORY_MAX_RATIO:
+                df[col] = series.astype('category')
+        if df[col].dtype != series.dtype:
+            converted[col] = f"{df[col].dtype} (sen)" if col in scales else str(df[col].dtype)
+
+    return df, {"before_mb": before, "after_mb": memory_usage_mb(df), "converted": converted, "fixed_point": scales}
+
+
+def sort_by_date(df, file_type):
+    """
+    Mengurutkan frame berdasarkan kolom tanggalnya (NaT di akhir) agar rentang tanggal
+    bisa dipotong dengan binary search. Frame yang sudah terurut dikembalikan apa adanya.
+    """
+    date_columns = [col for col in DATE_COLUMNS.get(file_type, []) if col in df.columns]
+    if not date_columns:
+        return df
+    dates = df[date_columns[0]]
+    valid = dates.notna().sum()
+    if dates.iloc[:valid].is_monotonic_increasing and dates.iloc[valid:].isna().all():
+        return df
+    return df.sort_values(date_columns[0], kind='stable', ignore_index=True)
+
+
+def read_data(source, file_type, sku_decoder=None, report=None):
+    """
+    Membaca satu file Excel secara utuh, membersihkannya, dan (opsional) menambahkan hasil parsing SKU.
+    """
+    df = clean_data(pd.read_excel(source), file_type, report)
+    if sku_decoder and 'SKU' in df.columns:
+        df = pd.concat([df, parse_sku_batch(df['SKU'], sku_decoder)], axis=1)
+    return df
+
+
+def peak_rss_mb():
+    """
+    Puncak RSS proses saat ini dalam MB, atau None jika tidak tersedia di platform ini.
+    """
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss dalam KB di Linux, tetapi dalam byte di macOS
+        return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+    try:
+        import psutil
+    except ImportError:
+        return None
+    info = psutil.Process().memory_info()
+    return getattr(info, "peak_wset", info.rss) / 1024 / 1024
+
+
+def _unique_headers(header_row):
+    """
+    Meniru penamaan kolom pd.read_excel: sel kosong menjadi 'Unnamed: i' dan
+    nama duplikat diberi akhiran '.1', '.2', dst. (misalnya 'Pajak.1' di Data Inbound).
+    """
+    headers, seen = [], {}
+    for i, value in enumerate(header_row):
+        name = f"Unnamed: {i}" if value is None else str(value)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        headers.append(name)
+    return headers
+
+
+def iter_excel_chunks(source, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Menghasilkan DataFrame per potongan `chunk_size` baris dari sheet pertama,
+    memakai openpyxl read_only sehingga workbook tidak pernah dimuat utuh ke memori.
+    """
+    from openpyxl import load_workbook
+
+    if hasattr(source, "seek"):
+        source.seek(0)
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header_row = next(rows, None)
+        if header_row is None:
+            return
+        headers = _unique_headers(header_row)
+        width = len(headers)
+
+        chunk = []
+        for row in rows:
+            if row is None or all(value is None for value in row):
+                continue
+            chunk.append(row[:width] + (None,) * (width - len(row)))
+            if len(chunk) >= chunk_size:
+                yield _chunk_frame(chunk, headers)
+                chunk = []
+        if chunk:
+            yield _chunk_frame(chunk, headers)
+    finally:
+        workbook.close()
+
+
+def _chunk_frame(rows, headers):
+    df = pd.DataFrame.from_records(rows, columns=headers)
+    df = df.infer_objects()
+    # Sel kosong dari openpyxl berupa None; samakan dengan NaN seperti hasil pd.read_excel
+    for col in df.columns[df.dtypes == object]:
+        df[col] = df[col].where(df[col].notna(), np.nan)
+    return df
+
+
+def _arrow_schema(columns, file_type):
+    import pyarrow as pa
+
+    numeric = set(NUMERIC_COLUMNS.get(file_type, []))
+    dates = set(DATE_COLUMNS.get(file_type, []))
+    fields = []
+    for col in columns:
+        if col in numeric:
+            fields.append(pa.field(col, pa.float64()))
+        elif col in dates:
+            fields.append(pa.field(col, pa.timestamp("ns")))
+        else:
+            fields.append(pa.field(col, pa.string()))
+    return pa.schema(fields)
+
+
+def _stringify_columns(df, schema):
+    """
+    Kolom yang tidak dibersihkan disimpan sebagai teks agar skema Parquet sama untuk setiap potongan.
+    """
+    import pyarrow as pa
+
+    for field in schema:
+        if field.type == pa.string():
+            col = df[field.name]
+            df[field.name] = col.where(col.isna(), col.astype(str)).astype(object)
+    return df
+
+
+def compact_parquet(path, out_path, file_type, batch_size=DEFAULT_CHUNK_SIZE, on_batch=None):
+    """
+    Menulis ulang Parquet hasil ingest streaming ke `out_path` dalam bentuk yang sama dengan frame dashboard:
+    terurut berdasarkan tanggal (seperti sort_by_date) dengan tipe data hasil optimize_dtypes, sehingga
+    pembacanya tidak perlu mengurutkan atau mengoptimasi ulang.
+
+    Tipe tujuan ditentukan per kolom (hanya satu kolom yang dimuat sebagai pandas pada satu waktu), lalu
+    baris disalin per `batch_size`. File yang belum terurut diurutkan sebagai tabel Arrow (teks tetap
+    ringkas, bukan objek Python) sebelum disalin. `on_batch()` dipanggil setelah setiap batch ditulis jika
+    diberikan. Mengembalikan laporan memori seperti optimize_dtypes.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    source = pq.ParquetFile(path)
+    columns = source.schema_arrow.names
+    dtypes, report = {}, {"before_mb": 0.0, "after_mb": 0.0, "converted": {}, "fixed_point": {}}
+    for col in columns:
+        compact, col_report = optimize_dtypes(source.read(columns=[col]).to_pandas(), file_type)
+        dtypes[col] = compact[col].dtype
+        report["before_mb"] += col_report["before_mb"]
+        report["after_mb"] += col_report["after_mb"]
+        report["converted"].update(col_report["converted"])
+        report["fixed_point"].update(col_report["fixed_point"])
+
+    batches = None
+    date_columns = [col for col in DATE_COLUMNS.get(file_type, []) if col in columns]
+    if date_columns:
+        dates = source.read(columns=date_columns[:1]).to_pandas()
+        if sort_by_date(dates, file_type) is not dates:
+            order = dates[date_columns[0]].sort_values(kind='stable').index.to_numpy()
+            batches = source.read().take(order).to_batches(max_chunksize=batch_size)
+    if batches is None:
+        batches = source.iter_batches(batch_size=batch_size)
+
+    writer = None
+    try:
+        for batch in batches:
+            chunk = batch.to_pandas()
+            for col, dtype in dtypes.items():
+                if col in report["fixed_point"]:
+                    chunk[col] = _to_fixed_point(chunk[col])
+                elif chunk[col].dtype != dtype:
+                    chunk[col] = chunk[col].astype(dtype)
+            if writer is None:
+                schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+                writer = pq.ParquetWriter(out_path, schema)
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            if on_batch is not None:
+                on_batch()
+    finally:
+        if writer is not None:
+            writer.close()
+    return report
+
+
+def stream_excel_to_parquet(source, file_type, out_path, sku_decoder=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                            progress=None):
+    """
+    Ingest streaming: membaca `source` per potongan baris, membersihkan setiap potongan dengan
+    clean_data (dan parse_sku_batch jika sku_decoder diberikan), lalu menulisnya sebagai Parquet.
+    `progress(rows)` dipanggil setelah setiap potongan jika diberikan. Hasilnya dipadatkan dan diurutkan
+    ke `out_path` dengan compact_parquet, sehingga bisa dipakai langsung sebagai entri cache.
+
+    Mengembalikan ringkasan: jumlah baris, durasi, baris/detik, memori, laporan parsing yang
+    diakumulasi dari semua potongan dan memory_report (laporan compact_parquet, None jika tidak ada baris).
+    Memori diukur dari RSS saat ini yang disampel di awal, setiap potongan dan setelah pemadatan (bukan
+    puncak sepanjang umur proses, yang di server Streamlit bisa berasal dari sesi lain): start_rss_mb,
+    peak_rss_mb (sampel tertinggi selama ingest) dan rss_growth_mb (selisih keduanya); None jika RSS
+    tidak tersedia di platform ini.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    start = time.perf_counter()
+    start_rss = profiler.current_rss_mb()
+    samples = [start_rss]
+    rows_written = 0
+    raw_path = f"{out_path}.raw"
+    writer = None
+    schema = None
+    report = {}
+    memory_report = None
+    try:
+        try:
+            for chunk in iter_excel_chunks(source, chunk_size):
+                chunk = clean_data(chunk, file_type, report)
+                if sku_decoder and 'SKU' in chunk.columns:
+                    chunk = pd.concat([chunk, parse_sku_batch(chunk['SKU'], sku_decoder)], axis=1)
+                if writer is None:
+                    schema = _arrow_schema(chunk.columns, file_type)
+                    writer = pq.ParquetWriter(raw_path, schema)
+                chunk = _stringify_columns(chunk, schema)
+                # Sampel saat potongan yang sudah diparse masih di memori, titik tertinggi per potongan
+                samples.append(profiler.current_rss_mb())
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+                rows_written += len(chunk)
+                if progress is not None:
+                    progress(rows_written)
+        finally:
+            if writer is not None:
+                writer.close()
+
+        if writer is None:
+            # File tanpa baris data: tetap tulis Parquet kosong agar pemanggil bisa membacanya
+            pd.DataFrame().to_parquet(out_path, index=False)
+        else:
+            memory_report = compact_parquet(raw_path, out_path, file_type, chunk_size,
+                                            on_batch=lambda: samples.append(profiler.current_rss_mb()))
+    finally:
+        if os.path.exists(raw_path):
+            os.remove(raw_path)
+
+    seconds = time.perf_counter() - start
+    samples.append(profiler.current_rss_mb())
+    peak = max(samples) if start_rss is not None else None
+    return {
+        "rows": rows_written,
+        "seconds": seconds,
+        "rows_per_sec": rows_written / seconds if seconds > 0 else 0.0,
+        "start_rss_mb": start_rss,
+        "peak_rss_mb": peak,
+        "rss_growth_mb": peak - start_rss if peak is not None else None,
+        "parse_report": report,
+        "memory_report": memory_report
+    }
+
+
+def describe_ingest_memory(stats):
+    """
+    Teks memori ingest untuk ditampilkan: puncak RSS selama ingest dan kenaikannya dari awal ingest.
+    """
+    if stats["peak_rss_mb"] is None:
+        return "memori n/a"
+    return f"puncak memori {stats['peak_rss_mb']:,.0f} MB (+{stats['rss_growth_mb']:,.0f} MB selama ingest)"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest streaming file Excel besar ke Parquet.")
+    parser.add_argument("file_type", choices=sorted(COLUMN_RENAMES))
+    parser.add_argument("source", help="File Excel (.xlsx)")
+    parser.add_argument("out_path", help="File Parquet tujuan")
+    parser.add_argument("--sku-master", help="File Data Master SKU untuk parsing SKU")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    sku_decoder = build_sku_decoder(pd.read_excel(args.sku_master)) if args.sku_master else None
+    stats = stream_excel_to_parquet(args.source, args.file_type, args.out_path, sku_decoder, args.chunk_size)
+    print(f"{stats['rows']:,} baris dalam {stats['seconds']:,.1f} detik "
+          f"({stats['rows_per_sec']:,.0f} baris/detik), {describe_ingest_memory(stats)}")
+
+
+if __name__ == "__main__":
+    main()
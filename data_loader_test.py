@@ -0,0 +1,63 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import pandas as pd
+
+import data_loader
+import synthetic_data
+
+
+def _clean_sales(rows=2000, seed=3):
+    return data_loader.clean_data(synthetic_data.generate(rows, seed=seed)["sales"], "sales")
+
+
+class CompactParquetTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+
+    def compact(self, df):
+        raw_path = os.path.join(self.directory, "raw.parquet")
+        out_path = os.path.join(self.directory, "out.parquet")
+        df.to_parquet(raw_path, index=False, row_group_size=300)
+        report = data_loader.compact_parquet(raw_path, out_path, "sales", batch_size=250)
+        return pd.read_parquet(out_path), report
+
+    def test_matches_sorted_and_optimized_frame(self):
+        # Baris diacak agar compact_parquet harus mengurutkan
+        df = _clean_sales().sample(frac=1, random_state=0).reset_index(drop=True)
+        compact, report = self.compact(df)
+        expected, expected_report = data_loader.optimize_dtypes(data_loader.sort_by_date(df, "sales"), "sales")
+        pd.testing.assert_frame_equal(compact, expected)
+        self.assertEqual(report["converted"], expected_report["converted"])
+        self.assertEqual(report["fixed_point"], {'HPP': data_loader.CURRENCY_SCALE,
+                                                 'Gross Profit': data_loader.CURRENCY_SCALE})
+        self.assertLess(report["after_mb"], report["before_mb"])
+
+    def test_sorted_input_keeps_order(self):
+        df = data_loader.sort_by_date(_clean_sales(), "sales")
+        compact, _ = self.compact(df)
+        pd.testing.assert_frame_equal(compact, data_loader.optimize_dtypes(df, "sales")[0])
+
+
+class FixedPointTest(unittest.TestCase):
+
+    def test_sen_round_trip(self):
+        df = pd.DataFrame({'HPP': [1234.56, 0.1, 99_999_999.99], 'Gross Profit': [-12.5, 0.0, 1e9]})
+        compact, report = data_loader.optimize_dtypes(df, "sales")
+        self.assertEqual(compact['HPP'].tolist(), [123456, 10, 9_999_999_999])
+        self.assertEqual(report["fixed_point"], {'HPP': 100, 'Gross Profit': 100})
+        pd.testing.assert_frame_equal(data_loader.to_rupiah(compact, "sales"), df)
+
+    def test_sub_sen_and_missing_values_stay_float(self):
+        df = pd.DataFrame({'HPP': [1.005, 2.0], 'Gross Profit': [1.0, None]})
+        compact, report = data_loader.optimize_dtypes(df, "sales")
+        self.assertEqual(compact.dtypes.tolist(), ['float64', 'float64'])
+        self.assertEqual(report["fixed_point"], {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,236 @@
+"""
+Registry dataset bersama untuk seluruh sesi dalam satu proses server.
+
+Setiap sesi Streamlit sebelumnya memegang salinan frame penjualan, inbound dan stok (serta kubus
+dan indeks filter turunannya) sendiri, sehingga sepuluh analis yang membuka ekspor harian yang
+sama berarti sepuluh salinan di memori. Registry ini menyimpan satu nilai per kunci isi (kunci
+data_cache berbasis hash file, token dataset tersimpan, dst.) dan membagikannya ke semua sesi.
+
+- Nilai dibagikan apa adanya dan harus diperlakukan read-only: pemakai hanya boleh membaca,
+  memotong (take/iloc) atau mengagregasi, tidak mengubah isinya di tempat.
+- Setiap sesi memegang nilai lewat Holder dengan slot bernama (misalnya "data:sales"). Mengganti
+  isi slot melepas kunci lama; Holder yang dibuang (sesi berakhir) melepas semua kuncinya.
+- Nilai tanpa pemegang tetap disimpan sebagai cache, lalu dievict secara LRU jika total ukuran
+  registry melewati REGISTRY_BUDGET_MB. Nilai yang masih dipegang sesi tidak pernah dievict.
+- Dua sesi yang meminta kunci yang sama bersamaan hanya membangunnya sekali.
+
+Modul ini tidak bergantung pada Streamlit.
+"""
+import itertools
+import os
+import sys
+import threading
+import time
+import weakref
+
+import numpy as np
+import pandas as pd
+
+REGISTRY_BUDGET_MB = float(os.environ.get("REGISTRY_BUDGET_MB", "2048"))
+
+_holder_ids = itertools.count(1)
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def size_bytes(value):
+    """
+    Perkiraan ukuran memori sebuah nilai: DataFrame/Series/array, dict/list/tuple berisinya, atau
+    objek dengan atribut nbytes (misalnya filter_engine.FilterIndex).
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(size_bytes(k) + size_bytes(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(size_bytes(item) for item in value)
+    nbytes = getattr(value, "nbytes", None)
+    return int(nbytes) if nbytes is not None else sys.getsizeof(value)
+
+
+def _is_empty(value):
+    # Hasil kosong (biasanya tanda file gagal dimuat) tidak disimpan agar bisa dicoba ulang
+    if value is None:
+        return True
+    if isinstance(value, (pd.DataFrame, pd.Series, dict, list, tuple)):
+        return len(value) == 0
+    return False
+
+
+class DatasetRegistry:
+    """
+    Kumpulan nilai bersama per kunci dengan hitungan pemegang dan eviksi LRU berbasis ukuran.
+    """
+
+    def __init__(self, budget_mb=REGISTRY_BUDGET_MB):
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self._entries = {}
+        self._building = {}
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def holder(self):
+        """
+        Holder baru untuk satu sesi. Semua kuncinya dilepas ketika holder dibuang oleh garbage collector.
+        """
+        return Holder(self)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def lookup(self, key):
+        """
+        Nilai untuk kunci, atau None jika belum ada. Tidak menambah pemegang.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry["hits"] += 1
+            entry["last_used"] = time.time()
+            return entry["value"]
+
+    def acquire(self, key, holder_id, builder):
+        """
+        Nilai untuk kunci, dibangun dengan builder() jika belum ada, dan holder_id dicatat sebagai pemegangnya.
+        Hasil kosong dikembalikan tanpa disimpan.
+        """
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry["holders"].add(holder_id)
+                    entry["hits"] += 1
+                    entry["last_used"] = time.time()
+                    return entry["value"]
+                building = self._building.get(key)
+                if building is None:
+                    building = self._building[key] = threading.Event()
+                    break
+            # Sesi lain sedang membangun kunci yang sama: tunggu hasilnya, lalu periksa ulang
+            building.wait()
+
+        try:
+            value = builder()
+        except BaseException:
+            with self._lock:
+                self._building.pop(key).set()
+            raise
+        size = size_bytes(value) if not _is_empty(value) else 0
+        with self._lock:
+            if not _is_empty(value):
+                self._entries[key] = {"value": value, "bytes": size, "holders": {holder_id}, "hits": 0,
+                                      "created": time.time(), "last_used": time.time()}
+            self._building.pop(key).set()
+            self._evict_locked()
+        return value
+
+    def release(self, key, holder_id):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry["holders"].discard(holder_id)
+            self._evict_locked()
+
+    def release_all(self, holder_id, keys):
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry["holders"].discard(holder_id)
+            self._evict_locked()
+
+    def _evict_locked(self):
+        total = sum(entry["bytes"] for entry in self._entries.values())
+        if total <= self.budget_bytes:
+            return
+        idle = sorted((key for key, entry in self._entries.items() if not entry["holders"]),
+                      key=lambda key: self._entries[key]["last_used"])
+        for key in idle:
+            if total <= self.budget_bytes:
+                break
+            total -= self._entries.pop(key)["bytes"]
+            self.evictions += 1
+
+    def clear(self):
+        """
+        Menghapus semua nilai tanpa pemegang. Mengembalikan jumlah nilai yang dihapus.
+        """
+        with self._lock:
+            idle = [key for key, entry in self._entries.items() if not entry["holders"]]
+            for key in idle:
+                del self._entries[key]
+            return len(idle)
+
+    def stats(self):
+        """
+        Ringkasan per nilai: kunci, ukuran (MB), jumlah pemegang, hit dan umur (detik).
+        """
+        now = time.time()
+        with self._lock:
+            rows = [{"key": str(key), "mb": entry["bytes"] / 1024 / 1024, "holders": len(entry["holders"]),
+                     "hits": entry["hits"], "age_s": now - entry["created"]}
+                    for key, entry in self._entries.items()]
+        return pd.DataFrame(rows, columns=["key", "mb", "holders", "hits", "age_s"])
+
+    def total_mb(self):
+        with self._lock:
+            return sum(entry["bytes"] for entry in self._entries.values()) / 1024 / 1024
+
+
+class Holder:
+    """
+    Pegangan satu sesi atas nilai-nilai registry, per slot bernama. Satu slot memegang paling banyak
+    satu kunci; mengisi slot dengan kunci lain melepas kunci sebelumnya.
+    """
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.id = next(_holder_ids)
+        self._slots = {}
+        self._finalizer = weakref.finalize(self, _release_slots, registry, self.id, self._slots)
+
+    def acquire(self, slot, key, builder):
+        """
+        Nilai bersama untuk kunci (dibangun dengan builder() jika belum ada di registry), dipegang di slot.
+        """
+        previous = self._slots.get(slot)
+        value = self.registry.acquire(key, self.id, builder)
+        if _is_empty(value):
+            self._slots.pop(slot, None)
+        else:
+            self._slots[slot] = key
+        if previous is not None and previous != key and previous not in self._slots.values():
+            self.registry.release(previous, self.id)
+        return value
+
+    def key(self, slot):
+        return self._slots.get(slot)
+
+    def release(self, slot=None):
+        """
+        Melepas satu slot, atau semua slot jika slot tidak diberikan.
+        """
+        slots = [slot] if slot is not None else list(self._slots)
+        keys = [self._slots.pop(name) for name in slots if name in self._slots]
+        self.registry.release_all(self.id, [key for key in keys if key not in self._slots.values()])
+
+
+def _release_slots(registry, holder_id, slots):
+    registry.release_all(holder_id, list(slots.values()))
+
+
+def shared():
+    """
+    Registry milik proses ini, dibuat saat pertama dipakai.
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = DatasetRegistry()
+        return _shared
@@ -0,0 +1,227 @@
+"""
+Peramalan permintaan per SKU untuk titik pemesanan ulang (reorder point) dan deteksi stok berlebih.
+
+Penjualan harian disusun menjadi matriks SKU x hari, lalu model sederhana dihitung sekaligus untuk
+semua SKU sebagai operasi array NumPy:
+
+- rata-rata bergerak (moving average) FORECAST_WINDOW_DAYS hari terakhir, dihitung sejak penjualan
+  pertama SKU agar produk baru tidak tertarik ke nol,
+- exponential smoothing (SMOOTHING_ALPHA), sebagai satu perkalian matriks-vektor dengan bobot peluruhan,
+- indeks musiman per kelompok Season: rasio penjualan kelompok pada periode yang sama tahun lalu
+  terhadap periode sebelumnya (hanya jika riwayat lebih dari setahun).
+
+Model per SKU dipilih dengan backtest: LEAD_TIME_DAYS hari terakhir ditahan, kedua model diramal dari
+data sebelumnya, dan model dengan galat absolut terkecil yang dipakai. Stok pengaman memakai simpangan
+baku permintaan harian pada jendela rata-rata bergerak, sehingga reorder point = permintaan selama lead
+time + stok pengaman. Stok di atas OVERSTOCK_DAYS hari permintaan (atau stok tanpa permintaan sama sekali)
+ditandai berlebih.
+
+Matriks dibangun per potongan CHUNK_SKUS SKU, sehingga memori sebanding dengan ukuran potongan, dan
+potongan-potongan dikerjakan paralel di thread pool (operasi berat NumPy melepas GIL).
+"""
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+FORECAST_WINDOW_DAYS = int(os.environ.get("FORECAST_WINDOW_DAYS", "28"))
+SMOOTHING_ALPHA = float(os.environ.get("FORECAST_ALPHA", "0.2"))
+LEAD_TIME_DAYS = int(os.environ.get("LEAD_TIME_DAYS", "14"))
+SERVICE_LEVEL_Z = float(os.environ.get("SERVICE_LEVEL_Z", "1.65"))
+OVERSTOCK_DAYS = int(os.environ.get("OVERSTOCK_DAYS", "90"))
+# Riwayat lebih panjang dari ini dipotong; cukup untuk indeks musiman tahunan
+HISTORY_DAYS = int(os.environ.get("FORECAST_HISTORY_DAYS", "450"))
+CHUNK_SKUS = int(os.environ.get("FORECAST_CHUNK_SKUS", "4096"))
+FORECAST_WORKERS = int(os.environ.get("FORECAST_WORKERS", str(os.cpu_count() or 1)))
+
+SEASON_DAYS = 365
+# Batas indeks musiman agar satu periode ekstrem tahun lalu tidak melipatgandakan ramalan
+SEASON_INDEX_LIMITS = (0.25, 4.0)
+
+MODELS = ["Moving Average", "Exponential Smoothing"]
+
+FORECAST_COLUMNS = ['TotalQTYTerjual', 'Perkiraan Harian', 'Model', 'Indeks Musim', 'Simpangan Harian']
+PLAN_COLUMNS = ['TotalQTYTerjual', 'TotalTersedia', 'Perkiraan Harian', 'Model', 'Indeks Musim',
+                'Stok Pengaman', 'Reorder Point', 'Hari Persediaan', 'Perlu Reorder', 'Stok Berlebih']
+
+
+def _moving_average(matrix, first_day, window):
+    """
+    Rata-rata harian window hari terakhir, dibagi jumlah hari sejak penjualan pertama jika lebih pendek.
+    """
+    days = matrix.shape[1]
+    window = min(window, days)
+    observed = np.clip(days - first_day, 1, window)
+    return matrix[:, days - window:].sum(axis=1) / observed
+
+
+def _moving_std(matrix, first_day, window):
+    """
+    Simpangan baku harian atas jendela yang sama dengan _moving_average, sehingga hari nol sebelum
+    penjualan pertama SKU tidak menaikkan simpangan (dan stok pengaman) produk baru.
+    """
+    days = matrix.shape[1]
+    window = min(window, days)
+    recent = matrix[:, days - window:]
+    active = np.arange(days - window, days) >= first_day[:, None]
+    observed = np.clip(days - first_day, 1, window)
+    mean = np.where(active, recent, 0).sum(axis=1) / observed
+    return np.sqrt(np.where(active, (recent - mean[:, None]) ** 2, 0).sum(axis=1) / observed)
+
+
+def _smoothing_weights(days, alpha):
+    # level_T = sum_t w_t * x_t dengan w_t = alpha * (1 - alpha)^(T-1-t), dan level awal = x_0
+    weights = alpha * (1 - alpha) ** np.arange(days - 1, -1, -1, dtype='float64')
+    weights[0] = (1 - alpha) ** (days - 1)
+    return weights
+
+
+def _exponential_smoothing(matrix, first_day, alpha):
+    """
+    Level exponential smoothing di akhir matriks untuk semua baris sekaligus. Hari sebelum
+    penjualan pertama SKU tidak ikut: bobotnya dinormalisasi ulang atas hari sejak penjualan pertama.
+    """
+    days = matrix.shape[1]
+    weights = _smoothing_weights(days, alpha)
+    cumulative = np.concatenate([[0.0], np.cumsum(weights)])
+    active_weight = cumulative[-1] - cumulative[np.minimum(first_day, days - 1)]
+    return (matrix @ weights) / np.where(active_weight > 0, active_weight, 1)
+
+
+def _first_sale(matrix):
+    sold = matrix > 0
+    return np.where(sold.any(axis=1), sold.argmax(axis=1), matrix.shape[1] - 1)
+
+
+def _fit_chunk(matrix, window, alpha, lead_time):
+    """
+    Ramalan permintaan harian, model terpilih dan simpangan baku harian untuk satu potongan SKU.
+    """
+    days = matrix.shape[1]
+    first_day = _first_sale(matrix)
+    forecasts = np.vstack([_moving_average(matrix, first_day, window),
+                           _exponential_smoothing(matrix, first_day, alpha)])
+
+    choice = np.ones(len(matrix), dtype='int64')
+    holdout = min(lead_time, days // 3)
+    if holdout > 0:
+        # Backtest: ramal `holdout` hari terakhir dari data sebelumnya, bandingkan dengan realisasi
+        train = matrix[:, :days - holdout]
+        train_first = np.minimum(first_day, days - holdout - 1)
+        backtest = np.vstack([_moving_average(train, train_first, window),
+                              _exponential_smoothing(train, train_first, alpha)]) * holdout
+        actual = matrix[:, days - holdout:].sum(axis=1)
+        errors = np.abs(backtest - actual)
+        choice = np.where(errors[0] < errors[1], 0, 1)
+
+    return forecasts[choice, np.arange(len(matrix))], choice, _moving_std(matrix, first_day, window)
+
+
+def _season_index(group_codes, day_codes, qty, n_groups, days, window, lead_time):
+    """
+    Indeks musiman per kelompok: permintaan kelompok selama lead time pada periode yang sama tahun lalu
+    dibagi permintaan kelompok pada `window` hari sebelumnya. 1 jika riwayat kurang dari setahun.
+    """
+    if days < SEASON_DAYS + window or n_groups == 0:
+        return np.ones(n_groups)
+    totals = np.bincount(group_codes * days + day_codes, weights=qty, minlength=n_groups * days)
+    totals = totals.reshape(n_groups, days)
+    anchor = days - SEASON_DAYS
+    ahead = totals[:, anchor:anchor + lead_time].sum(axis=1) / lead_time
+    before = totals[:, anchor - window:anchor].sum(axis=1) / window
+    index = np.divide(ahead, before, out=np.ones(n_groups), where=before > 0)
+    return np.clip(index, *SEASON_INDEX_LIMITS)
+
+
+def forecast_demand(skus, dates, qty, seasons=None, window=FORECAST_WINDOW_DAYS, alpha=SMOOTHING_ALPHA,
+                    lead_time=LEAD_TIME_DAYS, workers=FORECAST_WORKERS, chunk_skus=CHUNK_SKUS):
+    """
+    Ramalan permintaan harian per SKU dari baris penjualan (SKU, tanggal, QTY; boleh belum diagregasi).
+    SKU boleh berupa teks atau kunci integer (misalnya SKU_ID dari sku_dimension); seasons (opsional)
+    adalah Series Season dengan indeks berjenis kunci yang sama. Hari terakhir data menjadi titik awal ramalan.
+
+    Mengembalikan DataFrame per SKU berisi TotalQTYTerjual, Perkiraan Harian, Model, Indeks Musim dan
+    Simpangan Harian, terurut berdasarkan SKU.
+    """
+    skus = pd.Series(skus).reset_index(drop=True)
+    day_values = pd.to_datetime(pd.Series(dates)).to_numpy(dtype='datetime64[D]')
+    qty = np.asarray(qty, dtype='float64')
+    valid = skus.notna().to_numpy() & ~np.isnat(day_values) & ~np.isnan(qty)
+    if not valid.any():
+        # Kolom dan indeks bertipe sama dengan hasil biasa (float, tipe kunci SKU) agar reorder_plan
+        # tetap menghitung dengan float dan kunci integer tetap integer setelah digabung dengan stok
+        return pd.DataFrame({column: pd.Series(dtype=object if column == 'Model' else 'float64')
+                             for column in FORECAST_COLUMNS}, index=pd.Index(skus.iloc[:0], name='SKU'))
+
+    sku_codes, sku_index = pd.factorize(skus[valid].to_numpy(), sort=True)
+    day_values, qty = day_values[valid], qty[valid]
+    last_day = day_values.max()
+    first_day = max(day_values.min(), last_day - np.timedelta64(HISTORY_DAYS - 1, 'D'))
+    day_codes = (day_values - first_day).astype('int64')
+    totals = np.bincount(sku_codes, weights=qty, minlength=len(sku_index))
+    in_history = day_codes >= 0
+    sku_codes, day_codes, qty = sku_codes[in_history], day_codes[in_history], qty[in_history]
+    days = int(day_codes.max()) + 1 if len(day_codes) else 1
+
+    # Baris diurutkan per SKU agar setiap potongan SKU adalah irisan yang bersebelahan
+    order = np.argsort(sku_codes, kind='stable')
+    sku_codes, day_codes, qty = sku_codes[order], day_codes[order], qty[order]
+    starts = list(range(0, len(sku_index), chunk_skus))
+    bounds = np.searchsorted(sku_codes, starts + [len(sku_index)])
+
+    def fit(position):
+        start, stop = starts[position], min(starts[position] + chunk_skus, len(sku_index))
+        rows = slice(bounds[position], bounds[position + 1])
+        cells = (sku_codes[rows] - start) * days + day_codes[rows]
+        matrix = np.bincount(cells, weights=qty[rows], minlength=(stop - start) * days).reshape(stop - start, days)
+        return _fit_chunk(matrix, window, alpha, lead_time)
+
+    if workers > 1 and len(starts) > 1:
+        with ThreadPoolExecutor(max_workers=min(workers, len(starts))) as executor:
+            parts = list(executor.map(fit, range(len(starts))))
+    else:
+        parts = [fit(position) for position in range(len(starts))]
+    daily = np.concatenate([part[0] for part in parts])
+    choice = np.concatenate([part[1] for part in parts])
+    deviation = np.concatenate([part[2] for part in parts])
+
+    index = np.ones(len(sku_index))
+    if seasons is not None:
+        season_of = pd.Series(seasons).groupby(level=0, observed=True).first()
+        group_codes, groups = pd.factorize(season_of.reindex(sku_index).astype(object).fillna("").astype(str))
+        group_index = _season_index(group_codes[sku_codes], day_codes, qty, len(groups), days, window, lead_time)
+        index = group_index[group_codes]
+
+    return pd.DataFrame({
+        'TotalQTYTerjual': totals,
+        'Perkiraan Harian': daily * index,
+        'Model': np.asarray(MODELS, dtype=object)[choice],
+        'Indeks Musim': index,
+        'Simpangan Harian': deviation
+    }, index=pd.Index(sku_index, name='SKU'))
+
+
+def reorder_plan(forecast, stock, lead_time=LEAD_TIME_DAYS, service_z=SERVICE_LEVEL_Z,
+                 overstock_days=OVERSTOCK_DAYS):
+    """
+    Menggabungkan ramalan (hasil forecast_demand) dengan stok tersedia per SKU (Series) menjadi
+    rencana per SKU: stok pengaman, reorder point, hari persediaan dan penanda Perlu Reorder /
+    Stok Berlebih. SKU yang hanya ada di stok ikut dengan permintaan 0.
+    """
+    stock = pd.Series(stock, dtype='float64').groupby(level=0, observed=True).sum()
+    plan = forecast.reindex(forecast.index.union(stock.index))
+    plan.index.name = 'SKU'
+    plan = plan.fillna({'TotalQTYTerjual': 0.0, 'Perkiraan Harian': 0.0, 'Indeks Musim': 1.0,
+                        'Simpangan Harian': 0.0})
+    plan['TotalTersedia'] = stock.reindex(plan.index, fill_value=0.0)
+
+    daily = plan['Perkiraan Harian'].to_numpy()
+    available = plan['TotalTersedia'].to_numpy()
+    plan['Stok Pengaman'] = service_z * plan['Simpangan Harian'] * math.sqrt(lead_time)
+    plan['Reorder Point'] = daily * lead_time + plan['Stok Pengaman']
+    plan['Hari Persediaan'] = np.divide(available, daily, out=np.full(len(plan), np.nan), where=daily > 0)
+    plan['Perlu Reorder'] = (daily > 0) & (available <= plan['Reorder Point'].to_numpy())
+    plan['Stok Berlebih'] = (available > 0) & (available > daily * overstock_days)
+    return plan[PLAN_COLUMNS].reset_index()
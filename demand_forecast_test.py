@@ -0,0 +1,73 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import demand_forecast
+
+DAYS = 60
+
+
+def _daily_sales(series):
+    """
+    Baris penjualan dari {SKU: QTY per hari}; hari bernilai 0 tidak punya baris.
+    """
+    dates = pd.date_range('2024-01-01', periods=DAYS, freq='D')
+    rows = [(sku, dates[day], qty) for sku, values in series.items() for day, qty in enumerate(values) if qty]
+    skus, days, qty = zip(*rows)
+    return list(skus), list(days), list(qty)
+
+
+def _forecast(series):
+    return demand_forecast.forecast_demand(*_daily_sales(series), window=28, alpha=0.2, lead_time=14, workers=1)
+
+
+class ForecastModelTest(unittest.TestCase):
+
+    def test_backtest_picks_model_with_smaller_error(self):
+        # Lonjakan sesaat tepat sebelum periode backtest: smoothing bereaksi berlebihan, rata-rata bergerak tidak
+        spike = [10.0] * DAYS
+        spike[DAYS - 15] = 100.0
+        # Kenaikan permanen: smoothing mengejar level baru lebih cepat daripada rata-rata 28 hari
+        shift = [2.0] * 30 + [20.0] * 30
+        forecast = _forecast({'SPIKE': spike, 'SHIFT': shift})
+        self.assertEqual(forecast.loc['SPIKE', 'Model'], "Moving Average")
+        self.assertEqual(forecast.loc['SHIFT', 'Model'], "Exponential Smoothing")
+
+    def test_deviation_starts_at_first_sale(self):
+        # Produk baru yang terjual stabil 4 per hari sejak 5 hari terakhir tidak punya simpangan
+        new = [0.0] * (DAYS - 5) + [4.0] * 5
+        forecast = _forecast({'NEW': new, 'OLD': [1.0, 3.0] * (DAYS // 2)})
+        self.assertAlmostEqual(forecast.loc['NEW', 'Perkiraan Harian'], 4.0)
+        self.assertEqual(forecast.loc['NEW', 'Simpangan Harian'], 0.0)
+        self.assertAlmostEqual(forecast.loc['OLD', 'Simpangan Harian'], 1.0)
+
+
+class ReorderPlanTest(unittest.TestCase):
+
+    def test_reorder_and_overstock_flags(self):
+        forecast = pd.DataFrame({
+            'TotalQTYTerjual': [60.0, 30.0, 30.0],
+            'Perkiraan Harian': [2.0, 1.0, 1.0],
+            'Model': ["Moving Average"] * 3,
+            'Indeks Musim': [1.0] * 3,
+            'Simpangan Harian': [1.0, 0.0, 0.0]
+        }, index=pd.Index(['LOW', 'HIGH', 'EMPTY'], name='SKU'))
+        stock = pd.Series({'LOW': 20.0, 'HIGH': 200.0, 'IDLE': 5.0})
+        plan = demand_forecast.reorder_plan(forecast, stock, lead_time=16, service_z=2.0,
+                                            overstock_days=90).set_index('SKU')
+
+        # Reorder point = 2 * 16 + 2 * 1 * sqrt(16) = 40
+        self.assertEqual(plan.loc['LOW', 'Reorder Point'], 40.0)
+        self.assertEqual(plan.loc['LOW', 'Hari Persediaan'], 10.0)
+        flags = plan[['Perlu Reorder', 'Stok Berlebih']]
+        self.assertEqual(flags.loc['LOW'].tolist(), [True, False])
+        self.assertEqual(flags.loc['HIGH'].tolist(), [False, True])
+        # SKU tanpa stok sama sekali perlu dipesan ulang; stok tanpa permintaan adalah stok berlebih
+        self.assertEqual(flags.loc['EMPTY'].tolist(), [True, False])
+        self.assertEqual(flags.loc['IDLE'].tolist(), [False, True])
+        self.assertTrue(np.isnan(plan.loc['IDLE', 'Hari Persediaan']))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,249 @@
+"""
+Ekspor laporan dashboard di latar belakang.
+
+Ekspor memotret status filter saat tombol ditekan, lalu di thread pekerja menjalankan bagian-bagian
+laporan yang sama dengan batch_report (agregat, rekomendasi dan grafik) untuk filter tersebut, dan
+menulis:
+
+- workbook Excel multi-sheet: satu sheet status filter, lalu satu sheet per tabel,
+- satu file HTML statis berisi semua grafik plotly (plotly.js dari CDN).
+
+Job berjalan di luar rerun skrip Streamlit, sehingga dashboard tetap interaktif; sesi hanya menyimpan
+id job dan membaca progresnya. Pembatalan diperiksa di antara bagian laporan dan di antara sheet.
+Job dijalankan di thread, bukan proses, agar frame yang sudah dimuat (dibagikan lewat dataset_registry)
+bisa dibaca langsung tanpa disalin; backend duckdb membuka cursor sendiri di thread pekerja.
+
+Modul ini tidak bergantung pada Streamlit.
+"""
+import html
+import itertools
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+import batch_report
+
+EXPORT_DIR = os.environ.get("EXPORT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".exports"))
+EXPORT_WORKERS = int(os.environ.get("EXPORT_WORKERS", "1"))
+# File ekspor dan job yang lebih tua dari ini dibersihkan saat job baru dibuat
+EXPORT_MAX_AGE_HOURS = float(os.environ.get("EXPORT_MAX_AGE_HOURS", "24"))
+
+QUEUED = "antre"
+RUNNING = "berjalan"
+DONE = "selesai"
+CANCELLED = "dibatalkan"
+FAILED = "gagal"
+ACTIVE = (QUEUED, RUNNING)
+
+# Batas nama sheet Excel
+_SHEET_NAME_LENGTH = 31
+_job_ids = itertools.count(1)
+_shared = None
+_shared_lock = threading.Lock()
+
+
+class Cancelled(Exception):
+    pass
+
+
+class ExportJob:
+    """
+    Satu ekspor: status, progres (langkah selesai dari total), langkah yang sedang berjalan,
+    path hasil dan pesan kesalahan. Atributnya hanya ditulis oleh thread pekerja.
+    """
+
+    def __init__(self, label, context):
+        self.id = f"{time.strftime('%Y%m%d-%H%M%S')}-{next(_job_ids)}"
+        self.label = label
+        self.context = context
+        self.status = QUEUED
+        self.step = ""
+        self.done = 0
+        self.total = len(batch_report.REPORT_SECTIONS) + 2
+        self.paths = {}
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self._cancel = threading.Event()
+
+    @property
+    def active(self):
+        return self.status in ACTIVE
+
+    @property
+    def progress(self):
+        return self.done / self.total if self.total else 0.0
+
+    def cancel(self):
+        """
+        Meminta job berhenti di titik pemeriksaan berikutnya (job yang masih antre tidak dijalankan).
+        """
+        self._cancel.set()
+
+    def _check(self):
+        if self._cancel.is_set():
+            raise Cancelled()
+
+    def _advance(self, step):
+        self._check()
+        self.step = step
+
+    def run(self, make_queries):
+        """
+        Menjalankan ekspor di thread pekerja. make_queries() membuat objek kueri dashboard
+        (FrameQueries atau SqlQueries) untuk filter yang dipotret.
+        """
+        try:
+            self._check()
+            self.status = RUNNING
+            queries = make_queries()
+            tables, figures = {}, {}
+            for label, section in batch_report.REPORT_SECTIONS:
+                self._advance(label)
+                for name, table, fig in section(queries):
+                    tables[name] = table
+                    if fig is not None:
+                        figures[name] = fig
+                self.done += 1
+
+            os.makedirs(EXPORT_DIR, exist_ok=True)
+            self._advance("Workbook Excel")
+            self.paths["xlsx"] = self._write_workbook(tables)
+            self.done += 1
+            self._advance("Grafik HTML")
+            self.paths["html"] = self._write_html(figures)
+            self.done += 1
+            self.status = DONE
+        except Cancelled:
+            self.status = CANCELLED
+            self._remove_outputs()
+        except Exception as e:
+            self.status = FAILED
+            self.error = f"{type(e).__name__}: {e}"
+            self._remove_outputs()
+        finally:
+            self.step = ""
+            self.finished = time.time()
+
+    def _path(self, extension):
+        return os.path.join(EXPORT_DIR, f"laporan-{self.id}.{extension}")
+
+    def _write_workbook(self, tables):
+        path, tmp_path = self._path("xlsx"), self._path("tmp.xlsx")
+        used = set()
+        try:
+            with pd.ExcelWriter(tmp_path, engine="openpyxl") as writer:
+                pd.DataFrame(list(self.context.items()), columns=["Keterangan", "Nilai"]).to_excel(
+                    writer, sheet_name="Filter", index=False)
+                for name, table in tables.items():
+                    self._check()
+                    _excel_ready(table).to_excel(writer, sheet_name=_sheet_name(name, used), index=False)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return path
+
+    def _write_html(self, figures):
+        path, tmp_path = self._path("html"), self._path("tmp.html")
+        label = html.escape(self.label)
+        context = "".join(f"<li><b>{html.escape(str(key))}</b>: {html.escape(str(value))}</li>"
+                          for key, value in self.context.items())
+        parts = [f"<html><head><meta charset='utf-8'><title>{label}</title></head><body>",
+                 f"<h1>{label}</h1><ul>{context}</ul>"]
+        for index, fig in enumerate(figures.values()):
+            self._check()
+            # plotly.js disematkan sekali (figure pertama) agar file unduhan bisa dibuka tanpa internet
+            parts.append(fig.to_html(full_html=False, include_plotlyjs=index == 0))
+        parts.append("</body></html>")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(parts))
+        os.replace(tmp_path, path)
+        return path
+
+    def _remove_outputs(self):
+        for path in self.paths.values():
+            if os.path.exists(path):
+                os.remove(path)
+        self.paths = {}
+
+
+def _sheet_name(name, used):
+    base = re.sub(r'[\[\]:*?/\\]', '_', name)[:_SHEET_NAME_LENGTH]
+    candidate, suffix = base, 2
+    while candidate.lower() in used:
+        candidate = f"{base[:_SHEET_NAME_LENGTH - len(str(suffix)) - 1]}_{suffix}"
+        suffix += 1
+    used.add(candidate.lower())
+    return candidate
+
+
+def _excel_ready(table):
+    # Excel tidak menerima datetime dengan zona waktu; kategori ditulis sebagai teks biasa
+    table = table.copy(deep=False)
+    for col in table.columns:
+        if isinstance(table[col].dtype, pd.DatetimeTZDtype):
+            table[col] = table[col].dt.tz_localize(None)
+        elif isinstance(table[col].dtype, pd.CategoricalDtype):
+            table[col] = table[col].astype(object)
+    return table
+
+
+class ExportManager:
+    """
+    Antrean job ekspor milik proses ini. Job dijalankan oleh EXPORT_WORKERS thread pekerja;
+    job lain menunggu dengan status antre.
+    """
+
+    def __init__(self, workers=EXPORT_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="export")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, label, context, make_queries):
+        """
+        Membuat dan mengantrekan job ekspor. context adalah dict status filter (ditulis ke laporan).
+        """
+        self.cleanup()
+        job = ExportJob(label, context)
+        with self._lock:
+            self._jobs[job.id] = job
+        self._executor.submit(job.run, make_queries)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cleanup(self, max_age_hours=EXPORT_MAX_AGE_HOURS):
+        """
+        Menghapus job selesai dan file ekspor yang lebih tua dari max_age_hours.
+        """
+        cutoff = time.time() - max_age_hours * 3600
+        with self._lock:
+            for job_id in [job_id for job_id, job in self._jobs.items()
+                           if not job.active and job.finished is not None and job.finished < cutoff]:
+                del self._jobs[job_id]
+        if os.path.isdir(EXPORT_DIR):
+            for name in os.listdir(EXPORT_DIR):
+                path = os.path.join(EXPORT_DIR, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                except OSError:
+                    pass
+
+
+def shared():
+    """
+    Manager ekspor milik proses ini, dibuat saat pertama dipakai.
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = ExportManager()
+        return _shared
@@ -0,0 +1,158 @@
+"""
+Mesin filter berindeks untuk data penjualan, inbound dan stok.
+
+Data penjualan disimpan terurut berdasarkan 'Tanggal', sehingga rentang tanggal cukup dipotong
+dengan binary search. Untuk setiap kolom yang bisa difilter disiapkan array indeks baris per
+nilai (format CSR: urutan baris + offset per nilai), lalu seleksi beberapa filter didapat dengan
+mengiriskan indeks-indeks tersebut tanpa menyalin seluruh DataFrame.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+# Kolom yang bisa difilter beserta label di sidebar
+FILTER_DIMENSIONS = {
+    'Category': "Kategori",
+    'Season': "Musim",
+    'Channel': "Channel",
+    'Salesman': "Salesman",
+    'Nama Toko': "Toko",
+    'Lokasi': "Lokasi"
+}
+
+
+class FilterIndex:
+    """
+    Indeks filter untuk satu DataFrame. Jika date_column diberikan, frame diurutkan berdasarkan
+    kolom tersebut (NaT di akhir) kecuali sudah terurut.
+    """
+
+    def __init__(self, df, columns=None, date_column=None):
+        if date_column is not None and date_column in df.columns and not _is_sorted(df[date_column]):
+            df = df.sort_values(date_column, kind='stable', ignore_index=True)
+        self.frame = df
+        self.date_column = date_column if date_column in df.columns else None
+        self._dates = df[self.date_column].to_numpy(dtype='datetime64[ns]') if self.date_column else None
+        self._valid_dates = int(np.count_nonzero(~np.isnat(self._dates))) if self.date_column else 0
+        self._postings = {}
+
+        for column in columns or FILTER_DIMENSIONS:
+            if column not in df.columns:
+                continue
+            codes, uniques = pd.factorize(df[column], sort=True)
+            # Baris diurutkan per kode nilai; urutan stabil menjaga indeks baris tetap naik di tiap nilai
+            order = np.argsort(codes, kind='stable')
+            offsets = np.searchsorted(codes[order], np.arange(len(uniques) + 1), side='left')
+            self._postings[column] = {
+                "lookup": {value: i for i, value in enumerate(uniques)},
+                "values": list(uniques),
+                "order": order,
+                "offsets": offsets
+            }
+
+    @property
+    def columns(self):
+        return list(self._postings)
+
+    @property
+    def nbytes(self):
+        """
+        Perkiraan memori indeks, tanpa frame yang diindeks (frame dihitung terpisah oleh pemiliknya).
+        """
+        total = self._dates.nbytes if self._dates is not None else 0
+        for posting in self._postings.values():
+            total += posting["order"].nbytes + posting["offsets"].nbytes
+        return total
+
+    def values(self, column):
+        """
+        Daftar nilai unik (terurut) untuk sebuah kolom, dipakai sebagai opsi filter.
+        """
+        return self._postings[column]["values"] if column in self._postings else []
+
+    def date_limits(self):
+        """
+        Tanggal paling awal dan paling akhir (tanpa NaT), atau (None, None) jika tidak ada.
+        """
+        if not self._valid_dates:
+            return None, None
+        return pd.Timestamp(self._dates[0]), pd.Timestamp(self._dates[self._valid_dates - 1])
+
+    def date_bounds(self, start_date=None, end_date=None):
+        """
+        Posisi baris [lo, hi) untuk rentang tanggal inklusif sampai akhir hari end_date.
+        """
+        n = len(self.frame)
+        if self._dates is None:
+            return 0, n
+        lo = 0 if start_date is None else int(np.searchsorted(self._dates, np.datetime64(pd.Timestamp(start_date)),
+                                                              side='left'))
+        if end_date is None:
+            # Baris NaT (di ujung array) hanya ikut terpilih jika tidak ada filter tanggal sama sekali
+            hi = n if start_date is None else self._valid_dates
+        else:
+            end = pd.Timestamp(end_date).normalize() + pd.Timedelta(days=1)
+            hi = int(np.searchsorted(self._dates, np.datetime64(end), side='left'))
+        return lo, max(lo, hi)
+
+    def _rows_for(self, column, selected, lo, hi):
+        posting = self._postings[column]
+        order, offsets = posting["order"], posting["offsets"]
+        parts = []
+        for value in selected:
+            code = posting["lookup"].get(value)
+            if code is None:
+                continue
+            rows = order[offsets[code]:offsets[code + 1]]
+            # Indeks baris per nilai sudah naik, jadi rentang tanggal cukup dipotong dengan binary search
+            parts.append(rows[np.searchsorted(rows, lo):np.searchsorted(rows, hi)])
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.intp)
+
+    def select(self, start_date=None, end_date=None, filters=None):
+        """
+        Memilih baris berdasarkan rentang tanggal dan filter {kolom: [nilai, ...]}.
+        Filter untuk kolom yang tidak diindeks diabaikan.
+
+        Mengembalikan (frame terpilih, statistik) dengan statistik berisi jumlah baris,
+        selektivitas dan waktu (ms) untuk setiap filter.
+        """
+        total = len(self.frame)
+        stats = []
+
+        start = time.perf_counter()
+        lo, hi = self.date_bounds(start_date, end_date)
+        if self._dates is not None and (start_date is not None or end_date is not None):
+            stats.append(_stat("Tanggal", hi - lo, total, start))
+
+        mask = None
+        for column, selected in (filters or {}).items():
+            if column not in self._postings:
+                continue
+            start = time.perf_counter()
+            rows = self._rows_for(column, selected, lo, hi)
+            column_mask = np.zeros(hi - lo, dtype=bool)
+            column_mask[rows - lo] = True
+            mask = column_mask if mask is None else mask & column_mask
+            stats.append(_stat(column, int(mask.sum()), total, start))
+
+        if mask is None:
+            selected_frame = self.frame if (lo, hi) == (0, total) else self.frame.iloc[lo:hi]
+        else:
+            selected_frame = self.frame.take(np.flatnonzero(mask) + lo)
+        return selected_frame, stats
+
+
+def _is_sorted(series):
+    values = series.dropna()
+    # NaT harus berada di ujung agar binary search tetap valid
+    return values.is_monotonic_increasing and series.iloc[len(values):].isna().all()
+
+
+def _stat(name, rows, total, started):
+    return {
+        "filter": name,
+        "rows": rows,
+        "selectivity": rows / total if total else 0.0,
+        "ms": (time.perf_counter() - started) * 1000
+    }
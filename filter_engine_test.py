@@ -0,0 +1,89 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import data_loader
+import filter_engine
+import synthetic_data
+
+
+def _expected(df, start_date=None, end_date=None, filters=None):
+    """
+    Seleksi acuan dengan boolean mask biasa; tanggal akhir inklusif sampai akhir hari.
+    """
+    mask = pd.Series(True, index=df.index)
+    if start_date is not None:
+        mask &= df['Tanggal'] >= pd.Timestamp(start_date)
+    if end_date is not None:
+        mask &= df['Tanggal'] < pd.Timestamp(end_date).normalize() + pd.Timedelta(days=1)
+    for column, selected in (filters or {}).items():
+        mask &= df[column].isin(selected)
+    return df[mask]
+
+
+class FilterIndexTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        df = data_loader.clean_data(synthetic_data.generate(3000, seed=5, days=60)["sales"], "sales")
+        # Urutan acak dan beberapa NaT memastikan indeks mengurutkan sendiri dan menaruh NaT di akhir
+        df = df.sample(frac=1, random_state=1).reset_index(drop=True)
+        df.loc[[3, 50, 700], 'Tanggal'] = pd.NaT
+        cls.df = df
+        cls.index = filter_engine.FilterIndex(df, date_column='Tanggal')
+
+    def assertSelects(self, start_date=None, end_date=None, filters=None):
+        selected, _ = self.index.select(start_date, end_date, filters)
+        expected = _expected(self.index.frame, start_date, end_date, filters)
+        self.assertGreater(len(expected), 0)
+        pd.testing.assert_frame_equal(selected, expected)
+
+    def test_frame_sorted_with_nat_last(self):
+        dates = self.index.frame['Tanggal']
+        self.assertTrue(dates.iloc[:-3].is_monotonic_increasing)
+        self.assertTrue(dates.iloc[-3:].isna().all())
+        self.assertEqual(self.index.date_limits(), (dates.min(), dates.max()))
+
+    def test_matches_boolean_masks(self):
+        channels = self.index.values('Channel')
+        salesmen = self.index.values('Salesman')
+        self.assertSelects()
+        self.assertSelects('2024-01-10', '2024-02-05')
+        self.assertSelects(filters={'Channel': channels[:2]})
+        self.assertSelects('2024-01-10', '2024-02-05', {'Channel': channels[:2], 'Salesman': salesmen[1:3]})
+        self.assertSelects(start_date='2024-02-01', filters={'Salesman': [salesmen[0]]})
+
+    def test_end_date_includes_whole_day(self):
+        last = self.index.frame['Tanggal'].max()
+        self.assertNotEqual(last, last.normalize())
+        # Tanggal akhir tanpa jam tetap memilih transaksi pada jam terakhir hari itu
+        selected, _ = self.index.select(last.normalize(), last.normalize())
+        self.assertIn(last, selected['Tanggal'].tolist())
+        self.assertTrue((selected['Tanggal'].dt.normalize() == last.normalize()).all())
+        self.assertSelects(last.normalize(), last.normalize())
+
+    def test_nat_rows_only_without_date_filter(self):
+        all_rows, stats = self.index.select()
+        self.assertEqual(len(all_rows), len(self.df))
+        self.assertEqual(stats, [])
+        dated, _ = self.index.select(start_date='2024-01-01')
+        self.assertFalse(dated['Tanggal'].isna().any())
+        self.assertEqual(len(dated), len(self.df) - 3)
+
+    def test_unknown_values_and_columns(self):
+        selected, stats = self.index.select(filters={'Channel': ['Tidak Ada'], 'Kolom Lain': ['x']})
+        self.assertEqual(len(selected), 0)
+        self.assertEqual([stat["filter"] for stat in stats], ['Channel'])
+        self.assertEqual(stats[0]["selectivity"], 0.0)
+
+    def test_selection_stats(self):
+        channels = self.index.values('Channel')
+        selected, stats = self.index.select('2024-01-10', '2024-02-05', {'Channel': channels[:1]})
+        self.assertEqual([stat["filter"] for stat in stats], ["Tanggal", 'Channel'])
+        self.assertEqual(stats[-1]["rows"], len(selected))
+        np.testing.assert_allclose(stats[-1]["selectivity"], len(selected) / len(self.df))
+
+
+if __name__ == "__main__":
+    unittest.main()
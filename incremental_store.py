@@ -0,0 +1,362 @@
+"""
+Dataset tersimpan yang diperbarui secara inkremental dari file delta harian.
+
+Setiap jenis data disimpan sebagai partisi Parquet per bulan (berdasarkan 'Tanggal'; data stok
+yang tidak bertanggal disimpan dalam satu partisi). File delta dibersihkan dengan logika yang
+sama seperti load_data, lalu hanya partisi yang tersentuh delta yang dibaca, digabung dan
+dideduplikasi berdasarkan kunci alami (baris delta menggantikan baris lama dengan kunci sama).
+Kubus penjualan juga disimpan per partisi, sehingga biaya ingest sebanding dengan ukuran delta,
+bukan dengan panjang riwayat.
+
+Kunci alami bisa diatur lewat variabel lingkungan, misalnya STORE_KEY_SALES="No Faktur,SKU,Tanggal".
+Kunci yang diatur wajib ada di file delta; kunci bawaan yang tidak lengkap diganti seluruh kolom baris.
+Untuk data bertanggal, kunci harus memuat kolom tanggal karena deduplikasi hanya dilakukan di dalam
+partisi bulanan baris delta.
+
+Penggunaan dari command line:
+    python incremental_store.py append sales delta_penjualan.xlsx --sku-master master.xlsx
+    python incremental_store.py stats
+    python incremental_store.py clear [--type sales]
+"""
+import argparse
+import json
+import os
+import shutil
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+import data_cache
+import data_loader
+import sales_cube
+from sku_parser import SKU_COLUMNS, parse_sku_batch
+
+STORE_DIR = os.environ.get("DATA_STORE_DIR",
+                           os.path.join(os.path.dirname(os.path.abspath(__file__)), ".data_store"))
+
+DEFAULT_NATURAL_KEYS = {
+    "sales": ['No Faktur', 'SKU', 'Tanggal'],
+    "inbound": ['No PO', 'SKU', 'Tanggal'],
+    "stock": ['SKU', 'Lokasi']
+}
+# Kunci yang diatur lewat STORE_KEY_<JENIS>
+CONFIGURED_KEYS = {
+    file_type: [col.strip() for col in os.environ[f"STORE_KEY_{file_type.upper()}"].split(",") if col.strip()]
+    for file_type in DEFAULT_NATURAL_KEYS if os.environ.get(f"STORE_KEY_{file_type.upper()}")
+}
+NATURAL_KEYS = {**DEFAULT_NATURAL_KEYS, **CONFIGURED_KEYS}
+
+UNDATED_PARTITION = "tanpa-tanggal"
+AGGREGATE_TABLES = ["sales", "products"]
+
+
+def _dataset_dir(file_type):
+    return os.path.join(STORE_DIR, file_type)
+
+
+def _manifest_path(file_type):
+    return os.path.join(_dataset_dir(file_type), "manifest.json")
+
+
+def _partition_path(file_type, partition):
+    return os.path.join(_dataset_dir(file_type), "data", f"{partition}.parquet")
+
+
+def _aggregate_path(file_type, table, partition):
+    return os.path.join(_dataset_dir(file_type), "cube", table, f"{partition}.parquet")
+
+
+def read_manifest(file_type):
+    """
+    Metadata dataset tersimpan: id dataset, versi skema, hash SKU decoder, kunci alami, daftar
+    partisi (beserta jumlah baris), hash file delta yang sudah diterapkan, dan nomor versi dataset.
+    """
+    try:
+        with open(_manifest_path(file_type), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"store_id": uuid.uuid4().hex, "schema_version": data_cache.SCHEMA_VERSIONS.get(file_type, 0),
+                "decoder": None, "key_columns": None, "partitions": {}, "applied": [], "version": 0}
+
+
+def _write_manifest(file_type, manifest):
+    path = _manifest_path(file_type)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = data_cache.writer_temp_path(path)
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _write_parquet(df, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = data_cache.writer_temp_path(path)
+    try:
+        data_cache.prepare_for_parquet(df).to_parquet(tmp_path, index=False,
+                                                      row_group_size=data_cache.PARQUET_ROW_GROUP_ROWS)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+
+
+def _read_parquet(path):
+    return pd.read_parquet(path) if os.path.exists(path) else None
+
+
+def dataset_token(file_type):
+    """
+    Identitas versi dataset tersimpan: berubah setiap kali delta digabung, dan tidak terulang
+    setelah dataset dihapus lalu dibangun ulang.
+    """
+    manifest = read_manifest(file_type)
+    return f"{manifest['store_id']}-v{manifest['version']}" if manifest["partitions"] else None
+
+
+def key_columns(df, file_type):
+    """
+    Kolom kunci alami untuk df. Kunci dari STORE_KEY_<JENIS> harus ada semuanya (KeyError jika tidak).
+    Jika kunci bawaan tidak lengkap, seluruh kolom (selain hasil parsing SKU) dipakai sebagai kunci:
+    sebagian kunci saja (misalnya SKU dan Tanggal tanpa No Faktur) akan menganggap penjualan berbeda
+    sebagai duplikat.
+    """
+    columns = NATURAL_KEYS.get(file_type, [])
+    missing = [col for col in columns if col not in df.columns]
+    if missing and file_type in CONFIGURED_KEYS:
+        raise KeyError(f"Kolom kunci {', '.join(missing)} dari STORE_KEY_{file_type.upper()} tidak ditemukan "
+                       f"di file delta {file_type}.")
+    if missing or not columns:
+        columns = [col for col in df.columns if col not in SKU_COLUMNS]
+    check_partition_key(df, file_type, columns)
+    return columns
+
+
+def check_partition_key(df, file_type, keys):
+    """
+    Deduplikasi hanya membandingkan baris di partisi bulanan yang sama, sehingga untuk data bertanggal
+    kunci harus memuat kolom tanggal partisi (ValueError jika tidak).
+    """
+    date_columns = [col for col in data_loader.DATE_COLUMNS.get(file_type, []) if col in df.columns]
+    if date_columns and date_columns[0] not in keys:
+        raise ValueError(f"Kunci alami {file_type} ({', '.join(keys)}) harus memuat kolom {date_columns[0]}, "
+                         f"karena dataset dipartisi per bulan berdasarkan kolom tersebut.")
+
+
+def row_hashes(df, keys):
+    """
+    Hash 64-bit per baris dari kolom kunci. Teks dan kategori di-hash sebagai string, sehingga
+    nilai yang sama tetap cocok meskipun tipe kolomnya berbeda antara delta dan data tersimpan.
+    """
+    columns = {}
+    for col in keys:
+        series = df[col]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            series = series.astype('datetime64[ns]')
+        elif not pd.api.types.is_numeric_dtype(series) or isinstance(series.dtype, pd.CategoricalDtype):
+            series = series.astype(object).astype(str)
+        columns[col] = series.reset_index(drop=True)
+    return pd.util.hash_pandas_object(pd.DataFrame(columns), index=False).to_numpy()
+
+
+def partition_labels(df, file_type):
+    """
+    Label partisi per baris: 'YYYY-MM' dari kolom tanggal, atau satu partisi untuk data tanpa tanggal.
+    """
+    date_columns = [col for col in data_loader.DATE_COLUMNS.get(file_type, []) if col in df.columns]
+    if not date_columns:
+        return pd.Series(UNDATED_PARTITION, index=df.index)
+    dates = df[date_columns[0]]
+    return dates.dt.strftime('%Y-%m').where(dates.notna(), UNDATED_PARTITION)
+
+
+def _with_parsed_skus(df, sku_decoder):
+    df = df.drop(columns=[col for col in SKU_COLUMNS if col in df.columns])
+    if sku_decoder and 'SKU' in df.columns:
+        df = pd.concat([df.reset_index(drop=True), parse_sku_batch(df['SKU'].reset_index(drop=True), sku_decoder)],
+                       axis=1)
+    return df
+
+
+def _build_aggregates(file_type, df):
+    """
+    Agregat turunan untuk satu partisi. Saat ini hanya kubus penjualan; grain kubus adalah hari,
+    sehingga kubus per bulan cukup digabung untuk mendapatkan kubus seluruh dataset.
+    """
+    if file_type != "sales" or not {'Tanggal', 'Sub Total'}.issubset(df.columns):
+        return None
+    return sales_cube.build_sales_cube(df)
+
+
+def append_delta(df_delta, file_type, sku_decoder=None, source_hash=None):
+    """
+    Menggabungkan DataFrame delta yang sudah dibersihkan (hasil clean_data/load_data) ke dataset
+    tersimpan. Hanya partisi yang tersentuh delta yang dibaca dan ditulis ulang, termasuk agregatnya.
+    Jika SKU decoder berubah sejak penyimpanan terakhir, seluruh partisi diparse ulang sekali.
+    Delta dengan source_hash yang sudah pernah diterapkan dilewati.
+
+    Mengembalikan laporan berisi jumlah baris delta, baris baru, baris yang diganti, duplikat di
+    dalam delta, partisi yang diperbarui dan waktu proses.
+    """
+    started = time.perf_counter()
+    manifest = read_manifest(file_type)
+    report = {"rows": len(df_delta), "new": 0, "replaced": 0, "duplicates": 0, "partitions": [],
+              "skipped": False, "seconds": 0.0}
+    if source_hash is not None and source_hash in manifest["applied"]:
+        report["skipped"] = True
+        return report
+
+    schema_version = data_cache.SCHEMA_VERSIONS.get(file_type, 0)
+    if manifest["partitions"] and manifest["schema_version"] != schema_version:
+        raise ValueError(f"Dataset {file_type} tersimpan memakai skema versi {manifest['schema_version']}, "
+                         f"sedangkan versi saat ini {schema_version}. Hapus data tersimpan lalu unggah ulang.")
+
+    decoder_digest = data_cache.decoder_hash(sku_decoder)
+    keys = manifest["key_columns"] or key_columns(df_delta, file_type)
+    missing = [col for col in keys if col not in df_delta.columns]
+    if missing:
+        raise KeyError(f"Kolom kunci {', '.join(missing)} tidak ditemukan di file delta {file_type}.")
+    check_partition_key(df_delta, file_type, keys)
+
+    delta = _with_parsed_skus(df_delta, sku_decoder)
+    before_dedup = len(delta)
+    delta = delta.drop_duplicates(subset=keys, keep='last')
+    report["duplicates"] = before_dedup - len(delta)
+    labels = partition_labels(delta, file_type)
+
+    affected = set(labels.unique())
+    reparse = manifest["decoder"] is not None and manifest["decoder"] != decoder_digest
+    if reparse:
+        affected |= set(manifest["partitions"])
+
+    for partition in sorted(affected):
+        delta_part = delta[labels.to_numpy() == partition]
+        stored = _read_parquet(_partition_path(file_type, partition))
+        if stored is not None and reparse:
+            stored = _with_parsed_skus(stored, sku_decoder)
+        if stored is not None and not stored.empty:
+            # Baris lama yang kuncinya muncul lagi di delta diganti dengan versi delta
+            replaced = np.isin(row_hashes(stored, keys), row_hashes(delta_part, keys))
+            report["replaced"] += int(replaced.sum())
+            combined = pd.concat([stored[~replaced], delta_part], ignore_index=True)
+        else:
+            combined = delta_part.reset_index(drop=True)
+        report["new"] += len(delta_part)
+        combined = data_loader.sort_by_date(combined, file_type)
+
+        _write_parquet(combined, _partition_path(file_type, partition))
+        aggregates = _build_aggregates(file_type, combined)
+        if aggregates is not None:
+            for table in AGGREGATE_TABLES:
+                _write_parquet(aggregates[table], _aggregate_path(file_type, table, partition))
+        manifest["partitions"][partition] = {"rows": len(combined)}
+        report["partitions"].append(partition)
+    report["new"] -= report["replaced"]
+
+    manifest.update(schema_version=schema_version, decoder=decoder_digest, key_columns=keys,
+                    version=manifest["version"] + 1)
+    if source_hash is not None:
+        manifest["applied"].append(source_hash)
+    _write_manifest(file_type, manifest)
+    report["seconds"] = time.perf_counter() - started
+    return report
+
+
+def _concat_partitions(paths):
+    frames = [df for df in (_read_parquet(path) for path in paths) if df is not None]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def _ordered_partitions(manifest):
+    # Partisi bulanan berurutan secara leksikal; partisi tanpa tanggal selalu terakhir (NaT di akhir)
+    return sorted(manifest["partitions"], key=lambda p: (p == UNDATED_PARTITION, p))
+
+
+def load_dataset(file_type):
+    """
+    Membaca seluruh dataset tersimpan, terurut berdasarkan tanggal.
+    """
+    return _concat_partitions(partition_paths(file_type))
+
+
+def partition_paths(file_type):
+    """
+    Path file Parquet setiap partisi dataset tersimpan, terurut seperti load_dataset.
+    """
+    manifest = read_manifest(file_type)
+    return [_partition_path(file_type, p) for p in _ordered_partitions(manifest)]
+
+
+def load_aggregates(file_type):
+    """
+    Menggabungkan agregat per partisi menjadi kubus seluruh dataset, atau None jika belum ada.
+    """
+    manifest = read_manifest(file_type)
+    partitions = _ordered_partitions(manifest)
+    if not partitions or not os.path.exists(_aggregate_path(file_type, AGGREGATE_TABLES[0], partitions[0])):
+        return None
+    return {table: _concat_partitions(_aggregate_path(file_type, table, p) for p in partitions)
+            for table in AGGREGATE_TABLES}
+
+
+def clear_store(file_type=None):
+    """
+    Menghapus dataset tersimpan untuk satu jenis file, atau semuanya.
+    Mengembalikan jumlah dataset yang dihapus.
+    """
+    removed = 0
+    for name in [file_type] if file_type else sorted(DEFAULT_NATURAL_KEYS):
+        if os.path.isdir(_dataset_dir(name)):
+            shutil.rmtree(_dataset_dir(name), ignore_errors=True)
+            removed += 1
+    return removed
+
+
+def store_stats():
+    """
+    Ringkasan dataset tersimpan per jenis file: jumlah partisi, baris, versi dan kunci alami.
+    """
+    stats = {}
+    for file_type in sorted(DEFAULT_NATURAL_KEYS):
+        manifest = read_manifest(file_type)
+        if manifest["partitions"]:
+            stats[file_type] = {"partitions": len(manifest["partitions"]),
+                                "rows": sum(p["rows"] for p in manifest["partitions"].values()),
+                                "version": manifest["version"], "key_columns": manifest["key_columns"]}
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kelola dataset tersimpan yang diperbarui dari file delta.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    append_parser = subparsers.add_parser("append", help="Gabungkan file delta ke dataset tersimpan")
+    append_parser.add_argument("file_type", choices=sorted(DEFAULT_NATURAL_KEYS))
+    append_parser.add_argument("source", help="File Excel delta")
+    append_parser.add_argument("--sku-master", help="File Data Master SKU untuk parsing SKU")
+    clear_parser = subparsers.add_parser("clear", help="Hapus dataset tersimpan")
+    clear_parser.add_argument("--type", choices=sorted(DEFAULT_NATURAL_KEYS), help="Hanya hapus jenis file ini")
+    subparsers.add_parser("stats", help="Tampilkan ringkasan dataset tersimpan")
+    args = parser.parse_args(argv)
+
+    if args.command == "append":
+        sku_decoder = data_loader.build_sku_decoder(pd.read_excel(args.sku_master)) if args.sku_master else None
+        df_delta = data_loader.clean_data(pd.read_excel(args.source), args.file_type)
+        report = append_delta(df_delta, args.file_type, sku_decoder, data_cache.file_content_hash(args.source))
+        if report["skipped"]:
+            print("File delta ini sudah pernah diterapkan; tidak ada perubahan.")
+        else:
+            print(f"{report['rows']:,} baris delta: {report['new']:,} baru, {report['replaced']:,} diganti, "
+                  f"{report['duplicates']:,} duplikat; partisi {', '.join(report['partitions'])} "
+                  f"diperbarui dalam {report['seconds']:,.2f} detik")
+    elif args.command == "clear":
+        print(f"{clear_store(args.type)} dataset dihapus dari {STORE_DIR}")
+    else:
+        for file_type, stats in store_stats().items():
+            print(f"{file_type}: {stats['rows']:,} baris dalam {stats['partitions']} partisi "
+                  f"(versi {stats['version']}, kunci {', '.join(stats['key_columns'])})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+import incremental_store
+
+
+def _sales(rows):
+    return pd.DataFrame(rows, columns=['Tanggal', 'SKU', 'Nama Toko', 'Salesman', 'QTY']).assign(
+        Tanggal=lambda df: pd.to_datetime(df['Tanggal']))
+
+
+class NaturalKeyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        patcher = mock.patch.object(incremental_store, "STORE_DIR", self.directory)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.directory, True)
+
+    def test_incomplete_default_key_falls_back_to_full_row(self):
+        # Tanpa No Faktur, dua penjualan SKU yang sama pada menit yang sama tetap dua baris
+        delta = _sales([('2024-01-05 10:00', 'ZOZA21BAS-MIA-TBW35', 'Toko A', 'Budi', 2),
+                        ('2024-01-05 10:00', 'ZOZA21BAS-MIA-TBW35', 'Toko B', 'Sari', 5)])
+        report = incremental_store.append_delta(delta, "sales")
+        self.assertEqual((report["new"], report["duplicates"]), (2, 0))
+        self.assertEqual(incremental_store.read_manifest("sales")["key_columns"], list(delta.columns))
+
+        # Baris yang sama persis diterapkan ulang menggantikan baris lama, bukan menambah
+        report = incremental_store.append_delta(delta.iloc[[1]], "sales")
+        self.assertEqual((report["new"], report["replaced"]), (0, 1))
+        self.assertEqual(len(incremental_store.load_dataset("sales")), 2)
+
+    def test_complete_default_key_replaces_rows(self):
+        delta = _sales([('2024-01-05 10:00', 'SKU-1', 'Toko A', 'Budi', 2)]).assign(**{'No Faktur': 'INV-1'})
+        incremental_store.append_delta(delta, "sales")
+        report = incremental_store.append_delta(delta.assign(QTY=7), "sales")
+        self.assertEqual((report["new"], report["replaced"]), (0, 1))
+        self.assertEqual(incremental_store.load_dataset("sales")['QTY'].tolist(), [7])
+
+    def test_configured_key_must_exist(self):
+        delta = _sales([('2024-01-05 10:00', 'SKU-1', 'Toko A', 'Budi', 2)])
+        with mock.patch.dict(incremental_store.CONFIGURED_KEYS, {"sales": ['No Faktur', 'SKU', 'Tanggal']}), \
+                mock.patch.dict(incremental_store.NATURAL_KEYS, {"sales": ['No Faktur', 'SKU', 'Tanggal']}):
+            with self.assertRaises(KeyError):
+                incremental_store.append_delta(delta, "sales")
+
+    def test_dated_key_must_include_partition_date(self):
+        delta = _sales([('2024-01-05 10:00', 'SKU-1', 'Toko A', 'Budi', 2)])
+        with mock.patch.dict(incremental_store.CONFIGURED_KEYS, {"sales": ['SKU', 'Nama Toko']}), \
+                mock.patch.dict(incremental_store.NATURAL_KEYS, {"sales": ['SKU', 'Nama Toko']}):
+            with self.assertRaises(ValueError):
+                incremental_store.append_delta(delta, "sales")
+        self.assertIsNone(incremental_store.dataset_token("sales"))
+
+    def test_undated_stock_key_without_date(self):
+        stock = pd.DataFrame({'SKU': ['SKU-1', 'SKU-1'], 'Lokasi': ['Gudang', 'Toko'], 'Tersedia': [3, 4]})
+        self.assertEqual(incremental_store.append_delta(stock, "stock")["new"], 2)
+        report = incremental_store.append_delta(stock.iloc[[0]].assign(Tersedia=9), "stock")
+        self.assertEqual((report["new"], report["replaced"]), (0, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,478 @@
+"""
+Uji beban dashboard: banyak sesi bersamaan terhadap server Streamlit sungguhan yang mengunggah workbook
+sintetis dan memutar ulang interaksi filter, lalu melaporkan latensi rerun, throughput dan RSS server
+per jumlah sesi.
+
+Server dijalankan sebagai subproses `streamlit run app.py` di localhost (tanpa file watcher dan tanpa
+proteksi XSRF, karena klien uji tidak memegang cookie browser). Setiap sesi adalah klien headless yang
+berbicara dengan protokol websocket Streamlit seperti browser: mengunggah file lewat endpoint upload,
+lalu mengirim status widget dan menunggu skrip selesai. Dengan begitu sesi berbagi proses, registry
+dataset dan GIL yang sama seperti pengguna sungguhan di satu server.
+
+Alur per tingkat jumlah sesi:
+1. Semua sesi terhubung bersamaan, mengunggah data dan menunggu dashboard termuat (ditambah pindah
+   backend jika --backend duckdb); waktunya dilaporkan sebagai load_p50_s.
+2. Setelah semua sesi siap, setiap sesi menjalankan --interactions interaksi: mengubah rentang tanggal
+   atau salah satu filter dimensi, dengan jeda acak sampai --think detik di antaranya.
+3. Latensi setiap rerun interaksi dicatat; throughput = jumlah rerun interaksi / durasi fase interaksi.
+
+Server yang sama dipakai untuk semua tingkat, seperti server yang berjalan lama; sesi tingkat sebelumnya
+diputus sebelum tingkat berikutnya dimulai.
+
+Dengan --cold-start, yang diukur adalah start server: waktu impor modul app.py di proses Python baru, lalu
+untuk tiga kali start berturut-turut waktu sampai server sehat dan waktu dari sesi pertama terhubung sampai
+dashboard tampil (render_s): unggahan pertama (mengisi cache Parquet dan catatan dataset terakhir), restart
+dengan unggahan ulang (cache Parquet terpakai), dan restart lewat warm_start.py tanpa unggahan. Sesi pertama
+terhubung --start-delay detik setelah server sehat, seperti server yang sudah berjalan sebelum pengguna datang.
+
+Penggunaan dari command line:
+    python load_harness.py --sessions 1,5,10,25,50 --rows 10k
+    python load_harness.py --sessions 1,10 --backend duckdb --interactions 20 --think 0.5
+    python load_harness.py --cold-start --rows 100k
+"""
+import argparse
+import ast
+import contextlib
+import datetime
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import requests
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+import benchmark
+import profiler
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+WARM_START_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "warm_start.py")
+DEFAULT_SESSIONS = "1,5,10,25,50"
+DEFAULT_ROWS = "10k"
+DEFAULT_PORT = 8599
+SERVER_START_SECONDS = 60
+# Interval pengambilan sampel RSS server selama uji
+RSS_SAMPLE_SECONDS = 0.2
+# Peluang interaksi berupa perubahan rentang tanggal; sisanya mengubah filter dimensi
+DATE_INTERACTION_SHARE = 0.6
+
+DATE_LABEL = "Pilih Rentang Tanggal Penjualan"
+FILTER_LABEL_PREFIX = "Filter Berdasarkan "
+BACKEND_KEY = "query_backend"
+UPLOADER_KEYS = {"sku_master": "sku_master_uploader", "sales": "sales_uploader", "inbound": "inbound_uploader",
+                 "stock": "stock_uploader"}
+WIDGET_TYPES = {"file_uploader", "date_input", "multiselect", "selectbox"}
+
+RESULT_COLUMNS = ["sessions", "reruns", "errors", "load_p50_s", "p50_s", "p95_s", "p99_s", "throughput_rps",
+                  "rss_peak_mb", "rss_end_mb"]
+COLD_START_COLUMNS = ["start", "server_ready_s", "render_s", "rendered", "errors", "rss_mb"]
+# Modul berat yang seharusnya baru diimpor saat dibutuhkan, bukan saat app.py diimpor
+LAZY_MODULES = ["plotly.express", "openpyxl", "duckdb"]
+_IMPORT_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+for name in sys.argv[2:]:
+    __import__(name)
+print(json.dumps({"seconds": time.perf_counter() - started,
+                  "loaded": [name for name in json.loads(sys.argv[1]) if name in sys.modules]}))
+"""
+
+
+class AppServer:
+    """
+    Server `streamlit run app.py` di subproses selama blok with (lewat `warm_start.py serve` jika warm=True).
+    Output server dibuang kecuali log_path diberikan.
+    """
+
+    def __init__(self, port=DEFAULT_PORT, log_path=None, warm=False):
+        self.port = port
+        self.url = f"http://127.0.0.1:{port}"
+        self.log_path = log_path
+        self.warm = warm
+        self.process = None
+
+    def __enter__(self):
+        log = open(self.log_path, "w") if self.log_path else subprocess.DEVNULL
+        command = [WARM_START_PATH, "serve"] if self.warm else ["-m", "streamlit", "run", APP_PATH]
+        self.process = subprocess.Popen(
+            [sys.executable, *command, "--server.headless", "true",
+             "--server.port", str(self.port), "--server.fileWatcherType", "none",
+             "--server.enableXsrfProtection", "false", "--server.enableCORS", "false",
+             "--browser.gatherUsageStats", "false"],
+            stdout=log, stderr=subprocess.STDOUT)
+        deadline = time.monotonic() + SERVER_START_SECONDS
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"Server Streamlit berhenti saat start (exit code {self.process.returncode})")
+            try:
+                if requests.get(f"{self.url}/_stcore/health", timeout=1).ok:
+                    return self
+            except requests.RequestException:
+                pass
+            time.sleep(0.2)
+        self.__exit__()
+        raise RuntimeError(f"Server Streamlit tidak siap dalam {SERVER_START_SECONDS} detik")
+
+    def __exit__(self, *exc):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+    @property
+    def pid(self):
+        return self.process.pid
+
+
+class Session:
+    """
+    Satu klien headless. Status widget disimpan per label (atau key untuk uploader dan pilihan backend)
+    dan dipetakan ke id widget terbaru pada setiap rerun, sama seperti frontend yang mengirim ulang semua
+    nilai widget yang pernah diubah.
+    """
+
+    def __init__(self, server, socket, timeout):
+        self.server = server
+        self.socket = socket
+        self.timeout = timeout
+        self.session_id = None
+        self.widgets = {}
+        self.values = {}
+
+    def _receive(self):
+        msg = ForwardMsg()
+        msg.ParseFromString(self.socket.recv(timeout=self.timeout))
+        return msg
+
+    def run(self):
+        """
+        Mengirim rerun dengan nilai widget saat ini dan menunggu skrip selesai.
+        Mengembalikan (detik, jumlah galat), galat berupa elemen exception atau skrip yang gagal.
+        """
+        back = BackMsg()
+        back.rerun_script.SetInParent()
+        for name, value in self.values.items():
+            widget = self.widgets.get(name)
+            if widget is not None:
+                state = back.rerun_script.widget_states.widgets.add()
+                state.CopyFrom(value)
+                state.id = widget.id
+        started = time.perf_counter()
+        self.socket.send(back.SerializeToString())
+        widgets, errors = {}, 0
+        while True:
+            msg = self._receive()
+            kind = msg.WhichOneof("type")
+            if kind == "new_session":
+                self.session_id = msg.new_session.initialize.session_id
+            elif kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                element = msg.delta.new_element
+                element_type = element.WhichOneof("type")
+                if element_type == "exception":
+                    errors += 1
+                elif element_type in WIDGET_TYPES:
+                    widget = getattr(element, element_type)
+                    widgets[widget.label] = widget
+                    # Uploader dan pilihan backend dikenali dari key-nya (akhiran id widget)
+                    widgets[widget.id.rsplit("-", 1)[-1]] = widget
+            elif kind == "script_finished":
+                if msg.script_finished != ForwardMsg.FINISHED_SUCCESSFULLY:
+                    errors += 1
+                break
+        self.widgets = widgets
+        return time.perf_counter() - started, errors
+
+    def upload(self, paths):
+        """
+        Mengunggah workbook ({jenis file: path}) lewat endpoint upload server dan menyetel uploader-nya.
+        """
+        names = {file_type: os.path.basename(path) for file_type, path in paths.items()}
+        back = BackMsg()
+        back.file_urls_request.request_id = "upload"
+        back.file_urls_request.session_id = self.session_id
+        back.file_urls_request.file_names.extend(names.values())
+        self.socket.send(back.SerializeToString())
+        msg = self._receive()
+        while msg.WhichOneof("type") != "file_urls_response":
+            msg = self._receive()
+        for (file_type, path), urls in zip(paths.items(), msg.file_urls_response.file_urls):
+            with open(path, "rb") as f:
+                data = f.read()
+            requests.put(self.server.url + urls.upload_url, files={"file": (names[file_type], data)},
+                         timeout=self.timeout).raise_for_status()
+            state = WidgetState()
+            info = state.file_uploader_state_value.uploaded_file_info.add()
+            info.name, info.size, info.file_id = names[file_type], len(data), urls.file_id
+            info.file_urls.CopyFrom(urls)
+            self.values[UPLOADER_KEYS[file_type]] = state
+
+    def select(self, name, value):
+        state = WidgetState()
+        if isinstance(value, list):
+            state.string_array_value.data.extend(value)
+        else:
+            state.string_value = value
+        self.values[name] = state
+
+    def interact(self, rng):
+        """
+        Mengubah satu widget seperti pengguna: rentang tanggal acak (7-90 hari) atau satu filter dimensi
+        (satu nilai acak, atau kembali ke "Semua").
+        """
+        filters = [label for label in self.widgets if label.startswith(FILTER_LABEL_PREFIX)]
+        date_widget = self.widgets.get(DATE_LABEL)
+        if date_widget is not None and (not filters or rng.random() < DATE_INTERACTION_SHARE):
+            first, last = (datetime.date.fromisoformat(value) for value in (date_widget.min, date_widget.max))
+            span = (last - first).days
+            length = min(rng.randint(7, 90), span)
+            start = first + datetime.timedelta(days=rng.randint(0, span - length))
+            self.select(DATE_LABEL, [start.isoformat(), (start + datetime.timedelta(days=length)).isoformat()])
+        elif filters:
+            label = rng.choice(filters)
+            # Opsi pertama adalah "Semua ..."
+            self.select(label, [rng.choice(list(self.widgets[label].options))])
+
+
+class RssSampler:
+    """
+    Mengambil sampel RSS proses pid di thread latar sampai blok with selesai; peak adalah nilai tertinggi.
+    """
+
+    def __init__(self, pid, interval=RSS_SAMPLE_SECONDS):
+        self.pid = pid
+        self.interval = interval
+        self.peak = profiler.current_rss_mb(pid) or 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, profiler.current_rss_mb(self.pid) or 0.0)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, profiler.current_rss_mb(self.pid) or 0.0)
+
+
+def _connect(server, timeout):
+    from websockets.sync.client import connect
+
+    return connect(server.url.replace("http", "ws", 1) + "/_stcore/stream", subprotocols=["streamlit"],
+                   max_size=None, open_timeout=timeout)
+
+
+def _load(session, paths, backend):
+    """
+    Rerun awal, unggah data dan (jika perlu) pindah backend. Mengembalikan (detik, jumlah galat).
+    """
+    seconds, errors = session.run()
+    session.upload(paths)
+    steps = [session.run()]
+    if backend != "pandas":
+        session.select(BACKEND_KEY, backend)
+        steps.append(session.run())
+    for more_seconds, more_errors in steps:
+        seconds, errors = seconds + more_seconds, errors + more_errors
+    return seconds, errors
+
+
+def _fail(record, exc):
+    record["errors"] += 1
+    record["failure"] = f"{type(exc).__name__}: {exc}"
+
+
+def _session(index, server, paths, args, barrier, record):
+    rng = random.Random(args.seed * 1_000 + index)
+    with contextlib.ExitStack() as stack:
+        try:
+            session = Session(server, stack.enter_context(_connect(server, args.timeout)), args.timeout)
+            record["load_s"], record["errors"] = _load(session, paths, args.backend)
+        except Exception as exc:
+            _fail(record, exc)
+        finally:
+            # Sesi yang gagal memuat tetap melewati barrier agar sesi lain tidak menunggu selamanya
+            barrier.wait()
+        if record["errors"]:
+            return
+        try:
+            for _ in range(args.interactions):
+                if args.think:
+                    time.sleep(rng.uniform(0, args.think))
+                session.interact(rng)
+                seconds, errors = session.run()
+                record["latencies"].append(seconds)
+                record["errors"] += errors
+        except Exception as exc:
+            _fail(record, exc)
+
+
+def run_level(sessions, server, paths, args):
+    """
+    Menjalankan satu tingkat jumlah sesi dan mengembalikan ringkasannya (kolom RESULT_COLUMNS).
+    """
+    records = [{"load_s": None, "latencies": [], "errors": 0, "failure": None} for _ in range(sessions)]
+    started = {}
+    barrier = threading.Barrier(sessions + 1, action=lambda: started.setdefault("time", time.perf_counter()))
+    threads = [threading.Thread(target=_session, args=(index, server, paths, args, barrier, records[index]),
+                                name=f"session-{index}") for index in range(sessions)]
+    with RssSampler(server.pid) as sampler:
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started["time"]
+
+    failures = sorted({record["failure"] for record in records if record["failure"]})
+    for failure in failures:
+        print(f"  galat sesi: {failure}")
+    latencies = np.array([seconds for record in records for seconds in record["latencies"]])
+    loads = [record["load_s"] for record in records if record["load_s"] is not None]
+
+    def percentile(q):
+        return float(np.percentile(latencies, q)) if len(latencies) else None
+
+    return {
+        "sessions": sessions,
+        "reruns": len(latencies),
+        "errors": sum(record["errors"] for record in records),
+        "load_p50_s": float(np.median(loads)) if loads else None,
+        "p50_s": percentile(50),
+        "p95_s": percentile(95),
+        "p99_s": percentile(99),
+        "throughput_rps": len(latencies) / elapsed if elapsed > 0 else None,
+        "rss_peak_mb": sampler.peak,
+        "rss_end_mb": profiler.current_rss_mb(server.pid)
+    }
+
+
+def app_imports():
+    """
+    Nama modul yang diimpor app.py di tingkat atas, sesuai urutan di file.
+    """
+    with open(APP_PATH, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    names = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            names.append(node.module)
+    return names
+
+
+def measure_imports():
+    """
+    Waktu impor modul-modul app.py di proses Python baru, beserta modul LAZY_MODULES yang ikut terimpor.
+    """
+    output = subprocess.run([sys.executable, "-c", _IMPORT_PROBE, json.dumps(LAZY_MODULES), *app_imports()],
+                            capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(APP_PATH)).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def cold_start(paths, args):
+    """
+    Mengukur start server: detik sampai server sehat dan dari sesi pertama terhubung sampai dashboard tampil,
+    untuk unggahan pertama, restart dengan unggahan ulang, dan restart warm start tanpa unggahan.
+    """
+    results = []
+    for name, warm in [("unggah pertama", False), ("restart + unggah", False), ("restart warm start", True)]:
+        print(f"{name} ...", flush=True)
+        started = time.perf_counter()
+        result = {"start": name, "server_ready_s": None, "render_s": None, "rendered": False, "errors": 0,
+                  "rss_mb": None}
+        with AppServer(args.port, args.server_log, warm=warm) as server:
+            result["server_ready_s"] = time.perf_counter() - started
+            time.sleep(args.start_delay)
+            started = time.perf_counter()
+            try:
+                with _connect(server, args.timeout) as socket:
+                    session = Session(server, socket, args.timeout)
+                    _, result["errors"] = session.run()
+                    # Warm start yang berhasil langsung menampilkan dashboard tanpa unggahan
+                    if DATE_LABEL not in session.widgets:
+                        session.upload(paths)
+                        _, errors = session.run()
+                        result["errors"] += errors
+                    result["render_s"] = time.perf_counter() - started
+                    result["rendered"] = DATE_LABEL in session.widgets
+            except Exception as exc:
+                result["errors"] += 1
+                print(f"  galat: {type(exc).__name__}: {exc}")
+            result["rss_mb"] = profiler.current_rss_mb(server.pid)
+        results.append(result)
+    return results
+
+
+def save_run(results, args, path=None):
+    """
+    Menyimpan hasil sebagai JSON (default BENCHMARK_DIR/load/<waktu>.json) dan mengembalikan path-nya.
+    """
+    created = time.strftime("%Y%m%d-%H%M%S")
+    path = path or os.path.join(benchmark.BENCHMARK_DIR, "load", f"{created}.json")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    settings = {key: value for key, value in vars(args).items() if key != "output"}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"created": created, "settings": settings, "environment": benchmark.environment(),
+                   "results": results}, f, indent=1)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Uji beban dashboard dengan banyak sesi Streamlit bersamaan.")
+    parser.add_argument("--sessions", default=DEFAULT_SESSIONS, help="Daftar jumlah sesi bersamaan, misalnya 1,10,50")
+    parser.add_argument("--rows", default=DEFAULT_ROWS, help="Jumlah baris penjualan data sintetis, misalnya 10k")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--interactions", type=int, default=10, help="Interaksi filter per sesi")
+    parser.add_argument("--think", type=float, default=1.0, help="Jeda acak maksimum antar interaksi (detik)")
+    parser.add_argument("--backend", default="pandas", choices=["pandas", "duckdb"], help="Backend query sesi")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port server Streamlit uji")
+    parser.add_argument("--timeout", type=float, default=600, help="Batas waktu satu rerun (detik)")
+    parser.add_argument("--server-log", help="Simpan output server Streamlit ke file ini")
+    parser.add_argument("--cold-start", action="store_true",
+                        help="Ukur waktu impor dan waktu sampai render pertama, dengan dan tanpa warm start")
+    parser.add_argument("--start-delay", type=float, default=10,
+                        help="Jeda antara server sehat dan sesi pertama pada --cold-start (detik)")
+    parser.add_argument("--output", help="Path JSON hasil (default BENCHMARK_DIR/load/<waktu>.json)")
+    args = parser.parse_args(argv)
+
+    paths = benchmark.dataset_paths(benchmark.parse_scale(args.rows), args.seed)
+    if args.cold_start:
+        imports = measure_imports()
+        print(f"Impor modul app.py: {imports['seconds']:,.3f} detik; modul lazy yang ikut terimpor: "
+              f"{', '.join(imports['loaded']) or '-'}")
+        results = cold_start(paths, args)
+        with pd.option_context("display.width", 200, "display.max_columns", None):
+            print(pd.DataFrame(results, columns=COLD_START_COLUMNS).round(3).to_string(index=False))
+        print(f"Hasil disimpan di {save_run({'imports': imports, 'starts': results}, args, args.output)}")
+        return 1 if any(result["errors"] or not result["rendered"] for result in results) else 0
+
+    levels = [int(value) for value in args.sessions.split(",") if value.strip()]
+    results = []
+    with AppServer(args.port, args.server_log) as server:
+        for sessions in levels:
+            print(f"{sessions} sesi ...", flush=True)
+            results.append(run_level(sessions, server, paths, args))
+
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(pd.DataFrame(results, columns=RESULT_COLUMNS).round(3).to_string(index=False))
+    print(f"Hasil disimpan di {save_run(results, args, args.output)}")
+    return 1 if any(result["errors"] for result in results) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,216 @@
+"""
+Pemuatan paralel untuk file Data Master SKU, penjualan, inbound dan stok.
+
+Membaca Excel dan membersihkannya adalah pekerjaan CPU yang saling independen, sehingga
+dijalankan bersamaan di process pool. Hanya parsing SKU yang bergantung pada Data Master SKU:
+begitu master selesai dibaca, setiap file yang sudah bersih langsung diparse SKU-nya, dan
+file yang selesai belakangan diparse saat itu juga.
+
+Penggunaan dari command line (membandingkan waktu berurutan vs paralel):
+    python parallel_loader.py --sku-master master.xlsx --sales penjualan.xlsx \
+        --inbound inbound.xlsx --stock stok.xlsx --compare
+"""
+import argparse
+import io
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pandas as pd
+
+import data_loader
+from sku_parser import parse_sku_batch
+
+DATA_TYPES = ["sales", "inbound", "stock"]
+DEFAULT_WORKERS = min(len(DATA_TYPES) + 1, os.cpu_count() or 1)
+
+# Status per file yang dilaporkan ke callback on_status
+READING = "membaca"
+WAITING_MASTER = "menunggu master"
+PARSING = "parsing SKU"
+DONE = "selesai"
+CACHED = "dari cache"
+FAILED = "gagal"
+
+_executor = None
+
+
+def get_executor(workers=DEFAULT_WORKERS):
+    """
+    Process pool bersama yang dipakai ulang antar pemanggilan (misalnya antar rerun Streamlit),
+    sehingga biaya menyalakan proses worker hanya dibayar sekali. Memakai 'spawn' agar aman
+    dijalankan dari server yang memiliki banyak thread.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    return _executor
+
+
+def _as_excel(source):
+    return io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+
+
+def _read_master(source):
+    started = time.perf_counter()
+    return pd.read_excel(_as_excel(source)), time.perf_counter() - started, None
+
+
+def _read_clean(source, file_type):
+    started = time.perf_counter()
+    report = {}
+    df = data_loader.clean_data(pd.read_excel(_as_excel(source)), file_type, report)
+    return df, time.perf_counter() - started, report
+
+
+def _parse(df, sku_decoder):
+    if sku_decoder and 'SKU' in df.columns:
+        return pd.concat([df, parse_sku_batch(df['SKU'], sku_decoder)], axis=1)
+    return df
+
+
+def load_workbooks(sources, sku_decoder=None, lookup=None, executor=None, on_status=None):
+    """
+    Memuat file-file secara paralel dengan jadwal yang memperhatikan dependensi.
+
+    - sources: {jenis file: path atau bytes}, jenis file "sku_master", "sales", "inbound", "stock".
+      Jika "sku_master" tidak ada, sku_decoder yang diberikan dipakai langsung.
+    - lookup(file_type, sku_decoder): opsional, dipanggil begitu decoder diketahui; jika mengembalikan
+      DataFrame (misalnya dari cache), pembacaan Excel untuk file itu dibatalkan atau diabaikan.
+    - on_status(file_type, status): dipanggil dari thread pemanggil setiap kali status file berubah.
+
+    Mengembalikan dict berisi "master" (DataFrame master atau None), "sku_decoder", "frames"
+    ({jenis file: DataFrame sudah diparse SKU-nya}), "errors", "timings" (detik kerja per file),
+    "reports" (laporan parsing per file) dan "seconds" (waktu dinding total).
+    """
+    started = time.perf_counter()
+    executor = executor or get_executor()
+    notify = on_status or (lambda file_type, status: None)
+    result = {"master": None, "sku_decoder": sku_decoder, "frames": {}, "errors": {}, "timings": {}, "reports": {},
+              "seconds": 0.0}
+
+    futures = {}
+    if "sku_master" in sources:
+        futures[executor.submit(_read_master, sources["sku_master"])] = "sku_master"
+        notify("sku_master", READING)
+    decoder_ready = "sku_master" not in sources
+    pending = [file_type for file_type in DATA_TYPES if file_type in sources]
+
+    def resolve_cached(file_types):
+        remaining = []
+        for file_type in file_types:
+            df = lookup(file_type, result["sku_decoder"]) if lookup else None
+            if df is None:
+                remaining.append(file_type)
+            else:
+                result["frames"][file_type] = df
+                notify(file_type, CACHED)
+        return remaining
+
+    if decoder_ready:
+        pending = resolve_cached(pending)
+    # Pembacaan data dimulai bersamaan dengan master; hanya parsing SKU yang menunggu master
+    for file_type in pending:
+        futures[executor.submit(_read_clean, sources[file_type], file_type)] = file_type
+        notify(file_type, READING)
+    cleaned = {}
+
+    def parse_ready():
+        for file_type in list(cleaned):
+            if file_type in result["frames"]:
+                cleaned.pop(file_type)
+                continue
+            notify(file_type, PARSING)
+            parse_started = time.perf_counter()
+            result["frames"][file_type] = _parse(cleaned.pop(file_type), result["sku_decoder"])
+            result["timings"][file_type] += time.perf_counter() - parse_started
+            notify(file_type, DONE)
+
+    while futures:
+        done, _ = wait(futures, return_when=FIRST_COMPLETED)
+        for future in done:
+            file_type = futures.pop(future)
+            if future.cancelled() or file_type in result["frames"]:
+                continue
+            try:
+                value, seconds, report = future.result()
+            except Exception as e:
+                result["errors"][file_type] = e
+                notify(file_type, FAILED)
+                continue
+            result["timings"][file_type] = seconds
+            if report is not None:
+                result["reports"][file_type] = report
+
+            if file_type == "sku_master":
+                result["master"] = value
+                result["sku_decoder"] = data_loader.build_sku_decoder(value)
+                decoder_ready = True
+                notify("sku_master", DONE)
+                # File yang ternyata sudah ada di cache tidak perlu menunggu pembacaan Excel-nya
+                for cached_type in set(DATA_TYPES) - set(resolve_cached(pending)):
+                    for other, other_type in list(futures.items()):
+                        if other_type == cached_type:
+                            other.cancel()
+            else:
+                cleaned[file_type] = value
+                if not decoder_ready:
+                    notify(file_type, WAITING_MASTER)
+            if decoder_ready:
+                parse_ready()
+
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+
+def load_sequential(sources, sku_decoder=None):
+    """
+    Jalur berurutan dengan langkah yang sama, sebagai pembanding load_workbooks.
+    """
+    started = time.perf_counter()
+    result = {"master": None, "sku_decoder": sku_decoder, "frames": {}, "errors": {}, "timings": {}, "reports": {},
+              "seconds": 0.0}
+    if "sku_master" in sources:
+        result["master"], result["timings"]["sku_master"], _ = _read_master(sources["sku_master"])
+        result["sku_decoder"] = data_loader.build_sku_decoder(result["master"])
+    for file_type in DATA_TYPES:
+        if file_type in sources:
+            df, seconds, result["reports"][file_type] = _read_clean(sources[file_type], file_type)
+            parse_started = time.perf_counter()
+            result["frames"][file_type] = _parse(df, result["sku_decoder"])
+            result["timings"][file_type] = seconds + time.perf_counter() - parse_started
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Muat file dashboard secara paralel dan ukur waktunya.")
+    parser.add_argument("--sku-master", required=True)
+    for file_type in DATA_TYPES:
+        parser.add_argument(f"--{file_type}")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--compare", action="store_true", help="Jalankan juga jalur berurutan sebagai pembanding")
+    args = parser.parse_args(argv)
+
+    sources = {"sku_master": args.sku_master}
+    sources.update({file_type: getattr(args, file_type) for file_type in DATA_TYPES if getattr(args, file_type)})
+
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        # Pemanasan: proses worker dinyalakan dulu agar waktu start-up tidak ikut terukur
+        list(executor.map(time.sleep, [0] * args.workers))
+        parallel = load_workbooks(sources, executor=executor,
+                                  on_status=lambda file_type, status: print(f"  {file_type}: {status}"))
+    for file_type, error in parallel["errors"].items():
+        print(f"{file_type} gagal: {error}")
+    work = sum(parallel["timings"].values())
+    print(f"Paralel: {parallel['seconds']:,.2f} detik (total kerja per file {work:,.2f} detik)")
+
+    if args.compare:
+        sequential = load_sequential(sources)
+        print(f"Berurutan: {sequential['seconds']:,.2f} detik "
+              f"-> percepatan {sequential['seconds'] / parallel['seconds']:,.2f}x")
+
+
+if __name__ == "__main__":
+    main()
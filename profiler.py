@@ -0,0 +1,173 @@
+"""
+Instrumentasi waktu dan memori per tahap untuk satu rerun dashboard.
+
+Setiap tahap (muat file, parsing SKU, filter, agregasi, pembuatan grafik, serialisasi tabel/grafik)
+dibungkus dengan `stage(...)`, yang mencatat waktu dinding, jumlah baris masuk/keluar dan selisih
+RSS proses. Catatan masuk ke run yang sedang aktif di thread ini (lihat start_run); tanpa run aktif,
+stage tidak mencatat apa pun, sehingga modul yang memakainya tetap bisa dipanggil dari luar
+aplikasi (misalnya batch_report) tanpa biaya tambahan.
+
+Modul ini tidak bergantung pada Streamlit; riwayat run disimpan oleh pemanggil.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+HISTORY_SIZE = int(os.environ.get("PROFILE_HISTORY", "20"))
+STAGE_COLUMNS = ["run", "label", "started", "stage", "kind", "depth", "ms", "rows_in", "rows_out", "mem_delta_mb",
+                 "cached"]
+
+_local = threading.local()
+_run_counter = 0
+_counter_lock = threading.Lock()
+
+
+def current_rss_mb(pid=None):
+    """
+    RSS proses saat ini (atau proses pid) dalam MB, atau None jika tidak tersedia di platform ini.
+    """
+    try:
+        with open(f"/proc/{pid or 'self'}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process(pid).memory_info().rss / 1024 / 1024
+
+
+def rows_of(value):
+    """
+    Jumlah baris sebuah hasil: len() untuk DataFrame/Series/array, jumlah baris untuk tuple/list berisi
+    DataFrame, selain itu None.
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series, np.ndarray)):
+        return len(value)
+    if isinstance(value, (tuple, list)) and value and all(isinstance(item, (pd.DataFrame, pd.Series))
+                                                          for item in value):
+        return sum(len(item) for item in value)
+    return None
+
+
+def active_run():
+    return getattr(_local, "run", None)
+
+
+def start_run(label="rerun"):
+    """
+    Memulai run baru untuk thread ini dan mengembalikannya. Run sebelumnya yang belum selesai
+    (misalnya karena exception) diganti.
+    """
+    global _run_counter
+    with _counter_lock:
+        _run_counter += 1
+        number = _run_counter
+    _local.run = {"run": number, "label": label, "started": time.strftime("%H:%M:%S"), "ms": 0.0,
+                  "rss_mb": current_rss_mb(), "stages": [], "_t0": time.perf_counter(), "_depth": 0}
+    return _local.run
+
+
+def finish_run(run=None):
+    """
+    Menutup run (default: run aktif), mengisi total waktu dan RSS akhir, lalu mengembalikannya.
+    """
+    run = run or active_run()
+    if run is None:
+        return None
+    run["ms"] = (time.perf_counter() - run.pop("_t0", time.perf_counter())) * 1000
+    run.pop("_depth", None)
+    run["rss_mb"] = current_rss_mb()
+    if active_run() is run:
+        _local.run = None
+    return run
+
+
+@contextmanager
+def run_scope(label):
+    """
+    Run untuk kode yang bisa berjalan tanpa run induk (misalnya rerun fragment Streamlit).
+    Jika sudah ada run aktif, blok ini hanya ikut dicatat di run tersebut dan menghasilkan None;
+    jika belum, run baru dibuat, ditutup di akhir blok, dan dihasilkan ke pemanggil.
+    """
+    if active_run() is not None:
+        yield None
+        return
+    run = start_run(label)
+    try:
+        yield run
+    finally:
+        finish_run(run)
+
+
+@contextmanager
+def stage(name, kind, rows_in=None):
+    """
+    Mencatat satu tahap di run aktif. Menghasilkan dict catatan; pemanggil boleh mengisi
+    record["rows_out"] atau record["cached"] di dalam blok.
+    """
+    run = active_run()
+    record = {"stage": name, "kind": kind, "rows_in": rows_in, "rows_out": None, "cached": False}
+    if run is None:
+        yield record
+        return
+    record["depth"] = run["_depth"]
+    run["stages"].append(record)
+    run["_depth"] += 1
+    rss = current_rss_mb()
+    started = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record["ms"] = (time.perf_counter() - started) * 1000
+        after = current_rss_mb()
+        record["mem_delta_mb"] = after - rss if after is not None and rss is not None else None
+        run["_depth"] -= 1
+
+
+def measure(name, kind, func, rows_in=None):
+    """
+    Menjalankan func() sebagai satu tahap; baris keluar diambil dari hasilnya (lihat rows_of).
+    """
+    with stage(name, kind, rows_in) as record:
+        result = func()
+        record["rows_out"] = rows_of(result)
+    return result
+
+
+def history_frame(runs):
+    """
+    Riwayat run sebagai DataFrame datar, satu baris per tahap.
+    """
+    rows = [{"run": run["run"], "label": run["label"], "started": run["started"], **record}
+            for run in runs for record in run["stages"]]
+    return pd.DataFrame(rows, columns=STAGE_COLUMNS)
+
+
+def summary_frame(runs):
+    """
+    Satu baris per run: total waktu, jumlah tahap, tahap paling lambat dan RSS akhir.
+    """
+    rows = []
+    for run in runs:
+        top = [record for record in run["stages"] if record.get("depth", 0) == 0]
+        slowest = max(run["stages"], key=lambda record: record.get("ms", 0), default=None)
+        rows.append({"run": run["run"], "label": run["label"], "started": run["started"], "ms": run["ms"],
+                     "stages": len(run["stages"]), "top_level_ms": sum(record.get("ms", 0) for record in top),
+                     "slowest": slowest["stage"] if slowest else None, "rss_mb": run["rss_mb"]})
+    return pd.DataFrame(rows, columns=["run", "label", "started", "ms", "stages", "top_level_ms", "slowest",
+                                       "rss_mb"])
+
+
+def to_json(runs):
+    """
+    Riwayat run sebagai teks JSON untuk dianalisis di luar aplikasi.
+    """
+    return json.dumps([{key: value for key, value in run.items() if not key.startswith("_")} for run in runs],
+                      indent=1, default=str)
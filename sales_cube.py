@@ -0,0 +1,97 @@
+"""
+Kubus penjualan yang sudah diagregasi per hari.
+
+Kubus dibangun sekali per dataset pada grain hari x Category x Sub Category x Tahun Produksi x
+Season x Warna Produk x Size Produk x Channel, dengan ukuran Sub Total, Nett Sales, Gross Profit,
+QTY dan jumlah baris. Grafik dan kartu KPI dijawab dari roll-up kubus ini, sehingga perubahan
+filter tidak perlu memindai ulang jutaan baris data mentah.
+"""
+import pandas as pd
+
+import data_loader
+
+DAY_COLUMN = 'Tanggal'
+CUBE_DIMENSIONS = ['Category', 'Sub Category', 'Tahun Produksi', 'Season', 'Warna Produk', 'Size Produk',
+                   'Channel']
+CUBE_MEASURES = ['Sub Total', 'Nett Sales', 'Gross Profit', 'QTY']
+ROW_COUNT = 'Jumlah Baris'
+
+# Kubus kecil terpisah untuk ranking produk (Nama Barang terlalu beragam untuk masuk ke kubus utama)
+PRODUCT_DIMENSIONS = ['Category', 'Season', 'Channel', 'Nama Barang']
+PRODUCT_MEASURES = ['QTY']
+
+
+def _aggregate(df, dimensions, measures):
+    dimensions = [col for col in dimensions if col in df.columns]
+    measures = [col for col in measures if col in df.columns]
+    keys = [df[DAY_COLUMN].dt.normalize().rename(DAY_COLUMN)] + [df[col] for col in dimensions]
+    grouped = df.groupby(keys, observed=True, dropna=False, sort=False)
+    cube = grouped[measures].sum()
+    # Rupiah fixed-point dijumlahkan secara eksak dalam sen, lalu kubus menyimpan nilai rupiah
+    for col in measures:
+        if data_loader.is_fixed_point(df[col], "sales"):
+            cube[col] = cube[col] / data_loader.CURRENCY_SCALE
+    cube[ROW_COUNT] = grouped.size()
+    return cube.reset_index()
+
+
+def build_sales_cube(df_sales):
+    """
+    Membangun kubus penjualan dari data penjualan yang sudah diparse SKU-nya.
+    Mengembalikan dict berisi kubus utama ("sales") dan kubus produk ("products").
+    """
+    return {
+        "sales": _aggregate(df_sales, CUBE_DIMENSIONS, CUBE_MEASURES),
+        "products": _aggregate(df_sales, PRODUCT_DIMENSIONS, PRODUCT_MEASURES)
+    }
+
+
+def slice_cube(cube, start_date=None, end_date=None, filters=None):
+    """
+    Memotong kubus berdasarkan rentang hari (inklusif) dan filter nilai per dimensi,
+    misalnya filters={'Category': ['Kids']}. Dimensi yang tidak ada di kubus diabaikan,
+    jadi pemanggil harus memeriksa covers() dan memakai data mentah untuk filter di luar grain kubus.
+    """
+    mask = pd.Series(True, index=cube.index)
+    if start_date is not None:
+        mask &= cube[DAY_COLUMN] >= pd.Timestamp(start_date)
+    if end_date is not None:
+        mask &= cube[DAY_COLUMN] <= pd.Timestamp(end_date)
+    for column, values in (filters or {}).items():
+        if column in cube.columns:
+            mask &= cube[column].isin(values)
+    return cube[mask]
+
+
+def covers(cube, filters):
+    """
+    True jika semua kolom filter merupakan dimensi di setiap tabel kubus, sehingga kubus
+    bisa menjawab seleksi tersebut tanpa kembali ke data mentah.
+    """
+    return all(column in table.columns for table in cube.values() for column in filters)
+
+
+def total(cube, measure):
+    """
+    Total satu ukuran pada potongan kubus (untuk kartu KPI).
+    """
+    return cube[measure].sum()
+
+
+def rollup(cube, dimension, measure, top=None):
+    """
+    Roll-up kubus ke satu dimensi, diurutkan menurun berdasarkan ukuran. Nilai yang sama tetap
+    berurutan menurut dimensinya (pengurutan stabil), sehingga hasilnya deterministik.
+    """
+    result = cube.groupby(dimension, observed=True)[measure].sum().sort_values(ascending=False, kind='stable')
+    if top is not None:
+        result = result.head(top)
+    return result.reset_index()
+
+
+def monthly(cube, measure, label='Bulan'):
+    """
+    Roll-up kubus ke bulan (format 'YYYY-MM') untuk grafik tren.
+    """
+    months = cube[DAY_COLUMN].dt.to_period('M').astype(str).rename(label)
+    return cube.groupby(months)[measure].sum().reset_index()
@@ -0,0 +1,391 @@
+"""
+Registri skema deklaratif untuk file Excel yang diunggah, beserta parser vektor untuk tanggal,
+angka dan rupiah.
+
+Setiap jenis file didefinisikan sebagai daftar kolom dengan nama baku, alias (nama kolom di
+ekspor lama/baru), parser, format tanggal dan peran kolom (rupiah atau kuantitas). Layout ekspor
+baru cukup ditambahkan sebagai entri alias/kolom di sini tanpa mengubah kode pembersihan.
+
+Sel yang tidak bisa diparse tidak menggagalkan file: nilainya dikosongkan (NaN/NaT; kolom angka
+lalu diisi 0 seperti sebelumnya) dan dihitung di laporan parsing per kolom.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+# Format rupiah Indonesia: Rp 1.234.567,89
+RUPIAH_LOCALE = {"symbol": "Rp", "thousands": ".", "decimal": ","}
+
+# Parser kolom: "datetime", "number", "rupiah" atau "text". Peran "currency"/"quantity" dipakai
+# oleh optimasi tipe data. Kolom required=True wajib ada setelah alias diterapkan.
+SCHEMAS = {
+    "sku_master": {
+        "label": "Data Master SKU",
+        "columns": {
+            'CODE': {"parser": "text", "required": True},
+            'ARTI': {"parser": "text", "required": True},
+            'JENIS': {"parser": "text", "required": True}
+        }
+    },
+    "sales": {
+        "label": "Data Penjualan",
+        "currency": RUPIAH_LOCALE,
+        "columns": {
+            'Tanggal': {"parser": "datetime", "formats": ['%d/%m/%Y %H:%M'], "required": True},
+            'SKU': {"parser": "text", "aliases": ['SK U']},
+            'Nama Toko': {"parser": "text", "aliases": ['Nama Toka Ziel Kids Officia Shop']},
+            'Salesman': {"parser": "text", "aliases": ['Salesmen']},
+            'QTY': {"parser": "number", "role": "quantity", "required": True},
+            'Harga': {"parser": "number", "role": "currency", "required": True},
+            'Sub Total': {"parser": "number", "role": "currency", "required": True},
+            'Nett Sales': {"parser": "number", "role": "currency", "required": True},
+            'HPP': {"parser": "rupiah", "role": "currency", "required": True},
+            'Gross Profit': {"parser": "rupiah", "role": "currency", "required": True}
+        }
+    },
+    "inbound": {
+        "label": "Data Inbound",
+        "columns": {
+            # Format tanggal inbound tidak tetap: format di bawah adalah jalur cepat, sisanya diinfer pandas
+            'Tanggal': {"parser": "datetime", "formats": ['%Y-%m-%d', '%Y-%m-%d %H:%M:%S'], "infer": True,
+                        "required": True},
+            'No PO': {"parser": "text", "aliases": ['purchaseorder_no']},
+            'Nama Supplier': {"parser": "text", "aliases": ['supplier_name']},
+            'No Bill': {"parser": "text", "aliases": ['bill_no']},
+            'Catatan': {"parser": "text"},
+            'Qty Dipesan Unit': {"parser": "number", "unit": " Buah", "role": "quantity", "aliases": ['Qty Dipesan'],
+                                 "required": True},
+            'Qty Diterima': {"parser": "number", "unit": " Buah", "role": "quantity", "required": True},
+            'Harga': {"parser": "number", "unit": " Buah", "role": "currency", "required": True},
+            'Amount': {"parser": "number", "unit": " Buah", "role": "currency", "aliases": ['amount'],
+                       "required": True},
+            'Sub Total': {"parser": "number", "unit": " Buah", "role": "currency", "required": True},
+            'Diskon': {"parser": "number", "unit": " Buah", "role": "currency", "required": True},
+            'Pajak Total': {"parser": "number", "unit": " Buah", "role": "currency", "aliases": ['Pajak.1'],
+                            "required": True},
+            'Grand Total': {"parser": "number", "unit": " Buah", "role": "currency", "required": True}
+        }
+    },
+    "stock": {
+        "label": "Data Stok",
+        "columns": {
+            'Nama Item': {"parser": "text", "aliases": ['Nama']},
+            'Is Bundle': {"parser": "text", "aliases": ['is_bundle']},
+            'QTY': {"parser": "number", "role": "quantity", "required": True},
+            'Dipesan': {"parser": "number", "role": "quantity", "required": True},
+            'Tersedia': {"parser": "number", "role": "quantity", "required": True},
+            'Harga Jual': {"parser": "number", "role": "currency", "required": True},
+            'HPP': {"parser": "number", "role": "currency", "required": True},
+            'Nilai Persediaan': {"parser": "number", "role": "currency", "required": True}
+        }
+    }
+}
+
+_FORMAT_FIELDS = {'%d': ("day", 2), '%m': ("month", 2), '%Y': ("year", 4), '%H': ("hour", 2), '%M': ("minute", 2),
+                  '%S': ("second", 2)}
+# Teks rupiah yang lebih panjang dari ini dianggap tidak valid
+_MAX_RUPIAH_WIDTH = 40
+_MAX_EXAMPLES = 5
+# Jalur cepat memproses teks per blok baris agar matriks kode karakter tetap kecil
+_BLOCK_ROWS = 65536
+
+
+def columns_with(file_type, **conditions):
+    """
+    Nama kolom baku suatu jenis file yang atributnya cocok, misalnya columns_with("sales", parser="datetime").
+    """
+    return [name for name, spec in SCHEMAS.get(file_type, {}).get("columns", {}).items()
+            if all(spec.get(key) == value for key, value in conditions.items())]
+
+
+def column_aliases(file_type):
+    """
+    Pemetaan alias -> nama kolom baku untuk df.rename.
+    """
+    return {alias: name for name, spec in SCHEMAS.get(file_type, {}).get("columns", {}).items()
+            for alias in spec.get("aliases", [])}
+
+
+def normalize_columns(columns):
+    """
+    Membersihkan nama kolom dari spasi berlebih dan karakter baris baru.
+    """
+    return [re.sub(r'\s+', ' ', str(col)).strip() for col in columns]
+
+
+def _new_entry(parser):
+    return {"parser": parser, "rows": 0, "missing": 0, "bad": 0, "examples": []}
+
+
+def _record(report, column, parser, original, parsed):
+    """
+    Menambahkan hitungan ke laporan: sel kosong di input dihitung 'missing', sel berisi yang
+    gagal diparse dihitung 'bad' (beserta beberapa contoh nilainya).
+    """
+    if report is None:
+        return
+    entry = report.setdefault(column, _new_entry(parser))
+    missing = original.isna().to_numpy()
+    bad = parsed.isna().to_numpy() & ~missing
+    entry["rows"] += len(original)
+    entry["missing"] += int(missing.sum())
+    entry["bad"] += int(bad.sum())
+    if bad.any() and len(entry["examples"]) < _MAX_EXAMPLES:
+        examples = original[bad].astype(str).unique()[:_MAX_EXAMPLES - len(entry["examples"])]
+        entry["examples"].extend(examples.tolist())
+
+
+def _string_mask(series):
+    return series.map(type).eq(str).to_numpy() if series.dtype == object else np.zeros(len(series), dtype=bool)
+
+
+def _fixed_format_layout(fmt):
+    """
+    Posisi karakter setiap komponen untuk format tanggal dengan lebar tetap, atau None jika format
+    memakai direktif selain %d %m %Y %H %M %S.
+    """
+    layout, position, i = {}, 0, 0
+    separators = []
+    while i < len(fmt):
+        if fmt[i] == '%':
+            directive = fmt[i:i + 2]
+            if directive not in _FORMAT_FIELDS:
+                return None
+            field, width = _FORMAT_FIELDS[directive]
+            layout[field] = (position, width)
+            position += width
+            i += 2
+        else:
+            separators.append((position, ord(fmt[i])))
+            position += 1
+            i += 1
+    return {"fields": layout, "separators": separators, "width": position}
+
+
+def _char_codes(text, width):
+    """
+    Array teks -> matriks kode karakter (baris x lebar), dengan 0 sebagai pengisi.
+    """
+    return np.asarray(text, dtype=f'U{width}').view(np.uint32).reshape(len(text), width).astype(np.int64)
+
+
+def _parse_fixed_format(values, layout):
+    """
+    Jalur cepat untuk tanggal berformat tetap (misalnya '%d/%m/%Y %H:%M'): teks diubah menjadi matriks
+    kode karakter dan setiap komponen dihitung dengan aritmetika numpy, tanpa strptime per sel.
+    Mengembalikan (datetime64[ns], mask baris yang cocok dengan format).
+    """
+    width = layout["width"]
+    result = np.full(len(values), np.datetime64('NaT'), dtype='datetime64[ns]')
+    # Teks yang lebih panjang dari format akan terpotong oleh dtype U{width}, jadi panjang asli dicek dulu
+    matched = pd.Series(values, dtype=object).str.len().to_numpy() == width
+    for start in range(0, len(values), _BLOCK_ROWS):
+        block = slice(start, start + _BLOCK_ROWS)
+        codes = _char_codes(values[block], width)
+        ok = matched[block].copy()
+        for position, code in layout["separators"]:
+            ok &= codes[:, position] == code
+        parts = {}
+        for field, (position, field_width) in layout["fields"].items():
+            digits = codes[:, position:position + field_width] - 48
+            ok &= ((digits >= 0) & (digits <= 9)).all(axis=1)
+            parts[field] = (digits * 10 ** np.arange(field_width - 1, -1, -1)).sum(axis=1)
+        if ok.any():
+            parsed = pd.to_datetime(pd.DataFrame({field: part[ok] for field, part in parts.items()}), errors='coerce')
+            result[start + np.flatnonzero(ok)] = parsed.to_numpy(dtype='datetime64[ns]')
+        matched[block] = ok
+    # Komponen di luar rentang (misalnya bulan 13) menjadi NaT dan dianggap tidak cocok
+    return result, matched & ~np.isnat(result)
+
+
+def parse_datetime(series, formats=(), infer=False):
+    """
+    Parsing kolom tanggal. Sel yang sudah bertipe tanggal dipakai apa adanya; teks dicoba dengan
+    setiap format secara berurutan memakai jalur cepat, lalu (jika infer=True) diinfer pandas.
+    Nilai yang tetap gagal menjadi NaT.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.astype('datetime64[ns]')
+    result = np.full(len(series), np.datetime64('NaT'), dtype='datetime64[ns]')
+    is_text = _string_mask(series)
+    others = ~is_text & series.notna().to_numpy()
+    if others.any():
+        # Sel tanggal asli dari Excel (datetime) atau tipe lain yang masih bisa dikenali pandas
+        result[others] = pd.to_datetime(series[others], errors='coerce').to_numpy(dtype='datetime64[ns]')
+
+    remaining = np.flatnonzero(is_text)
+    if len(remaining):
+        text = series.to_numpy()[remaining]
+        # Nilai unik saja yang diparse; data transaksi banyak mengulang tanggal/menit yang sama
+        codes, uniques = pd.factorize(text)
+        parsed = np.full(len(uniques), np.datetime64('NaT'), dtype='datetime64[ns]')
+        todo = np.arange(len(uniques))
+        for fmt in formats:
+            layout = _fixed_format_layout(fmt)
+            if layout is not None:
+                values, matched = _parse_fixed_format(uniques[todo], layout)
+                parsed[todo[matched]] = values[matched]
+                todo = todo[~matched]
+            if len(todo):
+                # Sisa teks (misalnya tanggal tanpa nol di depan, '1/2/2024') diparse strptime dengan format yang sama
+                values = pd.to_datetime(pd.Series(uniques[todo]), format=fmt, errors='coerce').to_numpy(
+                    dtype='datetime64[ns]')
+                matched = ~np.isnat(values)
+                parsed[todo[matched]] = values[matched]
+                todo = todo[~matched]
+        if infer and len(todo):
+            parsed[todo] = pd.to_datetime(pd.Series(uniques[todo]), errors='coerce').to_numpy(dtype='datetime64[ns]')
+        result[remaining] = parsed[codes]
+    return pd.Series(result, index=series.index, name=series.name)
+
+
+def parse_number(series, unit=None):
+    """
+    Parsing kolom angka biasa. Akhiran satuan (misalnya ' Buah') dibuang dari sel teks;
+    sel yang tidak bisa diubah menjadi angka menjadi NaN.
+    """
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(float)
+    values = series
+    if unit:
+        is_text = _string_mask(series)
+        if is_text.any():
+            values = series.copy()
+            values[is_text] = series[is_text].str.replace(unit, '', regex=False)
+    return pd.to_numeric(values, errors='coerce').astype(float)
+
+
+def _rupiah_classes(locale):
+    """
+    Tabel kelas karakter untuk parser rupiah: 0 tidak dikenal, 1 digit, 2 diabaikan (pemisah ribuan,
+    spasi, pengisi), 3 pemisah desimal, 4 tanda minus, 5 huruf simbol mata uang.
+    """
+    table = np.zeros(256, dtype=np.uint8)
+    table[ord('0'):ord('9') + 1] = 1
+    for char in {locale["thousands"], ' ', '\xa0', '\t', '\0'}:
+        table[ord(char)] = 2
+    table[ord(locale["decimal"])] = 3
+    table[ord('-')] = 4
+    for char in locale["symbol"]:
+        table[ord(char)] = 5
+    return table
+
+
+def _rupiah_fast(text, locale):
+    """
+    Parser rupiah satu lintasan untuk array teks: kolom-kolom karakter disapu dari kiri ke kanan
+    sekali saja untuk semua baris sekaligus, sambil merangkai digit menjadi satu bilangan bulat dan
+    menghitung digit di belakang pemisah desimal. Hasilnya bilangan bulat / 10^(digit desimal).
+    Simbol mata uang hanya boleh muncul utuh satu kali dan tanda minus satu kali, keduanya sebelum digit
+    pertama (misalnya "Rp -1.234" atau "-Rp1.234"). Teks yang memuat karakter lain, simbol atau minus di
+    posisi lain, lebih dari satu pemisah desimal, atau lebih dari 18 digit menjadi NaN.
+    """
+    width = max(int(np.char.str_len(text).max()), 1)
+    codes = np.asarray(text, dtype=f'U{width}').view(np.uint32).reshape(len(text), width).T
+    classes = _rupiah_classes(locale)[np.minimum(codes, 255)]
+    classes[codes > 255] = 0
+
+    size = len(text)
+    mantissa = np.zeros(size, dtype=np.int64)
+    digits = np.zeros(size, dtype=np.int64)
+    fraction = np.zeros(size, dtype=np.int64)
+    decimals = np.zeros(size, dtype=np.int64)
+    minus = np.zeros(size, dtype=np.int64)
+    unknown = np.zeros(size, dtype=bool)
+    symbol = np.array([ord(char) for char in locale["symbol"]], dtype=np.uint32)
+    # Jumlah huruf simbol yang sudah cocok berurutan, dan apakah karakter sebelumnya huruf simbol
+    matched = np.zeros(size, dtype=np.int64)
+    in_symbol = np.zeros(size, dtype=bool)
+    for column in range(width):
+        kind = classes[column]
+        is_digit = kind == 1
+        mantissa = np.where(is_digit, mantissa * 10 + (codes[column].astype(np.int64) - 48), mantissa)
+        before_number = (digits == 0) & (decimals == 0)
+        is_symbol = kind == 5
+        is_minus = kind == 4
+        unknown |= (kind == 0) | (is_minus & ~before_number)
+        if is_symbol.any():
+            symbol_ok = is_symbol & before_number & (matched < len(symbol)) & ((matched == 0) | in_symbol) & \
+                (codes[column] == symbol[np.minimum(matched, len(symbol) - 1)])
+            unknown |= is_symbol & ~symbol_ok
+            matched += symbol_ok
+            in_symbol = symbol_ok
+        elif in_symbol.any():
+            in_symbol = np.zeros(size, dtype=bool)
+        digits += is_digit
+        fraction += is_digit & (decimals > 0)
+        decimals += kind == 3
+        minus += is_minus
+
+    complete_symbol = (matched == 0) | (matched == len(symbol))
+    valid = ~unknown & complete_symbol & (digits > 0) & (digits <= 18) & (decimals <= 1) & (minus <= 1)
+    values = mantissa / 10.0 ** fraction
+    values = np.where(minus > 0, -values, values)
+    return np.where(valid, values, np.nan)
+
+
+def parse_rupiah(series, locale=None):
+    """
+    Parsing kolom rupiah berformat "Rp 1.234.567,89". Sel yang sudah berupa angka dipakai apa adanya;
+    teks diparse dengan jalur cepat satu lintasan per blok baris. Teks yang tidak valid menjadi NaN.
+    """
+    locale = locale or RUPIAH_LOCALE
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(float)
+    is_text = _string_mask(series)
+    result = pd.to_numeric(series.where(~is_text), errors='coerce').astype(float).to_numpy()
+    positions = np.flatnonzero(is_text)
+    if len(positions):
+        text = series.to_numpy()[positions].astype(str)
+        # Teks yang sangat panjang pasti bukan nilai rupiah; dibiarkan NaN agar lebar matriks tetap kecil
+        short = np.flatnonzero(np.char.str_len(text) <= _MAX_RUPIAH_WIDTH)
+        for start in range(0, len(short), _BLOCK_ROWS):
+            block = short[start:start + _BLOCK_ROWS]
+            result[positions[block]] = _rupiah_fast(text[block], locale)
+    return pd.Series(result, index=series.index, name=series.name)
+
+
+def apply_schema(df, file_type, report=None):
+    """
+    Menerapkan skema ke DataFrame mentah: normalisasi nama kolom, alias, pemeriksaan kolom wajib,
+    lalu parsing setiap kolom bertipe. Kolom angka/rupiah yang kosong atau gagal diparse diisi 0.
+
+    Jika `report` (dict) diberikan, hitungan per kolom ditambahkan ke dalamnya, sehingga laporan
+    bisa diakumulasi lintas potongan (chunk) pada ingest streaming.
+    """
+    schema = SCHEMAS[file_type]
+    df.columns = normalize_columns(df.columns)
+    df = df.rename(columns=column_aliases(file_type))
+
+    missing = [name for name, spec in schema["columns"].items() if spec.get("required") and name not in df.columns]
+    if missing:
+        raise KeyError(f"Kolom {', '.join(repr(name) for name in missing)} tidak ditemukan di {schema['label']} "
+                       f"setelah pembersihan dan penamaan ulang.")
+
+    for name, spec in schema["columns"].items():
+        if name not in df.columns or spec["parser"] == "text":
+            continue
+        original = df[name]
+        if spec["parser"] == "datetime":
+            parsed = parse_datetime(original, spec.get("formats", ()), spec.get("infer", False))
+            _record(report, name, spec["parser"], original, parsed)
+            df[name] = parsed
+        else:
+            if spec["parser"] == "rupiah":
+                parsed = parse_rupiah(original, schema.get("currency"))
+            else:
+                parsed = parse_number(original, spec.get("unit"))
+            _record(report, name, spec["parser"], original, parsed)
+            df[name] = parsed.fillna(0)
+    return df
+
+
+def report_frame(report):
+    """
+    Laporan parsing sebagai DataFrame (satu baris per kolom) untuk ditampilkan atau diekspor.
+    """
+    rows = [{"Kolom": column, "Parser": entry["parser"], "Baris": entry["rows"], "Kosong": entry["missing"],
+             "Gagal": entry["bad"], "Contoh Gagal": ", ".join(entry["examples"])}
+            for column, entry in (report or {}).items()]
+    return pd.DataFrame(rows, columns=["Kolom", "Parser", "Baris", "Kosong", "Gagal", "Contoh Gagal"])
@@ -0,0 +1,97 @@
+import datetime
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import schemas
+import synthetic_data
+
+SALES_FORMATS = schemas.SCHEMAS["sales"]["columns"]['Tanggal']["formats"]
+
+
+class ParseRupiahTest(unittest.TestCase):
+
+    def assertParsed(self, values, expected):
+        parsed = schemas.parse_rupiah(pd.Series(values, dtype=object))
+        np.testing.assert_array_equal(parsed.to_numpy(), np.asarray(expected, dtype='float64'))
+
+    def test_fast_path(self):
+        self.assertParsed(['Rp 1.234.567,89', 'Rp1.000', 'Rp 0,5', '1.234', 'Rp\xa0250.000,00', ',5'],
+                          [1234567.89, 1000.0, 0.5, 1234.0, 250000.0, 0.5])
+
+    def test_sign_only_before_first_digit(self):
+        self.assertParsed(['Rp -1.234,5', '-Rp 1.234,5', '-Rp1.234,5'], [-1234.5] * 3)
+        self.assertParsed(['12-3', 'Rp 1.234-', 'Rp 1,-5', '--5', '-'], [np.nan] * 5)
+
+    def test_symbol_only_once_and_complete(self):
+        self.assertParsed(['RpRp 5', 'Rpp 5', 'RRp 5', 'R 5', 'p 5', 'Rp 5 Rp', '5 Rp', 'R-p 5', 'rp 5'],
+                          [np.nan] * 9)
+
+    def test_malformed_text(self):
+        self.assertParsed(['Rp 1,2,3', 'Rp', 'Rp abc', 'Rp ' + '9' * 19, 'Rp ' + '1' * 50], [np.nan] * 5)
+
+    def test_numeric_cells_are_kept(self):
+        # Sel angka asli dari Excel dipakai apa adanya, termasuk titik desimalnya
+        self.assertParsed([1500, 'Rp 2.000', None, 12.5, True], [1500.0, 2000.0, np.nan, 12.5, 1.0])
+        parsed = schemas.parse_rupiah(pd.Series([1, 2], dtype='int64', name='HPP'))
+        self.assertEqual((parsed.dtype, parsed.name), (np.dtype('float64'), 'HPP'))
+
+
+class ParseDatetimeTest(unittest.TestCase):
+
+    def parse(self, values, formats=SALES_FORMATS, infer=False):
+        return schemas.parse_datetime(pd.Series(values, dtype=object), formats, infer).tolist()
+
+    def test_fixed_format_fast_path(self):
+        self.assertEqual(self.parse(['05/01/2024 10:30', '31/12/2023 23:59', '05/01/2024 10:30']),
+                         [pd.Timestamp('2024-01-05 10:30'), pd.Timestamp('2023-12-31 23:59'),
+                          pd.Timestamp('2024-01-05 10:30')])
+
+    def test_strptime_fallback_with_same_format(self):
+        # Tanpa nol di depan lebarnya tidak tetap, sehingga diparse strptime dengan format yang sama
+        self.assertEqual(self.parse(['5/1/2024 9:05']), [pd.Timestamp('2024-01-05 09:05')])
+
+    def test_invalid_components_are_nat(self):
+        self.assertTrue(all(pd.isna(value) for value in self.parse(['32/01/2024 10:00', '05/13/2024 10:00',
+                                                                    '05-01-2024 10:00', 'kemarin'])))
+
+    def test_infer_only_when_enabled(self):
+        self.assertTrue(pd.isna(self.parse(['2024-01-05'])[0]))
+        self.assertEqual(self.parse(['2024-01-05'], infer=True), [pd.Timestamp('2024-01-05')])
+
+    def test_datetime_cells_are_kept(self):
+        self.assertEqual(self.parse([datetime.datetime(2024, 1, 5, 8, 0), '05/01/2024 10:30', None]),
+                         [pd.Timestamp('2024-01-05 08:00'), pd.Timestamp('2024-01-05 10:30'), pd.NaT])
+
+
+class ParseReportTest(unittest.TestCase):
+
+    def test_bad_and_missing_cells_are_counted(self):
+        df = synthetic_data.generate(20, seed=4)["sales"]
+        df['HPP'] = df['HPP'].astype(object)
+        df.loc[0, 'HPP'] = 'Rp 12-3'
+        df.loc[1, 'HPP'] = None
+        df['Tanggal'] = df['Tanggal'].astype(object)
+        df.loc[2, 'Tanggal'] = 'bukan tanggal'
+        report = {}
+        # Laporan diakumulasi lintas potongan, seperti ingest streaming
+        for chunk in (df.iloc[:10].copy(), df.iloc[10:].copy()):
+            cleaned = schemas.apply_schema(chunk, "sales", report)
+        self.assertEqual(len(cleaned), 10)
+
+        hpp, dates = report['HPP'], report['Tanggal']
+        self.assertEqual((hpp["rows"], hpp["missing"], hpp["bad"], hpp["examples"]), (20, 1, 1, ['Rp 12-3']))
+        self.assertEqual((dates["rows"], dates["missing"], dates["bad"], dates["examples"]),
+                         (20, 0, 1, ['bukan tanggal']))
+        self.assertEqual(schemas.report_frame(report).set_index("Kolom").loc['HPP', "Gagal"], 1)
+
+    def test_bad_numbers_become_zero(self):
+        df = synthetic_data.generate(5, seed=4)["sales"]
+        df['HPP'] = df['HPP'].astype(object)
+        df.loc[0, 'HPP'] = 'RpRp 5'
+        self.assertEqual(schemas.apply_schema(df, "sales")['HPP'].iloc[0], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,335 @@
+"""
+Sketsa harian untuk top-N dan jumlah unik perkiraan pada dimensi berkardinalitas tinggi.
+
+Top-N per Nama Barang, SKU, Salesman atau Nama Toko secara eksak berarti groupby dan sort atas semua
+baris terpilih pada setiap perubahan filter. Modul ini membangun, sekali per dataset, sketsa kecil per
+hari yang bisa digabung (mergeable) untuk rentang tanggal mana pun:
+
+- Ringkasan heavy-hitter: per hari paling banyak SKETCH_TOP_CAPACITY kunci dengan QTY terbesar,
+  ditambah QTY terbesar yang dibuang hari itu. Seperti ringkasan Space-Saving yang digabung, kunci
+  yang tidak tercatat pada suatu hari paling banyak bernilai ambang hari tersebut, sehingga QTY
+  jendela setiap kandidat punya batas bawah (jumlah nilai tercatat) dan batas atas. Batas ini hanya
+  berlaku untuk nilai >= 0, sehingga QTY bersih per (hari, kunci) dipisah menjadi bagian penjualan
+  dan bagian retur (QTY negatif, disimpan sebagai nilainya yang positif) dengan ringkasan masing-masing;
+  batas QTY bersih adalah selisih batas kedua bagian.
+- Count-Min: matriks SKETCH_CM_DEPTH x SKETCH_CM_WIDTH per hari yang membuang kunci, dijumlahkan per
+  jendela; perkiraannya tidak pernah di bawah nilai sebenarnya dan dipakai untuk mengetatkan batas atas
+  kandidat pada hari-hari tersebut (hari tanpa kunci terbuang sudah eksak).
+- HyperLogLog: register 2^SKETCH_HLL_PRECISION per hari untuk jumlah SKU dan pelanggan (Nama Toko) unik;
+  gabungan jendela adalah maksimum register, galat standar relatif 1.04 / sqrt(jumlah register).
+
+Jika per hari tidak ada kunci yang dibuang (kardinalitas harian <= kapasitas), top-N dari sketsa sama
+persis dengan hasil eksak. Sketsa hanya dipartisi per hari: seleksi dengan filter dimensi lain harus
+dijawab secara eksak oleh pemanggil.
+
+Modul ini tidak bergantung pada Streamlit.
+"""
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+DAY_COLUMN = 'Tanggal'
+MEASURE = 'QTY'
+# Dimensi top-N beserta labelnya di dashboard
+TOP_DIMENSIONS = {'Nama Barang': 'Produk', 'SKU': 'SKU', 'Salesman': 'Salesman', 'Nama Toko': 'Toko'}
+# Dimensi jumlah unik beserta labelnya di dashboard
+DISTINCT_DIMENSIONS = {'SKU': 'SKU Terjual', 'Nama Toko': 'Pelanggan (Toko)'}
+UPPER_COLUMN = 'QTY Maksimum'
+
+SKETCH_TOP_CAPACITY = int(os.environ.get("SKETCH_TOP_CAPACITY", "200"))
+SKETCH_CM_WIDTH = int(os.environ.get("SKETCH_CM_WIDTH", "512"))
+SKETCH_CM_DEPTH = int(os.environ.get("SKETCH_CM_DEPTH", "4"))
+# 12 bit = 4096 register per hari, galat standar ~1,6%; minimal 11 agar sisa hash muat di mantissa float64
+SKETCH_HLL_PRECISION = int(os.environ.get("SKETCH_HLL_PRECISION", "12"))
+
+
+def _keys(series):
+    """
+    (nilai unik sebagai teks, kode per baris dengan -1 untuk nilai kosong).
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return np.asarray(series.cat.categories.astype(str), dtype=object), series.cat.codes.to_numpy()
+    codes, uniques = pd.factorize(series)
+    return np.asarray(pd.Index(uniques).astype(str), dtype=object), codes
+
+
+def _hashes(keys):
+    # Hash 64-bit yang stabil antar proses (pandas memakai kunci hash tetap)
+    return pd.util.hash_array(keys)
+
+
+def _countmin_index(hashes, width, depth):
+    """
+    Kolom Count-Min per baris sketsa (depth x jumlah kunci), dari dua paruh hash 64-bit (Kirsch-Mitzenmacher).
+    """
+    low, high = hashes & np.uint64(0xFFFFFFFF), hashes >> np.uint64(32)
+    rows = np.arange(depth, dtype=np.uint64)[:, None]
+    return ((low[None, :] + rows * high[None, :]) % np.uint64(width)).astype(np.int64)
+
+
+def _hll_slots(hashes, precision):
+    """
+    (indeks register, rank) per kunci: bit teratas memilih register, rank = posisi bit 1 pertama sisanya.
+    """
+    rest_bits = 64 - precision
+    index = (hashes >> np.uint64(rest_bits)).astype(np.int64)
+    rest = (hashes & np.uint64((1 << rest_bits) - 1)).astype(np.float64)
+    # frexp memberi panjang bit untuk nilai > 0 (eksak karena rest_bits <= 53) dan 0 untuk nol
+    bit_length = np.frexp(rest)[1]
+    return index, (rest_bits - bit_length + 1).astype(np.uint8)
+
+
+def hll_estimate(registers):
+    """
+    Perkiraan kardinalitas HyperLogLog dari satu set register, dengan koreksi linear counting
+    untuk kardinalitas kecil.
+    """
+    m = len(registers)
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m * m / np.sum(np.ldexp(1.0, -registers.astype(np.int64)))
+    zeros = int(np.count_nonzero(registers == 0))
+    if estimate <= 2.5 * m and zeros:
+        return m * math.log(m / zeros)
+    return float(estimate)
+
+
+class _HeavyHitters:
+    """
+    Ringkasan heavy-hitter per hari untuk satu dimensi dan satu bagian QTY (semua nilai >= 0), dengan
+    Count-Min hanya untuk hari yang membuang kunci (truncated_days). Kandidat disimpan terurut per hari;
+    offsets[i]:offsets[i + 1] adalah kandidat hari ke-i.
+    """
+
+    def __init__(self, key_count, offsets, candidate_days, candidate_keys, candidate_qty, dropped, day_totals,
+                 truncated_days, countmin, countmin_index):
+        self.key_count = key_count
+        self.offsets = offsets
+        self.candidate_days = candidate_days
+        self.candidate_keys = candidate_keys
+        self.candidate_qty = candidate_qty
+        self.dropped = dropped
+        self.day_totals = day_totals
+        self.truncated_days = truncated_days
+        self.countmin = countmin
+        self.countmin_index = countmin_index
+
+    @property
+    def nbytes(self):
+        arrays = (self.offsets, self.candidate_days, self.candidate_keys, self.candidate_qty, self.dropped,
+                  self.day_totals, self.truncated_days, self.countmin, self.countmin_index)
+        return sum(array.nbytes for array in arrays)
+
+    def candidates(self, start, end):
+        return np.unique(self.candidate_keys[self.offsets[start]:self.offsets[end]])
+
+    def truncated(self, start, end):
+        """
+        Indeks hari (relatif terhadap start) yang membuang kunci pada hari start:end.
+        """
+        first, last = self.truncated_days.searchsorted([start, end])
+        return self.truncated_days[first:last] - start
+
+    def bounds(self, start, end, keys):
+        """
+        (batas bawah, batas atas) QTY bagian ini untuk kode kunci keys pada hari start:end.
+        """
+        first, last = self.offsets[start], self.offsets[end]
+        window_keys, qty = self.candidate_keys[first:last], self.candidate_qty[first:last]
+        days = self.candidate_days[first:last] - start
+        size = self.key_count
+        lower = np.bincount(window_keys, weights=qty, minlength=size)[keys]
+        # Hari tempat kunci tidak tercatat menyumbang paling banyak ambang hari tersebut
+        dropped = self.dropped[start:end]
+        slack = dropped.sum() - np.bincount(window_keys, weights=dropped[days], minlength=size)[keys]
+        # Pada hari yang membuang kunci, batas atas juga dibatasi perkiraan Count-Min hari-hari tersebut
+        truncated_day = np.zeros(end - start, dtype=bool)
+        truncated_day[self.truncated(start, end)] = True
+        truncated_lower = np.bincount(window_keys, weights=qty * truncated_day[days], minlength=size)[keys]
+        truncated_upper = truncated_lower + slack
+        first, last = self.truncated_days.searchsorted([start, end])
+        if first < last:
+            countmin = self.countmin[first:last].sum(axis=0)
+            estimate = countmin[np.arange(len(self.countmin_index))[:, None], self.countmin_index[:, keys]]
+            truncated_upper = np.maximum(np.minimum(truncated_upper, estimate.min(axis=0)), truncated_lower)
+        return lower, lower + (truncated_upper - truncated_lower)
+
+    def unseen_max(self, start, end):
+        """
+        QTY maksimum bagian ini untuk kunci yang bukan kandidat pada hari start:end.
+        """
+        return float(self.dropped[start:end].sum())
+
+    def countmin_error(self, start, end):
+        """
+        Galat Count-Min e/width x total QTY bagian ini pada hari yang membuang kunci.
+        """
+        truncated_total = self.day_totals[start:end][self.truncated(start, end)].sum()
+        return math.e / self.countmin.shape[2] * float(truncated_total)
+
+
+class DailySketches:
+    """
+    Sketsa per hari untuk satu dataset penjualan. Dibagikan antar sesi lewat dataset_registry dan
+    diperlakukan read-only; window() menggabungkan hari-hari dalam rentang tanggal.
+    """
+
+    def __init__(self, days, totals, keys, heavy, registers, width, depth, precision):
+        self.days = days
+        self.totals = totals
+        self.keys = keys
+        self.heavy = heavy
+        self.registers = registers
+        self.width = width
+        self.depth = depth
+        self.precision = precision
+
+    @classmethod
+    def build(cls, df_sales, capacity=None, width=None, depth=None, precision=None):
+        """
+        Membangun sketsa dari data penjualan (tanpa filter). Dimensi yang tidak ada di frame dilewati.
+        """
+        capacity = SKETCH_TOP_CAPACITY if capacity is None else capacity
+        width = SKETCH_CM_WIDTH if width is None else width
+        depth = SKETCH_CM_DEPTH if depth is None else depth
+        precision = SKETCH_HLL_PRECISION if precision is None else precision
+
+        dates = df_sales[DAY_COLUMN].dt.normalize().to_numpy() if DAY_COLUMN in df_sales.columns else \
+            np.array([], dtype='datetime64[ns]')
+        valid = ~np.isnat(dates)
+        days, day_codes = np.unique(dates[valid], return_inverse=True)
+        qty = df_sales[MEASURE].to_numpy(dtype='float64')[valid] if MEASURE in df_sales.columns else \
+            np.zeros(int(valid.sum()))
+        totals = np.bincount(day_codes, weights=qty, minlength=len(days))
+
+        top_keys, heavy, registers = {}, {}, {}
+        for column in dict.fromkeys(list(TOP_DIMENSIONS) + list(DISTINCT_DIMENSIONS)):
+            if column not in df_sales.columns:
+                continue
+            keys, key_codes = _keys(df_sales[column])
+            key_codes = key_codes[valid]
+            rows = key_codes >= 0
+            # QTY eksak per (hari, kunci); sketsa dibangun dari pasangan ini, bukan per baris
+            pairs, inverse = np.unique(day_codes[rows].astype(np.int64) * len(keys) + key_codes[rows],
+                                       return_inverse=True)
+            pair_qty = np.bincount(inverse, weights=qty[rows], minlength=len(pairs))
+            pair_days, pair_keys = pairs // max(len(keys), 1), pairs % max(len(keys), 1)
+            hashes = _hashes(keys)
+            if column in TOP_DIMENSIONS:
+                # (penjualan, retur): QTY bersih negatif per (hari, kunci) disimpan sebagai nilainya yang positif
+                returns = pair_qty < 0
+                top_keys[column] = keys
+                heavy[column] = tuple(
+                    _build_heavy(hashes, pair_days[part], pair_keys[part], sign * pair_qty[part], len(keys),
+                                 len(days), capacity, width, depth)
+                    for part, sign in ((~returns, 1), (returns, -1)))
+            if column in DISTINCT_DIMENSIONS:
+                index, rank = _hll_slots(hashes, precision)
+                flat = np.zeros(len(days) << precision, dtype=np.uint8)
+                np.maximum.at(flat, (pair_days << precision) + index[pair_keys], rank[pair_keys])
+                registers[column] = flat.reshape(len(days), 1 << precision)
+        return cls(days, totals, top_keys, heavy, registers, width, depth, precision)
+
+    @property
+    def nbytes(self):
+        keys = sum(int(pd.Series(keys).memory_usage(deep=True)) for keys in self.keys.values())
+        return (self.days.nbytes + self.totals.nbytes + keys
+                + sum(part.nbytes for parts in self.heavy.values() for part in parts)
+                + sum(array.nbytes for array in self.registers.values()))
+
+    def window(self, start_date=None, end_date=None):
+        """
+        Gabungan sketsa untuk rentang hari (inklusif).
+        """
+        start = 0 if start_date is None else int(self.days.searchsorted(
+            np.datetime64(pd.Timestamp(start_date).normalize()), side='left'))
+        end = len(self.days) if end_date is None else int(self.days.searchsorted(
+            np.datetime64(pd.Timestamp(end_date).normalize()), side='right'))
+        return SketchWindow(self, start, max(start, end))
+
+
+def _build_heavy(hashes, pair_days, pair_keys, pair_qty, key_count, day_count, capacity, width, depth):
+    # Urutkan per hari lalu QTY menurun (kunci menaik untuk nilai sama), agar kandidat per hari adalah awal bloknya
+    order = np.lexsort((pair_keys, -pair_qty, pair_days))
+    pair_days, pair_keys, pair_qty = pair_days[order], pair_keys[order], pair_qty[order]
+    starts = np.searchsorted(pair_days, np.arange(day_count), side='left')
+    rank = np.arange(len(pair_days)) - starts[pair_days]
+    keep = rank < capacity
+    # QTY terbesar yang dibuang per hari adalah pasangan pada peringkat ke-capacity
+    dropped = np.zeros(day_count)
+    first_dropped = rank == capacity
+    dropped[pair_days[first_dropped]] = pair_qty[first_dropped]
+
+    # Count-Min hanya untuk hari yang membuang kunci (ditentukan dari peringkat, bukan dari nilai yang
+    # dibuang); hari lain sudah eksak lewat kandidatnya
+    truncated_days = pair_days[first_dropped]
+    position = np.full(day_count, -1)
+    position[truncated_days] = np.arange(len(truncated_days))
+    truncated = position[pair_days] >= 0
+    countmin_index = _countmin_index(hashes, width, depth)
+    countmin = np.zeros(len(truncated_days) * depth * width)
+    for row in range(depth):
+        flat = (position[pair_days[truncated]] * depth + row) * width + countmin_index[row, pair_keys[truncated]]
+        countmin += np.bincount(flat, weights=pair_qty[truncated], minlength=len(countmin))
+    candidate_days = pair_days[keep]
+    return _HeavyHitters(key_count, np.searchsorted(candidate_days, np.arange(day_count + 1), side='left'),
+                         candidate_days, pair_keys[keep], pair_qty[keep], dropped,
+                         np.bincount(pair_days, weights=pair_qty, minlength=day_count), truncated_days,
+                         countmin.reshape(len(truncated_days), depth, width), countmin_index)
+
+
+class SketchWindow:
+    """
+    Sketsa yang digabung untuk hari start:end (indeks pada DailySketches.days).
+    """
+
+    def __init__(self, sketches, start, end):
+        self.sketches = sketches
+        self.start = start
+        self.end = end
+
+    @property
+    def total(self):
+        return float(self.sketches.totals[self.start:self.end].sum())
+
+    def top(self, dimension, top=10):
+        """
+        Top-N kunci berdasarkan QTY pada jendela: kolom dimensi, QTY (batas bawah; eksak jika tidak ada
+        kunci yang dibuang) dan QTY Maksimum (batas atas). Terurut menurun berdasarkan QTY, lalu kunci.
+        """
+        sales, returns = self.sketches.heavy[dimension]
+        candidates = np.union1d(sales.candidates(self.start, self.end), returns.candidates(self.start, self.end))
+        if not len(candidates):
+            return pd.DataFrame({dimension: pd.Series(dtype=object), MEASURE: pd.Series(dtype='float64'),
+                                 UPPER_COLUMN: pd.Series(dtype='float64')})
+        sales_lower, sales_upper = sales.bounds(self.start, self.end, candidates)
+        returns_lower, returns_upper = returns.bounds(self.start, self.end, candidates)
+        lower, upper = sales_lower - returns_upper, sales_upper - returns_lower
+
+        table = pd.DataFrame({dimension: self.sketches.keys[dimension][candidates], MEASURE: lower,
+                              UPPER_COLUMN: upper})
+        table = table.sort_values(dimension, kind='stable').sort_values(MEASURE, ascending=False, kind='stable')
+        return table.head(top).reset_index(drop=True)
+
+    def error_bounds(self, dimension):
+        """
+        Batas galat top-N pada jendela: exact (tidak ada kunci yang dibuang), unseen_max (QTY bersih
+        maksimum kunci yang tidak muncul sebagai kandidat) dan countmin_error (galat Count-Min e/width x
+        total QTY penjualan dan retur pada hari yang membuang kunci, berlaku dengan peluang 1 - e^-depth).
+        """
+        parts = self.sketches.heavy[dimension]
+        exact = not any(len(part.truncated(self.start, self.end)) for part in parts)
+        return {"exact": exact, "unseen_max": parts[0].unseen_max(self.start, self.end),
+                "countmin_error": sum(part.countmin_error(self.start, self.end) for part in parts)}
+
+    def distinct(self):
+        """
+        Perkiraan jumlah unik per dimensi: {kolom: (perkiraan, galat standar relatif)}.
+        """
+        relative_error = 1.04 / math.sqrt(1 << self.sketches.precision)
+        result = {}
+        for column, registers in self.sketches.registers.items():
+            window = registers[self.start:self.end]
+            result[column] = (hll_estimate(window.max(axis=0)) if len(window) else 0.0, relative_error)
+        return result
@@ -0,0 +1,63 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import sketches
+
+
+def _sales(days, keys, qty):
+    return pd.DataFrame({'Tanggal': pd.to_datetime(days), 'SKU': keys, 'QTY': np.asarray(qty, dtype='float64')})
+
+
+def _random_sales(rng, rows):
+    return pd.DataFrame({
+        'Tanggal': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 6, rows), 'D'),
+        'SKU': rng.choice(list('ABCDEFGHIJKLMNOP'), rows),
+        # QTY negatif adalah retur
+        'QTY': rng.integers(-20, 30, rows).astype('float64')})
+
+
+class SketchReturnsTest(unittest.TestCase):
+
+    def test_returns_keep_bounds_ordered(self):
+        df = _sales(['2024-01-01'] * 4 + ['2024-01-02'] * 2, ['A', 'B', 'C', 'D', 'C', 'D'], [5, 3, -1, -2, 1, 1])
+        window = sketches.DailySketches.build(df, capacity=2).window()
+        top = window.top('SKU')
+        self.assertEqual(top['SKU'].tolist(), ['A', 'B', 'C', 'D'])
+        self.assertEqual(top['QTY'].tolist(), [5.0, 3.0, 0.0, -1.0])
+        self.assertEqual(top[sketches.UPPER_COLUMN].tolist(), top['QTY'].tolist())
+        self.assertTrue(window.error_bounds('SKU')['exact'])
+
+    def test_truncation_is_detected_when_dropped_qty_is_not_positive(self):
+        # Kunci ketiga hari itu bernilai 0; hari tetap tercatat membuang kunci
+        df = _sales(['2024-01-01'] * 3, ['A', 'B', 'C'], [5, 3, 0])
+        bounds = sketches.DailySketches.build(df, capacity=2).window().error_bounds('SKU')
+        self.assertFalse(bounds['exact'])
+        self.assertEqual(bounds['unseen_max'], 0.0)
+
+    def test_bounds_hold_with_returns(self):
+        rng = np.random.default_rng(0)
+        for _ in range(200):
+            df = _random_sales(rng, int(rng.integers(1, 300)))
+            daily = sketches.DailySketches.build(df, capacity=int(rng.integers(1, 6)), width=int(rng.integers(2, 16)),
+                                                 depth=2)
+            start, end = pd.Timestamp('2024-01-01') + pd.to_timedelta(np.sort(rng.integers(0, 6, 2)), 'D')
+            window = daily.window(start, end)
+            exact = df[df['Tanggal'].between(start, end)].groupby('SKU')['QTY'].sum()
+            top = window.top('SKU', top=len(exact) + 1)
+            bounds = window.error_bounds('SKU')
+
+            truth = exact.reindex(top['SKU']).fillna(0.0).to_numpy()
+            self.assertTrue(np.all(top['QTY'].to_numpy() <= truth + 1e-9))
+            self.assertTrue(np.all(truth <= top[sketches.UPPER_COLUMN].to_numpy() + 1e-9))
+            unseen = exact.drop(top['SKU'], errors='ignore')
+            self.assertTrue(np.all(unseen.to_numpy() <= bounds['unseen_max'] + 1e-9))
+            if bounds['exact']:
+                expected = exact.sort_index().sort_values(ascending=False, kind='stable')
+                self.assertEqual(top['SKU'].tolist(), expected.index.tolist())
+                self.assertEqual(top['QTY'].tolist(), expected.tolist())
+
+
+if __name__ == "__main__":
+    unittest.main()
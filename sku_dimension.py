@@ -0,0 +1,120 @@
+"""
+Tabel dimensi SKU dengan kunci integer padat, dibangun sekali per dataset.
+
+Setiap SKU yang muncul di data penjualan, inbound atau stok mendapat SKU_ID 0..n-1, diurutkan
+berdasarkan teks SKU, beserta Nama Item dan Category (kemunculan pertama di data stok) serta atribut
+hasil parsing SKU. Kolom SKU pada frame fakta bertipe category, sehingga kode kategorinya sudah
+merupakan kunci integer per frame; encode() cukup memetakan kategori tersebut ke SKU_ID sekali per
+tipe kategori, lalu mengiris kode per baris. Agregasi per SKU menjadi np.bincount atas SKU_ID dan
+join ke nama/atribut menjadi pengindeksan array, tanpa merge atau drop_duplicates berbasis teks.
+
+Karena SKU_ID terurut sesuai teks SKU, hasil per SKU yang diiris dalam urutan SKU_ID sudah terurut
+berdasarkan SKU, sama seperti merge pandas dan ORDER BY di sql_backend.
+"""
+import numpy as np
+import pandas as pd
+
+from sku_parser import SKU_DEFAULTS
+
+NAME_COLUMNS = ['Nama Item', 'Category']
+# Atribut hasil parsing SKU; Category ikut NAME_COLUMNS karena diambil dari data stok
+ATTRIBUTE_COLUMNS = [col for col in SKU_DEFAULTS if col != 'Category']
+
+
+def _unique_skus(series):
+    values = series.cat.categories if isinstance(series.dtype, pd.CategoricalDtype) else series.dropna().unique()
+    return pd.Index(values).astype(str)
+
+
+def _first_rows(ids, valid=None):
+    """
+    (SKU_ID, posisi baris pertama) untuk setiap SKU_ID di ids, hanya atas baris yang valid.
+    """
+    positions = np.flatnonzero((ids >= 0) if valid is None else (ids >= 0) & valid)
+    found, first = np.unique(ids[positions], return_index=True)
+    return found, positions[first]
+
+
+class SkuDimension:
+    """
+    Dimensi SKU untuk satu kombinasi dataset penjualan, stok dan inbound. Nilai dibagikan antar sesi
+    lewat dataset_registry dan diperlakukan read-only.
+    """
+
+    def __init__(self, skus, table):
+        self.skus = skus
+        self.index = pd.Index(skus)
+        self.table = table
+        self._remaps = {}
+
+    @classmethod
+    def build(cls, df_sales=None, df_stock=None, df_inbound=None):
+        """
+        Membangun dimensi dari frame yang tersedia (tanpa filter). Frame yang None atau tanpa kolom SKU dilewati.
+        """
+        frames = [df for df in (df_sales, df_stock, df_inbound) if df is not None and 'SKU' in df.columns]
+        skus = pd.Index([]).astype(str)
+        for df in frames:
+            skus = skus.union(_unique_skus(df['SKU']))
+        dimension = cls(np.asarray(skus.sort_values(), dtype=object), None)
+
+        columns = {'SKU': dimension.skus}
+        # Nama dan kategori: nilai non-null pertama per SKU di data stok (urutan baris file)
+        stock_ids = dimension.encode(df_stock['SKU']) if df_stock is not None and 'SKU' in df_stock.columns else None
+        for column in NAME_COLUMNS:
+            values = columns[column] = np.full(len(dimension), None, dtype=object)
+            if stock_ids is not None and column in df_stock.columns:
+                column_values = df_stock[column].to_numpy(dtype=object)
+                found, rows = _first_rows(stock_ids, pd.notna(column_values))
+                values[found] = column_values[rows]
+        # Atribut hasil parsing sama untuk SKU yang sama di semua frame; baris pertama per SKU di frame
+        # pertama yang memuatnya dipakai
+        for column in ATTRIBUTE_COLUMNS:
+            columns[column] = np.full(len(dimension), None, dtype=object)
+        for df in frames:
+            attributes = [column for column in ATTRIBUTE_COLUMNS if column in df.columns]
+            if not attributes:
+                continue
+            found, rows = _first_rows(dimension.encode(df['SKU']))
+            for column in attributes:
+                values = columns[column]
+                missing = pd.isna(values[found])
+                values[found[missing]] = df[column].to_numpy(dtype=object)[rows[missing]]
+        dimension.table = pd.DataFrame(columns, index=pd.RangeIndex(len(dimension), name='SKU_ID'))
+        return dimension
+
+    def __len__(self):
+        return len(self.skus)
+
+    @property
+    def nbytes(self):
+        remaps = sum(remap.nbytes for _, remap in self._remaps.values())
+        return int(self.table.memory_usage(index=True, deep=True).sum()) + remaps
+
+    def encode(self, series):
+        """
+        SKU_ID per baris (int64, -1 untuk SKU kosong atau tidak dikenal). Untuk kolom category,
+        pemetaan kategori -> SKU_ID dihitung sekali per tipe kategori dan dipakai ulang oleh
+        semua potongan frame yang berbagi tipe tersebut.
+        """
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            entry = self._remaps.get(id(series.dtype))
+            if entry is None or entry[0] is not series.dtype:
+                remap = np.append(self.index.get_indexer(series.cat.categories.astype(str)), -1)
+                entry = self._remaps[id(series.dtype)] = (series.dtype, remap)
+            # Kode -1 (kosong) mengambil elemen terakhir remap, yaitu -1
+            return entry[1][series.cat.codes.to_numpy()]
+        return self.index.get_indexer(series.astype(str).where(series.notna(), None))
+
+    def totals(self, ids, values):
+        """
+        Jumlah values per SKU_ID (array float64 sepanjang dimensi).
+        """
+        valid = ids >= 0
+        return np.bincount(ids[valid], weights=np.asarray(values, dtype='float64')[valid], minlength=len(self))
+
+    def present(self, ids):
+        """
+        Mask SKU_ID yang muncul setidaknya sekali di ids.
+        """
+        return np.bincount(ids[ids >= 0], minlength=len(self)) > 0
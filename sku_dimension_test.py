@@ -0,0 +1,69 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from sku_dimension import SkuDimension
+
+
+class SkuDimensionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.sales = pd.DataFrame({
+            'SKU': pd.Categorical(['B-2', 'A-1', 'B-2', None, 'D-4']),
+            'QTY': [2, 1, 3, 7, 4],
+            'Season': ['SS', 'FW', 'SS', None, 'FW']
+        })
+        self.stock = pd.DataFrame({
+            'SKU': ['C-3', 'A-1', 'A-1', 'B-2'],
+            'Nama Item': [None, 'Kaos Putih', 'Kaos Lama', 'Celana'],
+            'Category': ['Aksesoris', 'Atasan', 'Atasan', 'Bawahan'],
+            'Season': ['FW', 'XX', 'XX', 'XX']
+        })
+        self.dimension = SkuDimension.build(self.sales, self.stock)
+
+    def test_ids_sorted_by_sku_text(self):
+        self.assertEqual(self.dimension.skus.tolist(), ['A-1', 'B-2', 'C-3', 'D-4'])
+        table = self.dimension.table
+        self.assertEqual(table.index.name, 'SKU_ID')
+        # Nama dan kategori dari nilai non-null pertama di data stok
+        self.assertEqual(table['Nama Item'].tolist(), ['Kaos Putih', 'Celana', None, None])
+        self.assertEqual(table['Category'].tolist(), ['Atasan', 'Bawahan', 'Aksesoris', None])
+        # Atribut diambil dari frame pertama yang memuat SKU tersebut
+        self.assertEqual(table['Season'].tolist(), ['FW', 'SS', 'FW', 'FW'])
+
+    def test_encode_category_and_object_columns(self):
+        expected = [1, 0, 1, -1, 3]
+        self.assertEqual(self.dimension.encode(self.sales['SKU']).tolist(), expected)
+        self.assertEqual(self.dimension.encode(self.sales['SKU'].astype(object)).tolist(), expected)
+        self.assertEqual(self.dimension.encode(pd.Series(['C-3', 'Z-9', None])).tolist(), [2, -1, -1])
+
+    def test_encode_reuses_remap_per_categorical_dtype(self):
+        sales = self.sales['SKU']
+        # Potongan frame berbagi tipe kategori yang sama
+        for chunk in (sales.iloc[:2], sales.iloc[2:]):
+            self.dimension.encode(chunk)
+        self.assertEqual(len(self.dimension._remaps), 1)
+        other = pd.Series(pd.Categorical(['D-4', 'X-0', 'A-1']))
+        self.assertEqual(self.dimension.encode(other).tolist(), [3, -1, 0])
+        self.assertEqual(len(self.dimension._remaps), 2)
+
+    def test_totals_match_groupby(self):
+        ids = self.dimension.encode(self.sales['SKU'])
+        totals = self.dimension.totals(ids, self.sales['QTY'])
+        expected = self.sales.groupby('SKU', observed=False)['QTY'].sum()
+        expected = expected.reindex(self.dimension.skus, fill_value=0).to_numpy(dtype='float64')
+        np.testing.assert_array_equal(totals, expected)
+        # Baris tanpa SKU (QTY 7) tidak masuk ke SKU mana pun
+        self.assertEqual(totals.sum(), self.sales['QTY'].sum() - 7)
+        self.assertEqual(self.dimension.present(ids).tolist(), [True, True, False, True])
+
+    def test_empty_dimension(self):
+        dimension = SkuDimension.build()
+        self.assertEqual(len(dimension), 0)
+        ids = dimension.encode(pd.Series(['A-1']))
+        self.assertEqual(dimension.totals(ids, [5.0]).tolist(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
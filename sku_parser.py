@@ -0,0 +1,144 @@
+import re  # Untuk ekspresi reguler dalam parsing SKU
+
+import numpy as np
+import pandas as pd
+
+# Pola regex yang lebih fleksibel untuk menangani variasi SKU
+# Captures:
+# 1: First alphanumeric block (e.g., ZOZA, Z118, 201A, 202D, Z01)
+# 2: Optional second alphanumeric block (e.g., 118, A, D - if the first part was just 'Z', '201', '202')
+# 3: Year code (2 digits)
+# 4: Season code (3 letters)
+# 5: Product name code (any letters)
+# 6: Color code (3 letters)
+# 7: Size code (2 digits)
+SKU_PATTERN = r'([A-Z0-9]+)([A-Z0-9]+)?([0-9]{2})([A-Z]{3})[- ]([A-Z]+)-([A-Z]{3})([0-9]{2})'
+
+# Kolom hasil parsing beserta nilai default jika kode tidak dikenali
+SKU_DEFAULTS = {
+    "Category": "Unknown Category",
+    "Sub Category": "Unknown Sub Category",
+    "Tahun Produksi": "Unknown Tahun",
+    "Season": "Unknown Musim",
+    "Singkatan Nama Produk": "Unknown Produk",
+    "Warna Produk": "Unknown Warna",
+    "Size Produk": "Unknown Ukuran"
+}
+SKU_COLUMNS = ["Original SKU"] + list(SKU_DEFAULTS)
+
+# Atribut yang langsung diterjemahkan dari satu grup regex (indeks grup -> kolom)
+_DIRECT_GROUPS = {
+    2: "Tahun Produksi",
+    3: "Season",
+    4: "Singkatan Nama Produk",
+    5: "Warna Produk",
+    6: "Size Produk"
+}
+
+
+# --- Fungsi untuk Memparse SKU ---
+def parse_sku(sku, sku_decoder):
+    """
+    Memparse string SKU untuk mengekstrak informasi kategori, tahun, musim, dll.
+    Pola regex ini perlu disesuaikan dengan variasi format SKU Anda.
+    Contoh format SKU yang diberikan: ZOZA21BAS-MIA-TBW35, Z11822BAS LUNA-BWT03, 201A21BAS-CND-ORG02, 202D24BAS-HTR-BLK01
+    """
+    sku_info = {"Original SKU": sku}
+    sku_info.update(SKU_DEFAULTS)
+
+    match = re.match(SKU_PATTERN, sku, re.IGNORECASE)
+
+    if match:
+        parts = match.groups()
+        first_code_part = parts[0].upper()
+        second_code_part = parts[1].upper() if parts[1] else None
+        year_code = parts[2]
+        season_code = parts[3].upper()
+        product_name_code = parts[4].upper()
+        color_code = parts[5].upper()
+        size_code = parts[6]
+
+        # --- Logika untuk Kategori dan Sub Kategori ---
+        if first_code_part in sku_decoder and sku_decoder[first_code_part]["Jenis"] == "CATEGORY":
+            sku_info["Category"] = sku_decoder[first_code_part]["arti"]
+        elif second_code_part and second_code_part in sku_decoder and sku_decoder[second_code_part][
+            "Jenis"] == "CATEGORY":
+            sku_info["Category"] = sku_decoder[second_code_part]["arti"]
+
+        if first_code_part in sku_decoder and sku_decoder[first_code_part]["Jenis"] == "SUB CATEGORY":
+            sku_info["Sub Category"] = sku_decoder[first_code_part]["arti"]
+        elif second_code_part and second_code_part in sku_decoder and sku_decoder[second_code_part][
+            "Jenis"] == "SUB CATEGORY":
+            sku_info["Sub Category"] = sku_decoder[second_code_part]["arti"]
+
+        # --- Logika untuk atribut lainnya ---
+        sku_info["Tahun Produksi"] = sku_decoder.get(year_code, {}).get("arti", "Unknown Tahun")
+        sku_info["Season"] = sku_decoder.get(season_code, {}).get("arti", "Unknown Musim")
+        sku_info["Singkatan Nama Produk"] = sku_decoder.get(product_name_code, {}).get("arti", "Unknown Produk")
+        sku_info["Warna Produk"] = sku_decoder.get(color_code, {}).get("arti", "Unknown Warna")
+        sku_info["Size Produk"] = sku_decoder.get(size_code, {}).get("arti", "Unknown Ukuran")
+
+    return sku_info
+
+
+def build_decoder_tables(sku_decoder):
+    """
+    Mengubah sku_decoder (dict CODE -> {"arti", "Jenis"}) menjadi tabel lookup datar
+    yang bisa dipakai langsung oleh Series.map, sehingga tidak perlu probing dict per baris.
+    """
+    arti = {code: info["arti"] for code, info in sku_decoder.items()}
+    category = {code: info["arti"] for code, info in sku_decoder.items() if info["Jenis"] == "CATEGORY"}
+    sub_category = {code: info["arti"] for code, info in sku_decoder.items() if info["Jenis"] == "SUB CATEGORY"}
+    return {"arti": arti, "CATEGORY": category, "SUB CATEGORY": sub_category}
+
+
+def _decode_unique_skus(unique_skus, tables):
+    """
+    Memparse array SKU unik secara tervektorisasi dengan str.extract menggunakan regex yang sama.
+    Mengembalikan DataFrame dengan urutan baris yang sama seperti unique_skus.
+    """
+    skus = pd.Series(unique_skus, dtype=object)
+    # '^' meniru perilaku re.match (hanya cocok di awal string), str.extract memakai search
+    parts = skus.str.extract('^' + SKU_PATTERN, flags=re.IGNORECASE)
+    # Kode kategori dan non-digit dibandingkan dalam huruf besar, sama seperti parse_sku
+    parts = parts.apply(lambda col: col.str.upper())
+
+    result = pd.DataFrame({"Original SKU": skus})
+    for column, lookup_key, default in (("Category", "CATEGORY", SKU_DEFAULTS["Category"]),
+                                        ("Sub Category", "SUB CATEGORY", SKU_DEFAULTS["Sub Category"])):
+        lookup = tables[lookup_key]
+        # Blok pertama diprioritaskan, lalu blok kedua (opsional)
+        value = parts[0].map(lookup)
+        value = value.where(value.notna(), parts[1].map(lookup))
+        result[column] = value.fillna(default)
+
+    for group, column in _DIRECT_GROUPS.items():
+        result[column] = parts[group].map(tables["arti"]).fillna(SKU_DEFAULTS[column])
+
+    return result[SKU_COLUMNS]
+
+
+def parse_sku_batch(skus, sku_decoder):
+    """
+    Versi batch dari parse_sku untuk satu kolom SKU.
+    Setiap SKU unik hanya diparse sekali, lalu hasilnya disebarkan kembali ke setiap baris
+    melalui kode kategori (pd.factorize). Hasilnya identik dengan memanggil parse_sku per baris.
+    """
+    skus = pd.Series(skus).astype(str)
+    codes, uniques = pd.factorize(skus, sort=False)
+    decoded = _decode_unique_skus(np.asarray(uniques, dtype=object), build_decoder_tables(sku_decoder))
+    parsed = decoded.take(codes).reset_index(drop=True)
+    parsed.index = skus.index
+    return parsed
+
+
+def verify_parse_sku_batch(skus, sku_decoder):
+    """
+    Membandingkan parse_sku_batch dengan parse_sku per baris pada korpus SKU (regresi).
+    Mengembalikan DataFrame berisi baris yang berbeda; kosong berarti hasilnya identik.
+    """
+    skus = pd.Series(skus).astype(str).reset_index(drop=True)
+    expected = pd.DataFrame([parse_sku(sku, sku_decoder) for sku in skus], columns=SKU_COLUMNS)
+    actual = parse_sku_batch(skus, sku_decoder)
+    mismatch = (expected.astype(object) != actual.astype(object)).any(axis=1)
+    return pd.concat([expected[mismatch].add_prefix("expected "), actual[mismatch].add_prefix("actual ")], axis=1)
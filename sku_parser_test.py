@@ -0,0 +1,79 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from sku_parser import SKU_COLUMNS, SKU_DEFAULTS, parse_sku, parse_sku_batch, verify_parse_sku_batch
+
+SKU_DECODER = {
+    "ZOZA": {"arti": "Zoza", "Jenis": "CATEGORY"},
+    "Z118": {"arti": "Heels", "Jenis": "SUB CATEGORY"},
+    "201A": {"arti": "Sandal", "Jenis": "CATEGORY"},
+    # Kode yang hanya cocok dengan awal blok kategori tidak boleh ikut terbaca
+    "Z": {"arti": "Z Series", "Jenis": "CATEGORY"},
+    "Z1": {"arti": "Z1 Prefix", "Jenis": "SUB CATEGORY"},
+    "118": {"arti": "118", "Jenis": "SUB CATEGORY"},
+    "201": {"arti": "201", "Jenis": "CATEGORY"},
+    "21": {"arti": "2021", "Jenis": "TAHUN"},
+    "22": {"arti": "2022", "Jenis": "TAHUN"},
+    "BAS": {"arti": "Basic", "Jenis": "SEASON"},
+    "MIA": {"arti": "Mia", "Jenis": "PRODUK"},
+    "LUNA": {"arti": "Luna", "Jenis": "PRODUK"},
+    "TBW": {"arti": "Tan Brown", "Jenis": "WARNA"},
+    "BWT": {"arti": "Brown White", "Jenis": "WARNA"},
+    "35": {"arti": "35", "Jenis": "SIZE"},
+    "03": {"arti": "03", "Jenis": "SIZE"},
+}
+
+# Korpus regresi: kedua bentuk SKU yang didokumentasikan, huruf kecil, kode hilang atau tidak dikenal,
+# nilai kosong dan SKU yang hanya cocok di awal string
+SKU_CORPUS = [
+    "ZOZA21BAS-MIA-TBW35",
+    "Z11822BAS LUNA-BWT03",
+    "201A21BAS-CND-ORG02",
+    "202D24BAS-HTR-BLK01",
+    "zoza21bas-mia-tbw35",
+    "z11822bas luna-bwt03",
+    "ZoZa21BaS-Mia-TbW35",
+    "QQQQ99XYZ-ABC-DEF77",
+    "ZOZA21BAS-MIA-TBW",
+    "ZOZA21BASMIA-TBW35",
+    "ZOZA21BAS-MIA-TBW35-EXTRA",
+    "ZOZA21BAS-MIA-TBW3512",
+    " ZOZA21BAS-MIA-TBW35",
+    "X-ZOZA21BAS-MIA-TBW35",
+    "",
+    "   ",
+    None,
+    np.nan,
+    12345,
+    "ZOZA21BAS-MIA-TBW35",
+]
+
+
+class ParseSkuBatchTest(unittest.TestCase):
+
+    def test_batch_matches_per_row_parse(self):
+        mismatches = verify_parse_sku_batch(SKU_CORPUS, SKU_DECODER)
+        self.assertEqual(len(mismatches), 0, mismatches.to_string())
+
+    def test_batch_keeps_index_and_columns(self):
+        skus = pd.Series(SKU_CORPUS, index=range(100, 100 + len(SKU_CORPUS)))
+        parsed = parse_sku_batch(skus, SKU_DECODER)
+        self.assertEqual(list(parsed.columns), SKU_COLUMNS)
+        self.assertTrue(parsed.index.equals(skus.index))
+        for index, sku in skus.items():
+            self.assertEqual(parsed.loc[index].to_dict(), parse_sku(str(sku), SKU_DECODER))
+
+    def test_corpus_covers_decoded_and_default_values(self):
+        parsed = parse_sku_batch(SKU_CORPUS, SKU_DECODER)
+        self.assertEqual(parsed.loc[0, "Category"], "Zoza")
+        self.assertEqual(parsed.loc[1, "Sub Category"], "Heels")
+        self.assertEqual(parsed.loc[1, "Category"], SKU_DEFAULTS["Category"])
+        self.assertEqual(parsed.loc[2, "Category"], "Sandal")
+        self.assertEqual(parsed.loc[4, "Warna Produk"], "Tan Brown")
+        self.assertEqual(parsed.loc[7].drop("Original SKU").tolist(), list(SKU_DEFAULTS.values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,485 @@
+"""
+Backend query SQL (DuckDB) di atas file Parquet, untuk dataset yang lebih besar dari memori.
+
+Data yang sudah dibersihkan dan diparse SKU-nya dibaca langsung dari file Parquet (entri
+data_cache, hasil ingest streaming, atau partisi incremental_store) tanpa pernah dimuat utuh ke
+memori. Filter tanggal dan dimensi diterjemahkan menjadi klausa WHERE yang didorong DuckDB ke
+pemindaian Parquet (predicate pushdown): file terurut berdasarkan tanggal dan ditulis per row group
+(data_cache.PARQUET_ROW_GROUP_ROWS), sehingga row group di luar rentang tanggal dilewati
+berdasarkan statistik min/max-nya. DuckDB bisa menumpahkan agregasi besar ke disk
+(DUCKDB_TEMP_DIR) jika melewati DUCKDB_MEMORY_LIMIT.
+
+SqlQueries punya antarmuka yang sama dengan analytics.FrameQueries dan mengembalikan nilai serta
+urutan baris yang sama (lihat compare_backends). duckdb adalah dependensi opsional; tanpa paket
+itu hanya backend pandas yang tersedia.
+
+Penggunaan dari command line (membandingkan waktu dan hasil kedua backend):
+    python sql_backend.py --sales penjualan.parquet --stock stok.parquet --inbound inbound.parquet \
+        --start 2024-06-01 --end 2024-06-30 --filter Category=Kids,Girls
+"""
+import argparse
+import copy
+import math
+import os
+import threading
+import time
+
+import pandas as pd
+
+import analytics
+import data_loader
+import filter_engine
+import sales_cube
+import sketches
+import sku_dimension
+
+BACKENDS = ["pandas", "duckdb"]
+DEFAULT_BACKEND = os.environ.get("QUERY_BACKEND", "pandas")
+MEMORY_LIMIT = os.environ.get("DUCKDB_MEMORY_LIMIT")
+TEMP_DIR = os.environ.get("DUCKDB_TEMP_DIR")
+THREADS = os.environ.get("DUCKDB_THREADS")
+
+DATA_TYPES = ["sales", "inbound", "stock"]
+DATE_COLUMN = 'Tanggal'
+# Kolom tambahan dari read_parquet untuk menjaga urutan baris asli (urutan file, lalu baris di file)
+_META_COLUMNS = ["filename", "file_row_number"]
+_FILE_ORDER = '"filename", "file_row_number"'
+_INTEGER_TYPES = {"TINYINT", "SMALLINT", "INTEGER", "BIGINT", "HUGEINT", "UTINYINT", "USMALLINT", "UINTEGER",
+                  "UBIGINT"}
+
+_database = None
+_database_lock = threading.Lock()
+
+
+def available():
+    """
+    True jika paket duckdb terpasang.
+    """
+    try:
+        import duckdb  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def available_backends():
+    return BACKENDS if available() else ["pandas"]
+
+
+def connect():
+    """
+    Cursor baru ke database DuckDB in-memory milik proses ini. Setiap SqlQueries memakai cursor
+    sendiri (view sementara tidak saling terlihat), sehingga aman dipakai dari beberapa sesi.
+    """
+    global _database
+    with _database_lock:
+        if _database is None:
+            import duckdb
+
+            config = {}
+            if MEMORY_LIMIT:
+                config["memory_limit"] = MEMORY_LIMIT
+            if TEMP_DIR:
+                config["temp_directory"] = TEMP_DIR
+            if THREADS:
+                config["threads"] = int(THREADS)
+            _database = duckdb.connect(config=config)
+        return _database.cursor()
+
+
+def _ident(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _literal(text):
+    return "'" + str(text).replace("'", "''") + "'"
+
+
+def _timestamp(value):
+    return pd.Timestamp(value).to_pydatetime()
+
+
+class SqlQueries:
+    """
+    Kueri dashboard sebagai SQL atas file Parquet.
+
+    - sources: {jenis file: [path Parquet]} untuk "sales", "stock" dan "inbound".
+    - Rentang tanggal (inklusif sampai akhir hari end_date) berlaku untuk penjualan; filter
+      {kolom: [nilai, ...]} berlaku untuk setiap dataset yang memiliki kolom tersebut, sama seperti
+      filter_engine.FilterIndex.select.
+    """
+    backend = "duckdb"
+
+    def __init__(self, sources, start_date=None, end_date=None, filters=None):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.filters = filters or {}
+        self._cursor = connect()
+        self._types = {}
+        for file_type, paths in sources.items():
+            files = ", ".join(_literal(path) for path in paths)
+            self._cursor.execute(f"CREATE OR REPLACE TEMP VIEW {file_type} AS SELECT * FROM read_parquet([{files}], "
+                                 f"union_by_name=true, filename=true, file_row_number=true)")
+            described = self._cursor.execute(f"DESCRIBE {file_type}").fetchall()
+            self._types[file_type] = {row[0]: row[1] for row in described if row[0] not in _META_COLUMNS}
+
+    def select(self, start_date=None, end_date=None, filters=None):
+        """
+        Objek kueri atas sumber yang sama dengan rentang tanggal dan filter lain, tanpa membuat ulang view.
+        """
+        selected = copy.copy(self)
+        selected.start_date, selected.end_date, selected.filters = start_date, end_date, filters or {}
+        return selected
+
+    def columns(self, file_type):
+        return list(self._types.get(file_type, {}))
+
+    def _where(self, file_type, extra=(), dated=True):
+        """
+        Klausa WHERE (beserta parameternya) untuk filter aktif pada satu dataset.
+        """
+        columns = self._types[file_type]
+        clauses, params = [], []
+        if dated and file_type == "sales" and DATE_COLUMN in columns:
+            if self.start_date is not None:
+                clauses.append(f"{_ident(DATE_COLUMN)} >= ?")
+                params.append(_timestamp(self.start_date))
+            if self.end_date is not None:
+                clauses.append(f"{_ident(DATE_COLUMN)} < ?")
+                params.append(_timestamp(pd.Timestamp(self.end_date).normalize() + pd.Timedelta(days=1)))
+        for column, values in self.filters.items():
+            if column not in columns:
+                continue
+            values = [str(value) for value in values]
+            if not values:
+                clauses.append("FALSE")
+                continue
+            clauses.append(f"{_ident(column)} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+        clauses.extend(extra)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def _fixed_point(self, file_type, column):
+        # Kolom rupiah yang disimpan data_loader.optimize_dtypes sebagai integer sen
+        return (column in data_loader.FIXED_POINT_COLUMNS.get(file_type, ())
+                and self._types[file_type].get(column) in _INTEGER_TYPES)
+
+    def _sum(self, file_type, column):
+        if self._fixed_point(file_type, column):
+            # Dijumlahkan eksak dalam sen lalu dikembalikan ke rupiah, seperti sales_cube
+            return f"CAST(COALESCE(SUM({_ident(column)}), 0) AS DOUBLE) / {data_loader.CURRENCY_SCALE}"
+        # Jumlah kolom integer tetap integer (seperti pandas), bukan HUGEINT/float
+        sql_type = "BIGINT" if self._types[file_type].get(column) in _INTEGER_TYPES else "DOUBLE"
+        return f"CAST(COALESCE(SUM({_ident(column)}), 0) AS {sql_type})"
+
+    def _select(self, file_type, column):
+        if self._fixed_point(file_type, column):
+            return f"CAST({_ident(column)} AS DOUBLE) / {data_loader.CURRENCY_SCALE} AS {_ident(column)}"
+        return _ident(column)
+
+    def _df(self, sql, params=()):
+        return self._cursor.execute(sql, list(params)).df()
+
+    def _names(self):
+        """
+        Satu baris (SKU, Nama Item, Category) per SKU dari seluruh data stok (tanpa filter): nilai non-null
+        pertama menurut urutan baris file, setara dengan kolom nama di sku_dimension.SkuDimension.
+        """
+        sql = ('SELECT "SKU", arg_min("Nama Item", ordinal) AS "Nama Item", arg_min("Category", ordinal) AS "Category" '
+               f'FROM (SELECT *, ROW_NUMBER() OVER (ORDER BY {_FILE_ORDER}) AS ordinal FROM stock '
+               'WHERE "SKU" IS NOT NULL) GROUP BY 1')
+        return sql, []
+
+    def date_limits(self):
+        """
+        Tanggal penjualan paling awal dan paling akhir (tanpa filter), atau (None, None).
+        """
+        if DATE_COLUMN not in self._types.get("sales", {}):
+            return None, None
+        first, last = self._cursor.execute(
+            f"SELECT MIN({_ident(DATE_COLUMN)}), MAX({_ident(DATE_COLUMN)}) FROM sales").fetchone()
+        return (pd.Timestamp(first), pd.Timestamp(last)) if first is not None else (None, None)
+
+    def values(self, file_type, column):
+        """
+        Nilai unik (terurut) sebuah kolom, dipakai sebagai opsi filter.
+        """
+        if column not in self._types.get(file_type, {}):
+            return []
+        sql = (f"SELECT DISTINCT {_ident(column)} FROM {file_type} WHERE {_ident(column)} IS NOT NULL "
+               f"ORDER BY 1")
+        return [row[0] for row in self._cursor.execute(sql).fetchall()]
+
+    def rollup(self, dimension, measure, top=None):
+        """
+        Setara sales_cube.rollup pada data penjualan terpilih.
+        """
+        where, params = self._where("sales", [f"{_ident(dimension)} IS NOT NULL"])
+        sql = (f"SELECT {_ident(dimension)}, {self._sum('sales', measure)} AS {_ident(measure)} FROM sales{where} "
+               f"GROUP BY 1 ORDER BY 2 DESC, 1")
+        if top is not None:
+            sql += f" LIMIT {int(top)}"
+        return self._df(sql, params)
+
+    def kpi_summary(self):
+        where, params = self._where("sales")
+        nett_sales, gross_profit, qty = self._cursor.execute(
+            f"SELECT {self._sum('sales', 'Nett Sales')}, {self._sum('sales', 'Gross Profit')}, "
+            f"{self._sum('sales', 'QTY')} FROM sales{where}", params).fetchone()
+        where, params = self._where("stock")
+        available_qty, rows = self._cursor.execute(
+            f"SELECT {self._sum('stock', 'Tersedia')}, COUNT(*) FROM stock{where}", params).fetchone()
+        # Rata-rata dihitung dari jumlah / baris seperti Series.mean, bukan AVG, agar hasilnya sama persis
+        avg_stock_qty = float(available_qty) / rows if rows else 0
+        return {
+            "nett_sales": nett_sales,
+            "gross_profit": gross_profit,
+            "qty": qty,
+            "inventory_turnover": (qty / avg_stock_qty) if avg_stock_qty > 0 else 0
+        }
+
+    def sales_view(self, view):
+        return [(subheader, dimension, measure, title, self.rollup(dimension, measure))
+                for subheader, dimension, measure, title in analytics.SALES_VIEWS[view]]
+
+    def sales_by_channel(self):
+        return self.rollup('Channel', 'Sub Total')
+
+    def top_products(self, top=10):
+        return self.rollup('Nama Barang', 'QTY', top=top)
+
+    def top_values(self, dimension, top=10):
+        if dimension not in self._types["sales"]:
+            return pd.DataFrame(columns=[dimension, 'QTY'])
+        return self.rollup(dimension, 'QTY', top=top)
+
+    def distinct_counts(self):
+        columns = [column for column in sketches.DISTINCT_DIMENSIONS if column in self._types["sales"]]
+        if not columns:
+            return {}
+        where, params = self._where("sales")
+        counts = self._cursor.execute(
+            f"SELECT {', '.join(f'COUNT(DISTINCT {_ident(column)})' for column in columns)} FROM sales{where}",
+            params).fetchone()
+        return {column: int(count) for column, count in zip(columns, counts)}
+
+    def monthly_sales(self):
+        where, params = self._where("sales")
+        month = f"COALESCE(strftime(CAST({_ident(DATE_COLUMN)} AS TIMESTAMP), '%Y-%m'), 'NaT')"
+        return self._df(f'SELECT {month} AS "Bulan", {self._sum("sales", "Nett Sales")} AS "Nett Sales" '
+                        f'FROM sales{where} GROUP BY 1 ORDER BY 1', params)
+
+    def stock_vs_inbound(self):
+        stock_where, stock_params = self._where("stock", ['"SKU" IS NOT NULL'])
+        inbound_where, inbound_params = self._where("inbound", ['"SKU" IS NOT NULL'])
+        names, names_params = self._names()
+        sql = (f'WITH s AS (SELECT "SKU", {self._sum("stock", "Tersedia")} AS total FROM stock{stock_where} '
+               f'GROUP BY 1), '
+               f'i AS (SELECT "SKU", {self._sum("inbound", "Qty Diterima")} AS total FROM inbound{inbound_where} '
+               f'GROUP BY 1), '
+               f'c AS (SELECT COALESCE(s."SKU", i."SKU") AS "SKU", COALESCE(s.total, 0) AS "Total Tersedia", '
+               f'COALESCE(i.total, 0) AS "Total Qty Diterima" FROM s FULL OUTER JOIN i ON s."SKU" = i."SKU"), '
+               f'n AS ({names}) '
+               f'SELECT c."SKU", c."Total Tersedia", c."Total Qty Diterima", '
+               f'COALESCE(n."Nama Item", c."SKU") AS "Nama Item", n."Category" '
+               f'FROM c LEFT JOIN n ON c."SKU" = n."SKU" ORDER BY c."SKU"')
+        return self._df(sql, stock_params + inbound_params + names_params)
+
+    def stock_by_location(self):
+        where, params = self._where("stock", ['"Lokasi" IS NOT NULL'])
+        return self._df(f'SELECT "Lokasi", {self._sum("stock", "QTY")} AS "QTY" FROM stock{where} '
+                        f'GROUP BY 1 ORDER BY 2 DESC, 1', params)
+
+    def sku_sales(self):
+        """
+        QTY terjual per SKU (Series), setara FrameQueries.sku_sales.
+        """
+        where, params = self._where("sales", ['"SKU" IS NOT NULL'])
+        table = self._df(f'SELECT "SKU", {self._sum("sales", "QTY")} AS "QTY" FROM sales{where} GROUP BY 1 ORDER BY 1',
+                         params)
+        return table.set_index('SKU')['QTY']
+
+    def recommendations(self):
+        """
+        Setara analytics.recommendations: DuckDB hanya mengagregasi penjualan per SKU per hari, stok
+        per SKU dan nama SKU; ramalan permintaan dihitung dengan demand_forecast yang sama di pandas.
+        """
+        sales_where, sales_params = self._where("sales", ['"SKU" IS NOT NULL'])
+        stock_where, stock_params = self._where("stock", ['"SKU" IS NOT NULL'])
+        daily = self._df(f'SELECT "SKU", date_trunc(\'day\', {_ident(DATE_COLUMN)}) AS "Tanggal", '
+                         f'{self._sum("sales", "QTY")} AS "QTY" FROM sales{sales_where} GROUP BY 1, 2',
+                         sales_params)
+        seasons = None
+        if "Season" in self._types["sales"]:
+            seasons = self._df(f'SELECT "SKU", MIN("Season") AS "Season" FROM sales{sales_where} GROUP BY 1',
+                               sales_params).set_index('SKU')['Season']
+        stock_by_sku = self._df(f'SELECT "SKU", {self._sum("stock", "Tersedia")} AS "Tersedia" FROM stock{stock_where} '
+                                f'GROUP BY 1', stock_params).set_index('SKU')['Tersedia']
+        names, names_params = self._names()
+        names = self._df(names, names_params)
+        return analytics.reorder_recommendations(daily, seasons, stock_by_sku, names)
+
+    def _search_clause(self, file_type, columns, search):
+        text_columns = [col for col in columns if self._types[file_type].get(col) == "VARCHAR"]
+        if not search:
+            return [], []
+        if not text_columns:
+            return ["FALSE"], []
+        condition = " OR ".join(f"strpos(lower({_ident(col)}), ?) > 0" for col in text_columns)
+        return [f"({condition})"], [search.lower()] * len(text_columns)
+
+    def count(self, file_type, columns=None, search=None):
+        """
+        Jumlah baris terpilih (dan cocok dengan pencarian teks) untuk tabel berhalaman.
+        """
+        extra, search_params = self._search_clause(file_type, columns or self.columns(file_type), search)
+        where, params = self._where(file_type, extra)
+        return self._cursor.execute(f"SELECT COUNT(*) FROM {file_type}{where}", params + search_params).fetchone()[0]
+
+    def page(self, file_type, columns=None, search=None, sort_by=None, ascending=True, offset=0, limit=100):
+        """
+        Satu halaman baris terpilih, diurutkan berdasarkan sort_by (NaN di akhir) lalu urutan frame di
+        backend pandas (penjualan terurut stabil berdasarkan tanggal, lihat data_loader.sort_by_date),
+        seperti table_view.sort_positions.
+        """
+        columns = columns or self.columns(file_type)
+        extra, search_params = self._search_clause(file_type, columns, search)
+        where, params = self._where(file_type, extra)
+        order = _FILE_ORDER
+        if file_type == "sales" and DATE_COLUMN in self._types[file_type]:
+            order = f"{_ident(DATE_COLUMN)} ASC NULLS LAST, {order}"
+        if sort_by in self._types[file_type]:
+            order = f"{_ident(sort_by)} {'ASC' if ascending else 'DESC'} NULLS LAST, {order}"
+        sql = (f"SELECT {', '.join(self._select(file_type, col) for col in columns)} FROM {file_type}{where} "
+               f"ORDER BY {order} LIMIT {int(limit)} OFFSET {int(offset)}")
+        return self._df(sql, params + search_params)
+
+
+# Kueri yang dibandingkan oleh compare_backends: (nama, fungsi atas objek kueri)
+QUERIES = [("kpi_summary", lambda q: q.kpi_summary())] + \
+          [(f"sales_view:{view}", lambda q, v=view: q.sales_view(v)) for view in analytics.SALES_VIEWS] + \
+          [("sales_by_channel", lambda q: q.sales_by_channel()),
+           ("top_products", lambda q: q.top_products())] + \
+          [(f"top_values:{dimension}", lambda q, d=dimension: q.top_values(d))
+           for dimension in sketches.TOP_DIMENSIONS] + \
+          [("distinct_counts", lambda q: q.distinct_counts()),
+           ("monthly_sales", lambda q: q.monthly_sales()),
+           ("stock_vs_inbound", lambda q: q.stock_vs_inbound()),
+           ("stock_by_location", lambda q: q.stock_by_location()),
+           ("recommendations", lambda q: q.recommendations()),
+           ("sku_sales", lambda q: q.sku_sales())]
+
+
+def frame_queries(frames, start_date=None, end_date=None, filters=None):
+    """
+    analytics.FrameQueries untuk frame yang sudah dimuat, dengan langkah seleksi yang sama seperti
+    dashboard: indeks filter per dataset, lalu potongan kubus (atau kubus dari baris terpilih jika
+    filter di luar grain kubus).
+    """
+    filters = filters or {}
+    indexes = {file_type: filter_engine.FilterIndex(df, date_column='Tanggal' if file_type == "sales" else None)
+               for file_type, df in frames.items()}
+    df_sales, _ = indexes["sales"].select(start_date, end_date, filters)
+    df_stock, _ = indexes["stock"].select(filters=filters)
+    df_inbound, _ = indexes["inbound"].select(filters=filters)
+    cube = sales_cube.build_sales_cube(indexes["sales"].frame)
+    sales_filters = {column: values for column, values in filters.items() if column in indexes["sales"].columns}
+    if sales_cube.covers(cube, sales_filters):
+        cube_sales = sales_cube.slice_cube(cube['sales'], start_date, end_date, sales_filters)
+        cube_products = sales_cube.slice_cube(cube['products'], start_date, end_date, sales_filters)
+    else:
+        filtered_cube = sales_cube.build_sales_cube(df_sales)
+        cube_sales, cube_products = filtered_cube['sales'], filtered_cube['products']
+    dimension = sku_dimension.SkuDimension.build(frames["sales"], frames["stock"], frames["inbound"])
+    return analytics.FrameQueries(cube_sales, cube_products, df_sales, df_stock, df_inbound, dimension)
+
+
+def _normalize(df):
+    df = df.reset_index(drop=True)
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype) or df[col].dtype == object:
+            df[col] = df[col].astype(object).where(df[col].notna(), None)
+    return df
+
+
+def same_result(expected, actual, rtol=1e-9):
+    """
+    True jika dua hasil kueri sama: kolom, urutan baris dan nilai (angka pecahan dengan toleransi
+    relatif rtol karena urutan penjumlahan berbeda). Tipe kategori vs teks tidak dibedakan.
+    """
+    if isinstance(expected, dict):
+        return expected.keys() == actual.keys() and all(
+            math.isclose(float(expected[key]), float(actual[key]), rel_tol=rtol) for key in expected)
+    if isinstance(expected, (list, tuple)):
+        return len(expected) == len(actual) and all(same_result(a, b, rtol) for a, b in zip(expected, actual))
+    if isinstance(expected, pd.Series):
+        return same_result(expected.reset_index(), actual.reset_index(), rtol)
+    if isinstance(expected, pd.DataFrame):
+        try:
+            pd.testing.assert_frame_equal(_normalize(expected), _normalize(actual), check_dtype=False,
+                                          check_exact=False, rtol=rtol, check_index_type=False)
+        except AssertionError:
+            return False
+        return True
+    return expected == actual
+
+
+def load_frames(sources):
+    """
+    Memuat file Parquet per dataset ke pandas dengan optimasi tipe dan urutan yang sama seperti dashboard.
+    """
+    frames = {}
+    for file_type, paths in sources.items():
+        df = pd.concat([pd.read_parquet(path) for path in paths], ignore_index=True)
+        frames[file_type] = data_loader.optimize_dtypes(data_loader.sort_by_date(df, file_type), file_type)[0]
+    return frames
+
+
+def compare_backends(sources, start_date=None, end_date=None, filters=None):
+    """
+    Menjalankan setiap kueri dashboard di kedua backend atas data yang sama dan membandingkan hasilnya.
+    Mengembalikan DataFrame: query, pandas_ms, duckdb_ms dan identical.
+    """
+    started = time.perf_counter()
+    pandas_queries = frame_queries(load_frames(sources), start_date, end_date, filters)
+    pandas_setup = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    sql_queries = SqlQueries(sources, start_date, end_date, filters)
+    rows = [{"query": "(muat dan seleksi)", "pandas_ms": pandas_setup,
+             "duckdb_ms": (time.perf_counter() - started) * 1000, "identical": True}]
+    for name, run in QUERIES:
+        started = time.perf_counter()
+        expected = run(pandas_queries)
+        pandas_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        actual = run(sql_queries)
+        rows.append({"query": name, "pandas_ms": pandas_ms, "duckdb_ms": (time.perf_counter() - started) * 1000,
+                     "identical": same_result(expected, actual)})
+    return pd.DataFrame(rows, columns=["query", "pandas_ms", "duckdb_ms", "identical"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bandingkan backend pandas dan DuckDB atas file Parquet.")
+    for file_type in DATA_TYPES:
+        parser.add_argument(f"--{file_type}", nargs="+", required=True, help="File Parquet (bisa lebih dari satu)")
+    parser.add_argument("--start", help="Tanggal awal (YYYY-MM-DD)")
+    parser.add_argument("--end", help="Tanggal akhir, inklusif (YYYY-MM-DD)")
+    parser.add_argument("--filter", action="append", default=[], metavar="KOLOM=NILAI1,NILAI2",
+                        help="Filter dimensi, misalnya Category=Kids,Girls (bisa diulang)")
+    args = parser.parse_args(argv)
+
+    filters = {}
+    for item in args.filter:
+        column, _, values = item.partition("=")
+        filters[column] = [value for value in values.split(",") if value]
+    sources = {file_type: getattr(args, file_type) for file_type in DATA_TYPES}
+    result = compare_backends(sources, args.start, args.end, filters)
+    print(result.to_string(index=False, float_format=lambda value: f"{value:,.1f}"))
+    mismatched = result[~result["identical"]]
+    print("Hasil kedua backend identik." if mismatched.empty else
+          f"{len(mismatched)} kueri berbeda: {', '.join(mismatched['query'])}")
+    return 0 if mismatched.empty else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,106 @@
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+
+import pandas as pd
+
+import data_cache
+import data_loader
+import sql_backend
+import synthetic_data
+from sku_parser import parse_sku_batch
+
+
+def write_sources(directory, rows=3000, seed=1, optimize=False):
+    """
+    Dataset sintetis yang sudah dibersihkan dan diparse SKU-nya, ditulis sebagai satu file Parquet per dataset.
+    Dengan optimize=True tipe datanya dipadatkan seperti entri cache dashboard (rupiah fixed-point dalam sen).
+    """
+    frames = synthetic_data.generate(rows, seed=seed)
+    sku_decoder = data_loader.build_sku_decoder(frames["sku_master"].copy())
+    sources = {}
+    for file_type in sql_backend.DATA_TYPES:
+        df = data_loader.clean_data(frames[file_type].copy(), file_type)
+        df = data_loader.sort_by_date(pd.concat([df, parse_sku_batch(df['SKU'], sku_decoder)], axis=1), file_type)
+        if optimize:
+            df = data_loader.optimize_dtypes(df, file_type)[0]
+        path = os.path.join(directory, f"{file_type}.parquet")
+        data_cache.prepare_for_parquet(df).to_parquet(path, index=False)
+        sources[file_type] = [path]
+    return sources
+
+
+@unittest.skipUnless(sql_backend.available(), "duckdb tidak terpasang")
+class CompareBackendsTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        cls.sources = write_sources(cls.directory)
+        sales = pd.read_parquet(cls.sources["sales"][0], columns=['Tanggal', 'Category', 'Channel'])
+        # Rentang tanggal sebagai date, seperti nilai st.date_input di dashboard
+        cls.end = sales['Tanggal'].max().date()
+        cls.start = cls.end - datetime.timedelta(days=60)
+        cls.categories = sales['Category'].value_counts().index[:2].tolist()
+        cls.channel = sales['Channel'].value_counts().index[:1].tolist()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def assertIdentical(self, start_date=None, end_date=None, filters=None):
+        result = sql_backend.compare_backends(self.sources, start_date, end_date, filters)
+        self.assertEqual(len(result), len(sql_backend.QUERIES) + 1)
+        different = result.loc[~result["identical"], "query"].tolist()
+        self.assertEqual(different, [], f"hasil berbeda untuk filter {start_date}..{end_date} {filters}")
+
+    def test_without_filters(self):
+        self.assertIdentical()
+
+    def test_date_range(self):
+        self.assertIdentical(self.start, self.end)
+
+    def test_category_filter(self):
+        self.assertIdentical(filters={'Category': self.categories})
+
+    def test_date_range_and_filters(self):
+        self.assertIdentical(self.start, self.end, {'Category': self.categories, 'Channel': self.channel})
+
+
+@unittest.skipUnless(sql_backend.available(), "duckdb tidak terpasang")
+class FixedPointSourcesTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        cls.sources = write_sources(cls.directory, optimize=True)
+        os.makedirs(os.path.join(cls.directory, "raw"))
+        cls.raw = write_sources(os.path.join(cls.directory, "raw"))
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def test_sources_are_fixed_point(self):
+        sales = pd.read_parquet(self.sources["sales"][0], columns=['HPP', 'Gross Profit'])
+        self.assertEqual(sales.dtypes.tolist(), ['int64', 'int64'])
+
+    def test_backends_identical(self):
+        result = sql_backend.compare_backends(self.sources)
+        self.assertEqual(result.loc[~result["identical"], "query"].tolist(), [])
+
+    def test_totals_in_rupiah(self):
+        # Total dari sen sama dengan total float rupiah mentah (tanpa optimasi tipe)
+        expected = sql_backend.SqlQueries(self.raw).kpi_summary()["gross_profit"]
+        self.assertAlmostEqual(sql_backend.SqlQueries(self.sources).kpi_summary()["gross_profit"], expected, places=2)
+
+    def test_page_in_rupiah(self):
+        page = sql_backend.SqlQueries(self.sources).page("sales", ['HPP'], limit=5)
+        hpp = pd.read_parquet(self.sources["sales"][0], columns=['HPP'])['HPP'].head(5)
+        self.assertEqual(page['HPP'].tolist(), (hpp / data_loader.CURRENCY_SCALE).tolist())
+
+
+if __name__ == "__main__":
+    unittest.main()
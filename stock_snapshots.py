@@ -0,0 +1,324 @@
+"""
+Snapshot stok historis dan metrik perputaran stok per rentang tanggal.
+
+Data stok hanya berupa posisi pada satu saat, sehingga perputaran stok dari satu file saja hanyalah
+perkiraan. Setiap unggahan stok bisa disimpan sebagai snapshot bertanggal (satu per hari); dari
+deret snapshot tersebut dihitung per SKU dan lokasi:
+
+- rata-rata stok tersedia (dan nilai persediaan) selama rentang tanggal,
+- perputaran (QTY terjual / rata-rata stok),
+- hari persediaan / days of cover (stok akhir / rata-rata penjualan harian),
+- sell-through (QTY terjual / (QTY terjual + stok akhir)).
+
+Di samping setiap snapshot disimpan jumlah kumulatifnya (prefix sum per SKU dan lokasi atas semua
+snapshot sampai tanggal itu). Rata-rata stok untuk rentang mana pun cukup didapat dari selisih dua
+file kumulatif, dan snapshot baru hanya menambah satu file kumulatif dari file sebelumnya, sehingga
+biayanya sebanding dengan ukuran satu snapshot, bukan panjang riwayat. Snapshot yang disisipkan di
+tengah riwayat (backfill) menghitung ulang file kumulatif setelahnya saja.
+
+SKU yang tidak tercantum di sebuah snapshot dianggap stoknya 0 pada tanggal itu. Penjualan tidak
+memiliki lokasi, sehingga QTY terjual per SKU dibagi ke lokasi sebanding porsi rata-rata stoknya.
+
+Penggunaan dari command line:
+    python stock_snapshots.py add stok.xlsx --date 2024-06-30 --sku-master master.xlsx
+    python stock_snapshots.py stats
+    python stock_snapshots.py clear
+"""
+import argparse
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+import data_cache
+import data_loader
+import incremental_store
+from sku_parser import parse_sku_batch
+
+SNAPSHOT_DIR = os.environ.get("SNAPSHOT_DIR", os.path.join(incremental_store.STORE_DIR, "stock_snapshots"))
+
+MEASURES = ['Tersedia', 'Nilai Persediaan']
+DIMENSION_COLUMNS = ['Nama Item', 'Category', 'Sub Category', 'Season']
+# Tingkat agregasi yang bisa dipilih di dashboard: kolom -> label
+GROUPINGS = {'SKU': "SKU", 'Category': "Kategori", 'Lokasi': "Lokasi"}
+
+
+def _path(*parts):
+    return os.path.join(SNAPSHOT_DIR, *parts)
+
+
+def _snapshot_path(label):
+    return _path("snapshots", f"{label}.parquet")
+
+
+def _cumulative_path(label):
+    return _path("cumulative", f"{label}.parquet")
+
+
+def read_manifest():
+    """
+    Metadata store: kolom kunci, kolom ukuran, dan daftar snapshot per tanggal (jumlah baris dan hash sumber).
+    """
+    try:
+        with open(_path("manifest.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"key_columns": None, "measures": None, "snapshots": {}, "version": 0}
+
+
+def _write_manifest(manifest):
+    path = _path("manifest.json")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = data_cache.writer_temp_path(path)
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _write_frame(df, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = data_cache.writer_temp_path(path)
+    try:
+        data_cache.prepare_for_parquet(df.reset_index()).to_parquet(tmp_path, index=False)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+
+
+def _read_frame(path, keys):
+    return pd.read_parquet(path).set_index(keys)
+
+
+def date_label(value):
+    return pd.Timestamp(value).strftime('%Y-%m-%d')
+
+
+def snapshot_dates():
+    return sorted(read_manifest()["snapshots"])
+
+
+def version():
+    """
+    Nomor versi store; berubah setiap kali snapshot ditambah atau diganti.
+    """
+    return read_manifest()["version"]
+
+
+def has_snapshot(snapshot_date, source_hash):
+    entry = read_manifest()["snapshots"].get(date_label(snapshot_date))
+    return entry is not None and entry.get("source") == source_hash
+
+
+def _snapshot_frame(df_stock, keys, measures):
+    """
+    Stok per kunci (SKU, lokasi) pada satu snapshot. Kunci kosong disimpan sebagai teks kosong
+    agar tetap bisa disejajarkan antar snapshot.
+    """
+    key_frame = pd.DataFrame({col: df_stock[col].astype(object).where(df_stock[col].notna(), "").astype(str)
+                              for col in keys})
+    values = df_stock[measures].astype('float64').reset_index(drop=True)
+    return pd.concat([key_frame.reset_index(drop=True), values], axis=1).groupby(keys, sort=True)[measures].sum()
+
+
+def _update_dimensions(df_stock):
+    """
+    Atribut SKU terbaru (nama, kategori, ...) untuk pengelompokan dan filter metrik.
+    """
+    columns = [col for col in DIMENSION_COLUMNS if col in df_stock.columns]
+    latest = pd.DataFrame({col: df_stock[col].astype(object) for col in ['SKU'] + columns})
+    latest['SKU'] = latest['SKU'].where(latest['SKU'].notna(), "").astype(str)
+    path = _path("dimensions.parquet")
+    if os.path.exists(path):
+        latest = pd.concat([pd.read_parquet(path), latest], ignore_index=True)
+    latest = latest.drop_duplicates('SKU', keep='last').set_index('SKU')
+    _write_frame(latest, path)
+
+
+def add_snapshot(df_stock, snapshot_date, source_hash=None):
+    """
+    Menyimpan frame stok (hasil clean_data, sebaiknya sudah diparse SKU-nya) sebagai snapshot pada
+    snapshot_date. Snapshot dengan tanggal yang sama diganti; sumber yang sama (source_hash) untuk
+    tanggal yang sama dilewati. Hanya file kumulatif mulai tanggal tersebut yang ditulis ulang.
+
+    Mengembalikan laporan berisi tanggal, jumlah kunci, tanggal kumulatif yang dihitung ulang dan waktu proses.
+    """
+    started = time.perf_counter()
+    label = date_label(snapshot_date)
+    manifest = read_manifest()
+    report = {"date": label, "keys": 0, "recomputed": [], "skipped": False, "seconds": 0.0}
+    current = manifest["snapshots"].get(label)
+    if current is not None and source_hash is not None and current.get("source") == source_hash:
+        report["skipped"] = True
+        return report
+
+    keys = manifest["key_columns"] or [col for col in incremental_store.NATURAL_KEYS["stock"]
+                                       if col in df_stock.columns]
+    measures = manifest["measures"] or [col for col in MEASURES if col in df_stock.columns]
+    missing = [col for col in keys + ['SKU', 'Tersedia'] if col not in df_stock.columns]
+    if missing:
+        raise KeyError(f"Kolom {', '.join(sorted(set(missing)))} tidak ditemukan di data stok.")
+
+    snapshot = _snapshot_frame(df_stock, keys, measures)
+    _write_frame(snapshot, _snapshot_path(label))
+    _update_dimensions(df_stock)
+    report["keys"] = len(snapshot)
+
+    # Prefix sum dimulai dari kumulatif tanggal sebelumnya; biasanya snapshot baru adalah yang terakhir,
+    # sehingga hanya satu file kumulatif yang ditulis
+    dates = sorted(set(manifest["snapshots"]) | {label})
+    position = dates.index(label)
+    cumulative = _read_frame(_cumulative_path(dates[position - 1]), keys) if position else None
+    for date in dates[position:]:
+        current_snapshot = snapshot if date == label else _read_frame(_snapshot_path(date), keys)
+        cumulative = current_snapshot if cumulative is None else cumulative.add(current_snapshot, fill_value=0)
+        _write_frame(cumulative, _cumulative_path(date))
+        report["recomputed"].append(date)
+
+    manifest["snapshots"][label] = {"keys": len(snapshot), "source": source_hash}
+    manifest.update(key_columns=keys, measures=measures, version=manifest["version"] + 1)
+    _write_manifest(manifest)
+    report["seconds"] = time.perf_counter() - started
+    return report
+
+
+def _ratios(table, days):
+    sold = table['QTY Terjual']
+    daily_sales = sold / days
+    table['Perputaran'] = sold / table['Rata-rata Stok'].where(table['Rata-rata Stok'] > 0)
+    table['Hari Persediaan'] = table['Stok Akhir'] / daily_sales.where(daily_sales > 0)
+    table['Sell-Through'] = sold / (sold + table['Stok Akhir']).where(sold + table['Stok Akhir'] > 0)
+    return table
+
+
+def window_metrics(sold_by_sku, start_date=None, end_date=None, filters=None):
+    """
+    Stok dan penjualan per SKU dan lokasi untuk snapshot di dalam rentang [start_date, end_date]
+    (inklusif per hari).
+
+    - sold_by_sku: Series QTY terjual per SKU untuk rentang yang sama (misalnya FrameQueries.sku_sales).
+    - filters {kolom: [nilai]} berlaku untuk kolom kunci dan atribut SKU yang ada (Category, Lokasi, Season, ...).
+
+    Mengembalikan dict berisi frame per kunci, jumlah snapshot, tanggal snapshot pertama/terakhir,
+    jumlah hari rentang, rata-rata stok total dan perputaran keseluruhan, atau None jika tidak ada
+    snapshot di rentang tersebut. Tabel per tingkat agregasi dibuat dengan group_metrics.
+    """
+    manifest = read_manifest()
+    dates = sorted(manifest["snapshots"])
+    first_label = date_label(start_date) if start_date is not None else None
+    last_label = date_label(end_date) if end_date is not None else None
+    window = [d for d in dates if (first_label is None or d >= first_label) and (last_label is None or d <= last_label)]
+    if not window:
+        return None
+    keys = manifest["key_columns"]
+    first, last = dates.index(window[0]), dates.index(window[-1])
+
+    # Jumlah stok atas snapshot di rentang = kumulatif terakhir - kumulatif sebelum rentang
+    total = _read_frame(_cumulative_path(dates[last]), keys)
+    if first:
+        total = total.sub(_read_frame(_cumulative_path(dates[first - 1]), keys), fill_value=0)
+    count = last - first + 1
+    frame = pd.DataFrame({'Rata-rata Stok': total['Tersedia'] / count})
+    if 'Nilai Persediaan' in total.columns:
+        frame['Rata-rata Nilai Persediaan'] = total['Nilai Persediaan'] / count
+    frame['Stok Awal'] = _read_frame(_snapshot_path(window[0]), keys)['Tersedia'].reindex(frame.index, fill_value=0)
+    frame['Stok Akhir'] = _read_frame(_snapshot_path(window[-1]), keys)['Tersedia'].reindex(frame.index,
+                                                                                              fill_value=0)
+    frame = frame[(frame['Rata-rata Stok'] != 0) | (frame['Stok Awal'] != 0) | (frame['Stok Akhir'] != 0)]
+    frame = frame.reset_index()
+
+    # Penjualan per SKU dibagi ke lokasi sebanding rata-rata stoknya (rata jika stoknya 0 di semua lokasi)
+    sold = pd.Series(np.asarray(sold_by_sku, dtype='float64'), index=pd.Index(sold_by_sku.index).astype(str))
+    sold = sold.groupby(level=0).sum()
+    per_sku = frame.groupby('SKU')['Rata-rata Stok']
+    sku_stock, sku_rows = per_sku.transform('sum'), per_sku.transform('size')
+    share = np.where(sku_stock > 0, frame['Rata-rata Stok'] / sku_stock.where(sku_stock > 0, 1), 1 / sku_rows)
+    frame['QTY Terjual'] = frame['SKU'].map(sold).fillna(0).to_numpy() * share
+
+    dimensions_path = _path("dimensions.parquet")
+    if os.path.exists(dimensions_path):
+        dimensions = pd.read_parquet(dimensions_path)
+        frame = frame.merge(dimensions[[col for col in dimensions.columns if col not in frame.columns or col == 'SKU']],
+                            on='SKU', how='left')
+    for column, values in (filters or {}).items():
+        if column in frame.columns:
+            frame = frame[frame[column].isin([str(value) for value in values])]
+
+    window_start = pd.Timestamp(start_date if start_date is not None else window[0]).normalize()
+    window_end = pd.Timestamp(end_date if end_date is not None else window[-1]).normalize()
+    days = (window_end - window_start).days + 1
+    totals = frame[_measures(frame)].sum()
+    return {
+        "frame": frame,
+        "snapshots": count,
+        "first": window[0],
+        "last": window[-1],
+        "days": days,
+        "average_stock": float(totals['Rata-rata Stok']),
+        "turnover": float(totals['QTY Terjual'] / totals['Rata-rata Stok']) if totals['Rata-rata Stok'] > 0 else 0
+    }
+
+
+def _measures(frame):
+    return [col for col in ['Rata-rata Stok', 'Rata-rata Nilai Persediaan', 'Stok Awal', 'Stok Akhir', 'QTY Terjual']
+            if col in frame.columns]
+
+
+def group_metrics(window, group_by='SKU'):
+    """
+    Tabel metrik dari hasil window_metrics per 'SKU', 'Category' atau 'Lokasi'. Jumlah stok dan
+    penjualan dijumlahkan dulu, baru rasio (perputaran, hari persediaan, sell-through) dihitung.
+    """
+    frame = window["frame"]
+    group_by = group_by if group_by in frame.columns else 'SKU'
+    table = frame.groupby(group_by, sort=True)[_measures(frame)].sum()
+    if group_by == 'SKU':
+        labels = [col for col in ['Nama Item', 'Category'] if col in frame.columns]
+        table = frame.drop_duplicates('SKU').set_index('SKU')[labels].join(table, how='right')
+    return _ratios(table, window["days"]).reset_index()
+
+
+def clear_snapshots():
+    """
+    Menghapus seluruh snapshot. Mengembalikan jumlah snapshot yang dihapus.
+    """
+    removed = len(read_manifest()["snapshots"])
+    shutil.rmtree(SNAPSHOT_DIR, ignore_errors=True)
+    return removed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kelola snapshot stok historis.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    add_parser = subparsers.add_parser("add", help="Simpan file stok sebagai snapshot bertanggal")
+    add_parser.add_argument("source", help="File Excel stok")
+    add_parser.add_argument("--date", required=True, help="Tanggal snapshot (YYYY-MM-DD)")
+    add_parser.add_argument("--sku-master", help="File Data Master SKU untuk parsing SKU (kategori)")
+    subparsers.add_parser("stats", help="Tampilkan daftar snapshot")
+    subparsers.add_parser("clear", help="Hapus semua snapshot")
+    args = parser.parse_args(argv)
+
+    if args.command == "add":
+        df_stock = data_loader.clean_data(pd.read_excel(args.source), "stock")
+        if args.sku_master:
+            sku_decoder = data_loader.build_sku_decoder(pd.read_excel(args.sku_master))
+            df_stock = pd.concat([df_stock, parse_sku_batch(df_stock['SKU'], sku_decoder)], axis=1)
+        report = add_snapshot(df_stock, args.date, data_cache.file_content_hash(args.source))
+        if report["skipped"]:
+            print(f"File ini sudah tersimpan sebagai snapshot {report['date']}; tidak ada perubahan.")
+        else:
+            print(f"Snapshot {report['date']}: {report['keys']:,} kunci; kumulatif "
+                  f"{', '.join(report['recomputed'])} ditulis dalam {report['seconds']:,.2f} detik")
+    elif args.command == "clear":
+        print(f"{clear_snapshots()} snapshot dihapus dari {SNAPSHOT_DIR}")
+    else:
+        for label, entry in read_manifest()["snapshots"].items():
+            print(f"{label}: {entry['keys']:,} kunci")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import itertools
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+import stock_snapshots
+
+DATES = ['2024-03-01', '2024-03-08', '2024-03-15', '2024-03-22', '2024-03-29']
+SKUS = ['A-01', 'A-02', 'B-01', 'C-01']
+LOCATIONS = ['Gudang', 'Toko']
+CATEGORIES = {'A-01': 'Atasan', 'A-02': 'Atasan', 'B-01': 'Bawahan', 'C-01': 'Celana'}
+
+
+def _stock(seed):
+    """
+    Frame stok acak; sebagian kombinasi SKU dan lokasi sengaja tidak ada (stoknya 0 pada snapshot itu).
+    """
+    rng = np.random.default_rng(seed)
+    rows = [(sku, location) for sku, location in itertools.product(SKUS, LOCATIONS) if rng.random() > 0.25]
+    stock = rng.integers(0, 50, len(rows)).astype('float64')
+    return pd.DataFrame({
+        'SKU': [sku for sku, _ in rows],
+        'Lokasi': [location for _, location in rows],
+        'Category': [CATEGORIES[sku] for sku, _ in rows],
+        'Tersedia': stock,
+        'Nilai Persediaan': stock * 1000
+    })
+
+
+def _expected_average(frames, window):
+    """
+    Rata-rata stok per (SKU, Lokasi) dihitung langsung dari semua snapshot di rentang.
+    """
+    stacked = pd.concat([frames[date] for date in window]).groupby(['SKU', 'Lokasi'])['Tersedia'].sum()
+    return (stacked / len(window)).rename('Rata-rata Stok')
+
+
+class WindowMetricsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        patcher = mock.patch.object(stock_snapshots, "SNAPSHOT_DIR", self.directory)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        self.frames = {date: _stock(seed) for seed, date in enumerate(DATES)}
+
+    def add(self, dates):
+        return [stock_snapshots.add_snapshot(self.frames[date], date, source_hash=date) for date in dates]
+
+    def assertWindowsMatch(self):
+        for first, last in itertools.combinations_with_replacement(range(len(DATES)), 2):
+            window = stock_snapshots.window_metrics(pd.Series(dtype='float64'), DATES[first], DATES[last])
+            frame = window["frame"].set_index(['SKU', 'Lokasi'])
+            expected = _expected_average(self.frames, DATES[first:last + 1])
+            # Kunci yang stoknya 0 di seluruh rentang tidak ikut ditampilkan
+            self.assertTrue(frame.index.isin(expected.index).all())
+            pd.testing.assert_series_equal(frame['Rata-rata Stok'].reindex(expected.index, fill_value=0), expected)
+            self.assertEqual(window["snapshots"], last - first + 1)
+
+    def test_prefix_sums_match_direct_average(self):
+        self.add(DATES)
+        self.assertWindowsMatch()
+
+    def test_backfill_recomputes_later_cumulatives_only(self):
+        reports = self.add(DATES[::2])
+        self.assertEqual([report["recomputed"] for report in reports], [[date] for date in DATES[::2]])
+        report = self.add([DATES[1]])[0]
+        self.assertEqual(report["recomputed"], DATES[1:3] + DATES[4:])
+        self.add([DATES[3]])
+        self.assertWindowsMatch()
+        # Sumber yang sama untuk tanggal yang sama dilewati
+        self.assertTrue(self.add([DATES[3]])[0]["skipped"])
+
+    def test_dates_are_inclusive_per_day(self):
+        self.add(DATES)
+        window = stock_snapshots.window_metrics(pd.Series(dtype='float64'), '2024-03-08 18:00', '2024-03-15')
+        self.assertEqual((window["first"], window["last"], window["days"]), ('2024-03-08', '2024-03-15', 8))
+        self.assertIsNone(stock_snapshots.window_metrics(pd.Series(dtype='float64'), '2024-04-01', '2024-04-30'))
+
+    def test_sales_split_by_stock_share(self):
+        self.add(DATES)
+        sold = pd.Series({'A-01': 30.0, 'B-01': 12.0})
+        window = stock_snapshots.window_metrics(sold, filters={'Category': ['Atasan', 'Bawahan']})
+        frame = window["frame"]
+        self.assertEqual(set(frame['Category']), {'Atasan', 'Bawahan'})
+        # Penjualan per SKU dibagi ke lokasi tanpa hilang atau bertambah
+        split = frame.groupby('SKU')['QTY Terjual'].sum()
+        self.assertAlmostEqual(split['A-01'], 30.0)
+        self.assertAlmostEqual(split['B-01'], 12.0)
+        self.assertAlmostEqual(split.get('A-02', 0.0), 0.0)
+
+        table = stock_snapshots.group_metrics(window, 'Category').set_index('Category')
+        atasan = frame[frame['Category'] == 'Atasan']
+        self.assertAlmostEqual(table.loc['Atasan', 'Perputaran'],
+                               atasan['QTY Terjual'].sum() / atasan['Rata-rata Stok'].sum())
+
+
+if __name__ == "__main__":
+    unittest.main()
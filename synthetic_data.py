@@ -0,0 +1,262 @@
+"""
+Generator data sintetis untuk Data Master SKU, penjualan, inbound dan stok.
+
+Data dibentuk dengan layout ekspor yang sama seperti file asli (nama kolom lama seperti 'SK U'
+dan 'Salesmen', tanggal sebagai teks, rupiah "Rp 1.234,00", kuantitas "12 Buah"), sehingga
+melewati jalur pembersihan dan parsing SKU yang sama seperti file unggahan. SKU mengikuti pola
+yang didokumentasikan, misalnya ZOZA21BAS-MIA-TBW35 dan Z11822BAS LUNA-BWT03, dengan sebagian
+kecil SKU yang tidak dikenali. Popularitas SKU mengikuti distribusi Zipf seperti data penjualan nyata.
+
+Hasilnya deterministik untuk (jumlah baris, seed) yang sama. Teks tanggal, rupiah dan nomor
+dokumen diformat per nilai unik lalu disebarkan, sehingga 10 juta baris tetap cepat dibuat.
+
+Penggunaan dari command line:
+    python synthetic_data.py 100000 --out data_sintetis/
+"""
+import argparse
+import os
+import string
+import time
+
+import numpy as np
+import pandas as pd
+
+import schemas
+
+# Batas baris sheet Excel (termasuk header); skala di atasnya hanya bisa ditulis sebagai Parquet
+EXCEL_MAX_ROWS = 1_048_575
+
+# Kode master: (CODE, ARTI, JENIS). Blok pertama SKU diambil dari CATEGORY dan SUB CATEGORY.
+CATEGORY_CODES = [('ZOZA', 'Kids', 'CATEGORY'), ('Z118', 'Zielkids', 'CATEGORY'), ('201A', 'Girls', 'CATEGORY'),
+                  ('202D', 'Boys', 'CATEGORY'), ('Z01', 'Baby', 'CATEGORY'), ('BT', 'Tee', 'SUB CATEGORY'),
+                  ('BD', 'Dress', 'SUB CATEGORY'), ('BP', 'Pants', 'SUB CATEGORY')]
+YEAR_CODES = [(str(year % 100), str(year), 'TAHUN') for year in range(2019, 2027)]
+SEASON_CODES = [('BAS', 'Basic', 'SEASON'), ('RMD', 'Ramadhan', 'SEASON'), ('HLD', 'Holiday', 'SEASON'),
+                ('SCH', 'School', 'SEASON')]
+COLOR_CODES = [('TBW', 'Brown', 'WARNA'), ('BWT', 'White', 'WARNA'), ('ORG', 'Orange', 'WARNA'),
+               ('BLK', 'Black', 'WARNA'), ('NVY', 'Navy', 'WARNA'), ('PNK', 'Pink', 'WARNA'),
+               ('GRN', 'Green', 'WARNA'), ('YLW', 'Yellow', 'WARNA')]
+SIZE_CODES = [('01', 'XXS', 'SIZE'), ('02', 'XS', 'SIZE'), ('03', 'S', 'SIZE'), ('04', 'M', 'SIZE'),
+              ('05', 'L', 'SIZE'), ('35', 'XL', 'SIZE')]
+PRODUCT_CODES = [('MIA', 'Mia', 'PRODUK'), ('LUNA', 'Luna', 'PRODUK'), ('CND', 'Candy', 'PRODUK'),
+                 ('HTR', 'Hunter', 'PRODUK')]
+
+CHANNELS = ['Shopee', 'Tokopedia', 'Lazada', 'TikTok Shop', 'Offline']
+SALESMEN = ['Ani', 'Budi', 'Citra', 'Dedi', 'Eka', 'Fajar']
+STORES = ['Ziel Kids Official Shop', 'Ziel Kids Bandung', 'Ziel Kids Surabaya', 'Ziel Kids Medan']
+LOCATIONS = ['Gudang Utama', 'Gudang Cadangan', 'Toko Bandung', 'Toko Surabaya']
+SUPPLIERS = ['CV Sinar Jaya', 'PT Tekstil Abadi', 'CV Mitra Garmen', 'PT Benang Mas']
+
+# Porsi SKU yang sengaja tidak cocok dengan pola (bundle, kode lama), agar jalur "Unknown" ikut teruji
+UNKNOWN_SKU_RATIO = 0.01
+ZIPF_EXPONENT = 1.1
+
+
+def default_sku_count(rows):
+    """
+    Jumlah SKU yang wajar untuk sejumlah baris penjualan (sekitar 1 SKU per 200 baris, 50-20.000).
+    """
+    return int(min(20_000, max(50, rows // 200)))
+
+
+def _product_codes(count, rng):
+    codes = [code for code, _, _ in PRODUCT_CODES]
+    seen = set(codes) | {code for code, _, _ in COLOR_CODES + SEASON_CODES}
+    letters = np.array(list(string.ascii_uppercase))
+    while len(codes) < count:
+        code = "".join(rng.choice(letters, rng.integers(3, 5)))
+        if code not in seen:
+            seen.add(code)
+            codes.append(code)
+    return codes
+
+
+def sku_master(product_count=60, seed=0):
+    """
+    Data Master SKU (kolom CODE, ARTI, JENIS) dengan kode produk tambahan hingga `product_count`.
+    """
+    rng = np.random.default_rng(seed)
+    products = [(code, code.title(), 'PRODUK') for code in _product_codes(product_count, rng)]
+    rows = CATEGORY_CODES + YEAR_CODES + SEASON_CODES + products + COLOR_CODES + SIZE_CODES
+    return pd.DataFrame(rows, columns=['CODE', 'ARTI', 'JENIS'])
+
+
+def make_skus(count, master, seed=0):
+    """
+    Membuat `count` SKU unik dari kode-kode di master dengan dua bentuk yang didokumentasikan:
+    <blok><tahun><musim>-<produk>-<warna><ukuran> dan <blok><tahun><musim> <produk>-<warna><ukuran>.
+    Sebagian kecil (UNKNOWN_SKU_RATIO) berupa kode yang tidak cocok dengan pola.
+    """
+    rng = np.random.default_rng(seed)
+    by_type = {jenis: group['CODE'].tolist() for jenis, group in master.groupby('JENIS')}
+    blocks = by_type['CATEGORY'] + by_type['SUB CATEGORY']
+    # Sebagian besar SKU diawali kode kategori; blok sub kategori lebih jarang
+    block_weights = np.array([0.85 / len(by_type['CATEGORY'])] * len(by_type['CATEGORY']) +
+                             [0.15 / len(by_type['SUB CATEGORY'])] * len(by_type['SUB CATEGORY']))
+    unknown = int(round(count * UNKNOWN_SKU_RATIO))
+    skus = set()
+    while len(skus) < count - unknown:
+        batch = count - unknown - len(skus)
+        parts = [rng.choice(blocks, batch, p=block_weights), rng.choice(by_type['TAHUN'], batch),
+                 rng.choice(by_type['SEASON'], batch), rng.choice(np.array(['-', ' ']), batch),
+                 rng.choice(by_type['PRODUK'], batch), rng.choice(by_type['WARNA'], batch),
+                 rng.choice(by_type['SIZE'], batch)]
+        for block, year, season, separator, product, color, size in zip(*parts):
+            skus.add(f"{block}{year}{season}{separator}{product}-{color}{size}")
+    skus = sorted(skus)[:count - unknown] + [f"BUNDLE-{i:05d}" for i in range(unknown)]
+    return np.array(skus, dtype=object)[rng.permutation(len(skus))]
+
+
+def _format_unique(values, formatter):
+    """
+    Memformat nilai menjadi teks hanya sekali per nilai unik, lalu menyebarkannya kembali.
+    """
+    uniques, codes = np.unique(values, return_inverse=True)
+    return np.array([formatter(value) for value in uniques], dtype=object)[codes]
+
+
+def format_rupiah(value):
+    """
+    Angka -> teks rupiah Indonesia, misalnya 1234567.5 -> "Rp 1.234.567,50".
+    """
+    text = f"{value:,.2f}".replace(',', '_').replace('.', schemas.RUPIAH_LOCALE["decimal"])
+    return f"{schemas.RUPIAH_LOCALE['symbol']} {text.replace('_', schemas.RUPIAH_LOCALE['thousands'])}"
+
+
+def _numbered(prefix, numbers):
+    return _format_unique(numbers, lambda number: f"{prefix}{number:07d}")
+
+
+def _minute_texts(start, minutes, fmt):
+    """
+    Teks tanggal untuk offset menit dari `start`, diformat per menit unik.
+    """
+    uniques, codes = np.unique(minutes, return_inverse=True)
+    texts = (pd.Timestamp(start) + pd.to_timedelta(uniques, unit='min')).strftime(fmt)
+    return np.asarray(texts, dtype=object)[codes]
+
+
+def _product_names(skus):
+    return np.array([f"Produk {sku.replace('-', ' ')}" for sku in skus], dtype=object)
+
+
+def generate(rows, seed=0, sku_count=None, start="2024-01-01", days=365):
+    """
+    Membuat satu set data sintetis dengan `rows` baris penjualan. Inbound berisi sekitar 1/20
+    baris penjualan dan stok berisi satu baris per SKU per lokasi.
+
+    Mengembalikan {jenis file: DataFrame mentah} dengan jenis "sku_master", "sales", "inbound", "stock".
+    """
+    rng = np.random.default_rng(seed)
+    sku_count = sku_count or default_sku_count(rows)
+    master = sku_master(seed=seed)
+    skus = make_skus(sku_count, master, seed)
+    names = _product_names(skus)
+    sku_price = rng.integers(40, 400, sku_count) * 1000
+
+    # Popularitas SKU mengikuti distribusi Zipf: sedikit SKU menyumbang sebagian besar penjualan
+    weights = 1.0 / np.arange(1, sku_count + 1) ** ZIPF_EXPONENT
+    sku_idx = rng.choice(sku_count, rows, p=weights / weights.sum())
+    qty = rng.integers(1, 6, rows)
+    price = sku_price[sku_idx]
+    sub_total = qty * price
+    discount = rng.choice(np.array([1.0, 1.0, 1.0, 0.9, 0.8]), rows)
+    nett = sub_total * discount
+    hpp = sub_total * 0.45
+    minutes = np.sort(rng.integers(0, days * 24 * 60, rows))
+    sales = pd.DataFrame({
+        'No Faktur': _numbered('INV', np.arange(rows) // 3),
+        'Tanggal': _minute_texts(start, minutes, '%d/%m/%Y %H:%M'),
+        'SK U': skus[sku_idx],
+        'Nama Barang': names[sku_idx],
+        'Channel': rng.choice(CHANNELS, rows),
+        'Salesmen': rng.choice(SALESMEN, rows),
+        'Nama Toka Ziel Kids Officia Shop': rng.choice(STORES, rows),
+        'QTY': qty,
+        'Harga': price,
+        'Sub Total': sub_total,
+        'Nett Sales': nett,
+        'HPP': _format_unique(hpp, format_rupiah),
+        'Gross Profit': _format_unique(nett - hpp, format_rupiah)
+    })
+
+    inbound_rows = max(rows // 20, 20)
+    inbound_idx = rng.integers(0, sku_count, inbound_rows)
+    ordered = rng.integers(10, 200, inbound_rows)
+    received = np.minimum(ordered, rng.integers(5, 200, inbound_rows))
+    cost = (sku_price[inbound_idx] * 0.45).round()
+    amount = received * cost
+    days_offset = np.sort(rng.integers(0, days, inbound_rows)) * 24 * 60
+    inbound = pd.DataFrame({
+        'purchaseorder_no': _numbered('PO', np.arange(inbound_rows) // 5),
+        'Tanggal': _minute_texts(start, days_offset, '%Y-%m-%d'),
+        'supplier_name': rng.choice(SUPPLIERS, inbound_rows),
+        'SKU': skus[inbound_idx],
+        'Qty Dipesan': _format_unique(ordered, lambda q: f"{q} Buah"),
+        'Qty Diterima': _format_unique(received, lambda q: f"{q} Buah"),
+        'Harga': cost,
+        'amount': amount,
+        'Sub Total': amount,
+        'Diskon': 0,
+        'Pajak.1': (amount * 0.11).round(),
+        'Grand Total': (amount * 1.11).round(),
+        'bill_no': _numbered('BILL', np.arange(inbound_rows) // 5),
+        'Catatan': ''
+    })
+
+    stock_sku = np.repeat(np.arange(sku_count), len(LOCATIONS))
+    stock_qty = rng.integers(0, 300, len(stock_sku))
+    reserved = np.minimum(stock_qty, rng.integers(0, 20, len(stock_sku)))
+    stock = pd.DataFrame({
+        'SKU': skus[stock_sku],
+        'Nama': names[stock_sku],
+        'Lokasi': np.tile(LOCATIONS, sku_count),
+        'QTY': stock_qty,
+        'Dipesan': reserved,
+        'Tersedia': stock_qty - reserved,
+        'Harga Jual': sku_price[stock_sku],
+        'HPP': (sku_price[stock_sku] * 0.45).round(),
+        'Nilai Persediaan': stock_qty * (sku_price[stock_sku] * 0.45).round(),
+        'is_bundle': 0
+    })
+    return {"sku_master": master, "sales": sales, "inbound": inbound, "stock": stock}
+
+
+def write_dataset(frames, out_dir, excel=True):
+    """
+    Menulis set data ke out_dir sebagai <jenis>.xlsx (nama yang dikenali batch_report.find_inputs).
+    Frame yang melebihi batas baris Excel, atau semua frame jika excel=False, ditulis sebagai
+    <jenis>.parquet. Mengembalikan {jenis file: path}.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    paths = {}
+    for file_type, df in frames.items():
+        if excel and len(df) <= EXCEL_MAX_ROWS:
+            paths[file_type] = os.path.join(out_dir, f"{file_type}.xlsx")
+            df.to_excel(paths[file_type], index=False)
+        else:
+            paths[file_type] = os.path.join(out_dir, f"{file_type}.parquet")
+            df.to_parquet(paths[file_type], index=False)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Buat file data sintetis untuk pengujian dan benchmark.")
+    parser.add_argument("rows", type=int, help="Jumlah baris penjualan")
+    parser.add_argument("--out", default="data_sintetis", help="Direktori output")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skus", type=int, help="Jumlah SKU (default mengikuti jumlah baris)")
+    parser.add_argument("--parquet", action="store_true", help="Tulis Parquet, bukan Excel")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    frames = generate(args.rows, args.seed, args.skus)
+    generated = time.perf_counter() - started
+    paths = write_dataset(frames, args.out, excel=not args.parquet)
+    for file_type, path in paths.items():
+        print(f"{file_type}: {len(frames[file_type]):,} baris -> {path}")
+    print(f"Dibuat dalam {generated:,.1f} detik, ditulis dalam {time.perf_counter() - started - generated:,.1f} detik")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Penampil tabel berhalaman (server-side) untuk DataFrame besar.
+
+Pencarian dan pengurutan dihitung di server; hanya baris pada halaman yang sedang dilihat
+yang diserialisasi dan dikirim ke browser.
+"""
+import math
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import profiler
+
+DEFAULT_PAGE_SIZE = int(os.environ.get("TABLE_PAGE_SIZE", "100"))
+NO_SORT = "(tanpa urutan)"
+
+
+def search_positions(df, text):
+    """
+    Posisi baris yang salah satu kolom teksnya mengandung `text` (tanpa membedakan huruf besar/kecil).
+    Kolom category dicocokkan lewat daftar kategorinya saja, bukan per baris.
+    """
+    if not text:
+        return np.arange(len(df))
+    mask = np.zeros(len(df), dtype=bool)
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            categories = series.cat.categories.astype(str)
+            matched = np.flatnonzero(categories.str.contains(text, case=False, regex=False))
+            mask |= np.isin(series.cat.codes.to_numpy(), matched)
+        elif series.dtype == object or isinstance(series.dtype, pd.StringDtype):
+            mask |= series.astype(str).str.contains(text, case=False, regex=False).to_numpy(dtype=bool)
+    return np.flatnonzero(mask)
+
+
+def sort_positions(df, positions, sort_by, ascending=True):
+    """
+    Mengurutkan posisi baris berdasarkan satu kolom (NaN di akhir).
+    """
+    if not sort_by or sort_by == NO_SORT:
+        return positions
+    values = df[sort_by].take(positions).reset_index(drop=True)
+    order = values.sort_values(ascending=ascending, kind='stable', na_position='last').index.to_numpy()
+    return positions[order]
+
+
+def arrow_payload_bytes(df):
+    """
+    Perkiraan ukuran payload st.dataframe (serialisasi Arrow IPC), atau None jika gagal.
+    """
+    try:
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(df, preserve_index=True)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().size
+    except Exception:
+        return None
+
+
+def format_bytes(size):
+    if size is None:
+        return "n/a"
+    for unit in ("B", "KB", "MB"):
+        if size < 1024 or unit == "MB":
+            return f"{size:,.0f} {unit}" if unit == "B" else f"{size:,.1f} {unit}"
+        size /= 1024
+
+
+def render_paged_table(df, key, data_key=None, page_size=None, page_transform=None):
+    """
+    Menampilkan DataFrame per halaman dengan kontrol pencarian, pengurutan dan nomor halaman.
+    Hasil pencarian/pengurutan dimemo di session state berdasarkan (data_key, cari, urutan),
+    sehingga berpindah halaman tidak menghitung ulang. page_transform (opsional) diterapkan pada
+    halaman yang ditampilkan saja, misalnya data_loader.to_rupiah untuk kolom fixed-point.
+    """
+    page_size = page_size or DEFAULT_PAGE_SIZE
+    col_search, col_sort, col_order, col_page = st.columns([3, 2, 1, 1])
+    search = col_search.text_input("Cari", key=f"{key}_search")
+    sort_by = col_sort.selectbox("Urutkan berdasarkan", [NO_SORT] + list(df.columns), key=f"{key}_sort")
+    ascending = col_order.toggle("Naik", value=True, key=f"{key}_ascending")
+
+    state = (data_key, len(df), search, sort_by, ascending)
+    memo = st.session_state.setdefault('paged_table_memo', {})
+    if key not in memo or memo[key]['state'] != state:
+        positions = profiler.measure(f"cari/urut tabel: {key}", "tabel",
+                                     lambda: sort_positions(df, search_positions(df, search), sort_by, ascending),
+                                     rows_in=len(df))
+        memo[key] = {'state': state, 'positions': positions}
+    positions = memo[key]['positions']
+
+    total = len(positions)
+    pages = max(1, math.ceil(total / page_size))
+    page_key = f"{key}_page"
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages
+    page = col_page.number_input("Halaman", min_value=1, max_value=pages, step=1, key=page_key)
+
+    start = (page - 1) * page_size
+    end = min(start + page_size, total)
+    page_df = df.take(positions[start:end])
+    if page_transform is not None:
+        page_df = page_transform(page_df)
+    with profiler.stage(f"render tabel: {key}", "render", rows_in=len(page_df)):
+        st.dataframe(page_df)
+    st.caption(f"Baris {start + 1 if total else 0:,}–{end:,} dari {total:,} (halaman {page} dari {pages}) · "
+               f"payload {format_bytes(arrow_payload_bytes(page_df))}")
+
+
+def render_query_table(key, data_key, columns, count, fetch, page_size=None):
+    """
+    Seperti render_paged_table, tetapi pencarian, pengurutan dan pemotongan halaman dikerjakan oleh
+    backend query (misalnya sql_backend.SqlQueries): count(search) mengembalikan jumlah baris cocok,
+    fetch(search, sort_by, ascending, offset, limit) mengembalikan satu halaman. Tidak ada baris
+    yang dimuat ke memori selain halaman yang ditampilkan.
+    """
+    page_size = page_size or DEFAULT_PAGE_SIZE
+    col_search, col_sort, col_order, col_page = st.columns([3, 2, 1, 1])
+    search = col_search.text_input("Cari", key=f"{key}_search")
+    sort_by = col_sort.selectbox("Urutkan berdasarkan", [NO_SORT] + list(columns), key=f"{key}_sort")
+    ascending = col_order.toggle("Naik", value=True, key=f"{key}_ascending")
+
+    state = (data_key, search)
+    memo = st.session_state.setdefault('query_table_memo', {})
+    if key not in memo or memo[key]['state'] != state:
+        total = profiler.measure(f"hitung baris tabel: {key}", "tabel", lambda: count(search))
+        memo[key] = {'state': state, 'total': total}
+    total = memo[key]['total']
+
+    pages = max(1, math.ceil(total / page_size))
+    page_key = f"{key}_page"
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages
+    page = col_page.number_input("Halaman", min_value=1, max_value=pages, step=1, key=page_key)
+
+    start = (page - 1) * page_size
+    end = min(start + page_size, total)
+    page_df = profiler.measure(f"ambil halaman tabel: {key}", "tabel",
+                               lambda: fetch(search, None if sort_by == NO_SORT else sort_by, ascending, start,
+                                             page_size))
+    with profiler.stage(f"render tabel: {key}", "render", rows_in=len(page_df)):
+        st.dataframe(page_df)
+    st.caption(f"Baris {start + 1 if total else 0:,}–{end:,} dari {total:,} (halaman {page} dari {pages}) · "
+               f"payload {format_bytes(arrow_payload_bytes(page_df))}")
@@ -0,0 +1,194 @@
+"""
+Warm start: memuat dataset terakhir ke memori saat server start.
+
+Setelah server restart, pengguna pertama harus mengunggah ulang file dan menunggu pembacaan cache
+Parquet, optimasi tipe data serta pembangunan struktur turunan (kubus penjualan, indeks filter, dimensi
+SKU) sebelum dashboard tampil. Dashboard mencatat dataset lengkap terakhir yang dimuatnya di cache
+(data_cache.record_last_dataset); modul ini membaca catatan tersebut dan, di thread latar, memasukkan
+decoder SKU, frame dan struktur turunannya ke registry proses (dataset_registry) dengan kunci yang sama
+seperti app.py. Sesi tanpa unggahan lalu langsung memakai nilai yang sudah ada di registry.
+
+Nilai hasil preload tidak dipegang siapa pun, sehingga tetap bisa dievict jika anggaran registry
+terlampaui; sesi berikutnya cukup membacanya ulang dari cache Parquet.
+
+Warm start aktif jika WARM_START=1 (preload dimulai saat sesi pertama menjalankan skrip), atau jika
+dashboard dijalankan lewat `python warm_start.py serve` (preload dimulai sebelum server menerima koneksi).
+
+Penggunaan dari command line:
+    python warm_start.py serve [argumen streamlit run lain, misalnya --server.port 8501]
+    python warm_start.py preload
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+import pandas as pd
+
+import charts
+import data_cache
+import data_loader
+import dataset_registry
+import filter_engine
+import sales_cube
+import sku_dimension
+
+WARM_START = os.environ.get("WARM_START", "0") == "1"
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+DATA_TYPES = ("sales", "inbound", "stock")
+
+RUNNING = "berjalan"
+DONE = "selesai"
+EMPTY = "tidak ada dataset"
+FAILED = "gagal"
+
+_status = {"state": None, "files": None, "steps": {}, "seconds": None, "error": None}
+_thread = None
+_lock = threading.Lock()
+
+
+def load_decoder(key):
+    """
+    SKU decoder dari entri cache Data Master SKU, atau {} jika entrinya sudah tidak ada.
+    """
+    df = data_cache.load_cached_frame(key)
+    return data_loader.build_sku_decoder(df) if df is not None else {}
+
+
+def load_frame(key, file_type):
+    """
+    Frame dari cache Parquet, diurutkan dan dioptimasi tipenya seperti app.finalize_frame.
+    """
+    df = data_cache.load_cached_frame(key)
+    if df is None or df.empty:
+        return pd.DataFrame()
+    return data_loader.optimize_dtypes(data_loader.sort_by_date(df, file_type), file_type)[0]
+
+
+def preload(registry=None, files=None):
+    """
+    Memuat dataset (default: dataset terakhir di cache) beserta struktur turunannya ke registry.
+    Mengembalikan waktu per langkah dalam detik, atau None jika tidak ada dataset untuk dimuat.
+    """
+    registry = registry or dataset_registry.shared()
+    files = files or data_cache.last_dataset()
+    if not files:
+        return None
+    holder = registry.holder()
+    steps = {}
+
+    def step(name, key, builder):
+        started = time.perf_counter()
+        value = holder.acquire(name, key, builder)
+        steps[name] = time.perf_counter() - started
+        return value
+
+    try:
+        # plotly.express baru diimpor saat grafik pertama dibuat; di sini agar render pertama tidak menunggu
+        started = time.perf_counter()
+        charts.express()
+        steps["impor plotly.express"] = time.perf_counter() - started
+
+        master_key = files["sku_master"]["key"]
+        step("sku_master", master_key, lambda: load_decoder(master_key))
+        keys = {file_type: files[file_type]["key"] for file_type in DATA_TYPES}
+        frames = {file_type: step(f"data:{file_type}", keys[file_type], lambda: load_frame(keys[file_type], file_type))
+                  for file_type in DATA_TYPES}
+        if any(df.empty for df in frames.values()):
+            return steps
+
+        # Kunci sama dengan app.per_dataset dan app.get_sku_dimension
+        step("sales_cube", ("sales_cube", keys["sales"]), lambda: sales_cube.build_sales_cube(frames["sales"]))
+        for file_type in DATA_TYPES:
+            name = f"{file_type}_filter_index"
+            date_column = 'Tanggal' if file_type == "sales" else None
+            step(name, (name, keys[file_type]),
+                 lambda: filter_engine.FilterIndex(frames[file_type], date_column=date_column))
+        step("sku_dimension", ("sku_dimension", keys["sales"], keys["stock"], keys["inbound"]),
+             lambda: sku_dimension.SkuDimension.build(frames["sales"], frames["stock"], frames["inbound"]))
+    finally:
+        holder.release()
+    return steps
+
+
+def _run(registry, files):
+    started = time.perf_counter()
+    try:
+        steps = preload(registry, files) if files else None
+        _status.update(state=DONE if steps else EMPTY, steps=steps or {})
+    except Exception as e:
+        _status.update(state=FAILED, error=f"{type(e).__name__}: {e}")
+    _status["seconds"] = time.perf_counter() - started
+
+
+def start(registry=None):
+    """
+    Memulai preload dataset terakhir di thread latar, sekali per proses.
+    """
+    global _thread
+    with _lock:
+        if _thread is None:
+            files = data_cache.last_dataset()
+            _status.update(state=RUNNING, files=files)
+            _thread = threading.Thread(target=_run, args=(registry, files), name="warm-start", daemon=True)
+            _thread.start()
+        return _thread
+
+
+def enabled():
+    """
+    True jika warm start aktif di proses ini (WARM_START=1 atau server dijalankan lewat serve).
+    """
+    return WARM_START or _thread is not None
+
+
+def status():
+    """
+    Status preload: state, files (dataset yang dimuat), steps (detik per langkah), seconds dan error.
+    """
+    return dict(_status)
+
+
+def serve(streamlit_args):
+    """
+    Memulai preload lalu menjalankan `streamlit run app.py` di proses yang sama, sehingga registry yang
+    diisi preload adalah registry yang dipakai sesi dashboard.
+    """
+    from streamlit.web import cli
+
+    start()
+    sys.argv = ["streamlit", "run", APP_PATH, *streamlit_args]
+    return cli.main()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Jalankan dashboard dengan preload dataset terakhir dari cache.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("serve", help="Jalankan dashboard; argumen lain diteruskan ke streamlit run")
+    subparsers.add_parser("preload", help="Muat dataset terakhir sekali dan tampilkan waktu per langkah")
+    args, streamlit_args = parser.parse_known_args(argv)
+
+    # Skrip ini berjalan sebagai __main__, sedangkan app.py mengimpor warm_start; state preload harus
+    # berada di modul yang diimpor dengan nama tersebut
+    import warm_start
+
+    if args.command == "serve":
+        return warm_start.serve(streamlit_args)
+    if streamlit_args:
+        parser.error(f"argumen tidak dikenal: {' '.join(streamlit_args)}")
+    files = data_cache.last_dataset()
+    if files is None:
+        print(f"Tidak ada dataset terakhir yang masih lengkap di {data_cache.CACHE_DIR}")
+        return 1
+    steps = warm_start.preload(files=files)
+    for file_type, entry in files.items():
+        print(f"{file_type}: {entry['name']}")
+    for name, seconds in steps.items():
+        print(f"  {name}: {seconds:,.3f} detik")
+    print(f"Total: {sum(steps.values()):,.3f} detik")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())